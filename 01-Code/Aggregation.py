@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Class Aggregation:
+==================
+
+  Group-by aggregation engine used to roll year-by-year vectors up the
+  TaskStaff/TaskEquipment -> Task -> WorkPackage -> Project hierarchy.
+
+  Leaf vectors are stacked into a (leaves, years) array, zero padded where
+  vectors are short.  Each leaf carries the integer index of its parent.
+  The parent sums are then formed in a single indexed reduction
+  (np.add.at), so the cost of a roll-up grows linearly with the number of
+  leaves.  np.add.at accumulates leaves in the order in which they are
+  presented, so the sums are identical to those obtained by looping over
+  children in the same order.
+
+  Aggregation has no instances; all methods are class methods.
+
+
+  Class attributes:
+  -----------------
+  __Debug : Boolean: set for debug print out
+
+
+  Methods:
+  --------
+  Processing methods:
+      stack: Stack list of 1D numpy arrays into a zero-padded 2D array.
+                 Input: _Vectors -- list of numpy arrays
+                Return: numpy array (leaves, years), numpy int array of
+                        lengths of leaf vectors
+                 [Classmethod]
+
+      groupSum: Sum rows of 2D array by group.
+                 Input: _Values  -- numpy array (leaves, years)
+                        _Groups  -- numpy int array; group of each leaf,
+                                    leaves with negative group are ignored
+                        _nGroups -- number of groups
+                Return: numpy array (groups, years)
+                 [Classmethod]
+
+      groupLength: Length of vectors in each group.  Leaves of zero length
+                   are ignored; groups without leaves have length 0.
+                 Input: _Lengths -- numpy int array; length of each leaf
+                        _Groups  -- numpy int array; group of each leaf
+                        _nGroups -- number of groups
+                Return: numpy int array (groups)
+                Raises: InconsistentLengths if the non-empty leaves of a
+                        group have different lengths.
+                 [Classmethod]
+
+      rollUp: Sum leaf vectors into list of parent vectors.
+                 Input: _Values  -- numpy array (leaves, years)
+                        _Groups  -- numpy int array; group of each leaf
+                        _nGroups -- number of groups
+                        _GrpLen  -- numpy int array; length of each group
+                                    vector
+                Return: List of numpy arrays, one per group; groups of
+                        length zero get an empty array.  The arrays are
+                        views into a single backing array.
+                 [Classmethod]
+
+      share: Move a year-by-year vector attribute of a list of instances
+             into a single backing array; each instance keeps a view of
+             its own row.
+                 Input: _Insts -- list of instances
+                        _Attr  -- name of the attribute
+                Return: numpy array (instances, years); the backing array
+                 [Classmethod]
+
+      toQuarters: Spread annual values evenly over the four quarters of
+                  each year.
+                 Input: _Values -- numpy array (..., years)
+                Return: numpy array (..., 4*years)
+                 [Classmethod]
+
+      toYears: Sum quarterly values into annual values.
+                 Input: _Values -- numpy array (..., 4*years)
+                Return: numpy array (..., years)
+                 [Classmethod]
+
+
+  Exceptions:
+    InconsistentLengths: leaves summed into the same parent have vectors
+                         of different lengths.
+
+
+Created on Sun 18Oct26. Version history:
+----------------------------------------
+ 1.0: 18Oct26: First implementation
+ 1.1: 18Oct26: toQuarters and toYears for quarterly costing
+ 1.2: 18Oct26: rollUp returns views of the group sums; share
+
+@author: kennethlong
+"""
+
+import numpy as np
+
+class Aggregation:
+    __Debug = False
+
+#--------  Processing methods:
+    @classmethod
+    def stack(cls, _Vectors):
+        Lengths = np.array([len(Vec) for Vec in _Vectors], dtype=int)
+        nYrs    = 0
+        if len(Lengths) > 0:
+            nYrs = int(np.max(Lengths))
+        Values = np.zeros((len(_Vectors), nYrs))
+        for iVec, Vec in enumerate(_Vectors):
+            Values[iVec, :Lengths[iVec]] = Vec
+        if cls.__Debug:
+            print(" Aggregation; stack: stacked", len(_Vectors), \
+                  "vectors, maximum length", nYrs)
+        return Values, Lengths
+
+    @classmethod
+    def groupSum(cls, _Values, _Groups, _nGroups):
+        Sums = np.zeros((_nGroups, _Values.shape[1]))
+        Sel  = _Groups >= 0
+        np.add.at(Sums, _Groups[Sel], _Values[Sel])
+        if cls.__Debug:
+            print(" Aggregation; groupSum: summed", np.sum(Sel), \
+                  "leaves into", _nGroups, "groups")
+        return Sums
+
+    @classmethod
+    def groupLength(cls, _Lengths, _Groups, _nGroups):
+        Sel    = np.logical_and(_Groups >= 0, _Lengths > 0)
+        MaxLen = np.zeros(_nGroups, dtype=int)
+        MinLen = np.full(_nGroups, np.iinfo(int).max)
+        np.maximum.at(MaxLen, _Groups[Sel], _Lengths[Sel])
+        np.minimum.at(MinLen, _Groups[Sel], _Lengths[Sel])
+        Bad = np.logical_and(MaxLen > 0, MinLen != MaxLen)
+        if np.any(Bad):
+            raise InconsistentLengths(" Aggregation; groupLength: groups ", \
+                                      np.nonzero(Bad)[0])
+        return MaxLen
+
+    @classmethod
+    def rollUp(cls, _Values, _Groups, _nGroups, _GrpLen):
+        Values = _Values
+        if _nGroups > 0 and np.max(_GrpLen) > _Values.shape[1]:
+            Values = np.zeros((_Values.shape[0], np.max(_GrpLen)))
+            Values[:, :_Values.shape[1]] = _Values
+        Sums = cls.groupSum(Values, _Groups, _nGroups)
+        return [Sums[iGrp, :_GrpLen[iGrp]] for iGrp in range(_nGroups)]
+
+    @classmethod
+    def share(cls, _Insts, _Attr):
+        Values, Lengths = cls.stack([getattr(Inst, _Attr) \
+                                     for Inst in _Insts])
+        for iInst, Inst in enumerate(_Insts):
+            setattr(Inst, _Attr, Values[iInst, :Lengths[iInst]])
+        if cls.__Debug:
+            print(" Aggregation; share:", _Attr, "of", len(_Insts), \
+                  "instances in backing array", Values.shape)
+        return Values
+
+    @classmethod
+    def toQuarters(cls, _Values):
+        return np.repeat(np.asarray(_Values, dtype=float) / 4., 4, axis=-1)
+
+    @classmethod
+    def toYears(cls, _Values):
+        Values = np.asarray(_Values, dtype=float)
+        return np.sum(Values.reshape(Values.shape[:-1] + (-1, 4)), axis=-1)
+
+
+#--------  Exceptions:
+class InconsistentLengths(Exception):
+    pass
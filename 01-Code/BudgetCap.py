@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Class BudgetCap:
+================
+
+  Proposes reductions of TaskStaff effort and equipment cost that bring
+  the project, and/or individual work packages, within a budget cap.
+
+  The "lines" that may be cut are the costed TaskStaff rows and the
+  equipment items of the costed project.  Cutting line i by a fraction
+  s_i (0 <= s_i <= maximum cut of the line) scales its staff fraction, or
+  equipment cost, in every year by (1 - s_i).  The grand totals are
+  linear in the inputs (see CostOperator), so the saving on work package
+  w is s_i * C_iw, where C_iw is the contribution of line i to the grand
+  total of w, including inflation, working margin and contingency.
+
+  The cuts solve the linear programme:
+    minimise    sum_i Weight_i * s_i
+    subject to  sum_i s_i * C_iw >= GrandTotal_w - Cap_w  (capped WPs)
+                sum_i s_i * C_i  >= Total - Cap           (project cap)
+                sum_(i in t) s_i * Frac_i <= Frac_t - Min_t  (each task t)
+                0 <= s_i <= MaxCut_i
+  where Frac_i is the total staff fraction of row i and Frac_t and Min_t
+  are the total and minimum staff fraction of task t.  The impact of a
+  cut is thus the weighted fraction of the line removed; the default
+  weight is 1 for every line and a pinned line has maximum cut 0.
+
+  The programme is solved with a dense two-phase simplex (see simplex).
+  A shortfall u_w >= 0 is added to the left of each cap constraint; the
+  total shortfall is minimised first and the weighted cuts are then
+  minimised with the total shortfall held at its minimum.  If the caps
+  can be met the shortfall is zero and the cuts are the solution of the
+  programme above; if not, the cuts that come closest to the caps are
+  kept and the shortfall is recorded.  The values of the cuts are
+  finally evaluated from the optimal basis of the original constraints,
+  so that a cap that is met is met to rounding.
+
+
+  Class attributes:
+  -----------------
+  __Debug : Boolean: set for debug print out
+  _Kinds  : Kinds of line, "TaskStaff" and "Equipment"
+
+
+  Instance attributes:
+  --------------------
+    _Cntrl     : Costing context
+    _Cap       : Project budget cap (£k); None for no cap
+    _WPCaps    : Dictionary of work package caps (£k) keyed by code
+    _Operator  : Instance of CostOperator
+    _Lines     : List of (kind, instance) of the lines; TaskStaff or
+                 Equipment instances
+    _LineIdx   : Dictionary of index in _Lines keyed by instance
+    _Saving    : numpy array (lines, work packages + 1) of the saving on
+                 the grand totals of cutting each line completely; last
+                 column is the project
+    _Weight    : numpy array (lines) of weights
+    _MaxCut    : numpy array (lines) of maximum cuts
+    _MinEffort : Dictionary of minimum staff fraction keyed by Task
+    _Cuts      : numpy array (lines) of cuts; None before solve
+    _Shortfall : Dictionary of amount by which each cap is missed (£k)
+                 keyed by work package code, "Project" for the project
+    _Nominal   : Nominal staff fraction tensors and equipment costs, held
+                 while the cuts are applied
+
+
+  Methods:
+  --------
+  Built-in methods __init__, __repr__ and __str__.
+      __init__: Compile cost operator and lines.
+                 Input: _Cap    -- project budget cap (£k); None (default)
+                                   for no cap
+                        _WPCaps -- dictionary of work package caps (£k)
+                                   keyed by code; None (default) for none
+                        _Cntrl  -- costing context; default if None
+                Raises: UnknownWorkPackage
+      __repr__: One liner with call.
+      __str__ : Dump of caps, lines and solution.
+
+  Set methods:
+      pin: Line may not be cut.
+                 Input: _Inst -- instance of TaskStaff or Equipment
+                Raises: UnknownLine
+
+      setWeight: Set weight of line.
+                 Input: _Inst, _Weight (> 0)
+                Raises: UnknownLine, InvalidWeight
+
+      setMaximumCut: Set maximum cut of line.
+                 Input: _Inst, _MaxCut -- fraction between 0 and 1
+                Raises: UnknownLine
+
+      setMinimumEffort: Set minimum total staff fraction of a task.
+                 Input: _Task, _MinFrac
+
+  Get methods:
+      getLine: Return index of line of instance (from _LineIdx).
+                Raises: UnknownLine
+
+      getNeed: Return saving needed to meet each cap given cuts.
+                 Input: _Cuts -- numpy array (lines)
+                Return: numpy array (work packages + 1); last entry is
+                        the project
+
+  Processing methods:
+      solve: Find cuts.
+                Return: change list; list of (kind, line, work package,
+                        nominal, revised, cut, saving) for lines with
+                        a cut, largest saving first
+
+      simplex: Solve the linear programme
+                 minimise c.x subject to A x <= b, x >= 0
+               by the two-phase simplex method on a dense tableau
+               (Bland's rule).
+                 Input: _c -- numpy array (variables)
+                        _A -- numpy array (constraints, variables)
+                        _b -- numpy array (constraints); any sign
+                        _Tol -- tolerance; 1.E-9 (default)
+                Return: numpy array (variables); None if infeasible
+                Raises: UnboundedProgramme
+                 [Classmethod]
+
+      pivot: Exchange basic variables of a tableau until no reduced
+             cost is negative (used by simplex).
+                 Input: _T     -- tableau; right-hand side last column
+                        _Basis -- numpy int array (rows) of basic columns
+                        _Cost  -- numpy array (columns) of costs
+                        _nCol  -- columns that may enter the basis
+                        _Tol   -- tolerance
+                Raises: UnboundedProgramme
+                 [Classmethod]
+
+      exchange: Make a column basic in a row of a tableau (used by
+                pivot).
+                 Input: _T, _Basis, _iRow, _jCol
+                 [Classmethod]
+
+      apply: Apply cuts to the data model and re-cost the project; the
+             nominal inputs are kept for restore.
+
+      restore: Restore nominal inputs and re-cost the project.
+
+      writeOverview: Apply cuts, write overview report of the revised
+                     project and restore.
+                 Input: _ReportPath, _FileName -- as Report.Overview
+
+      createPandasDataframe: Create dataframe of change list.
+                 Input: _Changes -- list returned by solve
+                 [Classmethod]
+
+      createCSV: Write dataframe to CSV file.
+                 Input: _DataFrame, _filename
+                 [Classmethod]
+
+
+  Exceptions:
+    UnknownWorkPackage: cap given for unknown work package
+
+    UnknownLine       : instance is not a line of the costed project
+
+    InvalidWeight     : weight of line not greater than zero
+
+    UnboundedProgramme: linear programme given to simplex is unbounded
+
+
+Created on Sun 18Oct26. Version history:
+----------------------------------------
+ 1.0: 18Oct26: First implementation
+ 1.1: 18Oct26: Weight of line checked; line index held in a dictionary
+ 1.2: 18Oct26: Linear programme solved by simplex in place of the greedy
+               cuts, which missed caps that could be met when the
+               minimum effort of a task limited the cuts
+
+@author: kennethlong
+"""
+
+import numpy as np
+import pandas as pd
+
+import Control          as Cntrl
+import CostOperator     as CstOp
+import LhARACostingTool as LCT
+import Project          as Prj
+import Report           as Rpt
+import TaskEquipment    as TskEqp
+import TaskStaff        as TskStf
+import WorkPackage      as wp
+
+class BudgetCap:
+    __Debug = False
+    _Kinds  = ("TaskStaff", "Equipment")
+
+#--------  "Built-in methods":
+    def __init__(self, _Cap=None, _WPCaps=None, _Cntrl=None):
+        self._Cntrl = _Cntrl
+        if self._Cntrl == None:
+            self._Cntrl = Cntrl.Control()
+        self._Cap    = _Cap
+        self._WPCaps = {}
+        if _WPCaps is not None:
+            self._WPCaps = dict(_WPCaps)
+        Codes = [iWP._Code for iWP in wp.WorkPackage.instances]
+        for Code in self._WPCaps:
+            if not Code in Codes:
+                raise UnknownWorkPackage(" BudgetCap: no work package ", \
+                                         Code)
+
+        iOp  = CstOp.CostOperator(None, self._Cntrl)
+        nYrs = iOp._nYrs
+        nWP  = len(iOp._WPs)
+        x    = iOp.getInput()
+        TS   = TskStf.TaskStaff
+        RowInst = {iTS._Row: iTS for iTS in TS.instances \
+                   if iTS._Row != None}
+        self._Operator = iOp
+        self._Lines    = [("TaskStaff", RowInst[Row]) \
+                          for Row in iOp._Rows] + \
+                         [("Equipment", iEqp) for iEqp in iOp._EqpKeys]
+        self._LineIdx  = {Line[1]: iLn \
+                          for iLn, Line in enumerate(self._Lines)}
+
+        #.. Contribution of each line to the grand total of each work
+        #   package and of the project:
+        nLn = len(self._Lines)
+        self._Saving = np.zeros((nLn, nWP + 1))
+        for iPos in range(nWP + 1):
+            Cntrb = iOp.getGradient("Total", iPos) * x
+            self._Saving[:, iPos] = np.concatenate([ \
+                np.sum(Cntrb[iOp._Slices[Kind]].reshape(-1, nYrs), axis=1) \
+                for Kind in self._Kinds])
+
+        self._Weight    = np.ones(nLn)
+        self._MaxCut    = np.ones(nLn)
+        self._MinEffort = {}
+        self._Cuts      = None
+        self._Shortfall = {}
+        self._Nominal   = None
+        if BudgetCap.__Debug:
+            print(self)
+
+    def __repr__(self):
+        return "BudgetCap(Cap, WPCaps, Control)"
+
+    def __str__(self):
+        print(" BudgetCap:")
+        print("     Project cap:", self._Cap, "; work package caps:", \
+              self._WPCaps)
+        print("     Lines:", len(self._Lines), "; pinned:", \
+              int(np.sum(self._MaxCut == 0.)), \
+              "; tasks with minimum effort:", len(self._MinEffort))
+        if self._Cuts is not None:
+            print("     Lines cut:", int(np.sum(self._Cuts > 0.)), \
+                  "; shortfall:", self._Shortfall)
+        return "     <---- Done."
+
+#--------  Set methods:
+    def pin(self, _Inst):
+        self._MaxCut[self.getLine(_Inst)] = 0.
+
+    def setWeight(self, _Inst, _Weight):
+        if not _Weight > 0.:
+            raise InvalidWeight(" BudgetCap; setWeight: weight not > 0: ", \
+                                _Weight)
+        self._Weight[self.getLine(_Inst)] = _Weight
+
+    def setMaximumCut(self, _Inst, _MaxCut):
+        self._MaxCut[self.getLine(_Inst)] = min(max(_MaxCut, 0.), 1.)
+
+    def setMinimumEffort(self, _Task, _MinFrac):
+        self._MinEffort[_Task] = _MinFrac
+
+#--------  Get methods:
+    def getLine(self, _Inst):
+        iLn = self._LineIdx.get(_Inst)
+        if iLn == None:
+            raise UnknownLine(" BudgetCap; getLine: not a line of project: ", \
+                              _Inst)
+        return iLn
+
+    def getNeed(self, _Cuts):
+        Saved = _Cuts @ self._Saving
+        Need  = np.zeros(self._Saving.shape[1])
+        for iPos, iWP in enumerate(self._Operator._WPs):
+            if iWP._Code in self._WPCaps:
+                Need[iPos] = iWP._GrandTotal - self._WPCaps[iWP._Code] - \
+                             Saved[iPos]
+        if self._Cap != None:
+            Need[-1] = Prj.Project.instances[0].getTotalProjectCost() - \
+                       self._Cap - Saved[-1]
+        return np.maximum(Need, 0.)
+
+#--------  Processing methods:
+    def solve(self):
+        TS   = TskStf.TaskStaff
+        nLn  = len(self._Lines)
+        Cuts = np.zeros(nLn)
+
+        #.. Staff fraction of each line and effort that may be removed from
+        #   each task:
+        Frac  = np.zeros(nLn)
+        Tasks = [None] * nLn
+        Spare = {}
+        for iLn, Line in enumerate(self._Lines):
+            if Line[0] != "TaskStaff":
+                continue
+            Frac[iLn]  = TS._TotalFrac[Line[1]._Row]
+            Tasks[iLn] = Line[1]._Task
+            Spare[Tasks[iLn]] = Spare.get(Tasks[iLn], 0.) + Frac[iLn]
+        for iTsk in Spare:
+            Spare[iTsk] = max(Spare[iTsk] - self._MinEffort.get(iTsk, 0.), \
+                              0.)
+
+        #.. Capped work packages and project:
+        Caps = [iPos for iPos, iWP in enumerate(self._Operator._WPs) \
+                if iWP._Code in self._WPCaps]
+        if self._Cap != None:
+            Caps.append(len(self._Operator._WPs))
+        nCap = len(Caps)
+        Need = self.getNeed(Cuts)[Caps]
+
+        #.. Constraints on variables (cuts, shortfalls):
+        #     cap:       -sum_i s_i * C_iw - u_w <= -Need_w
+        #     task:       sum_(i in t) s_i * Frac_i <= Spare_t
+        #     line:       s_i <= MaxCut_i
+        TskIdx = {iTsk: nCap + i for i, iTsk in enumerate(Spare)}
+        nTsk   = len(TskIdx)
+        A = np.zeros((nCap + nTsk + nLn, nLn + nCap))
+        b = np.zeros(A.shape[0])
+        A[:nCap, :nLn]  = -self._Saving[:, Caps].T
+        A[:nCap, nLn:]  = -np.eye(nCap)
+        b[:nCap]        = -Need
+        for iLn in range(nLn):
+            if Tasks[iLn] != None:
+                A[TskIdx[Tasks[iLn]], iLn] = Frac[iLn]
+        b[nCap:nCap+nTsk]   = list(Spare.values())
+        A[nCap+nTsk:, :nLn] = np.eye(nLn)
+        b[nCap+nTsk:]       = self._MaxCut
+
+        #.. Least total shortfall, then least weighted cut with the total
+        #   shortfall held:
+        Short = np.concatenate((np.zeros(nLn), np.ones(nCap)))
+        x     = BudgetCap.simplex(Short, A, b)
+        Least = np.sum(x[nLn:])
+        c     = np.concatenate((self._Weight, np.zeros(nCap)))
+        xW    = BudgetCap.simplex(c, np.vstack((A, Short)), \
+                                  np.append(b, Least))
+        if xW is not None:
+            x = xW
+        Cuts = np.clip(x[:nLn], 0., self._MaxCut)
+
+        self._Cuts = Cuts
+        Need = self.getNeed(Cuts)
+        self._Shortfall = {}
+        for iPos, iWP in enumerate(self._Operator._WPs):
+            if Need[iPos] > 0.:
+                self._Shortfall[iWP._Code] = Need[iPos]
+        if Need[-1] > 0.:
+            self._Shortfall["Project"] = Need[-1]
+
+        Changes = []
+        for iLn in np.argsort(-Cuts * self._Saving[:, -1], kind="stable"):
+            if Cuts[iLn] <= 0.:
+                continue
+            Kind, Inst = self._Lines[iLn]
+            if Kind == "TaskStaff":
+                Name    = Inst._Task._Name + " / " + Inst._Staff._StaffCode
+                Codes   = Inst._Task._WorkPackage._Code
+                Nominal = Frac[iLn]
+            else:
+                Name    = Inst._Name
+                Codes   = []
+                for iTskEqp in TskEqp.TaskEquipment.instances:
+                    Code = iTskEqp._Task._WorkPackage._Code
+                    if iTskEqp._Equipment is Inst and not Code in Codes:
+                        Codes.append(Code)
+                Codes   = "; ".join(Codes)
+                Nominal = np.sum(Inst._EquipmentCostByYear)
+            Changes.append((Kind, Name, Codes, Nominal, \
+                            Nominal * (1. - Cuts[iLn]), Cuts[iLn], \
+                            Cuts[iLn] * self._Saving[iLn, -1]))
+        if BudgetCap.__Debug:
+            print(" BudgetCap; solve:", len(Changes), "changes; shortfall:", \
+                  self._Shortfall)
+        return Changes
+
+    @classmethod
+    def simplex(cls, _c, _A, _b, _Tol=1.E-9):
+        c = np.asarray(_c, dtype=float)
+        A = np.asarray(_A, dtype=float)
+        b = np.asarray(_b, dtype=float)
+        nCon, nVar = A.shape
+
+        #.. Tableau of variables, slacks, artificials and right-hand side;
+        #   rows with b < 0 are negated and start from their artificial:
+        Neg  = np.flatnonzero(b < 0.)
+        nCol = nVar + nCon + len(Neg)
+        T    = np.zeros((nCon, nCol + 1))
+        T[:, :nVar]          = A
+        T[:, nVar:nVar+nCon] = np.eye(nCon)
+        T[:, -1]             = b
+        T[Neg] *= -1.
+        Art = nVar + nCon + np.arange(len(Neg))
+        T[Neg, Art] = 1.
+        Basis      = nVar + np.arange(nCon)
+        Basis[Neg] = Art
+
+        #.. Phase 1; least sum of artificials:
+        Cost = np.zeros(nCol)
+        Cost[Art] = 1.
+        cls.pivot(T, Basis, Cost, nCol, _Tol)
+        Scale = max(1., np.max(np.abs(b), initial=0.))
+        if np.sum(T[Basis >= nVar + nCon, -1]) > _Tol * Scale:
+            return None
+
+        #.. Artificials left in the basis (at zero) are exchanged for
+        #   any other column; if there is none the row is redundant:
+        for iRow in np.flatnonzero(Basis >= nVar + nCon):
+            Cols = np.flatnonzero(np.abs(T[iRow, :nVar+nCon]) > _Tol)
+            if len(Cols) > 0:
+                cls.exchange(T, Basis, iRow, Cols[0])
+
+        #.. Phase 2; least c.x without the artificials:
+        Cost = np.zeros(nCol)
+        Cost[:nVar] = c
+        cls.pivot(T, Basis, Cost, nVar + nCon, _Tol)
+
+        #.. Values of the basic variables from the original constraints:
+        Full = np.hstack((A, np.eye(nCon), np.zeros((nCon, len(Neg)))))
+        Full[Neg, Art] = -1.
+        xB = T[:, -1]
+        try:
+            xB = np.linalg.solve(Full[:, Basis], b)
+        except np.linalg.LinAlgError:
+            pass
+        x = np.zeros(nCol)
+        x[Basis] = np.where(xB > _Tol, xB, 0.)
+        if cls.__Debug:
+            print(" BudgetCap; simplex: objective:", c @ x[:nVar])
+        return x[:nVar]
+
+    @classmethod
+    def pivot(cls, _T, _Basis, _Cost, _nCol, _Tol):
+        while True:
+            Reduced = _Cost[:_nCol] - _Cost[_Basis] @ _T[:, :_nCol]
+            Enter   = np.flatnonzero(Reduced < -_Tol)
+            if len(Enter) == 0:
+                return
+            jCol = Enter[0]
+            Pos  = np.flatnonzero(_T[:, jCol] > _Tol)
+            if len(Pos) == 0:
+                raise UnboundedProgramme(" BudgetCap; simplex: " \
+                                         "programme is unbounded")
+            Ratio = _T[Pos, -1] / _T[Pos, jCol]
+            Tie   = Pos[Ratio <= np.min(Ratio) + _Tol]
+            cls.exchange(_T, _Basis, Tie[np.argmin(_Basis[Tie])], jCol)
+
+    @classmethod
+    def exchange(cls, _T, _Basis, _iRow, _jCol):
+        _T[_iRow] /= _T[_iRow, _jCol]
+        Col = _T[:, _jCol].copy()
+        Col[_iRow] = 0.
+        _T -= np.outer(Col, _T[_iRow])
+        _Basis[_iRow] = _jCol
+
+    def apply(self):
+        if self._Cuts is None:
+            self.solve()
+        TS = TskStf.TaskStaff
+        self._Nominal = []
+        for iLn, Line in enumerate(self._Lines):
+            if self._Cuts[iLn] <= 0.:
+                continue
+            Kind, Inst = Line
+            if Kind == "TaskStaff":
+                self._Nominal.append((Line, \
+                                      TS._FracTensor[Inst._Row].copy()))
+                TS._FracTensor[Inst._Row] *= 1. - self._Cuts[iLn]
+            else:
+                self._Nominal.append((Line, Inst._EquipmentCostByYear))
+                Inst.setEquipmentCost(Inst._EquipmentCostByYear * \
+                                      (1. - self._Cuts[iLn]))
+                Inst.setTotalEquipmentCost()
+        LCT.LhARACostingTool.doCosting(self._Cntrl)
+
+    def restore(self):
+        if self._Nominal == None:
+            return
+        TS = TskStf.TaskStaff
+        for Line, Nominal in self._Nominal:
+            Kind, Inst = Line
+            if Kind == "TaskStaff":
+                TS._FracTensor[Inst._Row] = Nominal
+            else:
+                Inst.setEquipmentCost(Nominal)
+                Inst.setTotalEquipmentCost()
+        self._Nominal = None
+        LCT.LhARACostingTool.doCosting(self._Cntrl)
+
+    def writeOverview(self, _ReportPath, _FileName):
+        self.apply()
+        try:
+            Ovrvw = Rpt.Overview(_ReportPath, _FileName, \
+                                 Prj.Project.instances[0])
+            Ovrvw.asCSV()
+        finally:
+            self.restore()
+
+    @classmethod
+    def createPandasDataframe(cls, _Changes):
+        BCData = []
+        BCData.append(["Line type", "Line", "Work package", "Nominal", \
+                       "Revised", "Cut (%)", "Saving (£k)"])
+        for Change in _Changes:
+            BCData.append(list(Change[:5]) + [100. * Change[5], Change[6]])
+        BCDataframe = pd.DataFrame(BCData)
+        if cls.__Debug:
+            print(" BudgetCap; createPandasDataframe: \n", BCDataframe)
+        return BCDataframe
+
+    @classmethod
+    def createCSV(cls, _BCDataFrame, _filename):
+        _BCDataFrame.to_csv(_filename)
+
+
+#--------  Exceptions:
+class UnknownWorkPackage(Exception):
+    pass
+
+class UnknownLine(Exception):
+    pass
+
+class InvalidWeight(Exception):
+    pass
+
+class UnboundedProgramme(Exception):
+    pass
@@ -8,12 +8,19 @@ Class Control:
   tool.  This class is a singleton class so that there is no ambiguity 
   about which values are in use.
 
+  The singleton is the default costing context.  Further, independent,
+  contexts each carrying their own control parameters can be created with
+  newContext and passed to the costing (e.g. WorkPackage.doCosting,
+  LhARACostingTool.Execute) so that several sets of assumptions can be
+  evaluated in one process.
+
 
   Class attributes:
   -----------------
   __instance : Set on creation of first (and only) instance.
       
 
+
   Instance attributes:
   --------------------
    __filename  : Filename from which parameters have been read.  If None
@@ -27,6 +34,11 @@ Class Control:
    _Contingency       = Contingency (fraction) equipment, project
                         staff, CG staff, year to start addition of contingency
    _fecChargeFraction = fEC charge fraction on staff, project, CG
+   _Factors           = Cache of factor vectors (see getFactorsByYr) keyed
+                        by number of years.
+   _FactorKey         = Control parameters for which the cached factor
+                        vectors were evaluated; the cache is cleared when
+                        the parameters change.
     
 
   Methods:
@@ -37,6 +49,17 @@ Class Control:
       __repr__: One liner with call.
       __str__ : Dump of constants
 
+  Context methods:
+      newContext: Create a costing context; an instance of Control that
+                  is independent of the singleton.  Parameters are read
+                  from _filename if given, else copied from the default
+                  context (the singleton).
+                 Input: _filename -- path to control file (optional)
+                Return: instance of Control
+                 [Classmethod]
+
+      isDefault: True if instance is the default context (the singleton)
+
 
   Get/set methods:   <-------- believed to be "self documenting"!
      getIssueDate
@@ -61,6 +84,27 @@ Class Control:
         
      getfecChargeFractionCG
 
+     setInflation, setVAT, setWorkingMargin, setContingency, 
+     setfecChargeFraction: Set parameters of a context; values as held in
+                     the corresponding attribute (fractions, start years
+                     counted from 0).  Intended for contexts created with
+                     newContext.
+
+     getFactorsByYr: Return dictionary of read-only numpy arrays, one
+                     entry per financial year, holding the factors applied
+                     by the work package costing:
+                       "InflationStaff"     : (1+capital rate)**i - 1
+                       "InflationEquipment" : (1+staff rate)**i - 1
+                       "WorkingMargin"      : working margin
+                       "ContingencyMaterial": material contingency
+                       "ContingencyStaffPrj": project staff contingency
+                       "ContingencyStaffCG" : CG staff contingency
+                     each set to zero before the year in which the factor
+                     starts to apply.  The vectors are evaluated once per
+                     number of years and cached; the cache is invalidated
+                     when the control parameters change.
+                 Input: _nYrs -- number of financial years
+
   Print methods:
      print: Prints control flag settings
 
@@ -69,6 +113,8 @@ Class Control:
   
 Created on Thu 31Dec20;16:42: Version history:
 ----------------------------------------------
+ 1.3: 18Oct26: Independent costing contexts (newContext)
+ 1.2: 18Oct26: Cached per-year factor vectors (getFactorsByYr)
  1.1: 13Sep22: Udated to allow WM, contingency to start in year n
  1.0: 14Jul21: First implementation
 
@@ -78,12 +124,15 @@ Created on Thu 31Dec20;16:42: Version history:
 import os
 import copy
 import datetime
+import numpy  as np
 import pandas as pnds
 from datetime import date
 
 class Control(object):
     __instance = None
     __Debug    = False
+    _Factors   = {}
+    _FactorKey = None
 
 #--------  "Built-in methods":
     def __new__(cls, _filename=None):
@@ -127,6 +176,41 @@ class Control(object):
         
         return cls.__instance
 
+#--------  Context methods:
+    @classmethod
+    def newContext(cls, _filename=None):
+        Dflt  = cls()
+        Cntxt = super(Control, cls).__new__(cls)
+        if _filename == None:
+            Cntxt._filename          = Dflt._filename
+            Cntxt._IssueDate         = Dflt._IssueDate
+            Cntxt._Inflation         = copy.copy(Dflt._Inflation)
+            Cntxt._VAT               = Dflt._VAT
+            Cntxt._WorkingMargin     = copy.copy(Dflt._WorkingMargin)
+            Cntxt._Contingency       = copy.copy(Dflt._Contingency)
+            Cntxt._fecChargeFraction = copy.copy(Dflt._fecChargeFraction)
+        elif not os.path.isfile(_filename):
+            raise NonExistantFile('CSV file' + \
+                                  _filename + \
+                                  ' does not exist; execution termimated.')
+        else:
+            Cntxt._filename    = _filename
+            Cntxt._cntrlParams = cls.getControls(_filename)
+            Cntxt._IssueDate, \
+            Cntxt._Inflation, \
+            Cntxt._VAT, \
+            Cntxt._WorkingMargin, \
+            Cntxt._Contingency, \
+            Cntxt._fecChargeFraction = cls.parseControl(Cntxt._cntrlParams)
+        Cntxt._Factors   = {}
+        Cntxt._FactorKey = None
+        if cls.__Debug:
+            print(" Control; newContext: context created.")
+        return Cntxt
+
+    def isDefault(self):
+        return self is Control.__instance
+
     def __repr__(self):
         return " Control(<filename>)"
 
@@ -155,55 +239,58 @@ class Control(object):
     
 #--------  Extracting data from the WorkPackage pandas dataframe:
     @classmethod
-    def parseControl(cls):
-        Rows = cls._cntrlParams.index
+    def parseControl(cls, _CntrlParams=None):
+        CntrlParams = _CntrlParams
+        if CntrlParams is None:
+            CntrlParams = cls._cntrlParams
+        Rows = CntrlParams.index
         for i in Rows:
             if cls.__Debug:
                 print(" Control: parseControl: processing flag: ", \
-                      cls._cntrlParams.iat[i,0])
-            if cls._cntrlParams.iat[i,0] == "Issue date":
+                      CntrlParams.iat[i,0])
+            if CntrlParams.iat[i,0] == "Issue date":
                 DateTime = datetime.datetime.strptime( \
-                            cls._cntrlParams.iat[i,1], "%d-%b-%y").date()
-            elif cls._cntrlParams.iat[i,0].find("Inflation") >= 0:
+                            CntrlParams.iat[i,1], "%d-%b-%y").date()
+            elif CntrlParams.iat[i,0].find("Inflation") >= 0:
                 Inflation = []
                 Inflation.append( \
-                      float(cls._cntrlParams.iat[i,1].strip("%")) / 100. )
+                      float(CntrlParams.iat[i,1].strip("%")) / 100. )
                 Inflation.append( \
-                      float(cls._cntrlParams.iat[i,2].strip("%")) / 100.)
-                iDm1 = int(cls._cntrlParams.iat[i,3])
+                      float(CntrlParams.iat[i,2].strip("%")) / 100.)
+                iDm1 = int(CntrlParams.iat[i,3])
                 iDm2 = max(0, iDm1-1)
                 Inflation.append(iDm2)
-            elif cls._cntrlParams.iat[i,0].find("VAT") >= 0:
-                VAT = float(cls._cntrlParams.iat[i,1].strip("%")) / 100.
-            elif cls._cntrlParams.iat[i,0].find("WorkingMargin") >= 0:
+            elif CntrlParams.iat[i,0].find("VAT") >= 0:
+                VAT = float(CntrlParams.iat[i,1].strip("%")) / 100.
+            elif CntrlParams.iat[i,0].find("WorkingMargin") >= 0:
                 WorkingMargin = []
                 WorkingMargin.append( \
-                    float(cls._cntrlParams.iat[i,1].strip("%")) / 100.)
-                iDm1 = int(cls._cntrlParams.iat[i,2])
+                    float(CntrlParams.iat[i,1].strip("%")) / 100.)
+                iDm1 = int(CntrlParams.iat[i,2])
                 iDm2 = max(0, iDm1-1)
                 WorkingMargin.append(iDm2)
-            elif cls._cntrlParams.iat[i,0].find("Contingency") >= 0:
+            elif CntrlParams.iat[i,0].find("Contingency") >= 0:
                 Contingency = []
                 Contingency.append( \
-                      float(cls._cntrlParams.iat[i,1].strip("%")) / 100. )
+                      float(CntrlParams.iat[i,1].strip("%")) / 100. )
                 Contingency.append( \
-                      float(cls._cntrlParams.iat[i,2].strip("%")) / 100.)
+                      float(CntrlParams.iat[i,2].strip("%")) / 100.)
                 Contingency.append( \
-                      float(cls._cntrlParams.iat[i,3].strip("%")) / 100.)
-                iDm1 = int(cls._cntrlParams.iat[i,4])
+                      float(CntrlParams.iat[i,3].strip("%")) / 100.)
+                iDm1 = int(CntrlParams.iat[i,4])
                 iDm2 = max(0, iDm1-1)
                 Contingency.append(iDm2)
-            elif cls._cntrlParams.iat[i,0].find("fEC") >= 0:
+            elif CntrlParams.iat[i,0].find("fEC") >= 0:
                 fEC = []
                 fEC.append( \
-                      float(cls._cntrlParams.iat[i,1].strip("%")) / 100. )
+                      float(CntrlParams.iat[i,1].strip("%")) / 100. )
                 fEC.append( \
-                      float(cls._cntrlParams.iat[i,2].strip("%")) / 100.)
+                      float(CntrlParams.iat[i,2].strip("%")) / 100.)
             else:
                 print("    ----> Control.parseControl: ", \
                       " unprocessed control field:", \
-                      cls._cntrlParams.iat[i,0], cls._cntrlParams.iat[i,1], \
-                      cls._cntrlParams.iat[i,2], cls._cntrlParams.iat[i,2] )
+                      CntrlParams.iat[i,0], CntrlParams.iat[i,1], \
+                      CntrlParams.iat[i,2], CntrlParams.iat[i,2] )
 
         return DateTime, Inflation, VAT, WorkingMargin, Contingency, fEC
 
@@ -247,6 +334,60 @@ class Control(object):
         
     def getfecChargeFractionCG(self):
         return self._fecChargeFraction[1]
+
+    def setInflation(self, _Inflation):
+        self._Inflation = list(_Inflation)
+
+    def setVAT(self, _VAT):
+        self._VAT = _VAT
+
+    def setWorkingMargin(self, _WorkingMargin):
+        self._WorkingMargin = list(_WorkingMargin)
+
+    def setContingency(self, _Contingency):
+        self._Contingency = list(_Contingency)
+
+    def setfecChargeFraction(self, _fecChargeFraction):
+        self._fecChargeFraction = list(_fecChargeFraction)
+
+    def getFactorsByYr(self, _nYrs):
+        Key = (tuple(self._Inflation), tuple(self._WorkingMargin), \
+               tuple(self._Contingency))
+        if Key != self._FactorKey:
+            self._Factors   = {}
+            self._FactorKey = Key
+        if _nYrs in self._Factors:
+            return self._Factors[_nYrs]
+
+        #.. Compounding with python float power, as libm pow and numpy's
+        #   power can differ in the last bit:
+        iYr = np.arange(_nYrs)
+        Cmp = [np.array([(1. + Rate)**i - 1 for i in range(_nYrs)]) \
+               for Rate in self._Inflation[:2]]
+        Factors = { \
+            "InflationStaff"     : np.where(iYr >= self._Inflation[2], \
+                                            Cmp[0], 0.), \
+            "InflationEquipment" : np.where(iYr >= self._Inflation[2], \
+                                            Cmp[1], 0.), \
+            "WorkingMargin"      : np.where( \
+                      iYr >= self.getWorkingMarginStrtInYr(), \
+                      self.getWorkingMargin(), 0.), \
+            "ContingencyMaterial": np.where( \
+                      iYr >= self.getContingencyStrtInYr(), \
+                      self.getContingencyMaterial(), 0.), \
+            "ContingencyStaffPrj": np.where( \
+                      iYr >= self.getContingencyStrtInYr(), \
+                      self.getContingencyStaffPrj(), 0.), \
+            "ContingencyStaffCG" : np.where( \
+                      iYr >= self.getContingencyStrtInYr(), \
+                      self.getContingencyStaffCG(), 0.)}
+        for Factor in Factors.values():
+            Factor.flags.writeable = False
+        if Control.__Debug:
+            print(" Control; getFactorsByYr: factors for", _nYrs, \
+                  "years:", Factors)
+        self._Factors[_nYrs] = Factors
+        return Factors
         
     
 #--------  Print methods:
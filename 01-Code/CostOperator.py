@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Class CostOperator:
+===================
+
+  Linear cost operator compiled from the costed project.
+
+  Once the control parameters and the annual costs of staff are fixed,
+  every by-year cost of the work packages and of the project is linear in
+  the inputs:
+    "TaskStaff"    : staff fraction by year of each costed TaskStaff row
+    "Equipment"    : cost by year of each equipment item
+    "OtherNonStaff": cost by year of each other non-staff item
+    "Travel"       : travel cost by year of each work package
+    "Consumables"  : consumable cost by year of each work package
+  The inputs are flattened, block after block and item by item, into a
+  single input vector.  The outputs are the by-year vectors of the
+  quantities in _Quantities for each work package and for the project;
+  the project is held as an extra, last, work package.
+
+  The operator is held as a sparse matrix in coordinate form (output
+  index, input index, coefficient), so that re-evaluation is a single
+  sparse matrix-vector product (np.bincount, or np.add.at for a matrix of
+  input vectors).  The coefficients follow WorkPackage.doCosting; the
+  outputs agree with it to rounding.  Staff cost is the product of
+  fraction and annual cost, so the annual costs are folded into the
+  coefficients; a change of annual cost, or of the control parameters,
+  requires the operator to be compiled again.
+
+  The operator covers the work packages it was compiled for; the
+  TaskStaff rows, equipment and other non-staff items of other work
+  packages are not included.
+
+
+  Class attributes:
+  -----------------
+  __Debug    : Boolean: set for debug print out
+  _Blocks    : Names of input blocks, in order
+  _Quantities: Names of output quantities, in order:
+                 "StaffFrac", "Staff", "CGStaff", "Equipment",
+                 "Inflation", "OtherNonStaff", "TrvlCnsm",
+                 "WorkingMargin", "ContingencyEquipment",
+                 "ContingencyStaff", "ContingencyStaffCG", "Contingency",
+                 "Total"
+               where "ContingencyStaff" includes the CG staff contingency
+               (as WorkPackage._ContingencyByYear[1]) and "Contingency" is
+               the sum of equipment and staff contingency (as
+               Project._ContingencyByYear).
+
+
+  Instance attributes:
+  --------------------
+    _WPs       : List of work packages
+    _nYrs      : Number of financial years
+    _Rows      : numpy int array of TaskStaff rows
+    _EqpKeys   : List of Equipment instances
+    _ONSKeys   : List of OtherNonStaff instances
+    _Slices    : Dictionary of slices of the input vector, keyed by block
+    _nIn       : Length of input vector
+    _nOut      : Length of output vector
+    _Out, _In  : numpy int arrays; output and input index of coefficients
+    _Coef      : numpy array of coefficients
+
+
+  Methods:
+  --------
+  Built-in methods __init__, __repr__ and __str__.
+      __init__: Compile operator.
+                 Input: _WPs   -- list of costed work packages; all
+                                  instances if None (default)
+                        _Cntrl -- costing context; default if None
+                Raises: ScenarioSweep.InconsistentFinancialYears
+      __repr__: One liner with call.
+      __str__ : Dump of operator size.
+
+  Get methods:
+      getInput: Return input vector of the current data model.
+
+      getGradient: Return derivative of the sum over years of a quantity
+                   with respect to each input.
+                 Input: _Quantity -- name of quantity; "Total" (default)
+                        _WPPos    -- position of work package; project
+                                     if None (default)
+                Return: numpy array (inputs)
+
+      getIndex: Return output index of quantity, work package and year.
+                 Input: _Quantity -- name of quantity
+                        _WPPos    -- position of work package; len(_WPs)
+                                     for the project
+                        _Yr       -- index of year
+
+  Set methods:
+      setInput: Write input vector back to the data model: fractions by
+                year of the TaskStaff rows, with their costs
+                (TaskStaff.costRows), equipment and other non-staff cost
+                by year, travel and consumable cost by year of the work
+                packages.  The tasks of the work packages are then costed
+                again (Task.doCosting).  The quarterly fractions
+                (TaskStaff._FracTensor) are not changed.
+                 Input: _x -- input vector
+
+  Processing methods:
+      apply: Sparse matrix-vector product.
+                 Input: _x -- input vector, or numpy array (inputs, n)
+                Return: output vector, or numpy array (outputs, n)
+
+      evaluate: Evaluate and reshape outputs.
+                 Input: _x -- input vector; current data model if None
+                Return: dictionary of numpy arrays (work packages + 1,
+                        years) keyed by quantity; last row is the project
+
+      setCosting: Write evaluated outputs to the by-year and total
+                  attributes of the work packages and, if the operator
+                  covers all work packages, the project.  If the input
+                  vector is given it is first written back with setInput,
+                  so that the Task and TaskStaff costing read by the
+                  reports (e.g. WorkPackageSummary, StaffEffortSummary)
+                  agrees with the work package totals.  Without it the
+                  Task and TaskStaff costing is left as it is and agrees
+                  only if the outputs were evaluated from the current
+                  data model.  Quarterly costing is not changed; run
+                  doQuarterlyCosting again for the quarterly reports.
+                 Input: _Outputs -- dictionary returned by evaluate
+                        _x       -- input vector from which _Outputs were
+                                    evaluated; None (default) to leave
+                                    the data model as it is
+
+
+Created on Sun 18Oct26. Version history:
+----------------------------------------
+ 1.0: 18Oct26: First implementation
+ 1.1: 18Oct26: getGradient
+ 1.2: 18Oct26: CG flag taken from the staff funding index
+ 1.3: 18Oct26: setInput; setCosting writes the input vector back to the
+               Task and TaskStaff costing
+
+@author: kennethlong
+"""
+
+import numpy as np
+
+import Control       as Cntrl
+import OtherNonStaff as ONS
+import Project       as Prj
+import Staff         as Stf
+import ScenarioSweep as ScnSwp
+import Task          as Tsk
+import TaskStaff     as TskStf
+import TaskEquipment as TskEqp
+import WorkPackage   as wp
+
+class CostOperator:
+    __Debug     = False
+    _Blocks     = ("TaskStaff", "Equipment", "OtherNonStaff", "Travel", \
+                   "Consumables")
+    _Quantities = ("StaffFrac", "Staff", "CGStaff", "Equipment", \
+                   "Inflation", "OtherNonStaff", "TrvlCnsm", \
+                   "WorkingMargin", "ContingencyEquipment", \
+                   "ContingencyStaff", "ContingencyStaffCG", \
+                   "Contingency", "Total")
+
+#--------  "Built-in methods":
+    def __init__(self, _WPs=None, _Cntrl=None):
+        iCntrl = _Cntrl
+        if iCntrl == None:
+            iCntrl = Cntrl.Control()
+        self._WPs = wp.WorkPackage.instances
+        if _WPs is not None:
+            self._WPs = list(_WPs)
+        Costs      = ScnSwp.ScenarioSweep.getCostArrays(self._WPs)
+        nWP        = len(self._WPs)
+        self._nYrs = Costs["Staff"].shape[1]
+        WPPos      = {iWP: iPos for iPos, iWP in enumerate(self._WPs)}
+        Fctr       = iCntrl.getFactorsByYr(self._nYrs)
+
+        #.. Leaves of each block: work package of each leaf, column of the
+        #   leaf within the block and coefficients of the quantities,
+        #   (leaves, years):
+        TS     = TskStf.TaskStaff
+        Rows   = TS.getRows()
+        Rows   = Rows[TS._Filled[Rows, TS._COST]]
+        TskWP  = np.array([WPPos.get(iTsk._WorkPackage, -1) \
+                           for iTsk in TS._TaskKeys], dtype=int)
+        RowWP  = TskWP[TS._TaskIdx[Rows]]
+        self._Rows = Rows[RowWP >= 0]
+        RowWP  = RowWP[RowWP >= 0]
+        Annual = np.array([iStf._AnnualCost for iStf in TS._StaffKeys], \
+                          dtype=float)[TS._StaffIdx[self._Rows]][:, None]
+        CG     = Stf.Staff.isCG(TS._StaffKeys).astype(float) \
+                                     [TS._StaffIdx[self._Rows]][:, None]
+        ContCG = Fctr["ContingencyStaffCG"] * Annual * CG
+        ContS  = Fctr["ContingencyStaffPrj"] * (Annual - Annual * CG) + \
+                 ContCG
+        Leaves = {"TaskStaff": (RowWP, np.arange(len(self._Rows)), { \
+                      "StaffFrac"         : np.ones_like(Annual), \
+                      "Staff"             : Annual, \
+                      "CGStaff"           : Annual * CG, \
+                      "Inflation"         : Fctr["InflationStaff"] * Annual, \
+                      "WorkingMargin"     : Fctr["WorkingMargin"] * Annual, \
+                      "ContingencyStaff"  : ContS, \
+                      "ContingencyStaffCG": ContCG, \
+                      "Contingency"       : ContS, \
+                      "Total"             : Annual + \
+                                    Fctr["InflationStaff"] * Annual + \
+                                    Fctr["WorkingMargin"] * Annual + \
+                                    ContS})}
+
+        TskEqps = [iTskEqp for iTskEqp in TskEqp.TaskEquipment.instances \
+                   if iTskEqp._Task._WorkPackage in WPPos]
+        self._EqpKeys = []
+        EqpPos        = {}
+        for iTskEqp in TskEqps:
+            if not iTskEqp._Equipment in EqpPos:
+                EqpPos[iTskEqp._Equipment] = len(self._EqpKeys)
+                self._EqpKeys.append(iTskEqp._Equipment)
+        One = np.ones((1, self._nYrs))
+        Leaves["Equipment"] = ( \
+            np.array([WPPos[iTskEqp._Task._WorkPackage] \
+                      for iTskEqp in TskEqps], dtype=int), \
+            np.array([EqpPos[iTskEqp._Equipment] \
+                      for iTskEqp in TskEqps], dtype=int), \
+            {"Equipment"           : One, \
+             "Inflation"           : Fctr["InflationEquipment"] * One, \
+             "WorkingMargin"       : Fctr["WorkingMargin"] * One, \
+             "ContingencyEquipment": Fctr["ContingencyMaterial"] * One, \
+             "Contingency"         : Fctr["ContingencyMaterial"] * One, \
+             "Total"               : One + Fctr["InflationEquipment"] + \
+                                     Fctr["WorkingMargin"] + \
+                                     Fctr["ContingencyMaterial"]})
+
+        self._ONSKeys = [iONS for iONS in ONS.OtherNonStaff.instances \
+                         if iONS._WPInst in WPPos]
+        Leaves["OtherNonStaff"] = ( \
+            np.array([WPPos[iONS._WPInst] for iONS in self._ONSKeys], \
+                     dtype=int), \
+            np.arange(len(self._ONSKeys)), \
+            {"OtherNonStaff": One, "Total": One})
+        for Block in ("Travel", "Consumables"):
+            Leaves[Block] = (np.arange(nWP), np.arange(nWP), \
+                             {"TrvlCnsm": One, "Total": One})
+
+        #.. Input slices:
+        nCols = {"TaskStaff"    : len(self._Rows), \
+                 "Equipment"    : len(self._EqpKeys), \
+                 "OtherNonStaff": len(self._ONSKeys), \
+                 "Travel"       : nWP, \
+                 "Consumables"  : nWP}
+        self._Slices = {}
+        Base = 0
+        for Block in self._Blocks:
+            self._Slices[Block] = slice(Base, Base + nCols[Block]*self._nYrs)
+            Base += nCols[Block]*self._nYrs
+        self._nIn  = Base
+        self._nOut = len(self._Quantities) * (nWP + 1) * self._nYrs
+
+        #.. Coefficients; each leaf contributes to its work package and to
+        #   the project:
+        Yr        = np.arange(self._nYrs)[None, :]
+        Out, In, Coef = [], [], []
+        for Block in self._Blocks:
+            LfWP, LfCol, Coefs = Leaves[Block]
+            InIdx = self._Slices[Block].start + \
+                    LfCol[:, None] * self._nYrs + Yr
+            for Quantity, Cf in Coefs.items():
+                Cf = np.broadcast_to(Cf, InIdx.shape)
+                for WPIdx in (LfWP, np.full(len(LfWP), nWP)):
+                    Out.append(self.getIndex(Quantity, WPIdx[:, None], \
+                                             Yr).ravel())
+                    In.append(InIdx.ravel())
+                    Coef.append(Cf.ravel())
+        Out  = np.concatenate(Out)  if len(Out) > 0 else np.zeros(0, int)
+        In   = np.concatenate(In)   if len(In)  > 0 else np.zeros(0, int)
+        Coef = np.concatenate(Coef) if len(Coef) > 0 else np.zeros(0)
+        NonZero    = Coef != 0.
+        self._Out  = Out[NonZero]
+        self._In   = In[NonZero]
+        self._Coef = Coef[NonZero]
+        if CostOperator.__Debug:
+            print(self)
+
+    def __repr__(self):
+        return "CostOperator(WorkPackages, Control)"
+
+    def __str__(self):
+        print(" CostOperator:")
+        print("     Work packages:", [iWP._Code for iWP in self._WPs])
+        print("     Years:", self._nYrs, "; inputs:", self._nIn, \
+              "; outputs:", self._nOut, "; non-zero coefficients:", \
+              len(self._Coef))
+        return "     <---- Done."
+
+#--------  Get methods:
+    def getIndex(self, _Quantity, _WPPos, _Yr):
+        iQ = self._Quantities.index(_Quantity)
+        return (iQ * (len(self._WPs) + 1) + _WPPos) * self._nYrs + _Yr
+
+    def getGradient(self, _Quantity="Total", _WPPos=None):
+        WPPos = _WPPos
+        if WPPos == None:
+            WPPos = len(self._WPs)
+        Frst = self.getIndex(_Quantity, WPPos, 0)
+        Sel  = np.logical_and(self._Out >= Frst, \
+                              self._Out <  Frst + self._nYrs)
+        return np.bincount(self._In[Sel], weights=self._Coef[Sel], \
+                           minlength=self._nIn)
+
+    def getInput(self):
+        x   = np.zeros(self._nIn)
+        nYr = self._nYrs
+        nCp = min(nYr, TskStf.TaskStaff._FracByYr.shape[1])
+        Frc = np.zeros((len(self._Rows), nYr))
+        Frc[:, :nCp] = TskStf.TaskStaff._FracByYr[self._Rows, :nCp]
+        x[self._Slices["TaskStaff"]] = Frc.ravel()
+        for Block, Vectors in ( \
+                ("Equipment",     [iEqp._EquipmentCostByYear \
+                                   for iEqp in self._EqpKeys]), \
+                ("OtherNonStaff", [iONS._OtherNonStaffCostByYear \
+                                   for iONS in self._ONSKeys]), \
+                ("Travel",        [iWP._TravelByYear \
+                                   for iWP in self._WPs]), \
+                ("Consumables",   [iWP._ConsumeByYear \
+                                   for iWP in self._WPs])):
+            Arr = np.zeros((len(Vectors), nYr))
+            for iLf, Vec in enumerate(Vectors):
+                Arr[iLf, :len(Vec)] = Vec
+            x[self._Slices[Block]] = Arr.ravel()
+        return x
+
+#--------  Set methods:
+    def setInput(self, _x):
+        x   = np.asarray(_x, dtype=float)
+        nYr = self._nYrs
+        TS  = TskStf.TaskStaff
+        nCp = min(nYr, TS._FracByYr.shape[1])
+        Frc = x[self._Slices["TaskStaff"]].reshape(len(self._Rows), nYr)
+        TS._FracByYr[self._Rows, :nCp] = Frc[:, :nCp]
+        TS.costRows(self._Rows)
+
+        Arr = x[self._Slices["Equipment"]].reshape(-1, nYr)
+        for iLf, iEqp in enumerate(self._EqpKeys):
+            nVec = len(iEqp._EquipmentCostByYear)
+            iEqp._EquipmentCostByYear = Arr[iLf, :nVec].copy()
+            iEqp.setTotalEquipmentCost()
+        Arr = x[self._Slices["OtherNonStaff"]].reshape(-1, nYr)
+        for iLf, iONS in enumerate(self._ONSKeys):
+            nVec = len(iONS._OtherNonStaffCostByYear)
+            iONS._OtherNonStaffCostByYear = Arr[iLf, :nVec].copy()
+            iONS.setTotalOtherNonStaffCost()
+        Trvl = x[self._Slices["Travel"]].reshape(-1, nYr)
+        Cnsm = x[self._Slices["Consumables"]].reshape(-1, nYr)
+        for iPos, iWP in enumerate(self._WPs):
+            iWP._TravelByYear  = Trvl[iPos, :len(iWP._TravelByYear)].copy()
+            iWP._TotalTravel   = np.sum(iWP._TravelByYear)
+            iWP._ConsumeByYear = Cnsm[iPos, :len(iWP._ConsumeByYear)].copy()
+            iWP._TotalConsume  = np.sum(iWP._ConsumeByYear)
+
+        Tsk.Task.doCosting([iTsk for iWP in self._WPs \
+                            for iTsk in Tsk.Task.getForWorkPackage(iWP)])
+
+#--------  Processing methods:
+    def apply(self, _x):
+        x = np.asarray(_x, dtype=float)
+        if x.ndim == 1:
+            return np.bincount(self._Out, weights=self._Coef * x[self._In], \
+                               minlength=self._nOut)
+        y = np.zeros((self._nOut, x.shape[1]))
+        np.add.at(y, self._Out, self._Coef[:, None] * x[self._In])
+        return y
+
+    def evaluate(self, _x=None):
+        x = _x
+        if x is None:
+            x = self.getInput()
+        y = self.apply(x).reshape(len(self._Quantities), \
+                                  len(self._WPs) + 1, self._nYrs)
+        return {Quantity: y[iQ] \
+                for iQ, Quantity in enumerate(self._Quantities)}
+
+    def setCosting(self, _Outputs, _x=None):
+        if _x is not None:
+            self.setInput(_x)
+        Out = _Outputs
+        for iPos, iWP in enumerate(self._WPs):
+            iWP._StaffFracByYear = Out["StaffFrac"][iPos].copy()
+            iWP.setTotalStaffFrac()
+            iWP._StaffCostByYear = Out["Staff"][iPos].copy()
+            iWP.setTotalStaffCost()
+            iWP._CGStaffCostByYear = Out["CGStaff"][iPos].copy()
+            iWP.setTotalCGStaffCost()
+            iWP._EquipmentCostByYear = Out["Equipment"][iPos].copy()
+            iWP.setTotalEquipmentCost()
+            iWP._InflationByYr = Out["Inflation"][iPos].copy()
+            iWP.setTotalInflation()
+            iWP._OtherNonStaffCostByYear = Out["OtherNonStaff"][iPos].copy()
+            iWP.setTotalOtherNonStaffCost()
+            iWP._TrvlCnsmCostByYear = Out["TrvlCnsm"][iPos].copy()
+            iWP._TotalTrvlCnsmCost  = np.sum(iWP._TrvlCnsmCostByYear)
+            iWP._WorkingMarginByYear = Out["WorkingMargin"][iPos].copy()
+            iWP.setWorkingMarginTotal()
+            iWP._ContingencyByYear = \
+                [Out["ContingencyEquipment"][iPos].copy(), \
+                 Out["ContingencyStaff"][iPos].copy(), \
+                 Out["ContingencyStaffCG"][iPos].copy()]
+            iWP.setContingencyTotal()
+            iWP._TotalCostByYear = Out["Total"][iPos].copy()
+            iWP.setGrandTotal()
+
+        if len(self._WPs) != len(wp.WorkPackage.instances) or \
+           not all(iWP in self._WPs for iWP in wp.WorkPackage.instances):
+            return
+        for iPrj in Prj.Project.instances:
+            iPrj._StaffCostByYear = Out["Staff"][-1].copy()
+            iPrj.setTotalStaffCost()
+            iPrj._CGStaffCostByYear = Out["CGStaff"][-1].copy()
+            iPrj.setTotalCGStaffCost()
+            iPrj._EquipmentCostByYear = Out["Equipment"][-1].copy()
+            iPrj.setTotalEquipmentCost()
+            iPrj._OtherNonStaffCostByYear = Out["OtherNonStaff"][-1].copy()
+            iPrj.setTotalOtherNonStaffCost()
+            iPrj._TrvlCnsmCostByYear = Out["TrvlCnsm"][-1].copy()
+            iPrj.setTotalTrvlCnsmCost()
+            iPrj._InflationByYear = Out["Inflation"][-1].copy()
+            iPrj.setInflationTotal()
+            iPrj._WorkingMarginByYear = Out["WorkingMargin"][-1].copy()
+            iPrj.setWorkingMarginTotal()
+            iPrj._ContingencyByYear = Out["Contingency"][-1].copy()
+            iPrj.setContingencyTotal()
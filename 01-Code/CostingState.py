@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Class CostingState:
+===================
+
+  Persisted costed state used by the incremental mode of the LhARA costing
+  tool (see LhARACostingTool.Execute).
+
+  Each work package carries a signature, a SHA-256 digest of:
+    - the content of the work package definition file;
+    - the control parameters (inflation, VAT, working margin, contingency,
+      fEC charge fractions); and
+    - the staff database entries of the staff that work on the work
+      package (institute, staff code, annual cost, project or CG).
+  A work package whose signature matches the one stored at the end of the
+  previous run is "clean": its costed attributes, those of its tasks and
+  the costed rows of its TaskStaff instances are restored from the state.
+  All other work packages are "dirty" and are re-costed.
+
+  The state is a dictionary:
+    "Version"      : Version of the state, _Version
+    "Staff"        : Signature of the full staff database
+    "WorkPackages" : Dictionary keyed by work package code of dictionaries:
+                       "Signature"  : Work package signature
+                       "WorkPackage": Costed attributes of WorkPackage
+                       "Tasks"      : List of (task name, costed
+                                      attributes) in task order
+                       "nTaskStaff" : Number of TaskStaff rows
+                       "TaskStaff"  : Costing of rows (see
+                                      TaskStaff.getCosting)
+
+  The state is held in the file _StateFile in the directory given by the
+  environment variable CACHEPATH (see ParseCache).  If CACHEPATH is not
+  set there is no state and every work package is dirty.
+
+  CostingState has no instances; all methods are class methods.
+
+
+  Class attributes:
+  -----------------
+  __Debug   : Boolean: set for debug print out
+  _Version  : Version of the state; a state of a different version is
+              ignored.
+  _StateFile: Name of file in which the state is held.
+
+
+  Methods:
+  --------
+  I/o methods:
+      getStatePath: Return path of state file; None if CACHEPATH not set.
+                 [Classmethod]
+
+      load: Return state read from state file; None if there is no state
+            or the state is of a different version.
+                 [Classmethod]
+
+      store: Write state to state file; does nothing if CACHEPATH not set.
+                 Input: _State -- state (dictionary)
+                 [Classmethod]
+
+  Signature methods:
+      digest: Return SHA-256 hex digest of the repr of a tuple of items.
+                 [Classmethod]
+
+      controlSignature: Signature of the control parameters.
+                 Input: _Cntrl -- costing context; default if None
+                 [Classmethod]
+
+      staffSignature: Signature of all instances of Staff.
+                 [Classmethod]
+
+      workPackageSignature: Signature of work package.
+                 Input: _WPInst      -- instance of WorkPackage
+                        _CntrlSig    -- control signature
+                 [Classmethod]
+
+  Processing methods:
+      getTaskStaffRows: Return numpy int array of TaskStaff rows of tasks
+                 Input: _Tasks -- list of instances of Task
+                 [Classmethod]
+
+      snapshot: Return state entry of costed work package.
+                 Input: _WPInst, _Signature
+                 [Classmethod]
+
+      restore: Restore costed attributes of work package, its tasks and
+               TaskStaff rows from state entry; resets their total value.
+                 Input: _WPInst, _Entry
+                Return: True if restored; False if the entry does not match
+                        the tasks and TaskStaff rows of the work package
+                 [Classmethod]
+
+      plan: Compare current work packages and staff with state.
+                 Input: _State -- state; None if no state
+                        _Cntrl -- costing context; default if None
+                Return: Dictionary:
+                          "Signatures": signature of each work package,
+                                        keyed by instance
+                          "Dirty"     : list of work packages to re-cost
+                          "Clean"     : list of work packages to restore
+                          "Removed"   : codes of work packages in state
+                                        but no longer defined
+                          "Changed"   : True if anything changed; i.e.
+                                        reports covering the whole project
+                                        must be rewritten
+                          "Staff"     : Staff signature
+                 [Classmethod]
+
+      update: Return new state from costed work packages.
+                 Input: _Plan -- plan returned by plan
+                 [Classmethod]
+
+
+Created on Sun 18Oct26. Version history:
+----------------------------------------
+ 1.0: 18Oct26: First implementation
+ 1.1: 18Oct26: Signature of given costing context
+ 1.2: 18Oct26: Restore resets the cached total value
+
+@author: kennethlong
+"""
+
+import os
+import pickle
+import hashlib
+import numpy as np
+
+import Control     as Cntrl
+import ParseCache  as PrsCch
+import Staff       as Stf
+import Task        as Tsk
+import TaskStaff   as TskStf
+import WorkPackage as wp
+
+class CostingState:
+    __Debug    = False
+    _Version   = 1
+    _StateFile = "CostingState.pkl"
+
+#--------  I/o methods:
+    @classmethod
+    def getStatePath(cls):
+        CACHEPATH = PrsCch.ParseCache.getCachePath()
+        if CACHEPATH == None:
+            return None
+        return os.path.join(CACHEPATH, cls._StateFile)
+
+    @classmethod
+    def load(cls):
+        StatePath = cls.getStatePath()
+        if StatePath == None or not os.path.isfile(StatePath):
+            return None
+        with open(StatePath, 'rb') as File:
+            State = pickle.load(File)
+        if State.get("Version") != cls._Version:
+            return None
+        return State
+
+    @classmethod
+    def store(cls, _State):
+        StatePath = cls.getStatePath()
+        if StatePath == None:
+            return
+        TmpPath = StatePath + "." + str(os.getpid()) + ".tmp"
+        with open(TmpPath, 'wb') as File:
+            pickle.dump(_State, File, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(TmpPath, StatePath)
+
+#--------  Signature methods:
+    @classmethod
+    def digest(cls, _Items):
+        return hashlib.sha256(repr(_Items).encode()).hexdigest()
+
+    @classmethod
+    def controlSignature(cls, _Cntrl=None):
+        iCntrl = _Cntrl
+        if iCntrl == None:
+            iCntrl = Cntrl.Control()
+        return cls.digest((iCntrl._Inflation, iCntrl._VAT, \
+                           iCntrl._WorkingMargin, iCntrl._Contingency, \
+                           iCntrl._fecChargeFraction))
+
+    @classmethod
+    def staffSignature(cls):
+        return cls.digest(tuple((iStf._InstituteCode, iStf._StaffCode, \
+                                 iStf._NameOrPost, iStf._GradeOrLevel, \
+                                 iStf._AnnualCost, iStf._ProjectOrCG, \
+                                 iStf._Comments) \
+                                for iStf in Stf.Staff.instances))
+
+    @classmethod
+    def workPackageSignature(cls, _WPInst, _CntrlSig):
+        Staff = []
+        for iTsk in Tsk.Task.getForWorkPackage(_WPInst):
+            for iTskStf in TskStf.TaskStaff.getForTask(iTsk):
+                iStf = iTskStf._Staff
+                Staff.append((iStf._InstituteCode, iStf._StaffCode, \
+                              iStf._AnnualCost, iStf._ProjectOrCG))
+        return cls.digest((PrsCch.ParseCache.fileHash(_WPInst._filename), \
+                           _CntrlSig, tuple(Staff)))
+
+#--------  Processing methods:
+    @classmethod
+    def getTaskStaffRows(cls, _Tasks):
+        return np.array([iTskStf._Row for iTsk in _Tasks \
+                         for iTskStf in TskStf.TaskStaff.getForTask(iTsk)], \
+                        dtype=int)
+
+    @classmethod
+    def snapshot(cls, _WPInst, _Signature):
+        Tasks = Tsk.Task.getForWorkPackage(_WPInst)
+        Rows  = cls.getTaskStaffRows(Tasks)
+        return {"Signature"  : _Signature, \
+                "WorkPackage": {Attr: getattr(_WPInst, Attr) for Attr in \
+                                wp.WorkPackage._CostedAttributes}, \
+                "Tasks"      : [(iTsk._Name, \
+                                 {Attr: getattr(iTsk, Attr) for Attr in \
+                                  Tsk.Task._CostedAttributes}) \
+                                for iTsk in Tasks], \
+                "nTaskStaff" : len(Rows), \
+                "TaskStaff"  : TskStf.TaskStaff.getCosting(Rows)}
+
+    @classmethod
+    def restore(cls, _WPInst, _Entry):
+        Tasks = Tsk.Task.getForWorkPackage(_WPInst)
+        Rows  = cls.getTaskStaffRows(Tasks)
+        if [iTsk._Name for iTsk in Tasks] != \
+           [Name for Name, Attrs in _Entry["Tasks"]] or \
+           len(Rows) != _Entry["nTaskStaff"]:
+            return False
+        TskStf.TaskStaff.setCosting(Rows, _Entry["TaskStaff"])
+        for iTsk, (Name, Attrs) in zip(Tasks, _Entry["Tasks"]):
+            for Attr in Attrs:
+                setattr(iTsk, Attr, Attrs[Attr])
+            iTsk._TotalValue = None
+        for Attr in _Entry["WorkPackage"]:
+            setattr(_WPInst, Attr, _Entry["WorkPackage"][Attr])
+        _WPInst._TotalValue = None
+        return True
+
+    @classmethod
+    def plan(cls, _State, _Cntrl=None):
+        CntrlSig = cls.controlSignature(_Cntrl)
+        StfSig   = cls.staffSignature()
+        Entries  = {}
+        if _State != None:
+            Entries = _State["WorkPackages"]
+
+        Plan = {"Signatures": {}, "Dirty": [], "Clean": [], \
+                "Removed": [], "Changed": False, "Staff": StfSig}
+        for iWP in wp.WorkPackage.instances:
+            Sig = cls.workPackageSignature(iWP, CntrlSig)
+            Plan["Signatures"][iWP] = Sig
+            Entry = Entries.get(iWP._Code)
+            if Entry != None and Entry["Signature"] == Sig and \
+               cls.restore(iWP, Entry):
+                Plan["Clean"].append(iWP)
+            else:
+                Plan["Dirty"].append(iWP)
+
+        Codes = [iWP._Code for iWP in wp.WorkPackage.instances]
+        Plan["Removed"] = [Code for Code in Entries if not Code in Codes]
+        Plan["Changed"] = _State == None or \
+                          _State["Staff"] != StfSig or \
+                          len(Plan["Dirty"]) > 0 or \
+                          len(Plan["Removed"]) > 0
+        if cls.__Debug:
+            print(" CostingState; plan:", len(Plan["Dirty"]), "dirty,", \
+                  len(Plan["Clean"]), "clean,", len(Plan["Removed"]), \
+                  "removed work packages.")
+        return Plan
+
+    @classmethod
+    def update(cls, _Plan):
+        State = {"Version": cls._Version, "Staff": _Plan["Staff"], \
+                 "WorkPackages": {}}
+        for iWP in wp.WorkPackage.instances:
+            State["WorkPackages"][iWP._Code] = \
+                cls.snapshot(iWP, _Plan["Signatures"][iWP])
+        return State
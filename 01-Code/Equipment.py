@@ -12,6 +12,9 @@ Class Equipment:
   -----------------
   __Debug : Boolean: set for debug print out
   instances: List of instances if the Equipment class.
+  __slots__: Names of the instance attributes; instances carry no __dict__.
+  _Index   : Dictionary of instances keyed by name.  Each entry is a list
+             so that duplicates are recorded as the instance is created.
       
   Instance attributes:
   --------------------
@@ -40,8 +43,15 @@ Class Equipment:
   Get/set methods:
       getInstance: Finds instance of class with Equipment._Name
                  Input: _Name -- str -- name of Project to be found
-                Return: Instance of class; None if not found or if more than
-                        one instance
+                Return: Instance of class; None if not found.  Raises
+                        DuplicateEquipmentClassInstance if more 
+                        than one instance.  Uses _Index.
+                 [Classmethod]
+
+      addToIndex: Add instance to _Index; called on instanciation.
+                 [Classmethod]
+
+      buildIndex: Rebuild _Index from instances; called from clean.
                  [Classmethod]
 
      setEquipmentCost: Set equipment cost per year (£k).
@@ -78,6 +88,8 @@ Class Equipment:
 Created on Wed 19Jun21. Version history:
 ----------------------------------------
  1.0: 19Jun21: First implementation
+ 1.1: 18Oct26: Dictionary index for getInstance
+ 1.2: 18Oct26: Instance attributes declared in __slots__
 
 @author: kennethlong
 """
@@ -88,6 +100,8 @@ import pandas as pd
 class Equipment:
     __Debug = False
     instances = []
+    _Index    = {}
+    __slots__ = ("_Name", "_EquipmentCostByYear", "_TotalEquipmentCost")
 
 #--------  "Built-in methods":
     def __init__(self, _Name="None"):
@@ -98,6 +112,7 @@ class Equipment:
         self._TotalEquipmentCost  = float("nan")
 
         Equipment.instances.append(self)
+        Equipment.addToIndex(self)
 
     def __repr__(self):
         return "Equipment(Name)"
@@ -135,14 +150,9 @@ class Equipment:
 
     @classmethod
     def getInstance(cls, _Name):
-        InstList = []
         if Equipment.__Debug:
             print(" Equipment; getInstance: search for Equipment name:", _Name)
-        for inst in cls.instances:
-            if Equipment.__Debug:
-                print(" Equipment; getInstance: instance:", inst._Name)
-            if inst._Name == _Name:
-                InstList.append(inst)
+        InstList = cls._Index.get(_Name, [])
         Ninst = len(InstList)
         if Ninst == 0:
             RtnInst = None
@@ -155,6 +165,22 @@ class Equipment:
             print(" Equipment; getInstance: number of instances; " \
                   "return instance:", Ninst, "\n ", RtnInst)
         return RtnInst
+
+    @classmethod
+    def addToIndex(cls, _Inst):
+        if _Inst._Name in cls._Index:
+            cls._Index[_Inst._Name].append(_Inst)
+            if Equipment.__Debug:
+                print(" Equipment; addToIndex: duplicate instance for:", \
+                      _Inst._Name)
+        else:
+            cls._Index[_Inst._Name] = [_Inst]
+
+    @classmethod
+    def buildIndex(cls):
+        cls._Index = {}
+        for iInst in cls.instances:
+            cls.addToIndex(iInst)
     
         
 #--------  Creating the pandas dataframe:
@@ -209,6 +235,7 @@ class Equipment:
                 del iEqp
             except ValueError:
                 cls.instances.append(iEqp)
+        cls.buildIndex()
 
         return len(Deletions)
         
@@ -14,7 +14,16 @@ Class LhARACostingTool:
       
   Instance attributes:
   --------------------
-    _Debug: Debug flag
+    _Debug      : Debug flag
+    _Incremental: Incremental flag; if True only work packages that have
+                  changed since the previous run are re-costed and only the
+                  affected reports are rewritten (see CostingState).
+    _Quarterly  : Quarterly flag; if True the costing is also carried by
+                  quarter (see doQuarterlyCosting) and the quarterly cash
+                  flow report is written.
+    _OverAllocation: Over-allocated staff quarters found by the staff
+                  allocation check in Execute (see
+                  TaskStaff.checkAllocation); [] if none.
 
     
   Methods:
@@ -29,11 +38,58 @@ Class LhARACostingTool:
     Execute: Execute Costing, class method.
              Assumes staff, work package and associated data has been read.
              Works through costing and generates reports.
+             Input: _Cntrl -- costing context (instance of Control, see
+                              Control.newContext); default context if
+                              None (default)
+
+    doCosting: Clean and cost TaskStaff, Task, WorkPackage and Project.
+             Class method.
+             Input: _Cntrl -- costing context, as Execute
+
+    doIncrementalCosting: Clean TaskStaff, Task and WorkPackage, restore
+             the costing of unchanged work packages from the costing state
+             and re-cost the others; the project is then costed and the
+             state updated.  Class method.
+             Input: _Cntrl -- costing context, as Execute
+             Return: plan (see CostingState.plan)
+
+    checkStaffAllocation: Check that no member of staff is allocated more
+             than one FTE in any quarter, summed over all tasks of all
+             work packages; called by Execute after costing.  Offenders
+             are kept in _OverAllocation and a warning is printed.
+             Class method.
+             Return: list of offenders (see TaskStaff.checkAllocation)
+
+    doQuarterlyCosting: Cost Task, WorkPackage and Project by quarter;
+             called by Execute, after the by-year costing, if the
+             quarterly flag is set.  Class method.
+             Input: _Cntrl -- costing context, as Execute
+
+    doReports: Generate reports.  Class method.
+             Input: _Plan -- None (default) to write all reports; else plan
+                             returned by doIncrementalCosting, in which case
+                             only the summaries of re-costed work packages,
+                             and the project-wide reports if anything
+                             changed, are written.  Reports missing from the
+                             report directory are always written.
+
+    needReport: True if report is to be written.  Class method.
+             Input: _Plan     -- plan; None if all reports are written
+                    _Path     -- report directory
+                    _Filename -- report file name
+                    _Changed  -- True if the content of the report has
+                                 changed; defaults to _Plan["Changed"]
 
   
 Created on Thu 23Dec20: Version history:
 ----------------------------------------
  1.0: 23Jul21: First implementation
+ 1.1: 18Oct26: Incremental mode; only changed work packages re-costed and
+               re-reported
+ 1.2: 18Oct26: Execute takes costing context
+ 1.3: 18Oct26: Full costing in doCosting
+ 1.4: 18Oct26: Quarterly costing and cash flow report
+ 1.5: 18Oct26: Staff over-allocation check and report
 
 @author: kennethlong
 """
@@ -49,16 +105,21 @@ import Task          as Tsk
 import TaskStaff     as TskStf
 import TaskEquipment as TskEqp
 import Report        as Rpt
+import CostingState  as CstStt
 
 class LhARACostingTool(object):
     __instance = None
+    _Quarterly = False
+    _OverAllocation = []
 
 #--------  "Built-in methods":
-    def __new__(cls, _Debug=False):
+    def __new__(cls, _Debug=False, _Incremental=False, _Quarterly=False):
         if cls.__instance is None:
             cls.__instance = super(LhARACostingTool, cls).__new__(cls)
         
-        cls._Debug = _Debug
+        cls._Debug       = _Debug
+        cls._Incremental = _Incremental
+        cls._Quarterly   = _Quarterly
 
         if cls._Debug:
             print(" LhARACostingTool: instance created.")
@@ -66,22 +127,36 @@ class LhARACostingTool(object):
         return cls.__instance
 
     def __repr__(self):
-        return " LhARACostingTool(DebugFlag)"
+        return " LhARACostingTool(DebugFlag, IncrementalFlag, QuarterlyFlag)"
 
     def __str__(self):
         print(" LhARA costing tool:")
         print("     Debug flag:", self._Debug)
+        print("     Incremental flag:", self._Incremental)
+        print("     Quarterly flag:", self._Quarterly)
         return "     <---- Done."
 
     @classmethod
-    def Execute(cls):
+    def Execute(cls, _Cntrl=None):
         if cls._Debug:
             print("    ----> Execution starts.")
 
         """
                Do costing
         """
-        
+        Plan = None
+        if cls._Incremental:
+            Plan = cls.doIncrementalCosting(_Cntrl)
+        else:
+            cls.doCosting(_Cntrl)
+        if cls._Quarterly:
+            cls.doQuarterlyCosting(_Cntrl)
+        cls.checkStaffAllocation()
+
+        cls.doReports(Plan)
+
+    @classmethod
+    def doCosting(cls, _Cntrl=None):
         #.. TaskStaff
         if cls._Debug:
             print("          TaskStaff: clean")
@@ -111,7 +186,7 @@ class LhARACostingTool(object):
         if cls._Debug:
             print("                     ", nDel, " instances deleted")
             print("                       Run doCosting")
-        wp.WorkPackage.doCosting()
+        wp.WorkPackage.doCosting(None, _Cntrl)
         if cls._Debug:
             print("                      <---- done")
 
@@ -126,6 +201,64 @@ class LhARACostingTool(object):
             print("                 ", nDel, " instances deleted")
             print("                  <---- done")
 
+    @classmethod
+    def doIncrementalCosting(cls, _Cntrl=None):
+        if cls._Debug:
+            print("          Incremental costing: clean")
+        nDel  = TskStf.TaskStaff.clean()
+        nDel += Tsk.Task.clean()
+        nDel += wp.WorkPackage.clean()
+        if cls._Debug:
+            print("                              ", nDel, \
+                  " instances deleted")
+
+        State = CstStt.CostingState.load()
+        Plan  = CstStt.CostingState.plan(State, _Cntrl)
+        if cls._Debug:
+            print("                               Restored:", \
+                  [iWP._Code for iWP in Plan["Clean"]])
+            print("                               Re-cost :", \
+                  [iWP._Code for iWP in Plan["Dirty"]])
+
+        Tasks = [iTsk for iWP in Plan["Dirty"] \
+                 for iTsk in Tsk.Task.getForWorkPackage(iWP)]
+        Rows  = CstStt.CostingState.getTaskStaffRows(Tasks)
+        TskStf.TaskStaff.doCosting(Rows)
+        Tsk.Task.doCosting(Tasks)
+        wp.WorkPackage.doCosting(Plan["Dirty"], _Cntrl)
+
+        Prj.Project.doCosting()
+        nDel = Prj.Project.clean()
+
+        CstStt.CostingState.store(CstStt.CostingState.update(Plan))
+        if cls._Debug:
+            print("                                <---- done")
+        return Plan
+
+    @classmethod
+    def checkStaffAllocation(cls):
+        cls._OverAllocation = TskStf.TaskStaff.checkAllocation()
+        if len(cls._OverAllocation) > 0:
+            Codes = []
+            for Offender in cls._OverAllocation:
+                if not Offender[0]._StaffCode in Codes:
+                    Codes.append(Offender[0]._StaffCode)
+            print("     ----> Warning: staff allocated more than one FTE", \
+                  "in", len(cls._OverAllocation), "quarters:", Codes)
+        return cls._OverAllocation
+
+    @classmethod
+    def doQuarterlyCosting(cls, _Cntrl=None):
+        if cls._Debug:
+            print("          Quarterly costing: Task, WorkPackage, Project")
+        Tsk.Task.doQuarterlyCosting()
+        wp.WorkPackage.doQuarterlyCosting(None, _Cntrl)
+        Prj.Project.doQuarterlyCosting()
+        if cls._Debug:
+            print("                             <---- done")
+
+    @classmethod
+    def doReports(cls, _Plan=None):
         """
                Make reports
         """
@@ -147,9 +280,11 @@ class LhARACostingTool(object):
             #-------->  Workpackage report handling:
             if cls._Debug:
                 print("          Report: list work packages")
-            wpRpt = Rpt.WorkPackageList(REPORTPATH, \
-                                        "WorkPackageReportList.csv")
-            wpRpt.asCSV()
+            if cls.needReport(_Plan, REPORTPATH, \
+                              "WorkPackageReportList.csv"):
+                wpRpt = Rpt.WorkPackageList(REPORTPATH, \
+                                            "WorkPackageReportList.csv")
+                wpRpt.asCSV()
             if cls._Debug:
                 print("                  <---- done")
                             
@@ -158,6 +293,10 @@ class LhARACostingTool(object):
             for iWP in wp.WorkPackage.instances:
                 filepath = REPORTPATH
                 filename = iWP._Code + ".csv"
+                if not cls.needReport(_Plan, filepath, filename, \
+                                      _Plan != None and \
+                                      iWP in _Plan["Dirty"]):
+                    continue
                 if cls._Debug:
                     print("                 ----> ", iWP._Name)
                 wpSumRpt = Rpt.WorkPackageSummary(filepath, \
@@ -165,16 +304,23 @@ class LhARACostingTool(object):
                                                   iWP)
                 DataFrame = wpSumRpt.createPandasDataFrame()
                 wpSumRpt.createCSV(DataFrame)
+            if _Plan != None:
+                for Code in _Plan["Removed"]:
+                    Stale = os.path.join(REPORTPATH, Code + ".csv")
+                    if os.path.isfile(Stale):
+                        os.remove(Stale)
             if cls._Debug:
                 print("                  <---- done")
    
             #-------->  Staff report handling:
             if cls._Debug:
                 print("          Report: list all staff")
-            StfLstAll = Rpt.StaffList(REPORTPATH, "StaffReportList.csv")
-            StfLstAll.asCSV()
+            if cls.needReport(_Plan, REPORTPATH, "StaffReportList.csv"):
+                StfLstAll = Rpt.StaffList(REPORTPATH, "StaffReportList.csv")
+                StfLstAll.asCSV()
 
-            if len(Prj.Project.instances) == 1:
+            if len(Prj.Project.instances) == 1 and \
+               cls.needReport(_Plan, REPORTPATH, "StaffEffortSummary.csv"):
                 iPrj = Prj.Project.instances[0]
                 iStfSmRpt = Rpt.StaffEffortSummary(REPORTPATH, \
                                         "StaffEffortSummary.csv", \
@@ -188,7 +334,8 @@ class LhARACostingTool(object):
             if cls._Debug:
                 print("          Report: project overview")
                 
-            if len(Prj.Project.instances) == 1:
+            if len(Prj.Project.instances) == 1 and \
+               cls.needReport(_Plan, REPORTPATH, "Overview.csv"):
                 iPrj = Prj.Project.instances[0]
                 Ovrvw = Rpt.Overview(REPORTPATH, "Overview.csv", iPrj)
                 Ovrvw.asCSV()
@@ -196,6 +343,39 @@ class LhARACostingTool(object):
             if cls._Debug:
                 print("                  <---- done")
 
+            #-------->  Staff over-allocation report handling:
+            if len(Prj.Project.instances) == 1 and \
+               cls.needReport(_Plan, REPORTPATH, \
+                              "StaffOverAllocation.csv", True):
+                if cls._Debug:
+                    print("          Report: staff over-allocation")
+                iPrj = Prj.Project.instances[0]
+                OvrAll = Rpt.StaffOverAllocation(REPORTPATH, \
+                                                 "StaffOverAllocation.csv", \
+                                                 iPrj, cls._OverAllocation)
+                OvrAll.asCSV()
+                if cls._Debug:
+                    print("                  <---- done")
+
+            #-------->  Cash flow report handling:
+            if cls._Quarterly and len(Prj.Project.instances) == 1 and \
+               cls.needReport(_Plan, REPORTPATH, "CashFlow.csv"):
+                if cls._Debug:
+                    print("          Report: quarterly cash flow")
+                iPrj = Prj.Project.instances[0]
+                CshFlw = Rpt.CashFlow(REPORTPATH, "CashFlow.csv", iPrj)
+                CshFlw.asCSV()
+                if cls._Debug:
+                    print("                  <---- done")
+
+    @classmethod
+    def needReport(cls, _Plan, _Path, _Filename, _Changed=None):
+        if _Plan == None:
+            return True
+        if _Changed == None:
+            _Changed = _Plan["Changed"]
+        return _Changed or not os.path.isfile(os.path.join(_Path, _Filename))
+
     @classmethod
     def ClearDataStructure(cls):
         if cls._Debug:
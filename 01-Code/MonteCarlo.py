@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Class MonteCarlo:
+=================
+
+  Monte Carlo simulation of the uncertainty on the cost of the work
+  packages and of the project.
+
+  Uncertainty distributions are attached to the equipment costs
+  (Equipment._EquipmentCostByYear), the staff fractions of TaskStaff
+  instances and the annual costs of staff (Staff._AnnualCost).  Each
+  distribution is that of a multiplicative factor applied to the nominal
+  value; one factor is drawn per item and realisation and applies to all
+  years.  Distributions are given as tuples:
+    ("Normal",     sigma)            : 1 + sigma*z, truncated at 0
+    ("LogNormal",  sigma)            : exp(sigma*z - sigma**2/2); mean 1
+    ("Uniform",    low, high)
+    ("Triangular", low, mode, high)
+  A distribution can be attached to all items of a kind (key None) or to
+  an individual item, keyed by:
+    "Equipment": equipment name (Equipment._Name)
+    "Staff"    : (institute code, staff code); as Staff.getInstance
+    "TaskStaff": (work package code, task name, institute code, staff
+                 code)
+  The distribution of an individual item takes precedence.  Items without
+  distribution keep their nominal value.
+
+  The costed data model (see LhARACostingTool.Execute) is first compiled
+  into a model of arrays: the staff fractions by year of the costed
+  TaskStaff rows, the annual costs of staff, the equipment cost by year
+  of each TaskEquipment and the work package of each.  Other non-staff
+  and travel and consumable costs carry no uncertainty and are taken
+  from the work packages.  The staff fractions and equipment costs are
+  spread into matrices of shape (leaves, work packages * years), so that
+  a batch of realisations is summed into work packages by one matrix
+  product of the (realisations, leaves) weights; no array of shape
+  (realisations, leaves, years) is formed.  The sums, of shape
+  (realisations, work packages, years), are then costed; the
+  inflation, working margin and contingency are applied using
+  ScenarioSweep.totalCostByYear with the factor vectors of the costing
+  context.  With no uncertainty attached each realisation reproduces
+  WorkPackage.doCosting to rounding.
+
+  Batches are spread across a pool of worker processes.  Each batch draws
+  from its own random stream spawned from a single seed
+  (numpy.random.SeedSequence), so the result for a given seed does not
+  depend on the number of workers.
+
+  MonteCarlo has no instances; all methods are class methods.
+
+
+  Class attributes:
+  -----------------
+  __Debug      : Boolean: set for debug print out
+  _Kinds       : Kinds of item to which uncertainties can be attached
+  _Uncertainty : Dictionary, keyed by kind, of dictionaries of
+                 distributions keyed by item (None for all items)
+
+
+  Methods:
+  --------
+  Get/set methods:
+      setUncertainty: Attach distribution to items.
+                 Input: _Kind         -- "Equipment", "Staff" or
+                                         "TaskStaff"
+                        _Distribution -- distribution tuple; None removes
+                                         the distribution
+                        _Key          -- item key; None (default) for all
+                                         items of the kind.  Keys:
+                             "Equipment": equipment name
+                             "Staff"    : (institute code, staff code)
+                             "TaskStaff": (work package code, task name,
+                                           institute code, staff code)
+                Raises: UnknownDistribution
+                 [Classmethod]
+
+      clearUncertainty: Remove all distributions.
+                 [Classmethod]
+
+      getDistribution: Return distribution of item; None if none.
+                 Input: _Kind, _Key
+                 [Classmethod]
+
+  Processing methods:
+      spread: Spread leaves by year into the columns of their group.
+                 Input: _Values -- numpy array (leaves, years)
+                        _Groups -- numpy int array (leaves); group index
+                        _nGrps  -- number of groups
+                Return: numpy array (leaves, groups * years); row i holds
+                        _Values[i] in the columns of group _Groups[i]
+                 [Classmethod]
+
+      getModel: Compile costed work packages into a model (dictionary of
+                arrays).
+                 Input: _WPs   -- list of work packages; all if None
+                        _Cntrl -- costing context; default if None
+                Raises: ScenarioSweep.InconsistentFinancialYears
+                 [Classmethod]
+
+      sample: Draw multiplicative factors.
+                 Input: _Rng   -- numpy random Generator
+                        _Dists -- list of distributions, one per item
+                        _nSmpl -- number of realisations
+                Return: numpy array (realisations, items)
+                 [Classmethod]
+
+      runBatch: Evaluate a batch of realisations.
+                 Input: _Args -- tuple (model, SeedSequence, number of
+                                 realisations)
+                Return: numpy array (realisations, work packages, years)
+                 [Classmethod]
+
+      simulate: Run the simulation.
+                 Input: _nSamples    -- number of realisations
+                        _Seed        -- seed; None for fresh entropy
+                        _Percentiles -- percentiles; default (50, 80)
+                        _BatchSize   -- realisations per batch; default
+                                        1000
+                        _nWorkers    -- number of worker processes; None
+                                        for os.cpu_count()
+                        _WPs, _Cntrl -- as getModel
+                Return: dictionary:
+                          "Seed"          : entropy of the seed sequence
+                          "nSamples"      : number of realisations
+                          "Percentiles"   : percentiles
+                          "WorkPackages"  : work package codes
+                          "FinancialYears": financial years
+                          "WorkPackageTotalCostByYear": numpy array
+                                       (percentiles, work packages, years)
+                          "WorkPackageTotalCost": numpy array
+                                       (percentiles, work packages)
+                          "ProjectTotalCostByYear": numpy array
+                                       (percentiles, years)
+                          "ProjectTotalCost": numpy array (percentiles)
+                          "ProjectTotalCostSamples": numpy array
+                                       (realisations)
+                        Percentiles are taken year by year; the curves
+                        are therefore not additive.
+                 [Classmethod]
+
+  I/o methods:
+      createPandasDataframe: Pandas data frame of percentile curves.
+                 Input: _Result -- dictionary returned by simulate
+                 [Classmethod]
+
+      createCSV: Write data frame to CSV file.
+                 Input: _DataFrame, _filename
+                 [Classmethod]
+
+
+  Exceptions:
+    UnknownDistribution: distribution or kind of item not known
+
+
+Created on Sun 18Oct26. Version history:
+----------------------------------------
+ 1.0: 18Oct26: First implementation
+ 1.1: 18Oct26: CG flag taken from the staff funding index
+ 1.2: 18Oct26: Work package sums formed by one matrix product per batch
+               with leaves spread by (work package, year); staff and
+               task-staff distributions keyed by institute as well as
+               staff code, and by work package and task
+
+@author: kennethlong
+"""
+
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy  as np
+import pandas as pd
+
+import Control       as Cntrl
+import ScenarioSweep as ScnSwp
+import Staff         as Stf
+import TaskStaff     as TskStf
+import TaskEquipment as TskEqp
+import WorkPackage   as wp
+
+class MonteCarlo:
+    __Debug      = False
+    _Kinds       = ("Equipment", "Staff", "TaskStaff")
+    _Uncertainty = {"Equipment": {}, "Staff": {}, "TaskStaff": {}}
+
+#--------  Get/set methods:
+    @classmethod
+    def setUncertainty(cls, _Kind, _Distribution, _Key=None):
+        if not _Kind in cls._Kinds:
+            raise UnknownDistribution(" MonteCarlo; setUncertainty: kind ", \
+                                      _Kind)
+        if _Distribution == None:
+            cls._Uncertainty[_Kind].pop(_Key, None)
+            return
+        nPrm = {"Normal": 1, "LogNormal": 1, "Uniform": 2, "Triangular": 3}
+        if not _Distribution[0] in nPrm or \
+           len(_Distribution) != nPrm[_Distribution[0]] + 1:
+            raise UnknownDistribution( \
+                        " MonteCarlo; setUncertainty: distribution ", \
+                        _Distribution)
+        cls._Uncertainty[_Kind][_Key] = tuple(_Distribution)
+
+    @classmethod
+    def clearUncertainty(cls):
+        cls._Uncertainty = {Kind: {} for Kind in cls._Kinds}
+
+    @classmethod
+    def getDistribution(cls, _Kind, _Key):
+        Dists = cls._Uncertainty[_Kind]
+        return Dists.get(_Key, Dists.get(None))
+
+#--------  Processing methods:
+    @classmethod
+    def spread(cls, _Values, _Groups, _nGrps):
+        nLf, nYrs = _Values.shape
+        Spread = np.zeros((nLf, _nGrps, nYrs))
+        Spread[np.arange(nLf), _Groups] = _Values
+        return Spread.reshape(nLf, _nGrps * nYrs)
+
+    @classmethod
+    def getModel(cls, _WPs=None, _Cntrl=None):
+        iCntrl = _Cntrl
+        if iCntrl == None:
+            iCntrl = Cntrl.Control()
+        WPs = wp.WorkPackage.instances
+        if _WPs is not None:
+            WPs = _WPs
+        Costs = ScnSwp.ScenarioSweep.getCostArrays(WPs)
+        nWP   = len(WPs)
+        nYrs  = Costs["Staff"].shape[1]
+        WPPos = {iWP: iPos for iPos, iWP in enumerate(WPs)}
+
+        #.. Staff; costed TaskStaff rows of the work packages:
+        TS     = TskStf.TaskStaff
+        Rows   = TS.getRows()
+        Rows   = Rows[TS._Filled[Rows, TS._COST]]
+        TskWP  = np.array([WPPos.get(iTsk._WorkPackage, -1) \
+                           for iTsk in TS._TaskKeys], dtype=int)
+        RowWP  = TskWP[TS._TaskIdx[Rows]]
+        Rows   = Rows[RowWP >= 0]
+        RowWP  = RowWP[RowWP >= 0]
+        Frac   = np.zeros((len(Rows), nYrs))
+        nCp    = min(nYrs, TS._FracByYr.shape[1])
+        Frac[:, :nCp] = TS._FracByYr[Rows, :nCp]
+        RowStf = TS._StaffIdx[Rows]
+
+        #.. Equipment; TaskEquipment of the work packages:
+        TskEqps = [iTskEqp for iTskEqp in TskEqp.TaskEquipment.instances \
+                   if iTskEqp._Task._WorkPackage in WPPos]
+        EqpKeys = []
+        EqpPos  = {}
+        for iTskEqp in TskEqps:
+            if not iTskEqp._Equipment in EqpPos:
+                EqpPos[iTskEqp._Equipment] = len(EqpKeys)
+                EqpKeys.append(iTskEqp._Equipment)
+        Eqp    = np.zeros((len(TskEqps), nYrs))
+        for iLf, iTskEqp in enumerate(TskEqps):
+            Vec = iTskEqp._Equipment._EquipmentCostByYear
+            Eqp[iLf, :len(Vec)] = Vec
+
+        #.. Leaves spread into (leaves, work packages * years):
+        EqpWP  = np.array([WPPos[iTskEqp._Task._WorkPackage] \
+                           for iTskEqp in TskEqps], dtype=int)
+        RowTsk = [TS._TaskKeys[iTsk] for iTsk in TS._TaskIdx[Rows]]
+        Model = { \
+            "WorkPackages"  : [iWP._Code for iWP in WPs], \
+            "FinancialYears": WPs[0]._FinancialYears if nWP > 0 else [], \
+            "nYrs"          : nYrs, \
+            "Frac"          : cls.spread(Frac, RowWP, nWP), \
+            "RowStaff"      : RowStf, \
+            "AnnualCost"    : np.array([iStf._AnnualCost \
+                                        for iStf in TS._StaffKeys], \
+                                       dtype=float), \
+            "CG"            : Stf.Staff.isCG(TS._StaffKeys) \
+                                                    .astype(float)[RowStf], \
+            "Equipment"     : cls.spread(Eqp, EqpWP, nWP), \
+            "EqpIdx"        : np.array([EqpPos[iTskEqp._Equipment] \
+                                        for iTskEqp in TskEqps], dtype=int), \
+            "OtherNonStaff" : Costs["OtherNonStaff"], \
+            "TrvlCnsm"      : Costs["TrvlCnsm"], \
+            "Factors"       : iCntrl.getFactorsByYr(nYrs), \
+            "Distributions" : { \
+                "TaskStaff": [cls.getDistribution("TaskStaff", \
+                                  (iTsk._WorkPackage._Code, iTsk._Name, \
+                                   TS._StaffKeys[iStf]._InstituteCode, \
+                                   TS._StaffKeys[iStf]._StaffCode)) \
+                              for iTsk, iStf in zip(RowTsk, RowStf)], \
+                "Staff"    : [cls.getDistribution("Staff", \
+                                  (iStf._InstituteCode, iStf._StaffCode)) \
+                              for iStf in TS._StaffKeys], \
+                "Equipment": [cls.getDistribution("Equipment", iEqp._Name) \
+                              for iEqp in EqpKeys]}}
+        if cls.__Debug:
+            print(" MonteCarlo; getModel:", len(Rows), "TaskStaff rows,", \
+                  len(TskEqps), "equipment leaves,", nWP, \
+                  "work packages,", nYrs, "years")
+        return Model
+
+    @classmethod
+    def sample(cls, _Rng, _Dists, _nSmpl):
+        Fctr   = np.ones((_nSmpl, len(_Dists)))
+        Groups = {}
+        for iItm, Dist in enumerate(_Dists):
+            if Dist != None:
+                Groups.setdefault(Dist, []).append(iItm)
+        for Dist, Items in Groups.items():
+            Shape = (_nSmpl, len(Items))
+            if Dist[0] == "Normal":
+                Smpl = np.maximum(0., 1. + Dist[1]*_Rng.standard_normal(Shape))
+            elif Dist[0] == "LogNormal":
+                Smpl = np.exp(Dist[1]*_Rng.standard_normal(Shape) - \
+                              0.5*Dist[1]**2)
+            elif Dist[0] == "Uniform":
+                Smpl = _Rng.uniform(Dist[1], Dist[2], Shape)
+            else:
+                Smpl = _Rng.triangular(Dist[1], Dist[2], Dist[3], Shape)
+            Fctr[:, Items] = Smpl
+        return Fctr
+
+    @classmethod
+    def runBatch(cls, _Args):
+        Model, Seed, nSmpl = _Args
+        Rng   = np.random.default_rng(Seed)
+        Dists = Model["Distributions"]
+        fFrac = cls.sample(Rng, Dists["TaskStaff"], nSmpl)
+        fCost = cls.sample(Rng, Dists["Staff"],     nSmpl)
+        fEqp  = cls.sample(Rng, Dists["Equipment"], nSmpl)
+
+        #.. (realisations, leaves) weights times the spread leaves,
+        #   (leaves, work packages * years):
+        Shape = (nSmpl, len(Model["WorkPackages"]), Model["nYrs"])
+        Wght  = fFrac * (Model["AnnualCost"][None, :] * fCost) \
+                                                  [:, Model["RowStaff"]]
+        S     = (Wght @ Model["Frac"]).reshape(Shape)
+        CG    = ((Wght * Model["CG"]) @ Model["Frac"]).reshape(Shape)
+        E     = (fEqp[:, Model["EqpIdx"]] @ Model["Equipment"]) \
+                                                          .reshape(Shape)
+        return ScnSwp.ScenarioSweep.totalCostByYear(S, CG, E, \
+                   Model["OtherNonStaff"], Model["TrvlCnsm"], \
+                   Model["Factors"])
+
+    @classmethod
+    def simulate(cls, _nSamples, _Seed=None, _Percentiles=(50, 80), \
+                 _BatchSize=1000, _nWorkers=None, _WPs=None, _Cntrl=None):
+        Model   = cls.getModel(_WPs, _Cntrl)
+        SeedSeq = np.random.SeedSequence(_Seed)
+        nBatch  = -(-_nSamples // _BatchSize)
+        Batches = [(Model, Seed, min(_BatchSize, _nSamples - iBt*_BatchSize)) \
+                   for iBt, Seed in enumerate(SeedSeq.spawn(nBatch))]
+
+        nWorkers = _nWorkers
+        if nWorkers == None:
+            nWorkers = os.cpu_count()
+        nWorkers = min(nWorkers, nBatch)
+        if nWorkers <= 1 or not "fork" in mp.get_all_start_methods():
+            Totals = [cls.runBatch(Batch) for Batch in Batches]
+        else:
+            if cls.__Debug:
+                print(" MonteCarlo; simulate:", nBatch, "batches with", \
+                      nWorkers, "workers")
+            with ProcessPoolExecutor(max_workers=nWorkers, \
+                                     mp_context=mp.get_context("fork")) \
+                                     as Pool:
+                Totals = list(Pool.map(cls.runBatch, Batches))
+        nWP    = len(Model["WorkPackages"])
+        nYrs   = Model["nYrs"]
+        Totals = np.concatenate(Totals) if nBatch > 0 else \
+                 np.zeros((0, nWP, nYrs))
+
+        Prj    = np.sum(Totals, axis=1)
+        PrjTot = np.sum(Prj, axis=1)
+        Pcnt   = list(_Percentiles)
+        return {"Seed"                      : SeedSeq.entropy, \
+                "nSamples"                  : _nSamples, \
+                "Percentiles"               : Pcnt, \
+                "WorkPackages"              : Model["WorkPackages"], \
+                "FinancialYears"            : Model["FinancialYears"], \
+                "WorkPackageTotalCostByYear": np.percentile(Totals, Pcnt, \
+                                                            axis=0), \
+                "WorkPackageTotalCost"      : np.percentile( \
+                                    np.sum(Totals, axis=2), Pcnt, axis=0), \
+                "ProjectTotalCostByYear"    : np.percentile(Prj, Pcnt, \
+                                                            axis=0), \
+                "ProjectTotalCost"          : np.percentile(PrjTot, Pcnt), \
+                "ProjectTotalCostSamples"   : PrjTot}
+
+#--------  I/o methods:
+    @classmethod
+    def createPandasDataframe(cls, _Result):
+        MCData = []
+        MCData.append(["Work package", "Percentile"] + \
+                      [str(FY) for FY in _Result["FinancialYears"]] + \
+                      ["Total (£k)"])
+        for iP, Pcnt in enumerate(_Result["Percentiles"]):
+            for iWP, Code in enumerate(_Result["WorkPackages"]):
+                MCData.append([Code, Pcnt] + \
+                    list(_Result["WorkPackageTotalCostByYear"][iP, iWP]) + \
+                    [_Result["WorkPackageTotalCost"][iP, iWP]])
+            MCData.append(["Project", Pcnt] + \
+                          list(_Result["ProjectTotalCostByYear"][iP]) + \
+                          [_Result["ProjectTotalCost"][iP]])
+        MCDataframe = pd.DataFrame(MCData)
+        if cls.__Debug:
+            print(" MonteCarlo; createPandasDataframe: \n", MCDataframe)
+        return MCDataframe
+
+    @classmethod
+    def createCSV(cls, _MCDataFrame, _filename):
+        _MCDataFrame.to_csv(_filename)
+
+
+#--------  Exceptions:
+class UnknownDistribution(Exception):
+    pass
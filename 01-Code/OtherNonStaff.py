@@ -12,6 +12,11 @@ Class OtherNonStaff:
   -----------------
   __Debug : Boolean: set for debug print out
   instances: List of instances if the OtherNonStaff class.
+  __slots__: Names of the instance attributes; instances carry no __dict__.
+  _Index   : Dictionary of instances keyed by name.  Each entry is a list
+             so that duplicates are recorded as the instance is created.
+  _ByWorkPackage: Dictionary of lists of instances keyed by work package
+             instance (adjacency WorkPackage -> OtherNonStaff).
       
   Instance attributes:
   --------------------
@@ -40,8 +45,20 @@ Class OtherNonStaff:
   Get/set methods:
       getInstance: Finds instance of class with OtherNonStaff._Name
                  Input: _Name -- str -- name of Project to be found
-                Return: Instance of class; None if not found or if more than
-                        one instance
+                Return: Instance of class; None if not found.  Raises
+                        DuplicateOtherNonStaffClassInstance if more 
+                        than one instance.  Uses _Index.
+                 [Classmethod]
+
+      addToIndex: Add instance to _Index and _ByWorkPackage; called on 
+                 instanciation.
+                 [Classmethod]
+
+      buildIndex: Rebuild indices from instances; called from clean.
+                 [Classmethod]
+
+      getForWorkPackage: Return list of instances in work package.
+                 Input: _WPInst -- instance of WorkPackage
                  [Classmethod]
 
      setOtherNonStaffCost: Set other non-staff cost per year (£k).
@@ -79,6 +96,9 @@ Class OtherNonStaff:
 Created on Wed 19Jun21. Version history:
 ----------------------------------------
  1.0: 19Jun21: First implementation
+ 1.1: 18Oct26: Dictionary index for getInstance
+ 1.2: 18Oct26: Adjacency index work package -> OtherNonStaff
+ 1.3: 18Oct26: Instance attributes declared in __slots__
 
 @author: kennethlong
 """
@@ -91,6 +111,10 @@ import WorkPackage as wp
 class OtherNonStaff:
     __Debug = False
     instances = []
+    _Index    = {}
+    _ByWorkPackage = {}
+    __slots__ = ("_Name", "_WPInst", "_OtherNonStaffCostByYear", \
+                 "_TotalOtherNonStaffCost")
 
 #--------  "Built-in methods":
     def __init__(self, _Name="None", _WPInst=None):
@@ -107,6 +131,7 @@ class OtherNonStaff:
         self._TotalOtherNonStaffCost  = float("nan")
 
         OtherNonStaff.instances.append(self)
+        OtherNonStaff.addToIndex(self)
 
     def __repr__(self):
         return "OtherNonStaff(Name)"
@@ -145,15 +170,10 @@ class OtherNonStaff:
 
     @classmethod
     def getInstance(cls, _Name):
-        InstList = []
         if OtherNonStaff.__Debug:
             print(" OtherNonStaff; getInstance: search for OtherNonStaff name:",\
                   _Name)
-        for inst in cls.instances:
-            if OtherNonStaff.__Debug:
-                print(" OtherNonStaff; getInstance: instance:", inst._Name)
-            if inst._Name == _Name:
-                InstList.append(inst)
+        InstList = cls._Index.get(_Name, [])
         Ninst = len(InstList)
         if Ninst == 0:
             RtnInst = None
@@ -166,6 +186,31 @@ class OtherNonStaff:
             print(" OtherNonStaff; getInstance: number of instances; " \
                   "return instance:", Ninst, "\n ", RtnInst)
         return RtnInst
+
+    @classmethod
+    def addToIndex(cls, _Inst):
+        if _Inst._Name in cls._Index:
+            cls._Index[_Inst._Name].append(_Inst)
+            if OtherNonStaff.__Debug:
+                print(" OtherNonStaff; addToIndex: duplicate instance for:", \
+                      _Inst._Name)
+        else:
+            cls._Index[_Inst._Name] = [_Inst]
+        if _Inst._WPInst in cls._ByWorkPackage:
+            cls._ByWorkPackage[_Inst._WPInst].append(_Inst)
+        else:
+            cls._ByWorkPackage[_Inst._WPInst] = [_Inst]
+
+    @classmethod
+    def buildIndex(cls):
+        cls._Index         = {}
+        cls._ByWorkPackage = {}
+        for iInst in cls.instances:
+            cls.addToIndex(iInst)
+
+    @classmethod
+    def getForWorkPackage(cls, _WPInst):
+        return cls._ByWorkPackage.get(_WPInst, [])
     
         
 #--------  Creating the pandas dataframe:
@@ -220,6 +265,7 @@ class OtherNonStaff:
                 del iONS
             except ValueError:
                 cls.instances.append(iONS)
+        cls.buildIndex()
 
         return len(Deletions)
         
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Class ParseCache:
+=================
+
+  On-disk cache of the parsed intermediate form of input files (work
+  package definitions, staff database).  Entries are keyed by the kind of
+  file, the version of the parser and the SHA-256 hash of the file
+  content, so an entry is reused only if neither the file nor the parser
+  has changed.  Entries are stored as pickle files.
+
+  The cache is enabled by setting the environment variable CACHEPATH to
+  an existing directory; if CACHEPATH is not set, or does not point to a
+  directory, nothing is cached and every file is parsed.
+
+  ParseCache has no instances; all methods are class methods.
+
+
+  Class attributes:
+  -----------------
+  __Debug : Boolean: set for debug print out
+  _nHit   : Number of cache hits in this process
+  _nMiss  : Number of cache misses (with cache enabled) in this process
+
+
+  Methods:
+  --------
+  Get/set methods:
+      getCachePath: Return path to cache directory; None if cache disabled.
+                 [Classmethod]
+
+      fileHash: Return SHA-256 hex digest of content of file.
+                 Input: _filename -- path to file
+                 [Classmethod]
+
+      getEntryPath: Return path of cache entry.
+                 Input: _Kind     -- str, kind of file (e.g. "WorkPackage")
+                        _filename -- path to file
+                        _Version  -- parser version
+                Return: path; None if cache disabled.
+                 [Classmethod]
+
+  I/o methods:
+      load: Return cached record for file; None on a miss or if the cache
+            is disabled.  The "Filename" item of the record is set to
+            _filename.
+                 Input: _Kind, _filename, _Version as getEntryPath
+                 [Classmethod]
+
+      store: Write record to the cache; does nothing if cache disabled.
+             The entry is written to a temporary file and renamed so that
+             concurrent writers (e.g. ingest workers) are safe.
+                 Input: _Kind, _filename, _Version as getEntryPath
+                        _Record -- record to cache
+                 [Classmethod]
+
+      clear: Delete all cache entries.
+                Return: number of entries deleted
+                 [Classmethod]
+
+
+Created on Sun 18Oct26. Version history:
+----------------------------------------
+ 1.0: 18Oct26: First implementation
+
+@author: kennethlong
+"""
+
+import os
+import pickle
+import hashlib
+
+class ParseCache:
+    __Debug = False
+    _nHit   = 0
+    _nMiss  = 0
+
+#--------  Get/set methods:
+    @classmethod
+    def getCachePath(cls):
+        CACHEPATH = os.getenv('CACHEPATH')
+        if CACHEPATH == None or not os.path.isdir(CACHEPATH):
+            return None
+        return CACHEPATH
+
+    @classmethod
+    def fileHash(cls, _filename):
+        Hash = hashlib.sha256()
+        with open(_filename, 'rb') as File:
+            Hash.update(File.read())
+        return Hash.hexdigest()
+
+    @classmethod
+    def getEntryPath(cls, _Kind, _filename, _Version):
+        CACHEPATH = cls.getCachePath()
+        if CACHEPATH == None:
+            return None
+        Key = _Kind + "-v" + str(_Version) + "-" + cls.fileHash(_filename)
+        return os.path.join(CACHEPATH, Key + ".pkl")
+
+#--------  I/o methods:
+    @classmethod
+    def load(cls, _Kind, _filename, _Version):
+        EntryPath = cls.getEntryPath(_Kind, _filename, _Version)
+        if EntryPath == None:
+            return None
+        if not os.path.isfile(EntryPath):
+            cls._nMiss += 1
+            if cls.__Debug:
+                print(" ParseCache; load: miss for", _filename)
+            return None
+        with open(EntryPath, 'rb') as File:
+            Record = pickle.load(File)
+        Record["Filename"] = _filename
+        cls._nHit += 1
+        if cls.__Debug:
+            print(" ParseCache; load: hit for", _filename)
+        return Record
+
+    @classmethod
+    def store(cls, _Kind, _filename, _Version, _Record):
+        EntryPath = cls.getEntryPath(_Kind, _filename, _Version)
+        if EntryPath == None:
+            return
+        TmpPath = EntryPath + "." + str(os.getpid()) + ".tmp"
+        with open(TmpPath, 'wb') as File:
+            pickle.dump(_Record, File, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(TmpPath, EntryPath)
+        if cls.__Debug:
+            print(" ParseCache; store: entry for", _filename, "stored.")
+
+    @classmethod
+    def clear(cls):
+        CACHEPATH = cls.getCachePath()
+        nDel = 0
+        if CACHEPATH == None:
+            return nDel
+        for Entry in os.listdir(CACHEPATH):
+            if Entry.endswith(".pkl"):
+                os.remove(os.path.join(CACHEPATH, Entry))
+                nDel += 1
+        return nDel
@@ -23,6 +23,11 @@ Class Progress:
   -----------------
   __Debug : Boolean: set for debug print out
   instances: List of instances if the Progress class.
+  __slots__: Names of the instance attributes; instances carry no __dict__.
+  _Revision: Revision count of the progress data; incremented by the set
+             methods of Progress and EarnedValue (and so on creation of
+             an instance) and by clear.  Views of the progress data
+             (ProgressTable) compare it to detect changes.
 
       
   Instance attributes:
@@ -35,6 +40,10 @@ Class Progress:
    _PlannedValue            = Fractional completion of task at _Date
    _FractionComplete        = Fractional completion of task at _Date
    _Spend                   = Spend (£k) to _Date
+   _EarnedValueInst         = EarnedValue instance that refers to this
+                              Progress instance; set by
+                              EarnedValue.setProgress.  None if there is
+                              none.
 
     
   Methods:
@@ -48,8 +57,14 @@ Class Progress:
 
   I/o methods:
     loadProgress: Reads progress CSV file and creates Progress, PV, 
-                  instances as appropriate.
+                  instances as appropriate.  The dates are parsed in one
+                  call; each progress line is matched to its task
+                  through the (task name, work package) index of Task,
+                  the work package being given by the preceding "Work
+                  package" row (code or name).  Rows that can not be
+                  matched are reported together.
         Input: file name, full path to file containing progress data
+       Return: List of (row, flag, name) of the unmatched rows
         Class method
 
 
@@ -85,10 +100,21 @@ getFractionComplete: get fraction complete as float
         
          getSpend: get spend £k
         
-   getEarnedValue: get earmned value, £k
+   getEarnedValue: get earmned value, £k, from the EarnedValue instance
+                   that refers to this instance; None if there is none
+
+      newRevision: Increment _Revision; called by the set methods
+              Class method
+
+      getRevision: Return _Revision
+              Class method
 
 
   Processing methods:
+            clear: Delete all instances of Progress and EarnedValue
+             Return: Number of instances deleted
+              Class method
+
    takePrjWPorTsk: True if input is valid instance of Project,
                    WorkPackage or Task
               Input: Instance of Project, WorkPackage or Task to be
@@ -96,8 +122,23 @@ getFractionComplete: get fraction complete as float
               Class method
 
   WPorPrjProgress: Compute progress values for WorkPackage or Project
-                   instance.
+                   instance (see rollUpProgress).
               Input: Instance of Project or WorkPackage
+             Return: True if progress instances were created
+
+   rollUpProgress: Roll task progress up to work packages and project
+                   in one pass.  Task progress is sorted once by date
+                   and task name and summed by (work package, date) and
+                   by (project, date).  For each date a Progress and an
+                   EarnedValue instance is created for the work package
+                   or project: planned fraction complete and fraction
+                   complete are averaged over tasks; planned value,
+                   earned value and spend are summed.
+              Input: List of WorkPackage and Project instances; None
+                     for all work packages and projects
+             Return: Dictionary; True, keyed by instance, if progress
+                     instances were created for it
+              Class method
 
              Plot: Make progress plots (PV, EV, etc.); landscape and
                    portrait formats
@@ -130,23 +171,39 @@ ProgressPlannedFractionCompleteNotValid: fraction neither float nor null
                  PrjOrWpInstanceInvalid: Cant process progress data for
                                          Project or WorkPackage instance
 
+                     NoFilenameProvided: No progress file name given
+
+                        NonExistantFile: Progress file does not exist
+
 
   
 Created on Wed 17Jun22. Version history:
 ----------------------------------------
  1.0: 17Jun22: First implementation
+ 1.1: 18Oct26: Instance attributes declared in __slots__
+ 1.2: 18Oct26: Bulk loadProgress; dates parsed in one call, tasks found
+               through the Task index, unmatched rows reported together
+ 1.3: 18Oct26: rollUpProgress; work package and project progress for all
+               dates in one pass.  The last date is no longer dropped
+               (it was flushed only in debug mode).
+ 1.4: 18Oct26: Progress refers back to its EarnedValue instance;
+               getEarnedValue no longer scans EarnedValue.instances
+ 1.5: 18Oct26: Revision count (_Revision) kept by the set methods and
+               clear
 
 @author: kennethlong
 """
 
 import os
 import datetime as DT
+import numpy    as np
 import pandas   as pnds
 import math     as mt
 import matplotlib.pyplot as plt
 import matplotlib as mpl
 from operator import attrgetter
 
+import Aggregation as Agg
 import Task        as Tsk
 import WorkPackage as wp
 import Project     as Prj
@@ -155,6 +212,10 @@ import Project     as Prj
 class Progress:
     __Debug = False
     instances = []
+    _Revision = 0
+    __slots__ = ("_PrjWPorTsk", "_Date", "_PlannedFractionComplete", \
+                 "_PlannedValue", "_FractionComplete", "_Spend", \
+                 "_EarnedValueInst")
 
 #--------  "Built-in methods":
     def __init__(self, _PrjWPorTsk=None, _Date=None, \
@@ -168,6 +229,7 @@ class Progress:
         self.setPlannedValue(_PlannedValue)
         self.setFractionComplete(_FractionComplete)
         self.setSpend(_Spend)
+        self._EarnedValueInst = None
                 
         Progress.instances.append(self)
         
@@ -197,62 +259,66 @@ class Progress:
                                   ' does not exist; execution termimated.')
 
         ProgParams = pnds.read_csv(_filename)
-        iRow       = ProgParams.index
         if cls.getDebug():
             print(" Progress.loadProgress: parse progress report")
-        ProgList = ProgParams.values.tolist()
-        iCnt = 0
-        for i in iRow:
-            wpInst = None
+        Flag  = ProgParams.iloc[:, 0].to_numpy()
+        Label = ProgParams.iloc[:, 1].to_numpy()
+        Unmatched = []
+
+        #.. Work package of each row; set by the last "Work package" row:
+        WPByLabel = {}
+        for iWP in wp.WorkPackage.instances:
+            WPByLabel.setdefault(iWP._Name, iWP)
+        for iWP in wp.WorkPackage.instances:
+            WPByLabel[iWP._Code] = iWP
+        IsWP = Flag == "Work package"
+        WPs  = []
+        for iRow in np.nonzero(IsWP)[0]:
+            iWP = WPByLabel.get(Label[iRow], \
+                                WPByLabel.get(ProgParams.iloc[iRow, 2]))
+            if iWP == None:
+                Unmatched.append((int(iRow), Flag[iRow], Label[iRow]))
+            WPs.append(iWP)
+        #.. Rows before the first "Work package" row get index -1, i.e. the
+        #   trailing None:
+        WPs.append(None)
+        RowWP = np.cumsum(IsWP) - 1
+
+        #.. Progress lines; dates and values parsed column by column:
+        Lines = np.nonzero(Flag == "ProgressLine")[0]
+        Dates = pnds.to_datetime(ProgParams.iloc[Lines, 3], \
+                                 format='%d %B %Y').dt.to_pydatetime()
+        Dates = Dates.tolist()
+        Vals  = ProgParams.iloc[Lines, 4:8].to_numpy(dtype=float)
+        Vals[:, 1] = Vals[:, 1] / 1000.
+        Vals[:, 3] = Vals[:, 3] / 1000.
+        Vals  = Vals.tolist()
+
+        PrgInst = None
+        for iLn, iRow in enumerate(Lines):
             TskInst = None
-            iCnt += 1
+            iWP     = WPs[RowWP[iRow]]
+            if iWP != None:
+                TskInst = Tsk.Task.getInstance(Label[iRow], iWP)
+            if TskInst == None:
+                Unmatched.append((int(iRow), Flag[iRow], Label[iRow]))
+                continue
             if cls.getDebug():
-                print("     ----> Parse row", iCnt, ProgList[iCnt-1])
-
-            if ProgParams.iloc[i,0] == "Work package":
-                if cls.getDebug():
-                    print("         ----> Work package:", \
-                          ProgParams.iloc[i,1])
-                for wpInstIter in wp.WorkPackage.instances:
-                    if wpInstIter._Name == ProgParams.iloc[i,1]:
-                        if cls.getDebug():
-                            print("         ----> Identified:")
-                    wpInst = wpInstIter
-                if wpInst == None:
-                    if cls.getDebug():
-                        print("         <---- Not identified!")
-
-            elif ProgParams.iloc[i,0] == "ProgressLine":
-                if cls.getDebug():
-                    print("         ----> Progress line for task:", \
-                      ProgParams.iloc[i,1])
-                for TskInstIter in Tsk.Task.instances:
-                    if TskInstIter._Name == ProgParams.iloc[i,1]:
-                        if cls.getDebug():
-                            print("             ----> Identified.")
-                        TskInst = TskInstIter
-                if TskInst == None:
-                    if cls.getDebug():
-                        print("         <---- Not identified!")
-                    
-            if TskInst != None:
-                if cls.getDebug():
-                    print("                 ----> Progress line:", \
-                      DT.datetime.strptime(ProgParams.iloc[i,3],'%d %B %Y'),\
-                      ProgParams.iloc[i,4], \
-                      ProgParams.iloc[i,5], \
-                      ProgParams.iloc[i,6], \
-                      ProgParams.iloc[i,7])
-                PrgInst = Progress(TskInst, \
-                    DT.datetime.strptime(ProgParams.iloc[i,3],'%d %B %Y'), \
-                                   float(ProgParams.iloc[i,4]), \
-                                   float(ProgParams.iloc[i,5])/1000., \
-                                   float(ProgParams.iloc[i,6]), \
-                                   float(ProgParams.iloc[i,7])/1000. )
+                print("                 ----> Progress line:", \
+                      Label[iRow], Dates[iLn], Vals[iLn])
+            PrgInst = Progress(TskInst, Dates[iLn], *Vals[iLn])
+
+        if len(Unmatched) > 0:
+            Unmatched.sort()
+            print("     ----> Warning:", len(Unmatched), \
+                  "rows of progress report not matched:", _filename)
+            for Row in Unmatched:
+                print("           ---->", Row)
         if cls.getDebug():
             print("     <---- data frame:")
             print(PrgInst)
             print(" <----  Progress.loadProgress done.")
+        return Unmatched
             
                 
 #--------  Get/set methods:
@@ -268,17 +334,20 @@ class Progress:
                                 " Progress.setPrjWPorTsk: _PrjWPorTsk " \
                                 "not an instance of Task class")
         self._PrjWPorTsk = _PrjWPorTsk
+        Progress.newRevision()
         
     def setDate(self, _Date):
         if not isinstance(_Date, DT.datetime):
             raise ProgressDateNotValid(" Progress.setDate: _Date " \
                                        "not an instance of datetime class")
         self._Date = _Date
+        Progress.newRevision()
         
     def setPlannedFractionComplete(self, _PlannedFractionComplete):
         if isinstance(_PlannedFractionComplete, float) or \
             mt.isnan(float(_PlannedFractionComplete)):
             self._PlannedFractionComplete = _PlannedFractionComplete
+            Progress.newRevision()
         else:
             raise ProgressPlannedFractionCompleteNotValid( \
                                " Progress.setPlannedFractionComplete: " \
@@ -288,6 +357,7 @@ class Progress:
         if isinstance(_PlannedValue, float) or \
             mt.isnan(float(_PlannedValue)):
             self._PlannedValue = _PlannedValue
+            Progress.newRevision()
         else:
             raise ProgressPlannedValueNotValid( \
                                " Progress.setPlannedValue: " \
@@ -297,6 +367,7 @@ class Progress:
         if _FractionComplete == "nan" or \
            isinstance(_FractionComplete, float):
             self._FractionComplete = _FractionComplete
+            Progress.newRevision()
         else:
             raise ProgressFractionCompleteNotValid( \
                                        " Progress.setFractionComplete: " \
@@ -306,6 +377,7 @@ class Progress:
         if isinstance(_Spend, float) or \
            _Spend == "nan":
            self._Spend = _Spend
+           Progress.newRevision()
         else:
             raise ProgressSpendNotValid(" Progress.setSpend: _Spend " \
                                        "not a float")
@@ -314,6 +386,14 @@ class Progress:
     def getDebug(cls):
         return cls.__Debug
     
+    @classmethod
+    def newRevision(cls):
+        Progress._Revision += 1
+
+    @classmethod
+    def getRevision(cls):
+        return Progress._Revision
+
     def getPrjWPorTsk(self):
         return self._PrjWPorTsk
         
@@ -335,9 +415,8 @@ class Progress:
     def getEarnedValue(self):
 
         EV = None
-        for iEV in EarnedValue.instances:
-            if iEV.getProgress() == self:
-                EV = iEV._EarnedValue
+        if self._EarnedValueInst != None:
+            EV = self._EarnedValueInst._EarnedValue
         
         return EV
         
@@ -361,6 +440,14 @@ class Progress:
             
         return tkTsk
         
+    @classmethod
+    def clear(cls):
+        nDel = len(Progress.instances) + len(EarnedValue.instances)
+        Progress.instances    = []
+        EarnedValue.instances = []
+        Progress.newRevision()
+        return nDel
+
     @classmethod
     def WPorPrjProgress(cls, _WPorPrjInst):
 
@@ -372,135 +459,67 @@ class Progress:
             print(" Progress.WPorPrjProgress: wpName:", \
                   _WPorPrjInst._Name)
 
-        SortedPrgRprt = sorted(Progress.instances, \
-                          key=attrgetter('_Date', '_PrjWPorTsk._Name'), \
-                                 )
-
-        DtRef   = None
+        return cls.rollUpProgress([_WPorPrjInst])[_WPorPrjInst]
 
-        nTsks   = 0
-        wpPFC   = 0.
-        wpFC    = 0.
-        wpPV    = 0.
-        wpEV    = 0.
-        wpSpend = 0.
-
-        Loaded  = False
-        
-        #.. Loop over progress instances in date order:
-        for iPrg in SortedPrgRprt:
-            if cls.getDebug():
-                print("     ----> Consider Prj, WP, or Tsk:", \
-                      iPrg.getPrjWPorTsk().getName())
-            iWPorTsk = iPrg.getPrjWPorTsk()
-
-            #.. Take Task entries for requested work package only:
-            if isinstance(iWPorTsk, Tsk.Task):
-                iTsk = iWPorTsk
-                if cls.getDebug():
-                    print("         ----> Process task:", \
-                          iTsk.getName(), iTsk.getWorkPackage().getName())
-
-                if cls.takePrjWPorTsk(iTsk,_WPorPrjInst):
-                    if cls.getDebug() == True:
-                        print("             ----> WP or Tsk name:", \
-                              iWPorTsk.getName())
-                    
-                    Dt   = iPrg.getDate()
-                    if cls.getDebug() == True:
-                        print("             ----> Date, reference date:", \
-                              Dt, DtRef)
-                    if DtRef == None:
-                        DtRef = Dt
-                    
-                    #.. Handle new date; create wp progress instance and
-                    #   zero counters:
-                    if Dt != DtRef:
-                        if cls.getDebug() == True:
-                            print("                 ----> New date:", Dt)
-                        if nTsks != 0:
-                            #.. Create work-package progress instance
-                            wpPFC = wpPFC / nTsks
-                            wpFC  = wpFC  / nTsks
-                            if cls.getDebug() == True:
-                                print( \
-               "                       Creating WP progress instance:")
-                                print("                           ---->", \
-                                      " nTsks, PFC, FC, PV, EV, Spend:",\
-                                      nTsks, wpPFC, wpFC, wpPV, wpEV, wpSpend)
-                            iwpPrg = Progress(_WPorPrjInst, DtRef, wpPFC, \
-                                                  wpPV, wpFC, wpSpend)
-                            iwpEV  = EarnedValue(_WPorPrjInst, DtRef, \
-                                                     iwpPrg, wpEV)
-                            if not Loaded: Loaded = True
-                            if cls.getDebug() == True:
-                                print( \
-      "                 <---- Progress and EarnedValue instances created:",
-                                       iwpPrg.getPrjWPorTsk().getName(), \
-                                       iwpEV.getPrjWPorTsk().getName())
-                            
-                        #----> Progress(<arguments>)
-                        #.. Set date reference, zero task count
-                        DtRef   = Dt
-                        nTsks   = 0.
-                        wpPFC   = 0.
-                        wpFC    = 0.
-                        wpPV    = 0.
-                        wpEV    = 0.
-                        wpSpend = 0.
-                        if cls.getDebug() == True:
-                            print("                 <---- Reset done.")
-
-                    if cls.getDebug() == True:
-                        print("             <---- Load and increment.")
-                        
-                    #.. Get incremental data
-                    PFC  = iPrg.getPlannedFractionComplete()
-                    FC   = iPrg.getFractionComplete()
-                    PV   = iPrg.getPlannedValue()
-                    EV   = iPrg.getEarnedValue()
-                    Spnd = iPrg.getSpend()
-                    if cls.getDebug() == True:
-                        print("         <----", \
-                              " PFC, FC, PV, EV, Spnd:", \
-                              PFC, FC, PV, EV, Spnd)
-
-                    #.. Increment spend, progress etc.
-                    nTsks   += 1.
-                    wpPFC   += PFC
-                    wpFC    += FC
-                    wpPV    += PV
-                    wpEV    += EV
-                    wpSpend += Spnd
-
-                
-                #.. End of work-package-check if block
-            #.. End of is a Task check if block
-        #.. End of loop over progress entries
-
-        if cls.getDebug() == True:
-            print("     <----> Flush last entry:")
-            if nTsks != 0:
-                #.. Create work-package progress instance
-                wpPFC = wpPFC / nTsks
-                wpFC  = wpFC  / nTsks
+    @classmethod
+    def rollUpProgress(cls, _WPorPrjInsts=None):
+        WPorPrjInsts = _WPorPrjInsts
+        if WPorPrjInsts is None:
+            WPorPrjInsts = wp.WorkPackage.instances + Prj.Project.instances
+
+        #.. Task progress in date and task-name order:
+        SortedPrgRprt = sorted([iPrg for iPrg in Progress.instances \
+                                if isinstance(iPrg._PrjWPorTsk, Tsk.Task)], \
+                               key=attrgetter('_Date', '_PrjWPorTsk._Name'))
+        nPrg  = len(SortedPrgRprt)
+        Dates = np.array([iPrg._Date for iPrg in SortedPrgRprt], \
+                         dtype="datetime64[us]")
+        New   = np.concatenate(([True], Dates[1:] != Dates[:-1]))[:nPrg]
+        DtIdx = np.cumsum(New) - 1
+        nDt   = int(np.sum(New))
+        DtRef = [SortedPrgRprt[iPrg]._Date for iPrg in np.nonzero(New)[0]]
+
+        #.. Columns PFC, FC, PV, EV, spend; one row per task progress:
+        Values = np.array([[iPrg.getPlannedFractionComplete(), \
+                            iPrg.getFractionComplete(), \
+                            iPrg.getPlannedValue(), \
+                            iPrg.getEarnedValue(), \
+                            iPrg.getSpend()] for iPrg in SortedPrgRprt], \
+                          dtype=float).reshape(nPrg, 5)
+        WPs   = [iPrg._PrjWPorTsk._WorkPackage for iPrg in SortedPrgRprt]
+
+        #.. Sum by (work package or project, date) in one pass:
+        InstPos = {iInst: iPos for iPos, iInst in enumerate(WPorPrjInsts)}
+        nInst   = len(WPorPrjInsts)
+        Groups  = []
+        for Key in (WPs, [iWP._Project for iWP in WPs]):
+            Pos = np.array([InstPos.get(iKey, -1) for iKey in Key], \
+                           dtype=int)
+            Groups.append(np.where(Pos >= 0, Pos * nDt + DtIdx, -1))
+        Groups  = np.concatenate(Groups)
+        Values  = np.concatenate((Values, Values))
+        Sums    = Agg.Aggregation.groupSum(Values, Groups, nInst * nDt)
+        nTsks   = np.bincount(Groups[Groups >= 0], minlength=nInst * nDt)
+
+        #.. Create work package and project progress instances:
+        Loaded = {}
+        for iPos, iInst in enumerate(WPorPrjInsts):
+            Loaded[iInst] = False
+            for iDt in range(nDt):
+                iGrp = iPos * nDt + iDt
+                if nTsks[iGrp] == 0:
+                    continue
+                wpPFC, wpFC, wpPV, wpEV, wpSpend = Sums[iGrp].tolist()
+                wpPFC = wpPFC / float(nTsks[iGrp])
+                wpFC  = wpFC  / float(nTsks[iGrp])
                 if cls.getDebug() == True:
-                    print("           Creating WP progress instance:")
-                    print("               ---->", \
-                          " nTsks, PFC, FC, PV, EV, Spend:",\
-                          nTsks, wpPFC, wpFC, wpPV, wpEV, wpSpend)
-                iwpPrg = Progress(_WPorPrjInst, DtRef, wpPFC, \
+                    print(" Progress.rollUpProgress:", iInst._Name, \
+                          DtRef[iDt], " nTsks, PFC, FC, PV, EV, Spend:", \
+                          nTsks[iGrp], wpPFC, wpFC, wpPV, wpEV, wpSpend)
+                iwpPrg = Progress(iInst, DtRef[iDt], wpPFC, \
                                   wpPV, wpFC, wpSpend)
-                iwpEV  = EarnedValue(_WPorPrjInst, DtRef, \
-                                     iwpPrg, wpEV)
-                if cls.getDebug() == True:
-                    print("               <---- Final Progress", \
-                          " and EarnedValue instances created:", \
-                          iwpPrg.getPrjWPorTsk().getName(), \
-                          iwpEV.getPrjWPorTsk().getName())
-        
-        
-        #.. End of processing
+                iwpEV  = EarnedValue(iInst, DtRef[iDt], iwpPrg, wpEV)
+                Loaded[iInst] = True
 
         return Loaded
         
@@ -717,6 +736,12 @@ class NoWriteAccessToOutputPath(Exception):
 
 class PrjOrWpInstanceInvalid(Exception):
     pass
+
+class NoFilenameProvided(Exception):
+    pass
+
+class NonExistantFile(Exception):
+    pass
                   
 
 """
@@ -731,6 +756,7 @@ Class EarnedValue:
   -----------------
   __Debug : Boolean: set for debug print out
   instances: List of instances if the Progress class.
+  __slots__: Names of the instance attributes; instances carry no __dict__.
 
       
   Instance attributes:
@@ -764,7 +790,8 @@ Class EarnedValue:
       Input: Float, earned value, £k
 
        setProgress: set self._Progress with Progress instance associated
-                    with this EarnedValue instance
+                    with this EarnedValue instance and refer the Progress
+                    instance back to this instance
       Input: instance of Progress
 
        getProgress: return Progress instance
@@ -781,6 +808,11 @@ EarnedValueEVNotValid: Earned value neither float nor None
 Created on Wed 17Jun22. Version history:
 ----------------------------------------
  1.0: 120un22: First implementation
+ 1.1: 18Oct26: Instance attributes declared in __slots__
+ 1.2: 18Oct26: setProgress refers the Progress instance back to this
+               instance
+ 1.3: 18Oct26: Set methods increment the revision count of the progress
+               data (Progress._Revision)
 
 @author: kennethlong
 """
@@ -788,6 +820,7 @@ Created on Wed 17Jun22. Version history:
 class EarnedValue(Progress):
     __Debug = False
     instances = []
+    __slots__ = ("_Progress", "_EarnedValue")
 
 #--------  "Built-in methods":
     def __init__(self, _PrjWPorTsk=None, _Date=None, _Prg=None, _EV=None):
@@ -840,12 +873,15 @@ class EarnedValue(Progress):
             EV = _EV
 
         self._EarnedValue = EV
+        Progress.newRevision()
         
     def setProgress(self, _Prg):
         _setPrg = None
         if isinstance(_Prg, Progress):
             _setPrg = _Prg
+            _Prg._EarnedValueInst = self
         self._Progress = _Prg
+        Progress.newRevision()
 
     def getProgress(self):
         return self._Progress
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Class ProgressTable:
+====================
+
+  Columnar store of the earned-value time series held in the Progress
+  and EarnedValue instances.
+
+  Each field (date, planned fraction complete, planned value, fraction
+  complete, earned value, spend) is held as one numpy array with one
+  entry per Progress instance.  The rows are sorted by entity (Task,
+  WorkPackage or Project instance) and date, so the rows of an entity
+  form one contiguous block, addressed by _Start.  The schedule, cost
+  and budget variances and the schedule and cost performance indices of
+  every task, work package and the project are evaluated as whole-array
+  expressions that follow the row-by-row evaluation of the progress
+  report:
+    spend of zero is replaced by 1.E-6;
+    where the earned value is not known the variances are zero and the
+    performance indices one;
+    otherwise SV = EV - PV, CV = EV - spend, BV = spend - PV,
+    SPI = PV / EV and CPI = EV / spend.
+
+  getTable returns a table built from the current Progress instances.
+  The table is kept and built again when the progress data has changed
+  since it was built: the revision count of the progress data
+  (Progress._Revision) is incremented by the set methods of Progress and
+  EarnedValue, on creation of an instance and by Progress.clear, and the
+  lists of instances are compared with those from which the table was
+  built.  Attributes written directly, not through the set methods, are
+  not seen.
+
+
+  Class attributes:
+  -----------------
+  __Debug : Boolean: set for debug print out
+  _Columns: Column names of the progress report, after the title column
+  _Table  : Table returned by getTable
+  _Source : Revision count of the progress data, lists of Progress and
+            EarnedValue instances and their lengths when _Table was built
+
+
+  Instance attributes:
+  --------------------
+    _Entities : List of Task, WorkPackage and Project instances
+    _EntityIdx: Dictionary of index in _Entities keyed by instance
+    _Start    : numpy int array (entities + 1); rows of entity i are
+                _Start[i]:_Start[i+1]
+    _Entity   : numpy int array (rows); index of entity
+    _Date     : numpy datetime64 array (rows)
+    _PFC, _PV, _FC, _EV, _Spend: numpy arrays (rows); planned fraction
+                complete, planned value (£k), fraction complete, earned
+                value (£k; nan if not known), spend (£k)
+    _SpendPI  : numpy array (rows); spend used for the indices (£k)
+    _SV, _CV, _BV, _SPI, _CPI: numpy arrays (rows); schedule, cost and
+                budget variance (£k), schedule and cost performance
+                index
+
+
+  Methods:
+  --------
+  Built-in methods __init__, __repr__ and __str__.
+      __init__: Build table.
+                 Input: _Progress -- list of Progress instances;
+                                     Progress.instances if None (default)
+      __repr__: One liner with call.
+      __str__ : Dump of table size.
+
+  Get methods:
+      getTable: Return table of the current Progress instances.
+                 Built again if the progress data has changed.
+                 [Classmethod]
+
+      getTitle: Return title of the progress report of an entity.
+                 Input: _Entity -- Task, WorkPackage or Project instance
+                 [Classmethod]
+
+      getRows: Return slice of the rows of an entity; empty if the
+               entity has no progress.
+                 Input: _Entity -- Task, WorkPackage or Project instance
+
+      getLines: Return lines of the progress report of an entity: name,
+                date (YYYY-MM-DD) and the values of _Columns.
+                 Input: _Entity -- Task, WorkPackage or Project instance
+
+  Processing methods:
+      setIndicators: Evaluate variances and performance indices.
+
+      createPandasDataFrame: Return progress report of an entity as a
+                             pandas DataFrame, as taken by
+                             Progress.Plot.
+                 Input: _Entity -- Task, WorkPackage or Project instance
+
+      Plot: Plot progress of an entity (see Progress.Plot).
+                 Input: _Entity, _PlotPath, _FileName, landscape
+
+
+Created on Sun 18Oct26. Version history:
+----------------------------------------
+ 1.0: 18Oct26: First implementation
+ 1.1: 18Oct26: getTable builds again when progress data is set through
+               the set methods or cleared (Progress._Revision)
+
+@author: kennethlong
+"""
+
+import numpy  as np
+import pandas as pnds
+
+import Progress    as Prg
+import Task        as Tsk
+import WorkPackage as wp
+import Project     as Prj
+
+class ProgressTable:
+    __Debug  = False
+    _Columns = ("Date", "Planned value (£k)", "Earned value (£k)", \
+                "Spend (£k)", "Schedule variance (£k)", \
+                "Cost variance (£k)", "Budget variance variance (£k)", \
+                "Schedule performance index", "Cost performance index")
+    _Table   = None
+    _Source  = None
+
+#--------  "Built-in methods":
+    def __init__(self, _Progress=None):
+        Progress = Prg.Progress.instances
+        if _Progress is not None:
+            Progress = list(_Progress)
+        nPrg = len(Progress)
+
+        #.. Entities in order of first appearance:
+        self._Entities  = []
+        self._EntityIdx = {}
+        Entity = np.zeros(nPrg, dtype=int)
+        for iPrg, Inst in enumerate(Progress):
+            iEnt = Inst._PrjWPorTsk
+            if not iEnt in self._EntityIdx:
+                self._EntityIdx[iEnt] = len(self._Entities)
+                self._Entities.append(iEnt)
+            Entity[iPrg] = self._EntityIdx[iEnt]
+
+        #.. Columns; rows sorted by entity and date:
+        Date   = np.array([Inst._Date for Inst in Progress], \
+                          dtype="datetime64[us]")
+        Values = np.array([[Inst._PlannedFractionComplete, \
+                            Inst._PlannedValue, \
+                            Inst._FractionComplete, \
+                            Inst.getEarnedValue(), \
+                            Inst._Spend] for Inst in Progress], \
+                          dtype=float).reshape(nPrg, 5)
+        Order  = np.lexsort((Date, Entity))
+        self._Entity = Entity[Order]
+        self._Date   = Date[Order]
+        self._PFC, self._PV, self._FC, self._EV, self._Spend = \
+            [np.ascontiguousarray(Col) for Col in Values[Order].T]
+        self._Start  = np.searchsorted(self._Entity, \
+                                       np.arange(len(self._Entities) + 1))
+
+        self.setIndicators()
+        if self.__Debug:
+            print(self)
+
+    def __repr__(self):
+        return "ProgressTable(Progress)"
+
+    def __str__(self):
+        print(" ProgressTable:")
+        print("     Entities:", len(self._Entities), "; rows:", \
+              len(self._Entity))
+        return "     <---- Done."
+
+
+#--------  Get methods:
+    @classmethod
+    def getTable(cls):
+        Source = (Prg.Progress.getRevision(), \
+                  Prg.Progress.instances, len(Prg.Progress.instances), \
+                  Prg.EarnedValue.instances, len(Prg.EarnedValue.instances))
+        if cls._Table == None or cls._Source[0] != Source[0] or \
+           cls._Source[1] is not Source[1] or \
+           cls._Source[3] is not Source[3] or \
+           cls._Source[2::2] != Source[2::2]:
+            cls._Table  = ProgressTable()
+            cls._Source = Source
+        return cls._Table
+
+    @classmethod
+    def getTitle(cls, _Entity):
+        Title = ""
+        if isinstance(_Entity, Prj.Project):
+            Title = "Project: " + _Entity._Name
+        elif isinstance(_Entity, wp.WorkPackage):
+            Title = "Work package: " + _Entity._Name
+        elif isinstance(_Entity, Tsk.Task):
+            Title  = "Work package: " + _Entity._WorkPackage._Name
+            Title += "; Task: " + _Entity._Name
+        return Title
+
+    def getRows(self, _Entity):
+        iEnt = self._EntityIdx.get(_Entity)
+        if iEnt == None:
+            return slice(0, 0)
+        return slice(self._Start[iEnt], self._Start[iEnt+1])
+
+    def getLines(self, _Entity):
+        Rows  = self.getRows(_Entity)
+        Dates = np.datetime_as_string(self._Date[Rows], unit="D").tolist()
+        Cols  = [Col[Rows].tolist() for Col in \
+                 (self._PV, self._EV, self._SpendPI, self._SV, self._CV, \
+                  self._BV, self._SPI, self._CPI)]
+        return [[_Entity._Name, Dt] + list(Vals) \
+                for Dt, *Vals in zip(Dates, *Cols)]
+
+
+#--------  Processing methods:
+    def setIndicators(self):
+        self._SpendPI = np.where(self._Spend == 0., 1.E-6, self._Spend)
+        Known = np.logical_not(np.isnan(self._EV))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._SV  = np.where(Known, self._EV - self._PV, 0.)
+            self._CV  = np.where(Known, self._EV - self._SpendPI, 0.)
+            self._BV  = np.where(Known, self._SpendPI - self._PV, 0.)
+            self._SPI = np.where(Known, self._PV / self._EV, 1.)
+            self._CPI = np.where(Known, self._EV / self._SpendPI, 1.)
+
+    def createPandasDataFrame(self, _Entity):
+        DataFrame = pnds.DataFrame(self.getLines(_Entity), \
+                                   columns=[self.getTitle(_Entity)] + \
+                                           list(self._Columns))
+        if self.__Debug:
+            print(" ProgressTable; createPandasDataFrame: \n", DataFrame)
+        return DataFrame
+
+    def Plot(self, _Entity, _PlotPath=None, _FileName=None, \
+             landscape=False):
+        Prg.Progress.Plot(self.createPandasDataFrame(_Entity), \
+                          _PlotPath, _FileName, landscape)
@@ -12,6 +12,9 @@ Class Project:
   -----------------
   __Debug  : Boolean: set for debug print out
   instances: List of instances of Project class
+  _Index   : Dictionary of instances keyed by project name.  Each entry is
+             a list so that duplicates are recorded as the instance is 
+             created.
 
   Instance attributes:
   --------------------
@@ -42,6 +45,17 @@ Class Project:
    -InflationTotal      = Inflation total
    _WorkingMarginTotal  = WM by year
    _ContingencyTotal    = Contingency by year
+   _StaffCostByQtr, _CGStaffCostByQtr, _EquipmentCostByQtr,
+   _OtherNonStaffCostByQtr, _TrvlCnsmCostByQtr, _InflationByQtr,
+   _WorkingMarginByQtr, _ContingencyByQtr
+                        = As the by-year attributes, by quarter; four
+                          entries per FY.  None unless doQuarterlyCosting
+                          has been run.
+   _TotalCostByQtr      = Total project cost by quarter
+   _TotalValue          = Planned total value (£k); staff plus equipment
+                          cost summed over years.  Evaluated on first call
+                          of getTotalValue; reset when the staff or
+                          equipment total is set.
 
     
   Methods:
@@ -64,8 +78,17 @@ Class Project:
   Get/set methods:
       getInstance           : Finds instance of class with Project._Name
                  Input: _Name -- str -- name of Project to be found
-                Return: Instance of class; None if not found or if more than
-                        one instance
+                Return: Instance of class; None if not found.  Raises
+                        DuplicateProjectClassInstance if more than one 
+                        instance.  Uses _Index.
+                              [Classmethod]
+
+      addToIndex            : Add instance to _Index; called on 
+                              instanciation.
+                              [Classmethod]
+
+      buildIndex            : Rebuild _Index from instances; called from
+                              clean and clear.
                               [Classmethod]
 
       setStaffCostByYear    : Set staff cost by FY:
@@ -83,6 +106,9 @@ Class Project:
 
       setTotalEquipmentCost : Set total equipment cost -- sums cost per year
 
+      getTotalValue         : Return planned total value (£k); set on first
+                              call after costing
+
       setEOtherNonStaffCostByYear: Set equipment cost per year:
                  Input: numpy array containing cost in £k
 
@@ -108,7 +134,13 @@ Class Project:
             [Classmethod]
 
       doCosting: Sums data from Workpackages related to Project instance
-                 and completes Project costing
+                 and completes Project costing.  Sums are formed by the
+                 Aggregation engine.
+                 [Classmethod]
+
+      doQuarterlyCosting: Sums the quarterly costing of the work packages
+                 (see WorkPackage.doQuarterlyCosting) through the
+                 Aggregation engine.
                  [Classmethod]
 
   Exceptions:
@@ -120,6 +152,11 @@ Class Project:
 Created on Wed 19Jun21. Version history:
 ----------------------------------------
  1.0: 19Jun21: First implementation
+ 1.1: 18Oct26: Dictionary index for getInstance
+ 1.2: 18Oct26: doCosting rolls up work packages through Aggregation
+ 1.3: 18Oct26: Totals by year formed without per-year loops
+ 1.4: 18Oct26: Quarterly costing
+ 1.5: 18Oct26: Planned total value cached (_TotalValue)
 
 
 @author: kennethlong
@@ -129,10 +166,12 @@ import numpy  as np
 import pandas as pnds
 
 import WorkPackage as WP
+import Aggregation as Agg
 
 class Project:
     __Debug   = False
     instances = []
+    _Index    = {}
 
 #--------  "Built-in methods":
     def __init__(self, _ProjectName="None"):
@@ -162,8 +201,20 @@ class Project:
         self._InflationTotal      = None
         self._WorkingMarginTotal  = None
         self._ContingencyTotal    = None
+
+        self._StaffCostByQtr      = None
+        self._CGStaffCostByQtr    = None
+        self._EquipmentCostByQtr  = None
+        self._OtherNonStaffCostByQtr = None
+        self._TrvlCnsmCostByQtr   = None
+        self._InflationByQtr      = None
+        self._WorkingMarginByQtr  = None
+        self._ContingencyByQtr    = None
+        self._TotalCostByQtr      = None
+        self._TotalValue          = None
         
         Project.instances.append(self)
+        Project.addToIndex(self)
 
     def __repr__(self):
         return "Project(Name)"
@@ -215,6 +266,7 @@ class Project:
 
     def setTotalStaffCost(self):
         self._TotalStaffCost = np.sum(self._StaffCostByYear)
+        self._TotalValue     = None
         
     def setTotalCGStaffCost(self):
         self._TotalCGStaffCost = np.sum(self._CGStaffCostByYear)
@@ -224,6 +276,7 @@ class Project:
 
     def setTotalEquipmentCost(self):
         self._TotalEquipmentCost = np.sum(self._EquipmentCostByYear)
+        self._TotalValue         = None
 
     def setOtherNonStaffCostByYear(self, _OtherNonStaffCostByYear):
         self._OtherNonStaffCostByYear = _OtherNonStaffCostByYear
@@ -256,9 +309,7 @@ class Project:
         self._ContingencyTotal = np.sum(self._ContingencyByYear)
 
     def getTotalProjectCostByYear(self):
-        TotByYr = np.array([])
-        for iYr in range(len(self._FinancialYears)):
-            TotByYr = np.append(TotByYr, 0.)
+        TotByYr = np.zeros(len(self._FinancialYears))
         if isinstance(self._StaffCostByYear, np.ndarray):
             TotByYr += self._StaffCostByYear
         if isinstance(self._EquipmentCostByYear, np.ndarray):
@@ -277,39 +328,29 @@ class Project:
         return  TotByYr
     
     def getTotalProjectCost(self):
-        CstTotByYr = np.array([])
-        for iYr in range(len(self._FinancialYears)):
-            CstTotByYr = np.append(CstTotByYr, 0.)
-        Total = 0.
-
         CstTotByYr = self.getTotalProjectCostByYear()
         Total      = np.sum(CstTotByYr)
 
         return Total
 
     def getTotalValue(self):
-        TotByYr = np.array([])
-        for iYr in range(len(self._FinancialYears)):
-            TotByYr = np.append(TotByYr, 0.)
+        if self._TotalValue is not None:
+            return self._TotalValue
+        TotByYr = np.zeros(len(self._FinancialYears))
         if isinstance(self._StaffCostByYear, np.ndarray):
             TotByYr += self._StaffCostByYear
         if isinstance(self._EquipmentCostByYear, np.ndarray):
             TotByYr += self._EquipmentCostByYear
 
-        TotVal = np.sum(TotByYr)
+        self._TotalValue = np.sum(TotByYr)
 
-        return  TotVal
+        return  self._TotalValue
     
     @classmethod
     def getInstance(cls, _Name):
-        InstList = []
         if Project.__Debug:
             print(" Project; getInstance: search for project name:", _Name)
-        for inst in cls.instances:
-            if Project.__Debug:
-                print(" Project; getInstance: instance:", inst._Name)
-            if inst._Name == _Name:
-                InstList.append(inst)
+        InstList = cls._Index.get(_Name, [])
         Ninst = len(InstList)
         if Ninst == 0:
             RtnInst = None
@@ -323,6 +364,22 @@ class Project:
                   "return instance:", Ninst, "\n ", RtnInst)
         return RtnInst
 
+    @classmethod
+    def addToIndex(cls, _Inst):
+        if _Inst._Name in cls._Index:
+            cls._Index[_Inst._Name].append(_Inst)
+            if Project.__Debug:
+                print(" Project; addToIndex: duplicate instance for:", \
+                      _Inst._Name)
+        else:
+            cls._Index[_Inst._Name] = [_Inst]
+
+    @classmethod
+    def buildIndex(cls):
+        cls._Index = {}
+        for iInst in cls.instances:
+            cls.addToIndex(iInst)
+
         
 #--------  Processing methods
     @classmethod
@@ -396,6 +453,7 @@ class Project:
             else:
                 NewInst.append(iPrj)
         cls.instances = NewInst
+        cls.buildIndex()
         return nDel
 
     @classmethod
@@ -407,59 +465,57 @@ class Project:
             del iPrj
             nDel += 1
         cls.instances = NewInst
+        cls.buildIndex()
         return nDel
 
     @classmethod
     def doCosting(cls):
+        _FinancialYears = []
+        for iWP in WP.WorkPackage.instances:
+            if len(_FinancialYears) == 0:
+                _FinancialYears = iWP._FinancialYears
+            elif _FinancialYears != iWP._FinancialYears:
+                print(" Inconsistent financial years: WP:", \
+                      iWP._Name, iWP._FinancialYears, \
+                      len(iWP._FinancialYears))
+                raise InconsistentFinancialYears
+
+        #.. Leaves; all work packages summed into a single group:
+        Leaves  = {}
+        Lengths = []
+        for Attr in ("_StaffCostByYear", "_CGStaffCostByYear", \
+                     "_EquipmentCostByYear", "_OtherNonStaffCostByYear", \
+                     "_TrvlCnsmCostByYear", "_InflationByYr", \
+                     "_WorkingMarginByYear"):
+            Vectors = [getattr(iWP, Attr) \
+                       for iWP in WP.WorkPackage.instances]
+            Leaves[Attr] = Agg.Aggregation.stack(Vectors)
+            Lengths.append(Leaves[Attr][1])
+        Vectors = []
+        for iWP in WP.WorkPackage.instances:
+            Vectors.append(iWP._ContingencyByYear[0])
+            Vectors.append(iWP._ContingencyByYear[1])
+        Leaves["_ContingencyByYear"] = Agg.Aggregation.stack(Vectors)
+        Lengths.append(Leaves["_ContingencyByYear"][1])
+        Lengths = np.concatenate(Lengths)
+        GrpLen  = Agg.Aggregation.groupLength(Lengths, \
+                                    np.zeros(len(Lengths), dtype=int), 1)
+        Sums = {}
+        for Attr in Leaves:
+            Groups     = np.zeros(len(Leaves[Attr][1]), dtype=int)
+            Sums[Attr] = Agg.Aggregation.rollUp(Leaves[Attr][0], Groups, \
+                                                1, GrpLen)[0]
+
         for iPrj in cls.instances:
-            _FinancialYears          = []
-            _StaffCostByYear         = np.array([])
-            _CGStaffCostByYear       = np.array([])
-            _EquipmentCostByYear     = np.array([])
-            _OtherNonStaffCostByYear = np.array([])
-            _TrvlCnsmCostByYear      = np.array([])
-            _InflationByYear         = np.array([])
-            _WorkingMarginByYear     = np.array([])
-            _ContingencyByYear       = np.array([])
-            SumInitialised = False
-            for iWP in WP.WorkPackage.instances:
-                if len(_FinancialYears) == 0:
-                    _FinancialYears = iWP._FinancialYears
-                elif _FinancialYears != iWP._FinancialYears:
-                    print(" Inconsistent financial years: WP:", \
-                          iWP._Name, iWP._FinancialYears, \
-                          len(iWP._FinancialYears))
-                    raise InconsistentFinancialYears
-                
-                for iYr in range(len(iWP._StaffCostByYear)):
-                    if not SumInitialised:
-                        _StaffCostByYear     = \
-                            np.append(_StaffCostByYear,     [0.])
-                        _CGStaffCostByYear   = \
-                            np.append(_CGStaffCostByYear,   [0.])
-                        _EquipmentCostByYear = \
-                            np.append(_EquipmentCostByYear, [0.])
-                        _OtherNonStaffCostByYear = \
-                            np.append(_OtherNonStaffCostByYear, [0.])
-                        _TrvlCnsmCostByYear  = \
-                            np.append(_TrvlCnsmCostByYear,  [0.])
-                        _InflationByYear  = \
-                            np.append(_InflationByYear,  [0.])
-                        _WorkingMarginByYear  = \
-                            np.append(_WorkingMarginByYear,  [0.])
-                        _ContingencyByYear  = \
-                            np.append(_ContingencyByYear,  [0.])
-                SumInitialised     = True
-
-                _StaffCostByYear         += iWP._StaffCostByYear
-                _CGStaffCostByYear       += iWP._CGStaffCostByYear
-                _EquipmentCostByYear     += iWP._EquipmentCostByYear
-                _OtherNonStaffCostByYear += iWP._OtherNonStaffCostByYear
-                _TrvlCnsmCostByYear      += iWP._TrvlCnsmCostByYear
-                _InflationByYear         += iWP._InflationByYr
-                _WorkingMarginByYear     += iWP._WorkingMarginByYear
-                _ContingencyByYear       += iWP._ContingencyByYear[0]
-                _ContingencyByYear       += iWP._ContingencyByYear[1]
+            _StaffCostByYear         = Sums["_StaffCostByYear"].copy()
+            _CGStaffCostByYear       = Sums["_CGStaffCostByYear"].copy()
+            _EquipmentCostByYear     = Sums["_EquipmentCostByYear"].copy()
+            _OtherNonStaffCostByYear = \
+                Sums["_OtherNonStaffCostByYear"].copy()
+            _TrvlCnsmCostByYear      = Sums["_TrvlCnsmCostByYear"].copy()
+            _InflationByYear         = Sums["_InflationByYr"].copy()
+            _WorkingMarginByYear     = Sums["_WorkingMarginByYear"].copy()
+            _ContingencyByYear       = Sums["_ContingencyByYear"].copy()
                 
             iPrj._StaffCostByYear = _StaffCostByYear
             iPrj.setTotalStaffCost()
@@ -478,6 +534,36 @@ class Project:
             iPrj._ContingencyByYear = _ContingencyByYear
             iPrj.setContingencyTotal()
 
+    @classmethod
+    def doQuarterlyCosting(cls):
+        #.. Leaves; all work packages summed into a single group:
+        Leaves  = {}
+        Lengths = []
+        for Attr in ("_StaffCostByQtr", "_CGStaffCostByQtr", \
+                     "_EquipmentCostByQtr", "_OtherNonStaffCostByQtr", \
+                     "_TrvlCnsmCostByQtr", "_InflationByQtr", \
+                     "_WorkingMarginByQtr", "_TotalCostByQtr"):
+            Vectors = [getattr(iWP, Attr) \
+                       for iWP in WP.WorkPackage.instances]
+            Leaves[Attr] = Agg.Aggregation.stack(Vectors)
+            Lengths.append(Leaves[Attr][1])
+        Vectors = []
+        for iWP in WP.WorkPackage.instances:
+            Vectors.append(iWP._ContingencyByQtr[0])
+            Vectors.append(iWP._ContingencyByQtr[1])
+        Leaves["_ContingencyByQtr"] = Agg.Aggregation.stack(Vectors)
+        Lengths.append(Leaves["_ContingencyByQtr"][1])
+        Lengths = np.concatenate(Lengths)
+        GrpLen  = Agg.Aggregation.groupLength(Lengths, \
+                                    np.zeros(len(Lengths), dtype=int), 1)
+
+        for iPrj in cls.instances:
+            for Attr in Leaves:
+                Groups = np.zeros(len(Leaves[Attr][1]), dtype=int)
+                setattr(iPrj, Attr, \
+                        Agg.Aggregation.rollUp(Leaves[Attr][0], Groups, \
+                                               1, GrpLen)[0])
+
 
 #--------  Exceptions:
 class DuplicateProjectClassInstance(Exception):
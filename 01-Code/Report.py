@@ -55,11 +55,22 @@ Class Report:
   WorkPackageInstanceInvalid: Instance of w/p for which report requested is 
                               invalid
 
+        NoQuarterlyCosting: Quarterly costing not done for cash flow report
+
 
 Created on Wed 19Jun21. Version history:
 ----------------------------------------
  1.0: 02Jul21: First implementation
  1.1: 20Jun22: Fix reporting of total CG contingency.
+ 1.2: 18Oct26: Use work package -> task -> task staff/equipment adjacency
+               indices rather than scanning all instances.
+ 1.3: 18Oct26: Sensitivity (tornado) report.
+ 1.4: 18Oct26: Quarterly cash flow report.
+ 1.5: 18Oct26: Staff over-allocation report.
+ 1.6: 18Oct26: Overview sums staff effort by (work package, institute)
+               code; institutes grouped by institute index.
+ 1.7: 18Oct26: Progress report lines taken from the columnar progress
+               table (ProgressTable).
 
 @author: kennethlong
 """
@@ -72,6 +83,7 @@ from operator import itemgetter, attrgetter
 import pandas as pnds
 import numpy  as np
 
+import Aggregation   as Agg
 import Control       as Cntrl
 
 import Task          as Tsk
@@ -82,6 +94,11 @@ import Project       as Prj
 import Staff         as Stf
 import OtherNonStaff as ONS
 import Progress      as Prg
+import ProgressTable as PrgTbl
+import CostOperator  as CstOp
+import ScenarioSweep as ScnSwp
+
+import matplotlib.pyplot as plt
 
 iCntrl = Cntrl.Control()
 
@@ -246,6 +263,38 @@ class Overview(Report):
             FrcTot = np.append(FrcTot, 0.)
             CstTot = np.append(CstTot, 0.)
 
+        """
+           Sum task staff by (work package, institute) code; rows are
+           taken in task order so that the sums are built up in the same
+           order as a loop over tasks:
+        """
+        TS      = TskStf.TaskStaff
+        nYr     = len(_PrjInst._FinancialYears)
+        nInst   = len(Stf.Staff.institutes)
+        WPPos   = {iWP: iPos for iPos, iWP in \
+                   enumerate(wp.WorkPackage.instances)}
+        TskPos  = {iTsk: iPos for iPos, iTsk in \
+                   enumerate(Tsk.Task.instances)}
+        Rows    = TS.getRows()
+        TskGrp  = np.array([TskPos.get(iTsk, -1) for iTsk in TS._TaskKeys], \
+                           dtype=int)[TS._TaskIdx[Rows]]
+        Rows    = Rows[np.argsort(TskGrp, kind="stable")]
+        WPGrp   = np.array([WPPos.get(iWP, -1) for iWP in TS._WPKeys], \
+                           dtype=int)[TS._WPIdx[Rows]]
+        InstGrp = TS._InstIdx[Rows]
+        Groups  = np.where(np.logical_and(WPGrp >= 0, InstGrp >= 0), \
+                           WPGrp * nInst + InstGrp, -1)
+        nCol    = min(nYr, TS._FracByYr.shape[1])
+        FrcVal  = np.zeros((len(Rows), nYr))
+        CstVal  = np.zeros((len(Rows), nYr))
+        FrcVal[:, :nCol] = TS._FracByYr[Rows, :nCol]
+        CstVal[:, :nCol] = np.where(TS._Filled[Rows, TS._COST][:, None], \
+                                    TS._CostByYr[Rows, :nCol], 0.)
+        FrcByWPInst = Agg.Aggregation.groupSum(FrcVal, Groups, \
+                                               len(WPPos) * nInst)
+        CstByWPInst = Agg.Aggregation.groupSum(CstVal, Groups, \
+                                               len(WPPos) * nInst)
+
         """
            Loop over work packages:
         """
@@ -264,31 +313,9 @@ class Overview(Report):
             """
                Loop over institutes contributing staff:
             """
-            for InstCode in Stf.Staff.institutes:
-                Frc = np.array([])
-                Cst = np.array([])
-                for iYr in range(len(_PrjInst._FinancialYears)):
-                    Frc = np.append(Frc, 0.)
-                    Cst = np.append(Cst, 0.)
-
-                """
-                   Loop over task staff instances:
-                """
-                for iTskStf in TskStf.TaskStaff.instances:
-                    if iTskStf._Task._WorkPackage == iWP and \
-                       iTskStf._Staff._InstituteCode == InstCode:
-                        if Overview.__Debug:
-                            print("           ----> Institute: Staff code", \
-                                  InstCode, iTskStf._Staff.getStaffCode())
-                            print("                 Fraction by year:", \
-                                  iTskStf._StaffFracByYear)
-                            print("                 Cost by year    :", \
-                                  iTskStf._StaffCostByYear)
-                        Frc    += iTskStf._StaffFracByYear
-                        if isinstance(iTskStf._StaffCostByYear, \
-                                      np.ndarray):
-                            if iTskStf._StaffCostByYear.all() != None:
-                                Cst    += iTskStf._StaffCostByYear
+            for iInst, InstCode in enumerate(Stf.Staff.institutes):
+                Frc = FrcByWPInst[WPPos[iWP] * nInst + iInst]
+                Cst = CstByWPInst[WPPos[iWP] * nInst + iInst]
 
                 if Overview.__Debug and Frc.size != 0:
                     print("                 WP/institute totals:")
@@ -599,6 +626,7 @@ class StaffEffortSummary(Report):
            --------> Process staff list:
         """
         InstCode   = None
+        InstIdx    = None
         FrcTot     = np.array([])
         CstTot     = np.array([])
         for iStf in SortedStaffList:
@@ -608,10 +636,7 @@ class StaffEffortSummary(Report):
                 print("           Present institute code: ", InstCode)
 
             #----> Check staff member used in project:
-            nTsks = 0
-            for iTskStf in TskStf.TaskStaff.instances:
-                if iTskStf._Staff == iStf:
-                    nTsks += 1
+            nTsks = len(TskStf.TaskStaff.getForStaff(iStf))
             if nTsks == 0:
                 if StaffEffortSummary.__Debug:
                     print(" No tasks for staff member (skip):", iStf)
@@ -620,7 +645,7 @@ class StaffEffortSummary(Report):
             Line = []
 
             #----> Institute:
-            if InstCode != iStf._InstituteCode:
+            if InstIdx != iStf._InstIdx:
                 if len(FrcTot) != 0:
                     Line.append("Total")
                     for iYr in range(len(_PrjInst._FinancialYears)):
@@ -648,6 +673,7 @@ class StaffEffortSummary(Report):
                     FrcTot = np.append(FrcTot, 0.)
                     CstTot = np.append(CstTot, 0.)
                     
+                InstIdx  = iStf._InstIdx
                 InstCode = iStf._InstituteCode
                 Line.append(InstCode)
                 self._Lines.append(Line)
@@ -670,20 +696,19 @@ class StaffEffortSummary(Report):
             for iYr in range(len(_PrjInst._FinancialYears)):
                 Frc = np.append(Frc, 0.)
                 Cst = np.append(Cst, 0.)
-            for iTskStf in TskStf.TaskStaff.instances:
-                if iTskStf._Staff == iStf:
-                    if StaffEffortSummary.__Debug:
-                        print("             ----> Task matched! \n", \
+            for iTskStf in TskStf.TaskStaff.getForStaff(iStf):
+                if StaffEffortSummary.__Debug:
+                    print("             ----> Task matched! \n", \
                 "                       Task:", iTskStf._Task._Name, \
-                              " - staff code:", iStf._StaffCode)
-                    if iTsk != iTskStf._Task:
-                        if wpName != iTskStf._Task._WorkPackage._Name:
-                            wpName = iTskStf._Task._WorkPackage._Name
-                            wpList += wpName + " "
-                    if isinstance(iTskStf._StaffFracByYear, np.ndarray):
-                        Frc += iTskStf._StaffFracByYear
-                    if isinstance(iTskStf._StaffCostByYear, np.ndarray):
-                        Cst += iTskStf._StaffCostByYear
+                          " - staff code:", iStf._StaffCode)
+                if iTsk != iTskStf._Task:
+                    if wpName != iTskStf._Task._WorkPackage._Name:
+                        wpName = iTskStf._Task._WorkPackage._Name
+                        wpList += wpName + " "
+                if isinstance(iTskStf._StaffFracByYear, np.ndarray):
+                    Frc += iTskStf._StaffFracByYear
+                if isinstance(iTskStf._StaffCostByYear, np.ndarray):
+                    Cst += iTskStf._StaffCostByYear
             Line.append(wpList)
             for iYr in range(len(_PrjInst._FinancialYears)):
                 Line.append(Frc[iYr])
@@ -788,11 +813,10 @@ class WorkPackageSummary(Report):
         Line = self.StaffHeader(_wpInst)
         self._Lines.append(Line)
 
-        for iTsk in Tsk.Task.instances:
-            if iTsk._WorkPackage == _wpInst:
-                Lines = self.TaskStaffLines(_wpInst, iTsk)
-                for Line in Lines:
-                    self._Lines.append(Line)
+        for iTsk in Tsk.Task.getForWorkPackage(_wpInst):
+            Lines = self.TaskStaffLines(_wpInst, iTsk)
+            for Line in Lines:
+                self._Lines.append(Line)
 
         Line = self.RiskMitigationStaff(_wpInst)
         self._Lines.append(Line)
@@ -805,11 +829,10 @@ class WorkPackageSummary(Report):
         Line = self.EquipmentHeader(_wpInst)
         self._Lines.append(Line)
         
-        for iTsk in Tsk.Task.instances:
-            if iTsk._WorkPackage == _wpInst:
-                Lines = self.TaskEquipmentLines(_wpInst, iTsk)
-                for Line in Lines:
-                    self._Lines.append(Line)
+        for iTsk in Tsk.Task.getForWorkPackage(_wpInst):
+            Lines = self.TaskEquipmentLines(_wpInst, iTsk)
+            for Line in Lines:
+                self._Lines.append(Line)
 
         Line = self.EquipmentTotal(_wpInst)
         self._Lines.append(Line)
@@ -817,11 +840,10 @@ class WorkPackageSummary(Report):
         Line = self.Inflation(_wpInst)
         self._Lines.append(Line)
 
-        for iONS in ONS.OtherNonStaff.instances:
-            if iONS._WPInst == _wpInst:
-                Line = self.OtherNonStaffLines(_wpInst, iONS)
-                self._Lines.append(Line)
-                
+        for iONS in ONS.OtherNonStaff.getForWorkPackage(_wpInst):
+            Line = self.OtherNonStaffLines(_wpInst, iONS)
+            self._Lines.append(Line)
+            
         Line = self.Consumables(_wpInst)
         self._Lines.append(Line)
         
@@ -1013,17 +1035,16 @@ class WorkPackageSummary(Report):
         InstEqp = ""
         Line = []
         InstEqp = None
-        for iTskEqp in TskEqp.TaskEquipment.instances:
+        for iTskEqp in TskEqp.TaskEquipment.getForTask(_Tsk):
             Line = []
-            if iTskEqp._Task == _Tsk:
-                iEqp = iTskEqp._Equipment
-                Line.append(iEqp._Name)
-                for iYr in range(len(_wpInst._FinancialYears)):
-                    Line.append(None)
-                    Line.append(iEqp._EquipmentCostByYear[iYr])
+            iEqp = iTskEqp._Equipment
+            Line.append(iEqp._Name)
+            for iYr in range(len(_wpInst._FinancialYears)):
                 Line.append(None)
-                Line.append(iEqp._TotalEquipmentCost)
-                Lines.append(copy.deepcopy(Line))
+                Line.append(iEqp._EquipmentCostByYear[iYr])
+            Line.append(None)
+            Line.append(iEqp._TotalEquipmentCost)
+            Lines.append(copy.deepcopy(Line))
         return Lines
         
     def OtherNonStaffLines(self, _wpInst, _iONS):
@@ -1084,31 +1105,30 @@ class WorkPackageSummary(Report):
         InstCd = ""
         Line = []
         InstCd = None
-        for iTskStf in TskStf.TaskStaff.instances:
+        for iTskStf in TskStf.TaskStaff.getForTask(_Tsk):
             Line = []
-            if iTskStf._Task == _Tsk:
-                iStf = iTskStf._Staff
-                if InstCd != iStf._InstituteCode:
-                    InstCd = iStf._InstituteCode
-                    Line.append(iStf._InstituteCode)
-                    for iYr in range(len(_wpInst._FinancialYears)+1):
-                        for i in range(2):
-                            Line.append(None)
-                    Lines.append(copy.deepcopy(Line))
-                    Line = []
-                Line.append(iStf._StaffCode)
-                for iYr in range(len(_wpInst._FinancialYears)):
-                    Line.append(round(iTskStf._StaffFracByYear[iYr], 2))
-                    if isinstance(iTskStf._StaffCostByYear, np.ndarray):
-                        Line.append(round(iTskStf._StaffCostByYear[iYr], 2))
-                    else:
+            iStf = iTskStf._Staff
+            if InstCd != iStf._InstIdx:
+                InstCd = iStf._InstIdx
+                Line.append(iStf._InstituteCode)
+                for iYr in range(len(_wpInst._FinancialYears)+1):
+                    for i in range(2):
                         Line.append(None)
-                Line.append(round(iTskStf._TotalStaffFrac, 2))
-                if iTskStf._TotalStaffCost != None:
-                    Line.append(round(iTskStf._TotalStaffCost, 2))
+                Lines.append(copy.deepcopy(Line))
+                Line = []
+            Line.append(iStf._StaffCode)
+            for iYr in range(len(_wpInst._FinancialYears)):
+                Line.append(round(iTskStf._StaffFracByYear[iYr], 2))
+                if isinstance(iTskStf._StaffCostByYear, np.ndarray):
+                    Line.append(round(iTskStf._StaffCostByYear[iYr], 2))
                 else:
                     Line.append(None)
-                Lines.append(copy.deepcopy(Line))
+            Line.append(round(iTskStf._TotalStaffFrac, 2))
+            if iTskStf._TotalStaffCost != None:
+                Line.append(round(iTskStf._TotalStaffCost, 2))
+            else:
+                Line.append(None)
+            Lines.append(copy.deepcopy(Line))
         return Lines
         
     def YearHeader(self, _wpInst):
@@ -1141,28 +1161,12 @@ class Progress(Report):
            isinstance(_ChunkInst, wp.WorkPackage) or \
            isinstance(_ChunkInst, Prj.Project):
 
-            Name4Report = ""
+            Name4Report = PrgTbl.ProgressTable.getTitle(_ChunkInst)
 
-            if isinstance(_ChunkInst, Prj.Project):
-                Name4Report = "Project: " + _ChunkInst._Name
-            elif isinstance(_ChunkInst, wp.WorkPackage):
-                Name4Report = "Work package: " + _ChunkInst._Name
-            elif isinstance(_ChunkInst, Tsk.Task):
-                Name4Report  = "Work package: " + _ChunkInst._WorkPackage._Name
-                Name4Report += "; Task: " + _ChunkInst._Name
-                
             Report.__init__(self, "Progress report", _ReportPath, _FileName)
 
             self._Header.append(Name4Report)
-            self._Header.append("Date")
-            self._Header.append("Planned value (£k)")
-            self._Header.append("Earned value (£k)")
-            self._Header.append("Spend (£k)")
-            self._Header.append("Schedule variance (£k)")
-            self._Header.append("Cost variance (£k)")
-            self._Header.append("Budget variance variance (£k)")
-            self._Header.append("Schedule performance index")
-            self._Header.append("Cost performance index")
+            self._Header.extend(PrgTbl.ProgressTable._Columns)
             RptDt = date.today()
             self._Header.append(RptDt.strftime("%d-%b-%Y"))
 
@@ -1195,54 +1199,263 @@ class Progress(Report):
             print(" Progress(Report).Report start; for:", \
                   _ChunkInst.getName(), type(_ChunkInst))
             
-        SortedPrgRprt = sorted(Prg.Progress.instances, \
-                          key=attrgetter('_PrjWPorTsk._Name', '_Date'), \
-                                 )
-        Line  = []
-        Lines = []
-        for iPrg in SortedPrgRprt:
-            AddLine = False
-            if iPrg.getPrjWPorTsk() == _ChunkInst:
-                    AddLine = True
-                    if self.getDebug():
-                        print("     ----> Progress instance:", \
-                              iPrg.getPrjWPorTsk().getName(), \
-                              " to be added.")
-
-            if AddLine:
-                PV   = iPrg._PlannedValue
-                EV   = iPrg.getEarnedValue()
-                Spnd = iPrg._Spend
-                if Spnd == 0.:
-                    Spnd = 1.E-6
-                SV  = 0.
-                CV  = 0.
-                BV  = 0.
-                SPI = 1.
-                CPI = 1.
-                if np.isnan(EV) == False:
-                    SV   = EV - PV
-                    CV   = EV - Spnd
-                    BV   = Spnd - PV
-                    SPI  = PV/EV
-                    CPI  = EV/Spnd
-
-                Line.append(iPrg._PrjWPorTsk._Name)
-                Line.append(str(iPrg._Date)[:10])
-                Line.append(PV)
-                Line.append(EV)
-                Line.append(Spnd)
-                Line.append(SV)
-                Line.append(CV)
-                Line.append(BV)
-                Line.append(SPI)
-                Line.append(CPI)
-            
-                Lines.append(Line)
-                Line = []
-            #.. end of work package if check
+        Lines = PrgTbl.ProgressTable.getTable().getLines(_ChunkInst)
+        if Progress.__Debug:
+            print("     ----> Progress lines:", len(Lines))
+
+        return Lines
+    
+
+"""
+Class Sensitivity:  -------->  "Sensitivity" report; derived class  <--------
+==================
+
+  Sensitivity derived class ranks the inputs of the costing by their
+  effect on the grand total of the project (tornado analysis).  Each input
+  is perturbed, one at a time, down and up:
+    Staff annual cost  : by the fraction _Delta
+    TaskStaff fraction : by the fraction _Delta, all years
+    Equipment line     : by the fraction _Delta, all years
+    Control parameter  : rates and fractions by the fraction _Delta; start
+                         years by one year
+  The grand total is linear in the staff fractions, annual costs and
+  equipment costs, so their perturbations are taken in one pass from the
+  contributions of the inputs of the linear cost operator (CostOperator).
+  The control parameters are evaluated as one batch of scenarios
+  (ScenarioSweep).  Lines are sorted by decreasing swing.
+
+  asPlot writes a tornado plot of the inputs with the largest swing.
+
+"""
+class Sensitivity(Report):
+    __Debug   = False
+
+    def __init__(self, _ReportPath, _FileName, _PrjInst, _Delta=0.1):
+
+        if not isinstance(_PrjInst, Prj.Project):
+            raise ProjectInstanceInvalid( \
+                  ' Report.Sensitivity: no report possible for project.')
+
+        Report.__init__(self, "Sensitivity report: " + _PrjInst._Name, \
+                        _ReportPath, _FileName)
+
+        self._Delta  = _Delta
+        self._Total  = _PrjInst.getTotalProjectCost()
+        self._Header = ["Rank", "Input type", "Input", "Work package", \
+                        "Nominal", "Low", "High", "Total at low (£k)", \
+                        "Total at high (£k)", "Swing (£k)"]
+
+        Entries = self.Perturbations()
+        Entries = sorted(Entries, key=lambda Entry: \
+                         -abs(Entry[7] - Entry[6]))
+        self._Lines = []
+        for iRank, Entry in enumerate(Entries):
+            self._Lines.append([iRank+1] + list(Entry[:6]) + \
+                               [self._Total + Entry[6], \
+                                self._Total + Entry[7], \
+                                abs(Entry[7] - Entry[6])])
+
+    def Perturbations(self):
+        """
+        Return list of (input type, input, work package, nominal, low,
+        high, change of grand total at low, change at high).
+        """
+        Dlt     = self._Delta
+        TS      = TskStf.TaskStaff
+        iOp     = CstOp.CostOperator()
+        nYrs    = iOp._nYrs
+        Cntrb   = iOp.getGradient() * iOp.getInput()
+        RowCnt  = np.sum(Cntrb[iOp._Slices["TaskStaff"]].reshape(-1, nYrs), \
+                         axis=1)
+        EqpCnt  = np.sum(Cntrb[iOp._Slices["Equipment"]].reshape(-1, nYrs), \
+                         axis=1)
+        StfIdx  = TS._StaffIdx[iOp._Rows]
+        TskIdx  = TS._TaskIdx[iOp._Rows]
+        StfCnt  = np.bincount(StfIdx, weights=RowCnt, \
+                              minlength=len(TS._StaffKeys))
+
+        Entries = []
+        StfWPs  = {}
+        for iTsk, iStf in zip(TskIdx, StfIdx):
+            Code = TS._TaskKeys[iTsk]._WorkPackage._Code
+            if not Code in StfWPs.setdefault(iStf, []):
+                StfWPs[iStf].append(Code)
+        for iStf in StfWPs:
+            Stff = TS._StaffKeys[iStf]
+            Entries.append(("Staff annual cost", Stff._StaffCode, \
+                            "; ".join(StfWPs[iStf]), Stff._AnnualCost, \
+                            Stff._AnnualCost*(1.-Dlt), \
+                            Stff._AnnualCost*(1.+Dlt), \
+                            -Dlt*StfCnt[iStf], Dlt*StfCnt[iStf]))
+        for iPos, Row in enumerate(iOp._Rows):
+            iTsk = TS._TaskKeys[TskIdx[iPos]]
+            Frac = TS._TotalFrac[Row]
+            Entries.append(("TaskStaff fraction", iTsk._Name + " / " + \
+                            TS._StaffKeys[StfIdx[iPos]]._StaffCode, \
+                            iTsk._WorkPackage._Code, Frac, \
+                            Frac*(1.-Dlt), Frac*(1.+Dlt), \
+                            -Dlt*RowCnt[iPos], Dlt*RowCnt[iPos]))
+        for iPos, iEqp in enumerate(iOp._EqpKeys):
+            Codes = []
+            for iTskEqp in TskEqp.TaskEquipment.instances:
+                Code = iTskEqp._Task._WorkPackage._Code
+                if iTskEqp._Equipment == iEqp and not Code in Codes:
+                    Codes.append(Code)
+            Cost = np.sum(iEqp._EquipmentCostByYear)
+            Entries.append(("Equipment", iEqp._Name, "; ".join(Codes), \
+                            Cost, Cost*(1.-Dlt), Cost*(1.+Dlt), \
+                            -Dlt*EqpCnt[iPos], Dlt*EqpCnt[iPos]))
+
+        #.. Control parameters; nominal scenario followed by low and high
+        #   scenario of each parameter:
+        Nmnl   = ScnSwp.ScenarioSweep.getParameters()
+        Names  = ScnSwp.ScenarioSweep._Parameters
+        nScn   = 1 + 2*len(Names)
+        Params = {Name: np.full(nScn, float(Nmnl[Name])) for Name in Names}
+        for iPrm, Name in enumerate(Names):
+            if Name.endswith("StrtInYr"):
+                Low, High = max(Nmnl[Name] - 1, 0), Nmnl[Name] + 1
+            else:
+                Low, High = Nmnl[Name]*(1.-Dlt), Nmnl[Name]*(1.+Dlt)
+            Params[Name][1 + 2*iPrm] = Low
+            Params[Name][2 + 2*iPrm] = High
+        Result = ScnSwp.ScenarioSweep.sweep(Params)
+        Totals = np.sum(Result["ProjectTotalCostByYear"], axis=1)
+        for iPrm, Name in enumerate(Names):
+            Entries.append(("Control parameter", Name, "", Nmnl[Name], \
+                            Params[Name][1 + 2*iPrm], \
+                            Params[Name][2 + 2*iPrm], \
+                            Totals[1 + 2*iPrm] - Totals[0], \
+                            Totals[2 + 2*iPrm] - Totals[0]))
+
+        if Sensitivity.__Debug:
+            print(" Sensitivity(Report).Perturbations:", len(Entries), \
+                  "inputs perturbed.")
+        return Entries
+
+    def asPlot(self, _FileName=None, _nTop=20):
+        FileName = _FileName
+        if FileName == None:
+            FileName = os.path.splitext(self._FileName)[0] + ".png"
+        Lines = self._Lines[:_nTop][::-1]
+        Labels = [Line[1] + ": " + Line[2] for Line in Lines]
+        Low    = np.array([Line[7] for Line in Lines]) - self._Total
+        High   = np.array([Line[8] for Line in Lines]) - self._Total
+
+        fig, ax = plt.subplots(figsize = (10, 0.4*len(Lines) + 1.5))
+        ax.barh(Labels, Low,  left=self._Total, color="tab:blue", \
+                label="Low")
+        ax.barh(Labels, High, left=self._Total, color="tab:red", \
+                label="High")
+        ax.axvline(self._Total, color="black", linewidth=0.8)
+        ax.set_xlabel("Project grand total (£k)")
+        ax.set_title("Sensitivity of project grand total; inputs varied by " \
+                     + str(self._Delta*100.) + "%")
+        ax.legend()
+        plt.savefig(os.path.join(self._ReportPath, FileName), \
+                    bbox_inches='tight')
+        plt.close(fig)
+
+
+"""
+Class CashFlow:   -------->  "Cash flow" report; derived class  <--------
+===============
+
+  CashFlow derived class reports the quarterly cash flow of each work
+  package and of the project, one column per quarter of each financial
+  year.  Requires the quarterly costing (see
+  LhARACostingTool.doQuarterlyCosting).  Each work package, and the
+  project, is reported as lines of staff, equipment, inflation, other
+  non-staff, travel and consumables, working margin, contingency and
+  total cost; the project is followed by its cumulative total.
+
+"""
+class CashFlow(Report):
+    __Debug   = False
+    _Items    = (("Staff", "_StaffCostByQtr"), \
+                 ("Equipment", "_EquipmentCostByQtr"), \
+                 ("Inflation", "_InflationByQtr"), \
+                 ("Other non-staff", "_OtherNonStaffCostByQtr"), \
+                 ("Travel and consumables", "_TrvlCnsmCostByQtr"), \
+                 ("Working margin", "_WorkingMarginByQtr"), \
+                 ("Contingency", "_ContingencyByQtr"), \
+                 ("Total", "_TotalCostByQtr"))
+
+    def __init__(self, _ReportPath, _FileName, _PrjInst):
+
+        if not isinstance(_PrjInst, Prj.Project):
+            raise ProjectInstanceInvalid( \
+                  ' Report.CashFlow: no report possible for project.')
+        if not isinstance(_PrjInst._TotalCostByQtr, np.ndarray):
+            raise NoQuarterlyCosting( \
+                  ' Report.CashFlow: quarterly costing not done.')
 
+        Report.__init__(self, "Cash flow report: " + _PrjInst._Name, \
+                        _ReportPath, _FileName)
+
+        self._Header = ["Work package", "Item"]
+        for FY in _PrjInst._FinancialYears:
+            for iQtr in range(4):
+                self._Header.append(str(FY) + " Q" + str(iQtr+1))
+        self._Header.append("Total (£k)")
+
+        self._Lines = []
+        for iWP in wp.WorkPackage.instances:
+            self._Lines.extend(self.Lines(iWP._Code, iWP))
+        self._Lines.extend(self.Lines("Project", _PrjInst))
+        Cumulative = np.cumsum(_PrjInst._TotalCostByQtr)
+        self._Lines.append(["Project", "Cumulative total"] + \
+                           list(Cumulative) + [Cumulative[-1]])
+
+    def Lines(self, _Code, _Inst):
+        Lines = []
+        for Item, Attr in self._Items:
+            ByQtr = getattr(_Inst, Attr)
+            if Attr == "_ContingencyByQtr" and isinstance(ByQtr, list):
+                ByQtr = ByQtr[0] + ByQtr[1]
+            Lines.append([_Code, Item] + list(ByQtr) + [np.sum(ByQtr)])
+        if CashFlow.__Debug:
+            print(" CashFlow(Report).Lines:", _Code, Lines[-1])
         return Lines
+
+
+"""
+Class StaffOverAllocation:  ---->  "StaffOverAllocation" report  <----
+==========================
+
+  StaffOverAllocation derived class lists the quarters in which a member
+  of staff is allocated more than one FTE, summed over all tasks of all
+  work packages, with the excess FTE and the tasks contributing.  The
+  offenders are those returned by TaskStaff.checkAllocation.
+
+"""
+class StaffOverAllocation(Report):
+    __Debug   = False
+
+    def __init__(self, _ReportPath, _FileName, _PrjInst, _Offenders):
+
+        if not isinstance(_PrjInst, Prj.Project):
+            raise ProjectInstanceInvalid( \
+                  ' Report.StaffOverAllocation: no report possible.')
+
+        Report.__init__(self, "Staff over-allocation report", \
+                        _ReportPath, _FileName)
+
+        self._Header = ["Institute", "Staff code", "Financial year", \
+                        "Quarter", "Total FTE", "Excess FTE", "Tasks"]
+        self._Lines  = []
+        for Offender in _Offenders:
+            iStf, Yr, Qtr, FTE, Excess, Tasks = Offender
+            FY = Yr
+            if Yr < len(_PrjInst._FinancialYears):
+                FY = _PrjInst._FinancialYears[Yr]
+            self._Lines.append([iStf._InstituteCode, iStf._StaffCode, FY, \
+                                "Q" + str(Qtr+1), FTE, Excess, \
+                                "; ".join([iTsk._WorkPackage._Code + ": " + \
+                                           iTsk._Name for iTsk in Tasks])])
+        if StaffOverAllocation.__Debug:
+            print(" StaffOverAllocation(Report):", len(self._Lines), \
+                  "over-allocated quarters.")
     
 
 #--------  Exceptions:
@@ -1269,3 +1482,6 @@ class ProjectInstanceInvalid(Exception):
 
 class ProgressInstanceInvalid(Exception):
     pass
+
+class NoQuarterlyCosting(Exception):
+    pass
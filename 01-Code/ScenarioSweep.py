@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Class ScenarioSweep:
+====================
+
+  Evaluates the total cost by year of each work package, and of the
+  project, for N sets of control parameters in one batched numpy
+  evaluation.
+
+  The staff, CG staff, equipment, other non-staff and travel and
+  consumable costs by year do not depend on the control parameters.  They
+  are taken from the work packages as costed by a single doCosting pass
+  (see LhARACostingTool.Execute) and stacked into (work packages, years)
+  arrays.  The inflation, working margin and contingency of all scenarios
+  are then formed as (scenarios, work packages, years) array expressions
+  that follow WorkPackage.setInflationByYr, setWorkingMarginByYear,
+  setContingencyByYear and setTotalCostByYear term by term.  The
+  compounding of inflation uses numpy's power, so results agree with
+  WorkPackage.doCosting to rounding.
+
+  Control parameters are given as a dictionary of arrays of length N (or
+  scalars, which are broadcast), with values as held by Control (fractions;
+  start years counted from 0):
+    "InflationCapital"     : Control._Inflation[0]
+    "InflationStaff"       : Control._Inflation[1]
+    "InflationStrtInYr"    : Control._Inflation[2]
+    "WorkingMargin"        : Control._WorkingMargin[0]
+    "WorkingMarginStrtInYr": Control._WorkingMargin[1]
+    "ContingencyMaterial"  : Control._Contingency[0]
+    "ContingencyStaffPrj"  : Control._Contingency[1]
+    "ContingencyStaffCG"   : Control._Contingency[2]
+    "ContingencyStrtInYr"  : Control._Contingency[3]
+  Parameters that are not given are taken from the default costing
+  context.  As in WorkPackage.setInflationByYr, the "capital" rate
+  inflates staff cost and the "staff" rate equipment cost.
+
+  ScenarioSweep has no instances; all methods are class methods.
+
+
+  Class attributes:
+  -----------------
+  __Debug     : Boolean: set for debug print out
+  _Parameters : Names of the swept parameters
+
+
+  Methods:
+  --------
+  Get methods:
+      getParameters: Return dictionary of parameters of a costing context.
+                 Input: _Cntrl -- instance of Control; default context if
+                                  None (default)
+                Return: dictionary of floats
+                 [Classmethod]
+
+      fromContexts: Return parameter arrays for a list of costing contexts.
+                 Input: _Contexts -- list of instances of Control
+                Return: dictionary of numpy arrays
+                 [Classmethod]
+
+      getCostArrays: Stack the control-independent costs by year of the
+                     work packages.
+                 Input: _WPs -- list of costed work packages; all
+                                instances if None (default)
+                Return: dictionary of numpy arrays (work packages, years)
+                        keyed by "Staff", "CGStaff", "Equipment",
+                        "OtherNonStaff", "TrvlCnsm"
+                Raises: InconsistentFinancialYears if the work packages
+                        do not share the same financial years
+                 [Classmethod]
+
+  Processing methods:
+      sweep: Evaluate total cost by year for all scenarios.
+                 Input: _Params    -- dictionary of parameter arrays
+                        _BatchSize -- number of scenarios evaluated per
+                                      batch (bounds memory); default 4096
+                        _WPs       -- list of costed work packages; all
+                                      instances if None (default); as
+                                      getCostArrays
+                Return: dictionary:
+                          "WorkPackages"   : list of work package codes
+                          "FinancialYears" : list of financial years
+                          "WorkPackageTotalCostByYear": numpy array
+                                             (scenarios, work packages,
+                                             years)
+                          "ProjectTotalCostByYear": numpy array
+                                             (scenarios, years); sum over
+                                             work packages
+                 [Classmethod]
+
+      totalCostByYear: Total cost by year from control-independent costs
+                       and factor vectors; follows WorkPackage.doCosting.
+                 Input: _S, _CG, _E, _ONS, _TC -- staff, CG staff,
+                             equipment, other non-staff and travel and
+                             consumable costs by year (numpy arrays,
+                             years last)
+                        _Fctr -- dictionary of factor vectors keyed as
+                                 Control.getFactorsByYr; broadcast
+                                 against the costs
+                Return: numpy array
+                 [Classmethod]
+
+
+  Exceptions:
+    InconsistentFinancialYears: work packages have different financial
+                                years
+
+    InconsistentParameters: parameter arrays of different lengths, or
+                            unknown parameter
+
+
+Created on Sun 18Oct26. Version history:
+----------------------------------------
+ 1.0: 18Oct26: First implementation
+ 1.1: 18Oct26: totalCostByYear shared with MonteCarlo
+
+@author: kennethlong
+"""
+
+import numpy as np
+
+import Control     as Cntrl
+import WorkPackage as wp
+
+class ScenarioSweep:
+    __Debug     = False
+    _Parameters = ("InflationCapital", "InflationStaff", \
+                   "InflationStrtInYr", "WorkingMargin", \
+                   "WorkingMarginStrtInYr", "ContingencyMaterial", \
+                   "ContingencyStaffPrj", "ContingencyStaffCG", \
+                   "ContingencyStrtInYr")
+
+#--------  Get methods:
+    @classmethod
+    def getParameters(cls, _Cntrl=None):
+        iCntrl = _Cntrl
+        if iCntrl == None:
+            iCntrl = Cntrl.Control()
+        return {"InflationCapital"     : iCntrl.getInflationCapital(), \
+                "InflationStaff"       : iCntrl.getInflationStaff(), \
+                "InflationStrtInYr"    : iCntrl.getInflationStrtInYr(), \
+                "WorkingMargin"        : iCntrl.getWorkingMargin(), \
+                "WorkingMarginStrtInYr": iCntrl.getWorkingMarginStrtInYr(), \
+                "ContingencyMaterial"  : iCntrl.getContingencyMaterial(), \
+                "ContingencyStaffPrj"  : iCntrl.getContingencyStaffPrj(), \
+                "ContingencyStaffCG"   : iCntrl.getContingencyStaffCG(), \
+                "ContingencyStrtInYr"  : iCntrl.getContingencyStrtInYr()}
+
+    @classmethod
+    def fromContexts(cls, _Contexts):
+        Params = [cls.getParameters(iCntrl) for iCntrl in _Contexts]
+        return {Name: np.array([Prm[Name] for Prm in Params], dtype=float) \
+                for Name in cls._Parameters}
+
+    @classmethod
+    def getCostArrays(cls, _WPs=None):
+        WPs = wp.WorkPackage.instances
+        if _WPs is not None:
+            WPs = _WPs
+        for iWP in WPs:
+            if iWP._FinancialYears != WPs[0]._FinancialYears:
+                raise InconsistentFinancialYears( \
+                      " ScenarioSweep; getCostArrays: work package ", \
+                      iWP._Code, iWP._FinancialYears)
+        nYrs   = 0
+        if len(WPs) > 0:
+            nYrs = len(WPs[0]._FinancialYears)
+        Costs  = {}
+        for Name, Attr in (("Staff",         "_StaffCostByYear"), \
+                           ("CGStaff",       "_CGStaffCostByYear"), \
+                           ("Equipment",     "_EquipmentCostByYear"), \
+                           ("OtherNonStaff", "_OtherNonStaffCostByYear"), \
+                           ("TrvlCnsm",      "_TrvlCnsmCostByYear")):
+            Costs[Name] = np.zeros((len(WPs), nYrs))
+            for iPos, iWP in enumerate(WPs):
+                Costs[Name][iPos] = getattr(iWP, Attr)
+        return Costs
+
+#--------  Processing methods:
+    @classmethod
+    def sweep(cls, _Params, _BatchSize=4096, _WPs=None):
+        for Name in _Params:
+            if not Name in cls._Parameters:
+                raise InconsistentParameters( \
+                      " ScenarioSweep; sweep: unknown parameter ", Name)
+        Dflt   = cls.getParameters()
+        Params = {Name: np.atleast_1d(np.asarray( \
+                           _Params.get(Name, Dflt[Name]), dtype=float)) \
+                  for Name in cls._Parameters}
+        nScn   = max(len(Prm) for Prm in Params.values())
+        for Name in Params:
+            if len(Params[Name]) == 1:
+                Params[Name] = np.full(nScn, Params[Name][0])
+            elif len(Params[Name]) != nScn:
+                raise InconsistentParameters( \
+                      " ScenarioSweep; sweep: length of ", Name, \
+                      len(Params[Name]), " expected ", nScn)
+
+        WPs = wp.WorkPackage.instances
+        if _WPs is not None:
+            WPs = _WPs
+        Costs = cls.getCostArrays(WPs)
+        S     = Costs["Staff"][None]
+        CG    = Costs["CGStaff"][None]
+        E     = Costs["Equipment"][None]
+        ONS   = Costs["OtherNonStaff"][None]
+        TC    = Costs["TrvlCnsm"][None]
+        nYrs  = S.shape[2]
+        iYr   = np.arange(nYrs)[None, :]
+        Yrs   = iYr.astype(float)
+
+        WPTotal = np.zeros((nScn, len(WPs), nYrs))
+        for iBgn in range(0, nScn, _BatchSize):
+            Bt = slice(iBgn, min(iBgn + _BatchSize, nScn))
+            P  = {Name: Params[Name][Bt][:, None] for Name in Params}
+
+            #.. Factor vectors, (scenarios, 1, years):
+            InflOn = iYr >= P["InflationStrtInYr"]
+            WMOn   = iYr >= P["WorkingMarginStrtInYr"]
+            CntOn  = iYr >= P["ContingencyStrtInYr"]
+            Fctr   = { \
+                "InflationStaff"     : np.where(InflOn, \
+                          (1. + P["InflationCapital"])**Yrs - 1, 0.), \
+                "InflationEquipment" : np.where(InflOn, \
+                          (1. + P["InflationStaff"])**Yrs - 1, 0.), \
+                "WorkingMargin"      : np.where(WMOn, \
+                                                P["WorkingMargin"], 0.), \
+                "ContingencyMaterial": np.where(CntOn, \
+                                          P["ContingencyMaterial"], 0.), \
+                "ContingencyStaffPrj": np.where(CntOn, \
+                                          P["ContingencyStaffPrj"], 0.), \
+                "ContingencyStaffCG" : np.where(CntOn, \
+                                          P["ContingencyStaffCG"], 0.)}
+            Fctr   = {Name: Fctr[Name][:, None, :] for Name in Fctr}
+
+            WPTotal[Bt] = cls.totalCostByYear(S, CG, E, ONS, TC, Fctr)
+
+        if cls.__Debug:
+            print(" ScenarioSweep; sweep:", nScn, "scenarios,", \
+                  len(WPs), "work packages,", nYrs, "years")
+
+        FinancialYears = []
+        if len(WPs) > 0:
+            FinancialYears = WPs[0]._FinancialYears
+        return {"WorkPackages"              : [iWP._Code for iWP in WPs], \
+                "FinancialYears"            : FinancialYears, \
+                "WorkPackageTotalCostByYear": WPTotal, \
+                "ProjectTotalCostByYear"    : np.sum(WPTotal, axis=1)}
+
+    @classmethod
+    def totalCostByYear(cls, _S, _CG, _E, _ONS, _TC, _Fctr):
+        Infl        = _Fctr["InflationStaff"] * _S + \
+                      _Fctr["InflationEquipment"] * _E
+        WrkMrgn     = (_S + _E) * _Fctr["WorkingMargin"]
+        ContEquip   = _E * _Fctr["ContingencyMaterial"]
+        ContStaffCG = _CG * _Fctr["ContingencyStaffCG"]
+        ContStaff   = (_S - _CG) * _Fctr["ContingencyStaffPrj"] + ContStaffCG
+        return _S + _E + Infl + _ONS + _TC + WrkMrgn + ContEquip + ContStaff
+
+
+#--------  Exceptions:
+class InconsistentFinancialYears(Exception):
+    pass
+
+class InconsistentParameters(Exception):
+    pass
@@ -12,7 +12,21 @@ Class Staff:
   -----------------
   __Debug   : Boolean: set for debug print out
   instances : List of instances if the WorkPackage class.
-  institutes: List of institutes contributing staff
+  __slots__ : Names of the instance attributes; instances carry no __dict__.
+  institutes: List of institutes contributing staff; lookup table from
+              institute index to institute code
+  _InstituteIdx: Dictionary of institute index keyed by institute code
+  fundingSources: List of funding sources; lookup table from funding
+              index to funding source ("Project", "CG", ...)
+  _FundingIdx: Dictionary of funding index keyed by funding source
+  _CG       : Funding index of the Consolidated Grant ("CG")
+  _Index    : Dictionary of instances keyed by (institute code, staff code).
+              Each entry is a list so that duplicates are recorded as the
+              instance is created.
+  _Version  : Version of staff database record; to be incremented whenever
+              the content of the record changes.
+  _CacheKind: Kind under which staff database records are held in the
+              parse cache.
       
   Instance attributes:
   --------------------
@@ -22,7 +36,10 @@ Class Staff:
    _InstituteCode = Institute code (e.g. Imperial-Physics)
    _GradeOrLevel  = Grade of level (e.g. Senior Lecturer)
    _AnnualCost    = Total FEC per year
-   _ProjectOrCG   = Charged to "Project" or Consolidated Grant ("CG")
+   _ProjectOrCG   = Charged to "Project" or Consolidated Grant ("CG");
+                    property, held as the funding index _FundIdx
+   _InstIdx       = Institute index (into institutes)
+   _FundIdx       = Funding index (into fundingSources)
    _Comments      = Free format string field; additional information 
                     (e.g. WAG)
 
@@ -37,11 +54,22 @@ Class Staff:
 
   I/o and data-constructor methods:
       parseStaffDatabase: Read staff database CSV file and create Staff
-                          instances.
+                          instances.  The staff database record is taken
+                          from the parse cache if the file is unchanged
+                          since it was last parsed (see ParseCache).
                      Input: Path to CSV file containing staff database.
                     Return: Number of staff instances
                      [Class method]
 
+     getStaffDatabaseRecord: Read staff database CSV file into a picklable
+                          record: dictionary with items "Filename", 
+                          "Version" and "Rows", the list of (institute 
+                          code, staff code, name or post, grade or level,
+                          annual cost, project or CG, comments) tuples.
+                     Input: Path to CSV file containing staff database.
+                    Return: Record (dictionary)
+                     [Class method]
+
         getStaffDatabase: Uses pandas to create pandas dataframe from
                           CSV file.  Called from parseStaffDatabase.
                      Input: Path to CSV file containing staff database.
@@ -63,15 +91,46 @@ Class Staff:
       setAnnualCost: Set self._AnnualCost
                  Input: Annual cost (float); defaults to float(nan))
 
+     getProjectOrCG: Return funding source of this staff member
+     setProjectOrCG: Set funding source; interned into fundingSources
+                 Input: Funding source (str)
+
+            intern: Return the integer code of a value in a lookup table,
+                    appending the value to the table if it is new.
+                 Input: _Table -- list; lookup table code -> value
+                        _Index -- dictionary; value -> code
+                        _Value -- value to code
+                Return: Integer code
+                     [Class method]
+
+           getCodes: Institute and funding indices of a list of staff
+                  Input: List of Staff instances
+                 Return: numpy int arrays of institute and funding indices
+                     [Class method]
+
+               isCG: Flags staff charged to the Consolidated Grant
+                  Input: List of Staff instances
+                 Return: numpy bool array
+                     [Class method]
+
    getNumberOfStaff: Returns integer length of instances, i.e. number of 
                      staff.
                      [Class method]
 
-        getInstance: Finds instance of Staff, addressed by "NameOrPost"/
-                  Input: Str: NameOrPost
+        getInstance: Finds instance of Staff, addressed by institute code
+                     and staff code, using the _Index dictionary.
+                  Input: Str: InstituteCode, StaffCode
                  Return: Instance of Staff class if it exists.  Returns "None" 
-                         if NameOrPost is not found or there is more than one 
-                         instance with the same name or post.
+                         if not found.  Raises DuplicateStaffClassInstance
+                         if there is more than one instance with the same 
+                         key.
+                     [Class method]
+
+         addToIndex: Add instance to _Index; called on instanciation.
+                  Input: Instance of Staff
+                     [Class method]
+
+         buildIndex: Rebuild _Index from instances; called after clean.
                      [Class method]
 
           getHeader: Return string list containing column headers.
@@ -90,6 +149,10 @@ Class Staff:
                 Return: Number of staff entries remaining
                      [Class method]
 
+                 clear: Delete all instances of Staff and rebuild _Index.
+                Return: Number of instances deleted
+                     [Class method]
+
 
   Exceptions:
         DuplicateStaffClassInstance: Two instances with same NameOrPost found.
@@ -102,6 +165,12 @@ Class Staff:
 Created on Wed 19Jun21. Version history:
 ----------------------------------------
  1.0: 19Jun21: First implementation
+ 1.1: 18Oct26: Dictionary index for getInstance
+ 1.2: 18Oct26: Staff database record held in content-hash keyed parse 
+               cache
+ 1.3: 18Oct26: Instance attributes declared in __slots__
+ 1.4: 18Oct26: Institute and funding source interned into integer codes
+ 1.5: 18Oct26: clear
 
 @author: kennethlong
 """
@@ -109,11 +178,24 @@ Created on Wed 19Jun21. Version history:
 import os     as os
 import pandas as pnds
 import math   as mth
+import numpy  as np
+
+import ParseCache as PrsCch
 
 class Staff:
     __Debug    = False
     instances  = []
     institutes = []
+    _InstituteIdx  = {}
+    fundingSources = ["Project", "CG"]
+    _FundingIdx    = {"Project": 0, "CG": 1}
+    _CG        = 1
+    _Index     = {}
+    _Version   = 1
+    _CacheKind = "StaffDatabase"
+    __slots__ = ("_StaffCode", "_NameOrPost", "_filename", "_InstituteCode", \
+                 "_GradeOrLevel", "_AnnualCost", "_FundIdx", "_InstIdx", \
+                 "_Comments")
 
 #--------  "Built-in methods":
     def __init__(self, _StaffCode=None, _NameOrPost=None, _filename=None, \
@@ -156,10 +238,11 @@ class Staff:
         self._ProjectOrCG   = _ProjectOrCG
         self._Comments      = _Comments
 
-        if not (_InstituteCode in Staff.institutes):
-            Staff.institutes.append(_InstituteCode)
+        self._InstIdx = Staff.intern(Staff.institutes, Staff._InstituteIdx, \
+                                     _InstituteCode)
 
         Staff.instances.append(self)
+        Staff.addToIndex(self)
 
     def __repr__(self):
         return "Staff(Name)"
@@ -198,25 +281,36 @@ class Staff:
                    staff database file ", filename, \
                    " does not exist, execution terminated.")
 
-        _StffDtbsParams = cls.getStaffDatabase(filename)
-        if cls.__Debug:
-            xDummy = cls.printStaffDatabase(_StffDtbsParams)
+        Record = PrsCch.ParseCache.load(cls._CacheKind, filename, \
+                                        cls._Version)
+        if Record == None:
+            Record = cls.getStaffDatabaseRecord(filename)
+            PrsCch.ParseCache.store(cls._CacheKind, filename, \
+                                    cls._Version, Record)
 
-        iRow = _StffDtbsParams.index
-        for i in iRow:
-            InstituteCode = _StffDtbsParams.iat[i,0]
-            StaffCode     = _StffDtbsParams.iat[i,1]
-            NameOrPost    = _StffDtbsParams.iat[i,2]
-            GradeOrLevel  = _StffDtbsParams.iat[i,3]
-            AnnualCost    = _StffDtbsParams.iat[i,4]
-            ProjectOrCG   = _StffDtbsParams.iat[i,5]
-            Comments      = _StffDtbsParams.iat[i,6]
+        for Row in Record["Rows"]:
+            InstituteCode, StaffCode, NameOrPost, GradeOrLevel, \
+                AnnualCost, ProjectOrCG, Comments = Row
             StffDummy     = Staff(StaffCode, NameOrPost, filename, \
                                   InstituteCode,GradeOrLevel, AnnualCost, \
                                   ProjectOrCG, Comments)
 
         return len(cls.instances)
 
+    @classmethod
+    def getStaffDatabaseRecord(cls, _filename):
+        _StffDtbsParams = cls.getStaffDatabase(_filename)
+        if cls.__Debug:
+            xDummy = cls.printStaffDatabase(_StffDtbsParams)
+
+        Rows = []
+        for i in _StffDtbsParams.index:
+            Rows.append(tuple(_StffDtbsParams.iat[i,j] for j in range(7)))
+
+        return {"Filename": _filename, \
+                "Version" : cls._Version, \
+                "Rows"    : Rows}
+
     @classmethod
     def getStaffDatabase(cls, _filename):
         StffDBParams = pnds.read_csv(_filename)
@@ -242,23 +336,44 @@ class Staff:
     def setAnnualCost(self, _AnnCost=float("nan")):
         self._AnnualCost = _AnnCost
 
+    def getProjectOrCG(self):
+        return Staff.fundingSources[self._FundIdx]
+
+    def setProjectOrCG(self, _ProjectOrCG):
+        self._FundIdx = Staff.intern(Staff.fundingSources, \
+                                     Staff._FundingIdx, _ProjectOrCG)
+
+    _ProjectOrCG = property(getProjectOrCG, setProjectOrCG)
+
+    @classmethod
+    def intern(cls, _Table, _Index, _Value):
+        Code = _Index.get(_Value)
+        if Code == None:
+            Code = len(_Table)
+            _Table.append(_Value)
+            _Index[_Value] = Code
+        return Code
+
+    @classmethod
+    def getCodes(cls, _Staff):
+        InstIdx = np.array([iStf._InstIdx for iStf in _Staff], dtype=int)
+        FundIdx = np.array([iStf._FundIdx for iStf in _Staff], dtype=int)
+        return InstIdx, FundIdx
+
+    @classmethod
+    def isCG(cls, _Staff):
+        return cls.getCodes(_Staff)[1] == cls._CG
+
     @classmethod
     def getNumberOfStaff(cls):
         return len(cls.instances)
 
     @classmethod
     def getInstance(cls, _InstCode, _StaffCode):
-        InstList = []
         if Staff.__Debug:
             print(" Staff; getInstance: search for InstCode, StaffCode:", \
                   _InstCode, _StaffCode)
-        for inst in cls.instances:
-            if Staff.__Debug:
-                print(" Staff; getInstance: instance:", \
-                      inst._InstituteCode, inst._StaffCode)
-            if inst._InstituteCode == _InstCode and \
-               inst._StaffCode == _StaffCode:
-                InstList.append(inst)
+        InstList = cls._Index.get((_InstCode, _StaffCode), [])
         Ninst = len(InstList)
         if Ninst == 0:
             RtnInst = None
@@ -273,6 +388,22 @@ class Staff:
                   "return instance:", Ninst, "\n ", RtnInst)
         return RtnInst
 
+    @classmethod
+    def addToIndex(cls, _Inst):
+        Key = (_Inst._InstituteCode, _Inst._StaffCode)
+        if Key in cls._Index:
+            cls._Index[Key].append(_Inst)
+            if Staff.__Debug:
+                print(" Staff; addToIndex: duplicate instance for:", Key)
+        else:
+            cls._Index[Key] = [_Inst]
+
+    @classmethod
+    def buildIndex(cls):
+        cls._Index = {}
+        for iStf in cls.instances:
+            cls.addToIndex(iStf)
+
     @classmethod
     def getHeader(cls):
         HeaderList = ["Staff code", "Name or post", "Filename", \
@@ -346,8 +477,21 @@ class Staff:
                 del iStf
             except ValueError:
                 cls.instances.append(iStf)
+        cls.buildIndex()
 
         return len(Deletions)
+
+    @classmethod
+    def clear(cls):
+        OldInst = cls.instances
+        NewInst = []
+        nDel    = 0
+        for iStf in OldInst:
+            del iStf
+            nDel += 1
+        cls.instances = NewInst
+        cls.buildIndex()
+        return nDel
                 
         
 #--------  Exceptions:
@@ -12,6 +12,13 @@ Class Task:
   -----------------
   __Debug : Boolean: set for debug print out
   instances: List of instances if the Task class.
+  __slots__: Names of the instance attributes; instances carry no __dict__.
+  _Index   : Dictionary of instances keyed by (task name, work package 
+             instance).  Each entry is a list so that duplicates are
+             recorded as the instance is created.
+  _ByWorkPackage: Dictionary of lists of Task instances keyed by work 
+             package instance (adjacency WorkPackage -> Task).
+  _CostedAttributes: Names of the instance attributes filled by doCosting.
 
       
   Instance attributes:
@@ -29,6 +36,16 @@ Class Task:
    _EquipmentCostByYear = Total cost of equipment in £k for this task by FY
    _TotalEquipCost      = Summed total equipment cost over duration of
                           project (£k)
+   _StaffFracByQtr, _StaffCostByQtr, _CGStaffCostByQtr,
+   _EquipmentCostByQtr  = Staff fraction, staff cost, CG staff cost and
+                          equipment cost by quarter; four entries per FY.
+                          None unless doQuarterlyCosting has been run.
+   _TotalValue          = Planned total value (£k); staff and equipment
+                          cost plus share of the other non-staff cost of
+                          the work package.  Evaluated on first call of
+                          getTotalValue; reset when the staff or equipment
+                          total, or the other non-staff total of the work
+                          package, is set.
     
   Methods:
   --------
@@ -48,10 +65,25 @@ Class Task:
 
 
   Get/set methods:
-    getInstance: Finds instance of class with Task._Name
-                 Input: _Name -- str -- name of Project to be found
-                Return: Instance of class; None if not found or if more than
-                        one instance
+    getInstance: Finds instance of class with Task._Name in work package
+                 _WPInst using the _Index dictionary.
+                 Input: _Name   -- str -- name of Task to be found
+                        _WPInst -- instance of WorkPackage
+                Return: Instance of class; None if not found.  Raises
+                        DuplicateTaskClassInstance if more than one 
+                        instance.
+                   [Classmethod]
+
+     addToIndex: Add instance to _Index and _ByWorkPackage; called on 
+                 instanciation.
+                   [Classmethod]
+
+     buildIndex: Rebuild _Index and _ByWorkPackage from instances; called 
+                 from clean and clear.
+                   [Classmethod]
+
+     getForWorkPackage: Return list of Task instances in work package.
+                 Input: _WPInst -- instance of WorkPackage
                    [Classmethod]
 
     setStaffCostByYear: Set staff cost per year (£k)
@@ -78,6 +110,12 @@ Class Task:
     setTotalEquipmentCost: Set total equipment cost (£k)
         Sums equipment cost per year.
 
+    setTotalValue: Set planned total value (£k); None if the task has
+        not been costed.
+
+    getTotalValue: Return planned total value (£k); set on first call
+        after costing.
+
 
   Processing methods:
       createPandasDataframe : Create Pandas data frame containing Task
@@ -91,12 +129,30 @@ Class Task:
 
       doCosting: Complete costing of Task.  Sums data from TaskStaff and
                  TaskEquipment related to Task and completes Task costing.
+                 Sums are formed by the Aggregation engine.
+                 Input: _Tasks -- list of tasks to cost; all instances if
+                                  None (default)
+                 [Classmethod]
+
+      doQuarterlyCosting: Quarterly costing of Task.  Staff fraction and
+                 cost by quarter are summed from the TaskStaff effort
+                 tensor (see TaskStaff.getByQuarter); the equipment cost
+                 of each year is spread evenly over its quarters.
+                 Input: _Tasks -- as doCosting
                  [Classmethod]
 
   
 Created on Wed 19Jun21. Version history:
 ----------------------------------------
  1.0: 19Jun21: First implementation
+ 1.1: 18Oct26: Dictionary index for getInstance
+ 1.2: 18Oct26: Adjacency index work package -> task; doCosting sums only
+               the TaskStaff and TaskEquipment of each task
+ 1.3: 18Oct26: Roll-up of TaskStaff and TaskEquipment through Aggregation
+ 1.4: 18Oct26: doCosting of a subset of tasks (incremental recosting)
+ 1.5: 18Oct26: Quarterly costing
+ 1.6: 18Oct26: Instance attributes declared in __slots__
+ 1.7: 18Oct26: Planned total value cached (_TotalValue)
 
 @author: kennethlong
 """
@@ -109,10 +165,23 @@ import WorkPackage   as wp
 import TaskStaff     as TskStf
 import TaskEquipment as TskEqp
 import Progress      as Prg
+import Aggregation   as Agg
 
 class Task:
     __Debug = False
     instances = []
+    _Index    = {}
+    _ByWorkPackage = {}
+    _CostedAttributes = ("_StaffFracByYear", "_StaffCostByYear", \
+                         "_TotalStaffFrac", "_TotalStaffCost", \
+                         "_CGStaffCostByYear", "_EquipmentCostByYear", \
+                         "_TotalEquipmentCost")
+    __slots__ = ("_Name", "_WorkPackage", "_StaffFracByYear", \
+                 "_StaffCostByYear", "_CGStaffCostByYear", \
+                 "_TotalStaffCost", "_TotalStaffFrac", "_TotalCGStaffCost", \
+                 "_EquipmentCostByYear", "_TotalEquipmentCost", \
+                 "_StaffFracByQtr", "_StaffCostByQtr", "_CGStaffCostByQtr", \
+                 "_EquipmentCostByQtr", "_TotalValue")
 
 #--------  "Built-in methods":
     def __init__(self, _Name="None", _WPInst=None):
@@ -129,8 +198,14 @@ class Task:
         self._TotalCGStaffCost    = None
         self._EquipmentCostByYear = None
         self._TotalEquipmentCost  = None
+        self._StaffFracByQtr      = None
+        self._StaffCostByQtr      = None
+        self._CGStaffCostByQtr    = None
+        self._EquipmentCostByQtr  = None
+        self._TotalValue          = None
         
         Task.instances.append(self)
+        Task.addToIndex(self)
         
     def __repr__(self):
         return "Task(Name)"
@@ -171,17 +246,10 @@ class Task:
         
     @classmethod
     def getInstance(cls, _Name, _WPInst):
-        InstList = []
         if Task.__Debug:
             print(" Task; getInstance: search for Task name, WP name:", \
                   _Name, _WPInst._Name)
-        for inst in cls.instances:
-            if Task.__Debug:
-                print(" Task; getInstance: instances:", \
-                      inst._Name, inst._WorkPackage._Name)
-            if inst._Name == _Name and \
-               inst._WorkPackage._Name == _WPInst._Name:
-                InstList.append(inst)
+        InstList = cls._Index.get((_Name, _WPInst), [])
         Ninst = len(InstList)
         if Ninst == 0:
             RtnInst = None
@@ -197,26 +265,56 @@ class Task:
 
         return RtnInst
 
+    @classmethod
+    def addToIndex(cls, _Inst):
+        Key = (_Inst._Name, _Inst._WorkPackage)
+        if Key in cls._Index:
+            cls._Index[Key].append(_Inst)
+            if Task.__Debug:
+                print(" Task; addToIndex: duplicate instance for:", \
+                      _Inst._Name)
+        else:
+            cls._Index[Key] = [_Inst]
+        if _Inst._WorkPackage in cls._ByWorkPackage:
+            cls._ByWorkPackage[_Inst._WorkPackage].append(_Inst)
+        else:
+            cls._ByWorkPackage[_Inst._WorkPackage] = [_Inst]
+
+    @classmethod
+    def buildIndex(cls):
+        cls._Index         = {}
+        cls._ByWorkPackage = {}
+        for iTsk in cls.instances:
+            cls.addToIndex(iTsk)
+
+    @classmethod
+    def getForWorkPackage(cls, _WPInst):
+        return cls._ByWorkPackage.get(_WPInst, [])
+
     def getTotalValue(self):
-        TV       = None
-        ONSshare = 0.
+        if self._TotalValue is None:
+            self.setTotalValue()
+        return self._TotalValue
+
+    def setTotalValue(self):
+        self._TotalValue = None
         iWP   = self.getWorkPackage()
         if self.getDebug():
-            print(" Task.getTotalValue: Task, WP:", \
+            print(" Task.setTotalValue: Task, WP:", \
                   self.getName(), iWP.getName())
 
         if self._TotalStaffCost     != None and \
            self._TotalEquipmentCost != None:
             TV = self._TotalStaffCost + self._TotalEquipmentCost
             #..  Correct for non-equipment portion of non-staff for WP:
-            nTsks = iWP.getnTasks()
+            nTsks = len(Task.getForWorkPackage(iWP))
             if self.getDebug():
                 print("     ----> nTasks:", nTsks)
             ONSshare = iWP.getTotalOtherNonStaffCost() / float(nTsks)
             if self.getDebug():
                 print("     ----> Share of other non-staff costs:", ONSshare)
-                print(" <---- Return total value:", TV + ONSshare)
-        return TV + ONSshare
+                print(" <---- Total value:", TV + ONSshare)
+            self._TotalValue = TV + ONSshare
 
     def setStaffCostByYear(self, _StaffCostByYear):
         self._StaffCostByYear = _StaffCostByYear
@@ -229,6 +327,7 @@ class Task:
 
     def setTotalStaffCost(self):
         self._TotalStaffCost = np.sum(self._StaffCostByYear)
+        self._TotalValue     = None
         
     def setTotalStaffFrac(self):
         self._TotalStaffFrac = np.sum(self._StaffFracByYear)
@@ -241,6 +340,7 @@ class Task:
 
     def setTotalEquipmentCost(self):
         self._TotalEquipmentCost = np.sum(self._EquipmentCostByYear)
+        self._TotalValue         = None
         
 
 #--------  Processing methods:
@@ -281,6 +381,7 @@ class Task:
             else:
                 NewInst.append(iTsk)
         cls.instances = NewInst
+        cls.buildIndex()
         return nDel
 
     @classmethod
@@ -292,51 +393,95 @@ class Task:
             del iTsk
             nDel += 1
         cls.instances = NewInst
+        cls.buildIndex()
         return nDel
 
     @classmethod
-    def doCosting(cls):
-        for iTsk in cls.instances:
-            _StaffFracByYear   = np.array([])
-            _StaffCostByYear   = np.array([])
-            _CGStaffCostByYear = np.array([])
-            SumInitialised = False
-            for iTskStf in TskStf.TaskStaff.instances:
-                if iTskStf._Task == iTsk:
-                    for iYr in range(len(iTskStf._StaffCostByYear)):
-                        if not SumInitialised:
-                            _StaffFracByYear   = \
-                                np.append(_StaffFracByYear,   [0.])
-                            _StaffCostByYear   = \
-                                np.append(_StaffCostByYear,   [0.])
-                            _CGStaffCostByYear = \
-                                np.append(_CGStaffCostByYear, [0.])
-                    SumInitialised = True
-                    _StaffFracByYear += iTskStf._StaffFracByYear
-                    _StaffCostByYear += iTskStf._StaffCostByYear
-                    if iTskStf._Staff._ProjectOrCG == "CG":
-                        _CGStaffCostByYear += iTskStf._StaffCostByYear
-            iTsk._StaffFracByYear = _StaffFracByYear
-            iTsk._StaffCostByYear = _StaffCostByYear
+    def doCosting(cls, _Tasks=None):
+        Tasks  = cls.instances
+        if _Tasks is not None:
+            Tasks = _Tasks
+        nTsk   = len(Tasks)
+        TskPos = {iTsk: iPos for iPos, iTsk in enumerate(Tasks)}
+
+        #.. Staff; leaves are the costed rows of the TaskStaff effort tensor:
+        TS     = TskStf.TaskStaff
+        Rows   = TS.getRows()
+        Rows   = Rows[TS._Filled[Rows, TS._COST]]
+        KeyPos = np.array([TskPos.get(iTsk, -1) for iTsk in TS._TaskKeys], \
+                          dtype=int)
+        Groups = KeyPos[TS._TaskIdx[Rows]]
+        GrpLen = Agg.Aggregation.groupLength(TS._nYrs[Rows], Groups, nTsk)
+        _StaffFracByYear   = Agg.Aggregation.rollUp(TS._FracByYr[Rows], \
+                                                    Groups, nTsk, GrpLen)
+        _StaffCostByYear   = Agg.Aggregation.rollUp(TS._CostByYr[Rows], \
+                                                    Groups, nTsk, GrpLen)
+        _CGStaffCostByYear = Agg.Aggregation.rollUp(TS._CGCostByYr[Rows], \
+                                                    Groups, nTsk, GrpLen)
+
+        #.. Equipment:
+        Groups  = np.array([TskPos.get(iTskEqp._Task, -1) \
+                            for iTskEqp in TskEqp.TaskEquipment.instances], \
+                           dtype=int)
+        Vectors = [iTskEqp._Equipment._EquipmentCostByYear \
+                   if Groups[iLf] >= 0 else np.array([]) \
+                   for iLf, iTskEqp in \
+                   enumerate(TskEqp.TaskEquipment.instances)]
+        Values, Lengths = Agg.Aggregation.stack(Vectors)
+        GrpLen = Agg.Aggregation.groupLength(Lengths, Groups, nTsk)
+        _EquipmentCostByYear = Agg.Aggregation.rollUp(Values, Groups, \
+                                                      nTsk, GrpLen)
+
+        for iPos, iTsk in enumerate(Tasks):
+            iTsk._StaffFracByYear = _StaffFracByYear[iPos]
+            iTsk._StaffCostByYear = _StaffCostByYear[iPos]
             iTsk.setTotalStaffFrac()
             iTsk.setTotalStaffCost()
-            iTsk._CGStaffCostByYear = _CGStaffCostByYear
-
-        for iTsk in cls.instances:
-            _EquipmentCostByYear = np.array([])
-            SumInitialised = False
-            for iTskEqp in TskEqp.TaskEquipment.instances:
-                if iTskEqp._Task == iTsk:
-                    iEqp = iTskEqp._Equipment
-                    for iYr in range(len(iEqp._EquipmentCostByYear)):
-                        if not SumInitialised:
-                            _EquipmentCostByYear   = \
-                                np.append(_EquipmentCostByYear,   [0.])
-                    SumInitialised = True
-                    _EquipmentCostByYear += iEqp._EquipmentCostByYear
-            iTsk.setEquipmentCostByYear(_EquipmentCostByYear)
+            iTsk._CGStaffCostByYear = _CGStaffCostByYear[iPos]
+            iTsk.setEquipmentCostByYear(_EquipmentCostByYear[iPos])
             iTsk.setTotalEquipmentCost()
 
+    @classmethod
+    def doQuarterlyCosting(cls, _Tasks=None):
+        Tasks  = cls.instances
+        if _Tasks is not None:
+            Tasks = _Tasks
+        nTsk   = len(Tasks)
+        TskPos = {iTsk: iPos for iPos, iTsk in enumerate(Tasks)}
+
+        #.. Staff; quarters of the costed rows of the TaskStaff effort
+        #   tensor:
+        TS     = TskStf.TaskStaff
+        Rows   = TS.getRows()
+        Rows   = Rows[TS._Filled[Rows, TS._COST]]
+        KeyPos = np.array([TskPos.get(iTsk, -1) for iTsk in TS._TaskKeys], \
+                          dtype=int)
+        Groups = KeyPos[TS._TaskIdx[Rows]]
+        GrpLen = 4 * Agg.Aggregation.groupLength(TS._nYrs[Rows], Groups, \
+                                                 nTsk)
+        ByQtr  = TS.getByQuarter(Rows)
+        Sums   = {Key: Agg.Aggregation.rollUp(ByQtr[Key], Groups, nTsk, \
+                                              GrpLen) for Key in ByQtr}
+
+        #.. Equipment:
+        Groups  = np.array([TskPos.get(iTskEqp._Task, -1) \
+                            for iTskEqp in TskEqp.TaskEquipment.instances], \
+                           dtype=int)
+        Vectors = [iTskEqp._Equipment._EquipmentCostByYear \
+                   if Groups[iLf] >= 0 else np.array([]) \
+                   for iLf, iTskEqp in \
+                   enumerate(TskEqp.TaskEquipment.instances)]
+        Values, Lengths = Agg.Aggregation.stack(Vectors)
+        GrpLen = 4 * Agg.Aggregation.groupLength(Lengths, Groups, nTsk)
+        _EquipmentCostByQtr = Agg.Aggregation.rollUp( \
+                    Agg.Aggregation.toQuarters(Values), Groups, nTsk, GrpLen)
+
+        for iPos, iTsk in enumerate(Tasks):
+            iTsk._StaffFracByQtr     = Sums["FracByQtr"][iPos]
+            iTsk._StaffCostByQtr     = Sums["CostByQtr"][iPos]
+            iTsk._CGStaffCostByQtr   = Sums["CGCostByQtr"][iPos]
+            iTsk._EquipmentCostByQtr = _EquipmentCostByQtr[iPos]
+
 
 #--------  Exceptions:
 class DuplicateTaskClassInstance(Exception):
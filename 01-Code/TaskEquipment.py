@@ -13,6 +13,12 @@ Class TaskEquipment:
   -----------------
   __Debug : Boolean: set for debug print out
   instances: List of instances if the TaskEquipment class.
+  __slots__: Names of the instance attributes; instances carry no __dict__.
+  _Index   : Dictionary of instances keyed by (Task, Equipment) instances.  
+             Each entry is a list so that duplicates are recorded as the 
+             instance is created.
+  _ByTask  : Dictionary of lists of instances keyed by Task instance 
+             (adjacency Task -> TaskEquipment).
 
       
   Instance attributes:
@@ -38,8 +44,20 @@ Class TaskEquipment:
       getInstance: Finds instance of class with specific Task and Equipment
                    stored in the two instance attributes.
                  Input: _Task, _Equipment: Task and Project
-                Return: Instance of class; None if not found or if more than
-                        one instance
+                Return: Instance of class; None if not found.  Raises
+                        DuplicateTaskEquipmentClassInstance
+                        if more than one instance.  Uses _Index.
+                   [Classmethod]
+
+       addToIndex: Add instance to _Index and _ByTask; called on 
+                   instanciation.
+                   [Classmethod]
+
+       buildIndex: Rebuild indices from instances; called after clean.
+                   [Classmethod]
+
+       getForTask: Return list of instances for task.
+                 Input: _Task -- instance of Task
                    [Classmethod]
 
            getHeader: Returns header for dump of equipment list
@@ -67,6 +85,9 @@ Class TaskEquipment:
 Created on Wed 19Jun21. Version history:
 ----------------------------------------
  1.0: 20Jun21: First implementation
+ 1.1: 18Oct26: Dictionary index for getInstance
+ 1.2: 18Oct26: Adjacency index task -> TaskEquipment
+ 1.3: 18Oct26: Instance attributes declared in __slots__
 
 @author: kennethlong
 """
@@ -80,6 +101,9 @@ import Equipment as Eqp
 class TaskEquipment:
     __Debug = False
     instances = []
+    _Index    = {}
+    _ByTask   = {}
+    __slots__ = ("_Task", "_Equipment")
 
 #--------  "Built-in methods":
     def __init__(self, _Task=None, _Equipment=None):
@@ -101,6 +125,7 @@ class TaskEquipment:
                   "\n     Equipment:", self._Equipment)
 
         TaskEquipment.instances.append(self)
+        TaskEquipment.addToIndex(self)
 
     def __repr__(self):
         return "TaskEquipment(Name)"
@@ -122,17 +147,11 @@ class TaskEquipment:
 #--------  Get/set methods:
     @classmethod
     def getInstance(cls, _Task, _Equip):
-        InstList = []
         if TaskEquipment.__Debug:
             print(" TaskEquipment; getInstance: search for ",\
                   "TaskEquipment for Task:", _Task, " and Equipment:", \
                   _Equip)
-        for inst in cls.instances:
-            if TaskEquipment.__Debug:
-                print(" TaskEquipment; getInstance: instance:", \
-                      inst._Task, inst._Equipment)
-            if inst._Task == _Task and inst._Equipment == _Equip:
-                InstList.append(inst)
+        InstList = cls._Index.get((_Task, _Equip), [])
         Ninst = len(InstList)
         if Ninst == 0:
             RtnInst = None
@@ -146,6 +165,32 @@ class TaskEquipment:
             print(" TaskEquipment; getInstance: number of instances; ", \
                   " return instance:", Ninst, "\n ", RtnInst)
         return RtnInst
+
+    @classmethod
+    def addToIndex(cls, _Inst):
+        Key = (_Inst._Task, _Inst._Equipment)
+        if Key in cls._Index:
+            cls._Index[Key].append(_Inst)
+            if TaskEquipment.__Debug:
+                print(" TaskEquipment; addToIndex: duplicate instance for:", \
+                      Key)
+        else:
+            cls._Index[Key] = [_Inst]
+        if _Inst._Task in cls._ByTask:
+            cls._ByTask[_Inst._Task].append(_Inst)
+        else:
+            cls._ByTask[_Inst._Task] = [_Inst]
+
+    @classmethod
+    def buildIndex(cls):
+        cls._Index  = {}
+        cls._ByTask = {}
+        for iInst in cls.instances:
+            cls.addToIndex(iInst)
+
+    @classmethod
+    def getForTask(cls, _Task):
+        return cls._ByTask.get(_Task, [])
     
     @classmethod
     def getHeader(cls):
@@ -202,6 +247,7 @@ class TaskEquipment:
                 del iTskEqp
             except ValueError:
                 cls.instances.append(iTskEqp)
+        cls.buildIndex()
 
         return len(Deletions)
 
@@ -13,6 +13,37 @@ Class TaskStaff:
   -----------------
   __Debug : Boolean: set for debug print out
   instances: List of instances if the TaskEquipment class.
+  __slots__: Names of the instance attributes; instances carry no __dict__.
+  _Index   : Dictionary of instances keyed by (Task, Staff) instances.  
+             Each entry is a list so that duplicates are recorded as the 
+             instance is created.
+  _ByTask  : Dictionary of lists of instances keyed by Task instance 
+             (adjacency Task -> TaskStaff).
+  _ByStaff : Dictionary of lists of instances keyed by Staff instance
+             (adjacency Staff -> TaskStaff).
+
+  Effort tensor; one row per instance, rows padded to the longest year 
+  range with zeros:
+  _nRows     : Number of rows in use
+  _FracTensor: numpy array (rows, years, 4) staff fraction by year and 
+               quarter
+  _FracByYr  : numpy array (rows, years) staff fraction by year
+  _CostByYr  : numpy array (rows, years) staff cost by year (£k)
+  _CGCostByYr: numpy array (rows, years) staff cost by year for CG staff
+  _TotalFrac : numpy array (rows) total staff fraction
+  _TotalCost : numpy array (rows) total staff cost (£k)
+  _nYrs      : numpy array (rows) number of years filled for the row
+  _Filled    : numpy bool array (rows, 5) flags that the fraction by year
+               and quarter, fraction by year, total fraction, cost by year
+               and total cost have been set
+  _TaskIdx   : numpy int array (rows) index of task in _TaskKeys
+  _StaffIdx  : numpy int array (rows) index of staff in _StaffKeys
+  _InstIdx   : numpy int array (rows) index of institute in 
+               Staff.institutes (Staff._InstIdx)
+  _WPIdx     : numpy int array (rows) index of work package in _WPKeys
+  _TaskKeys  : List of Task instances referenced by _TaskIdx
+  _StaffKeys : List of Staff instances referenced by _StaffIdx
+  _WPKeys    : List of WorkPackage instances referenced by _WPIdx
 
 
   Instance attributes:
@@ -24,6 +55,12 @@ Class TaskStaff:
      _TotalStaffFrac      = Tofal staff fraction
      _StaffCostByYear     = Staff cost by year (£k)
      _TotalStaffCost      = Total staff cost (£k)
+     _CGStaffCostByYear   = Staff cost by year if staff is CG, else zero
+     _Row                 = Row of this instance in the effort tensor;
+                            None once the instance is removed by clean
+                            or clear
+     The fraction and cost attributes are read-only views into the effort
+     tensor; None until set.
 
     
   Methods:
@@ -39,10 +76,32 @@ Class TaskStaff:
       getInstance: Finds instance of class with specific Task and Staff
                    stored in the two instance attributes.
                  Input: _Task, _Equipment: Task and Project
-                Return: Instance of class; None if not found or if more than
-                        one instance
+                Return: Instance of class; None if not found.  Raises
+                        DuplicateTaskStaffClassInstance
+                        if more than one instance.  Uses _Index.
                    [Classmethod]
 
+       addToIndex: Add instance to _Index, _ByTask and _ByStaff; called 
+                   on instanciation.
+                   [Classmethod]
+
+       buildIndex: Rebuild indices from instances; called after clean and
+                   clear.
+                   [Classmethod]
+
+       getForTask: Return list of instances for task.
+                 Input: _Task -- instance of Task
+                   [Classmethod]
+
+      getForStaff: Return list of instances for member of staff.
+                 Input: _Staff -- instance of Staff
+                   [Classmethod]
+
+          getView: Return view of row of effort tensor array, None if the
+                   corresponding _Filled flag is not set.
+                 Input: _Col -- column of _Filled
+                        _Arr -- effort tensor array
+
      setStaffFracByYrNQtr: Set staff fraction by year and quarter
                 Input: numpy array
         
@@ -60,14 +119,89 @@ Class TaskStaff:
               Sums staff cost by year
 
 
+  Effort tensor methods:
+           newRow: Allocate (and zero) a row for a new instance
+                   [Classmethod]
+
+       setRowKeys: Fill task, staff and institute index columns of a row
+                   [Classmethod]
+
+           resize: Reallocate arrays with given numbers of rows and years
+                   [Classmethod]
+
+         setYears: Extend year axis if required
+                   [Classmethod]
+
+          compact: Move rows of surviving instances to the head of the
+                   arrays; called by clean.
+                   [Classmethod]
+
+         sumByRow: Sum year-by-year array over the years filled for each 
+                   row.
+                   [Classmethod]
+
+          getRows: Return numpy int array of rows of instances, in the 
+                   order of instances.
+                   [Classmethod]
+
+       getCosting: Return copy of the costed part of the effort tensor
+                   for a set of rows (fractions and costs by year, totals,
+                   years and filled flags) as a dictionary.
+                   Input: numpy int array of rows
+                   [Classmethod]
+
+       setCosting: Write costing returned by getCosting back into rows.
+                   Input: numpy int array of rows, dictionary
+                   [Classmethod]
+
+     getByQuarter: Return staff fraction, cost and CG cost by quarter of
+                   a set of costed rows as a dictionary of numpy arrays
+                   (rows, 4*years) keyed "FracByQtr", "CostByQtr" and
+                   "CGCostByQtr".  The cost of a quarter is a quarter of
+                   the annual cost times the fraction of the quarter, so
+                   the quarters of a year sum to the cost by year.
+                   Input: numpy int array of rows
+                   [Classmethod]
+
+
   Processing method:
-      clean: Delete incomplete instances of TaskStaff
+      clean: Delete incomplete instances of TaskStaff and compact the
+             effort tensor.
              [classmethod]
 
-      doCosting: Complete costing of TaskStaff.
+      doCosting: Complete costing of TaskStaff.  Fractions by year, 
+                 costs, CG costs and totals for all rows are evaluated in
+                 one pass over the effort tensor.
+                 Input: _Rows -- numpy int array of rows to cost; all rows
+                                 if None (default)
+                 [Classmethod]
+
+      costRows: Evaluate total fraction, costs, CG costs and total cost
+                of rows from their fractions by year.
+                 Input: _Rows -- numpy int array of rows
                  [Classmethod]
 
 
+  Validation methods:
+    getAllocation: Return total staff fraction of each member of staff by
+                   year and quarter, summed over all TaskStaff rows in one
+                   indexed reduction (np.add.at).
+                   Input: _Rows -- numpy int array of rows; all rows with
+                                   fractions set if None (default)
+                   Return: numpy array (len(_StaffKeys), years, 4)
+                   [Classmethod]
+
+  checkAllocation: Find members of staff allocated more than a limit in
+                   any quarter.  Cost is linear in the number of rows.
+                   Input: _Limit -- maximum total staff fraction; 1.0
+                                    (default)
+                   Return: list of (Staff instance, index of year, index
+                           of quarter, total fraction, excess fraction,
+                           list of Task instances contributing), ordered
+                           by staff, year and quarter
+                   [Classmethod]
+
+
   Exceptions:
      DuplicateTaskStaffClassInstance
 
@@ -79,6 +213,19 @@ Class TaskStaff:
 Created on Wed 19Jun21. Version history:
 ----------------------------------------
  1.0: 20Jun21: First implementation
+ 1.1: 18Oct26: Dictionary index for getInstance
+ 1.2: 18Oct26: Adjacency indices task -> TaskStaff and staff -> TaskStaff
+ 1.3: 18Oct26: Dense effort tensor; instances are views into it and 
+               doCosting is vectorised.
+ 1.4: 18Oct26: doCosting of a subset of rows; get/setCosting for 
+               incremental recosting
+ 1.5: 18Oct26: getByQuarter for quarterly costing
+ 1.6: 18Oct26: Staff over-allocation check (getAllocation, 
+               checkAllocation)
+ 1.7: 18Oct26: Instance attributes declared in __slots__
+ 1.8: 18Oct26: Work package and institute codes of each row; CG flag
+               taken from the staff funding index
+ 1.9: 18Oct26: costRows; costing of rows from their fractions by year
 
 @author: kennethlong
 """
@@ -91,6 +238,37 @@ import Staff as Stff
 class TaskStaff:
     __Debug = False
     instances = []
+    _Index    = {}
+    _ByTask   = {}
+    _ByStaff  = {}
+    __slots__ = ("_Task", "_Staff", "_Row")
+
+    _nRows      = 0
+    _FracTensor = np.zeros((0, 0, 4))
+    _FracByYr   = np.zeros((0, 0))
+    _CostByYr   = np.zeros((0, 0))
+    _CGCostByYr = np.zeros((0, 0))
+    _TotalFrac  = np.zeros(0)
+    _TotalCost  = np.zeros(0)
+    _nYrs       = np.zeros(0, dtype=int)
+    _Filled     = np.zeros((0, 5), dtype=bool)
+    _TaskIdx    = np.zeros(0, dtype=int)
+    _StaffIdx   = np.zeros(0, dtype=int)
+    _InstIdx    = np.zeros(0, dtype=int)
+    _WPIdx      = np.zeros(0, dtype=int)
+    _TaskKeys   = []
+    _StaffKeys  = []
+    _WPKeys     = []
+    _TaskCodes  = {}
+    _StaffCodes = {}
+    _WPCodes    = {}
+
+    #.. Columns of _Filled:
+    _FRAC    = 0
+    _FRACYR  = 1
+    _TOTFRAC = 2
+    _COST    = 3
+    _TOTCOST = 4
 
 #--------  "Built-in methods":
     def __init__(self, _Task=None, _Staff=None):
@@ -109,14 +287,11 @@ class TaskStaff:
         self._Task  = _Task
         self._Staff = _Staff
 
-        #.. Defined, but not filled, at init:
-        self._StaffFracByYrNQtr   = None
-        self._StaffFracByYear     = None
-        self._TotalStaffFrac      = None
-        self._StaffCostByYear     = None
-        self._TotalStaffCost      = None
+        #.. Row in effort tensor; defined, but not filled, at init:
+        self._Row = TaskStaff.newRow(self)
 
         TaskStaff.instances.append(self)
+        TaskStaff.addToIndex(self)
         if TaskStaff.__Debug:
             print(" TaskStaff; __init__:"
                   "\n     Task:", self._Task, \
@@ -135,19 +310,46 @@ class TaskStaff:
         return "     <---- TaskStaff: complete."
     
 
+#--------  Views into effort tensor:
+    def getView(self, _Col, _Arr):
+        if self._Row == None or not TaskStaff._Filled[self._Row, _Col]:
+            return None
+        if _Arr.ndim == 1:
+            return _Arr[self._Row]
+        return _Arr[self._Row, :TaskStaff._nYrs[self._Row]]
+
+    @property
+    def _StaffFracByYrNQtr(self):
+        return self.getView(TaskStaff._FRAC, TaskStaff._FracTensor)
+
+    @property
+    def _StaffFracByYear(self):
+        return self.getView(TaskStaff._FRACYR, TaskStaff._FracByYr)
+
+    @property
+    def _TotalStaffFrac(self):
+        return self.getView(TaskStaff._TOTFRAC, TaskStaff._TotalFrac)
+
+    @property
+    def _StaffCostByYear(self):
+        return self.getView(TaskStaff._COST, TaskStaff._CostByYr)
+
+    @property
+    def _CGStaffCostByYear(self):
+        return self.getView(TaskStaff._COST, TaskStaff._CGCostByYr)
+
+    @property
+    def _TotalStaffCost(self):
+        return self.getView(TaskStaff._TOTCOST, TaskStaff._TotalCost)
+
+
 #--------  Get/set methods:
     @classmethod
     def getInstance(cls, _Task, _Staff):
-        InstList = []
         if TaskStaff.__Debug:
             print(" TaskStaff; getInstance: search for Task and Staff:", \
                   _Task._Name, _Staff._NameOrPost)
-        for inst in cls.instances:
-            if TaskStaff.__Debug:
-                print(" TaskStaff; getInstance: instance Task, Staff:", \
-                      _Task._Name, _Staff._NameOrPost)
-            if inst._Task == _Task and inst._Staff == _Staff:
-                InstList.append(inst)
+        InstList = cls._Index.get((_Task, _Staff), [])
         Ninst = len(InstList)
         if Ninst == 0:
             RtnInst = None
@@ -163,23 +365,203 @@ class TaskStaff:
                   Ninst, "\n ", RtnInst)
         return RtnInst
 
+    @classmethod
+    def addToIndex(cls, _Inst):
+        Key = (_Inst._Task, _Inst._Staff)
+        if Key in cls._Index:
+            cls._Index[Key].append(_Inst)
+            if TaskStaff.__Debug:
+                print(" TaskStaff; addToIndex: duplicate instance for:", Key)
+        else:
+            cls._Index[Key] = [_Inst]
+        if _Inst._Task in cls._ByTask:
+            cls._ByTask[_Inst._Task].append(_Inst)
+        else:
+            cls._ByTask[_Inst._Task] = [_Inst]
+        if _Inst._Staff in cls._ByStaff:
+            cls._ByStaff[_Inst._Staff].append(_Inst)
+        else:
+            cls._ByStaff[_Inst._Staff] = [_Inst]
+
+    @classmethod
+    def buildIndex(cls):
+        cls._Index      = {}
+        cls._ByTask     = {}
+        cls._ByStaff    = {}
+        cls._TaskKeys   = []
+        cls._StaffKeys  = []
+        cls._TaskCodes  = {}
+        cls._StaffCodes = {}
+        cls._WPKeys     = []
+        cls._WPCodes    = {}
+        for iInst in cls.instances:
+            cls.addToIndex(iInst)
+            cls.setRowKeys(iInst._Row, iInst)
+
+    @classmethod
+    def getForTask(cls, _Task):
+        return cls._ByTask.get(_Task, [])
+
+    @classmethod
+    def getForStaff(cls, _Staff):
+        return cls._ByStaff.get(_Staff, [])
+
     def setStaffFracByYrNQtr(self, _StaffFracByYrNQtr):
-        self._StaffFracByYrNQtr = _StaffFracByYrNQtr
+        nYrs = _StaffFracByYrNQtr.shape[0]
+        TaskStaff.setYears(nYrs)
+        TaskStaff._FracTensor[self._Row]          = 0.
+        TaskStaff._FracTensor[self._Row, :nYrs, :] = _StaffFracByYrNQtr
+        TaskStaff._nYrs[self._Row]                = nYrs
+        TaskStaff._Filled[self._Row, TaskStaff._FRAC] = True
         
     def setStaffFracByYear(self):
-        self._StaffFracByYear = np.average(self._StaffFracByYrNQtr, 1)
+        nYrs = TaskStaff._nYrs[self._Row]
+        TaskStaff._FracByYr[self._Row]        = 0.
+        TaskStaff._FracByYr[self._Row, :nYrs] = \
+            np.average(self._StaffFracByYrNQtr, 1)
+        TaskStaff._Filled[self._Row, TaskStaff._FRACYR] = True
         
     def setTotalStaffFrac(self):
-        self._TotalStaffFrac = np.sum(self._StaffFracByYear)
+        TaskStaff._TotalFrac[self._Row] = np.sum(self._StaffFracByYear)
+        TaskStaff._Filled[self._Row, TaskStaff._TOTFRAC] = True
 
     def setStaffCostByYear(self):
         AnnualCost = self._Staff._AnnualCost
         StfFrcByYr = self._StaffFracByYear
-        self._StaffCostByYear = AnnualCost * StfFrcByYr
+        nYrs       = TaskStaff._nYrs[self._Row]
+        TaskStaff._CostByYr[self._Row]          = 0.
+        TaskStaff._CostByYr[self._Row, :nYrs]   = AnnualCost * StfFrcByYr
+        TaskStaff._CGCostByYr[self._Row]        = 0.
+        if self._Staff._FundIdx == Stff.Staff._CG:
+            TaskStaff._CGCostByYr[self._Row, :nYrs] = \
+                TaskStaff._CostByYr[self._Row, :nYrs]
+        TaskStaff._Filled[self._Row, TaskStaff._COST] = True
 
     def setTotalStaffCost(self):
-        self._TotalStaffCost = np.sum(self._StaffCostByYear)
+        TaskStaff._TotalCost[self._Row] = np.sum(self._StaffCostByYear)
+        TaskStaff._Filled[self._Row, TaskStaff._TOTCOST] = True
+        
+
+#--------  Effort tensor management:
+    @classmethod
+    def newRow(cls, _Inst):
+        if cls._nRows == cls._FracTensor.shape[0]:
+            cls.resize(max(16, 2*cls._nRows), cls._FracTensor.shape[1])
+        Row = cls._nRows
+        cls._nRows += 1
+        cls._FracTensor[Row] = 0.
+        cls._FracByYr[Row]   = 0.
+        cls._CostByYr[Row]   = 0.
+        cls._CGCostByYr[Row] = 0.
+        cls._TotalFrac[Row]  = 0.
+        cls._TotalCost[Row]  = 0.
+        cls._nYrs[Row]       = 0
+        cls._Filled[Row]     = False
+        cls.setRowKeys(Row, _Inst)
+        return Row
+
+    @classmethod
+    def setRowKeys(cls, _Row, _Inst):
+        if not _Inst._Task in cls._TaskCodes:
+            cls._TaskCodes[_Inst._Task] = len(cls._TaskKeys)
+            cls._TaskKeys.append(_Inst._Task)
+        if not _Inst._Staff in cls._StaffCodes:
+            cls._StaffCodes[_Inst._Staff] = len(cls._StaffKeys)
+            cls._StaffKeys.append(_Inst._Staff)
+        cls._TaskIdx[_Row]  = cls._TaskCodes[_Inst._Task]
+        cls._StaffIdx[_Row] = cls._StaffCodes[_Inst._Staff]
+        cls._InstIdx[_Row]  = -1
+        if isinstance(_Inst._Staff, Stff.Staff):
+            cls._InstIdx[_Row] = _Inst._Staff._InstIdx
+        cls._WPIdx[_Row]    = -1
+        if isinstance(_Inst._Task, Tsk.Task):
+            iWP = _Inst._Task._WorkPackage
+            if not iWP in cls._WPCodes:
+                cls._WPCodes[iWP] = len(cls._WPKeys)
+                cls._WPKeys.append(iWP)
+            cls._WPIdx[_Row] = cls._WPCodes[iWP]
+
+    @classmethod
+    def resize(cls, _nRowsMax, _nYrsMax):
+        n   = cls._nRows
+        nYr = cls._FracTensor.shape[1]
         
+        FracTensor = np.zeros((_nRowsMax, _nYrsMax, 4))
+        FracTensor[:n, :nYr, :] = cls._FracTensor[:n]
+        cls._FracTensor = FracTensor
+        for Name in ("_FracByYr", "_CostByYr", "_CGCostByYr"):
+            Arr = np.zeros((_nRowsMax, _nYrsMax))
+            Arr[:n, :nYr] = getattr(cls, Name)[:n]
+            setattr(cls, Name, Arr)
+        for Name, dType in (("_TotalFrac", float), ("_TotalCost", float), \
+                            ("_nYrs", int), ("_TaskIdx", int), \
+                            ("_StaffIdx", int), ("_InstIdx", int), \
+                            ("_WPIdx", int)):
+            Arr = np.zeros(_nRowsMax, dtype=dType)
+            Arr[:n] = getattr(cls, Name)[:n]
+            setattr(cls, Name, Arr)
+        Filled = np.zeros((_nRowsMax, 5), dtype=bool)
+        Filled[:n] = cls._Filled[:n]
+        cls._Filled = Filled
+
+    @classmethod
+    def setYears(cls, _nYrs):
+        if _nYrs > cls._FracTensor.shape[1]:
+            cls.resize(cls._FracTensor.shape[0], _nYrs)
+
+    @classmethod
+    def compact(cls):
+        Rows = np.array([iTskStf._Row for iTskStf in cls.instances], \
+                        dtype=int)
+        n    = len(Rows)
+        for Name in ("_FracTensor", "_FracByYr", "_CostByYr", \
+                     "_CGCostByYr", "_TotalFrac", "_TotalCost", "_nYrs", \
+                     "_Filled"):
+            Arr = getattr(cls, Name)
+            Arr[:n] = Arr[Rows]
+        for iRow, iTskStf in enumerate(cls.instances):
+            iTskStf._Row = iRow
+        cls._nRows = n
+
+    @classmethod
+    def getRows(cls):
+        return np.array([iTskStf._Row for iTskStf in cls.instances], \
+                        dtype=int)
+
+    @classmethod
+    def getCosting(cls, _Rows):
+        nYr = 0
+        if len(_Rows) > 0:
+            nYr = int(np.max(cls._nYrs[_Rows]))
+        return {"nYrs"      : cls._nYrs[_Rows].copy(), \
+                "FracByYr"  : cls._FracByYr[_Rows, :nYr].copy(), \
+                "CostByYr"  : cls._CostByYr[_Rows, :nYr].copy(), \
+                "CGCostByYr": cls._CGCostByYr[_Rows, :nYr].copy(), \
+                "TotalFrac" : cls._TotalFrac[_Rows].copy(), \
+                "TotalCost" : cls._TotalCost[_Rows].copy(), \
+                "Filled"    : cls._Filled[_Rows].copy()}
+
+    @classmethod
+    def setCosting(cls, _Rows, _Costing):
+        nYr = _Costing["FracByYr"].shape[1]
+        cls.setYears(nYr)
+        cls._nYrs[_Rows]               = _Costing["nYrs"]
+        cls._FracByYr[_Rows, :nYr]     = _Costing["FracByYr"]
+        cls._CostByYr[_Rows, :nYr]     = _Costing["CostByYr"]
+        cls._CGCostByYr[_Rows, :nYr]   = _Costing["CGCostByYr"]
+        cls._TotalFrac[_Rows]          = _Costing["TotalFrac"]
+        cls._TotalCost[_Rows]          = _Costing["TotalCost"]
+        cls._Filled[_Rows]             = _Costing["Filled"]
+
+    @classmethod
+    def sumByRow(cls, _Arr, _Rows):
+        Total = np.zeros(len(_Rows))
+        nYrs  = cls._nYrs[_Rows]
+        for nYr in np.unique(nYrs):
+            Sel        = nYrs == nYr
+            Total[Sel] = np.sum(_Arr[_Rows[Sel], :nYr], axis=1)
+        return Total
+
 
 #--------  Processing methods:
     @classmethod
@@ -198,6 +580,7 @@ class TaskStaff:
                not isinstance(iTskStf._StaffFracByYear, np.ndarray) or \
                np.isnan(iTskStf._TotalStaffFrac) or \
                iTskStf._TotalStaffFrac == None:
+                iTskStf._Row = None
                 del iTskStf
                 nDel += 1
                 if cls.__Debug:
@@ -207,6 +590,8 @@ class TaskStaff:
                     print("    ----> Keep!")
                 NewInst.append(iTskStf)
         cls.instances = NewInst
+        cls.compact()
+        cls.buildIndex()
         return nDel
 
         
@@ -220,19 +605,102 @@ class TaskStaff:
         for iTskStf in OldInst:
             if cls.__Debug:
                 print(iTskStf)
+            iTskStf._Row = None
             del iTskStf
             nDel += 1
             if cls.__Debug:
                 print("    ----> Deleted!")
         cls.instances = NewInst
+        cls._nRows    = 0
+        cls.buildIndex()
         return nDel
 
         
     @classmethod
-    def doCosting(cls):
-        for iTskStf in cls.instances:
-            iTskStf.setStaffCostByYear()
-            iTskStf.setTotalStaffCost()
+    def getByQuarter(cls, _Rows):
+        AnnualCost = np.array([iStf._AnnualCost \
+                               for iStf in cls._StaffKeys], dtype=float)
+        CG         = Stff.Staff.isCG(cls._StaffKeys)
+        StfIdx     = cls._StaffIdx[_Rows]
+        FracByQtr  = cls._FracTensor[_Rows].reshape(len(_Rows), -1)
+        CostByQtr  = AnnualCost[StfIdx][:,None] / 4. * FracByQtr
+        return {"FracByQtr"  : FracByQtr, \
+                "CostByQtr"  : CostByQtr, \
+                "CGCostByQtr": np.where(CG[StfIdx][:,None], CostByQtr, 0.)}
+
+    @classmethod
+    def doCosting(cls, _Rows=None):
+        Rows = cls.getRows()
+        if _Rows is not None:
+            Rows = Rows[np.isin(Rows, _Rows)]
+        if len(Rows) == 0:
+            return
+
+        #.. Fractions by year:
+        Rows = Rows[cls._Filled[Rows, cls._FRAC]]
+        cls._FracByYr[Rows]  = np.mean(cls._FracTensor[Rows], axis=2)
+
+        #.. Total fraction and costs:
+        cls.costRows(Rows)
+        cls._Filled[Rows, cls._FRACYR]  = True
+        cls._Filled[Rows, cls._TOTFRAC] = True
+        cls._Filled[Rows, cls._COST]    = True
+        cls._Filled[Rows, cls._TOTCOST] = True
+
+    @classmethod
+    def costRows(cls, _Rows):
+        Rows = _Rows
+        cls._TotalFrac[Rows] = cls.sumByRow(cls._FracByYr, Rows)
+
+        #.. Costs; annual cost and CG flag looked up by staff index:
+        AnnualCost = np.array([iStf._AnnualCost \
+                               for iStf in cls._StaffKeys], dtype=float)
+        CG         = Stff.Staff.isCG(cls._StaffKeys)
+        StfIdx     = cls._StaffIdx[Rows]
+        cls._CostByYr[Rows]   = AnnualCost[StfIdx][:,None] * \
+                                cls._FracByYr[Rows]
+        cls._CGCostByYr[Rows] = np.where(CG[StfIdx][:,None], \
+                                         cls._CostByYr[Rows], 0.)
+        cls._TotalCost[Rows]  = cls.sumByRow(cls._CostByYr, Rows)
+
+
+#--------  Validation methods:
+    @classmethod
+    def getAllocation(cls, _Rows=None):
+        Rows = _Rows
+        if Rows is None:
+            Rows = cls.getRows()
+            Rows = Rows[cls._Filled[Rows, cls._FRAC]]
+        Alloc = np.zeros((len(cls._StaffKeys),) + cls._FracTensor.shape[1:])
+        np.add.at(Alloc, cls._StaffIdx[Rows], cls._FracTensor[Rows])
+        return Alloc
+
+    @classmethod
+    def checkAllocation(cls, _Limit=1.):
+        Rows  = cls.getRows()
+        Rows  = Rows[cls._Filled[Rows, cls._FRAC]]
+        Alloc = cls.getAllocation(Rows)
+        Over  = Alloc > _Limit + 1.E-9
+
+        #.. Rows contributing to an over-allocated quarter:
+        Cntrb = np.logical_and(Over[cls._StaffIdx[Rows]], \
+                               cls._FracTensor[Rows] > 0.)
+        iRow, iYr, iQtr = np.nonzero(Cntrb)
+        Tasks = {}
+        for Row, Yr, Qtr in zip(Rows[iRow], iYr, iQtr):
+            Tasks.setdefault((cls._StaffIdx[Row], Yr, Qtr), []).append( \
+                                         cls._TaskKeys[cls._TaskIdx[Row]])
+
+        Offenders = []
+        for iStf, Yr, Qtr in zip(*np.nonzero(Over)):
+            Offenders.append((cls._StaffKeys[iStf], int(Yr), int(Qtr), \
+                              Alloc[iStf, Yr, Qtr], \
+                              Alloc[iStf, Yr, Qtr] - _Limit, \
+                              Tasks.get((iStf, Yr, Qtr), [])))
+        if cls.__Debug:
+            print(" TaskStaff; checkAllocation:", len(Offenders), \
+                  "over-allocated staff quarters")
+        return Offenders
 
 
 #--------  Exceptions:
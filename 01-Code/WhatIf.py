@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Class WhatIf:
+=============
+
+  What-if session.  The control file, staff database and work package
+  definitions are loaded once from the usual HOMEPATH inputs and costed.
+  Edits to staff fractions, annual costs and equipment costs are then
+  applied by propagating only the change ("delta") up the hierarchy:
+
+    TaskStaff row -> Task -> WorkPackage -> Project
+
+  For a staff or equipment delta, dS, dCG and dE by year, the derived
+  work package quantities change by (factors as Control.getFactorsByYr):
+    inflation       : InflationStaff*dS + InflationEquipment*dE
+    working margin  : WorkingMargin*(dS + dE)
+    contingency     : ContingencyMaterial*dE (equipment);
+                      ContingencyStaffPrj*(dS - dCG) +
+                      ContingencyStaffCG*dCG (staff)
+  and the totals are re-summed over the years of the instances touched.
+  The cost of an edit therefore scales with the number of TaskStaff rows
+  or TaskEquipment instances it touches, not with the size of the
+  project.  Delta updates accumulate rounding; recost re-runs the full
+  costing when an exact baseline is needed.
+
+  The data model is held in the class attributes of TaskStaff, Task,
+  WorkPackage and Project, so only one session can be active at a time.
+  The session uses its own costing context, read from the control file
+  in HOMEPATH (Control.newContext), and leaves the default context
+  unchanged.
+
+
+  Class attributes:
+  -----------------
+  __Debug : Boolean: set for debug print out
+
+
+  Instance attributes:
+  --------------------
+    _HomePath: Directory holding the inputs
+    _Cntrl   : Costing context of the session
+    _Project : Instance of Project
+    _Fctr    : Factor vectors of the costing context
+
+
+  Methods:
+  --------
+  Built-in methods __init__, __repr__ and __str__.
+      __init__: Load inputs and cost the project.
+                 Input: _HomePath -- directory holding inputs; environment
+                                     variable HOMEPATH if None (default)
+      __repr__: One liner with call.
+      __str__ : Dump of project totals.
+
+  I/o methods:
+      getInputs: Return paths to control file, staff database and work
+                 package directory, using the same layouts as the run
+                 script.
+                 Input: _HomePath
+                Raises: NoInputs
+                 [Classmethod]
+
+  Get methods:
+      getTaskStaff: Return TaskStaff instance of the task of a work
+                    package and the staff member of an institute
+                    (Task.getInstance, getStaff and
+                    TaskStaff.getInstance).
+                 Input: _WPCode, _TaskName, _InstCode, _StaffCode
+                Raises: InvalidEdit if not found
+
+      getStaff: Return Staff instance with institute and staff code
+                (Staff.getInstance).
+                 Input: _InstCode, _StaffCode
+                Raises: InvalidEdit if not found
+
+      getEquipment: Return Equipment instance with name.
+                Raises: InvalidEdit if not found
+
+      getTotals: Return totals.
+                 Input: _Tasks -- tasks to report; all if None (default)
+                        _WPs   -- work packages to report; all if None
+                Return: dictionary:
+                          "Tasks"       : staff plus equipment cost of
+                                          each task, keyed by (work
+                                          package code, task name)
+                          "WorkPackages": grand total of each work
+                                          package, keyed by code
+                          "Project"     : grand total of project
+
+      getWorkPackages: Return work packages of list of tasks, without
+                 repeats.
+
+  Edit methods; each returns the totals (see getTotals) of the tasks and
+  work packages touched and of the project:
+      setTaskStaffFraction: Set staff fraction of a quarter.
+                 Input: _TskStf -- instance of TaskStaff
+                        _Yr     -- index of year, from 0
+                        _Qtr    -- index of quarter, from 0
+                        _Frac   -- fraction
+                Raises: InvalidEdit if year or quarter out of range
+
+      setStaffAnnualCost: Set annual cost of member of staff.
+                 Input: _Stf        -- instance of Staff
+                        _AnnualCost -- annual cost (£k)
+
+      setEquipmentCost: Set cost by year of equipment item.
+                 Input: _Eqp        -- instance of Equipment
+                        _CostByYear -- numpy array (£k); same length as
+                                       the present cost by year
+                Raises: InvalidEdit if the length differs
+
+  Processing methods:
+      propagate: Add staff and equipment deltas to a task, its work
+                 package and the project.
+                 Input: _Tsk               -- instance of Task
+                        _dFrac, _dS, _dCG  -- staff fraction, staff cost
+                                              and CG staff cost deltas
+                                              by year; None if no change
+                        _dE                -- equipment cost delta by
+                                              year; None if no change
+
+      add: Return sum of vector and delta vector; the shorter of the two
+           is padded with zeros.  Delta of None returns the vector.
+                 [Classmethod]
+
+      recost: Re-run the full costing of the session.
+
+
+  Exceptions:
+    NoInputs   : inputs not found in HOMEPATH
+
+    InvalidEdit: item not found or edit out of range
+
+
+Created on Sun 18Oct26. Version history:
+----------------------------------------
+ 1.0: 18Oct26: First implementation
+ 1.1: 18Oct26: CG flag taken from the staff funding index
+ 1.2: 18Oct26: getStaff by institute and staff code; staff cleared with
+               Staff.clear
+ 1.3: 18Oct26: getTaskStaff by institute as well as staff code
+
+@author: kennethlong
+"""
+
+import os
+import numpy as np
+
+import Control          as Cntrl
+import Equipment        as Eqp
+import LhARACostingTool as LCT
+import Project          as Prj
+import Staff            as Stf
+import Task             as Tsk
+import TaskEquipment    as TskEqp
+import TaskStaff        as TskStf
+import WorkPackage      as wp
+
+class WhatIf:
+    __Debug = False
+
+#--------  "Built-in methods":
+    def __init__(self, _HomePath=None):
+        self._HomePath = _HomePath
+        if self._HomePath == None:
+            self._HomePath = os.getenv('HOMEPATH')
+        ControlFile, StaffDatabaseFile, wpDirectory = \
+            WhatIf.getInputs(self._HomePath)
+
+        self._Cntrl = Cntrl.Control.newContext(ControlFile)
+
+        iLCT = LCT.LhARACostingTool(False)
+        iLCT.ClearDataStructure()
+        Stf.Staff.clear()
+        Stf.Staff.parseStaffDatabase(StaffDatabaseFile)
+        Stf.Staff.cleanStaffDatabase()
+        wp.WorkPackage.ingest([os.path.join(wpDirectory, wpFile) \
+                               for wpFile in sorted(os.listdir(wpDirectory)) \
+                               if wpFile.find('.csv') > 0])
+        self.recost()
+
+    def __repr__(self):
+        return "WhatIf(HomePath)"
+
+    def __str__(self):
+        Totals = self.getTotals()
+        print(" WhatIf session: inputs from:", self._HomePath)
+        for Code in Totals["WorkPackages"]:
+            print("     ", Code, "grand total:", \
+                  Totals["WorkPackages"][Code])
+        print("      Project grand total:", Totals["Project"])
+        return "     <---- Done."
+
+#--------  I/o methods:
+    @classmethod
+    def getInputs(cls, _HomePath):
+        if _HomePath == None or not os.path.isdir(_HomePath):
+            raise NoInputs(" WhatIf; getInputs: no input directory ", \
+                           _HomePath)
+        Paths = []
+        for Options in ((('10-Control', 'Control'), \
+                         'LhARA-costing-tool-control.csv'), \
+                        (('12-Staff', 'StaffDatabase'), \
+                         'StaffDatabase.csv'), \
+                        (('11-WorkPackages', 'WorkPackages'), None)):
+            Dirs, File = Options
+            Found = None
+            for Dir in Dirs:
+                if os.path.isdir(os.path.join(_HomePath, Dir)):
+                    Found = os.path.join(_HomePath, Dir)
+                    if File != None:
+                        Found = os.path.join(Found, File)
+                    break
+            if Found == None:
+                raise NoInputs(" WhatIf; getInputs: can not find ", \
+                               Dirs, " in ", _HomePath)
+            Paths.append(Found)
+        return Paths
+
+#--------  Get methods:
+    def getTaskStaff(self, _WPCode, _TaskName, _InstCode, _StaffCode):
+        iStf    = self.getStaff(_InstCode, _StaffCode)
+        iTskStf = None
+        for iWP in wp.WorkPackage.instances:
+            if iWP._Code != _WPCode:
+                continue
+            iTsk = Tsk.Task.getInstance(_TaskName, iWP)
+            if iTsk != None:
+                iTskStf = TskStf.TaskStaff.getInstance(iTsk, iStf)
+            break
+        if iTskStf == None:
+            raise InvalidEdit(" WhatIf; getTaskStaff: not found: ", \
+                              _WPCode, _TaskName, _InstCode, _StaffCode)
+        return iTskStf
+
+    def getStaff(self, _InstCode, _StaffCode):
+        iStf = Stf.Staff.getInstance(_InstCode, _StaffCode)
+        if iStf == None:
+            raise InvalidEdit(" WhatIf; getStaff: not found: ", \
+                              _InstCode, _StaffCode)
+        return iStf
+
+    def getEquipment(self, _Name):
+        for iEqp in Eqp.Equipment.instances:
+            if iEqp._Name == _Name:
+                return iEqp
+        raise InvalidEdit(" WhatIf; getEquipment: not found: ", _Name)
+
+    def getTotals(self, _Tasks=None, _WPs=None):
+        Tasks = _Tasks
+        if Tasks == None:
+            Tasks = Tsk.Task.instances
+        WPs = _WPs
+        if WPs == None:
+            WPs = wp.WorkPackage.instances
+        return {"Tasks"       : {(iTsk._WorkPackage._Code, iTsk._Name): \
+                                 iTsk._TotalStaffCost + \
+                                 iTsk._TotalEquipmentCost \
+                                 for iTsk in Tasks}, \
+                "WorkPackages": {iWP._Code: iWP._GrandTotal \
+                                 for iWP in WPs}, \
+                "Project"     : self._Project.getTotalProjectCost()}
+
+    def getWorkPackages(self, _Tasks):
+        WPs = []
+        for iTsk in _Tasks:
+            if not iTsk._WorkPackage in WPs:
+                WPs.append(iTsk._WorkPackage)
+        return WPs
+
+#--------  Edit methods:
+    def setTaskStaffFraction(self, _TskStf, _Yr, _Qtr, _Frac):
+        TS  = TskStf.TaskStaff
+        Row = _TskStf._Row
+        if Row == None or not TS._Filled[Row, TS._COST] or \
+           _Yr < 0 or _Yr >= TS._nYrs[Row] or _Qtr < 0 or _Qtr > 3:
+            raise InvalidEdit(" WhatIf; setTaskStaffFraction: ", \
+                              "year, quarter out of range: ", _Yr, _Qtr)
+        nYr = TS._nYrs[Row]
+
+        OldFrac = TS._FracByYr[Row, :nYr].copy()
+        OldCost = TS._CostByYr[Row, :nYr].copy()
+        OldCG   = TS._CGCostByYr[Row, :nYr].copy()
+        TS._FracTensor[Row, _Yr, _Qtr] = _Frac
+        TS._FracByYr[Row, _Yr] = np.mean(TS._FracTensor[Row, _Yr])
+        TS._TotalFrac[Row]     = np.sum(TS._FracByYr[Row, :nYr])
+        TS._CostByYr[Row, _Yr] = _TskStf._Staff._AnnualCost * \
+                                 TS._FracByYr[Row, _Yr]
+        if _TskStf._Staff._FundIdx == Stf.Staff._CG:
+            TS._CGCostByYr[Row, _Yr] = TS._CostByYr[Row, _Yr]
+        TS._TotalCost[Row]     = np.sum(TS._CostByYr[Row, :nYr])
+
+        iTsk = _TskStf._Task
+        self.propagate(iTsk, TS._FracByYr[Row, :nYr] - OldFrac, \
+                       TS._CostByYr[Row, :nYr] - OldCost, \
+                       TS._CGCostByYr[Row, :nYr] - OldCG, None)
+        return self.getTotals([iTsk], [iTsk._WorkPackage])
+
+    def setStaffAnnualCost(self, _Stf, _AnnualCost):
+        TS    = TskStf.TaskStaff
+        _Stf._AnnualCost = _AnnualCost
+        Tasks = []
+        for iTskStf in TS.getForStaff(_Stf):
+            Row = iTskStf._Row
+            if Row == None or not TS._Filled[Row, TS._COST]:
+                continue
+            nYr     = TS._nYrs[Row]
+            OldCost = TS._CostByYr[Row, :nYr].copy()
+            OldCG   = TS._CGCostByYr[Row, :nYr].copy()
+            TS._CostByYr[Row, :nYr] = _AnnualCost * TS._FracByYr[Row, :nYr]
+            if _Stf._FundIdx == Stf.Staff._CG:
+                TS._CGCostByYr[Row, :nYr] = TS._CostByYr[Row, :nYr]
+            TS._TotalCost[Row] = np.sum(TS._CostByYr[Row, :nYr])
+            self.propagate(iTskStf._Task, None, \
+                           TS._CostByYr[Row, :nYr] - OldCost, \
+                           TS._CGCostByYr[Row, :nYr] - OldCG, None)
+            if not iTskStf._Task in Tasks:
+                Tasks.append(iTskStf._Task)
+        return self.getTotals(Tasks, self.getWorkPackages(Tasks))
+
+    def setEquipmentCost(self, _Eqp, _CostByYear):
+        CostByYear = np.asarray(_CostByYear, dtype=float)
+        if len(CostByYear) != len(_Eqp._EquipmentCostByYear):
+            raise InvalidEdit(" WhatIf; setEquipmentCost: ", \
+                              "length of cost by year: ", len(CostByYear))
+        dE = CostByYear - _Eqp._EquipmentCostByYear
+        _Eqp.setEquipmentCost(CostByYear)
+        _Eqp.setTotalEquipmentCost()
+        Tasks = []
+        for iTskEqp in TskEqp.TaskEquipment.instances:
+            if iTskEqp._Equipment is _Eqp:
+                self.propagate(iTskEqp._Task, None, None, None, dE)
+                if not iTskEqp._Task in Tasks:
+                    Tasks.append(iTskEqp._Task)
+        return self.getTotals(Tasks, self.getWorkPackages(Tasks))
+
+#--------  Processing methods:
+    def propagate(self, _Tsk, _dFrac, _dS, _dCG, _dE):
+        iWP  = _Tsk._WorkPackage
+        Fctr = self._Fctr
+        nYrs = len(Fctr["WorkingMargin"])
+        dS   = WhatIf.add(np.zeros(nYrs), _dS)
+        dCG  = WhatIf.add(np.zeros(nYrs), _dCG)
+        dE   = WhatIf.add(np.zeros(nYrs), _dE)
+
+        #.. Task:
+        if _dFrac is not None:
+            _Tsk._StaffFracByYear = WhatIf.add(_Tsk._StaffFracByYear, _dFrac)
+            _Tsk.setTotalStaffFrac()
+        if _dS is not None:
+            _Tsk._StaffCostByYear   = WhatIf.add(_Tsk._StaffCostByYear, _dS)
+            _Tsk._CGStaffCostByYear = WhatIf.add(_Tsk._CGStaffCostByYear, \
+                                                 _dCG)
+            _Tsk.setTotalStaffCost()
+        if _dE is not None:
+            _Tsk.setEquipmentCostByYear( \
+                              WhatIf.add(_Tsk._EquipmentCostByYear, _dE))
+            _Tsk.setTotalEquipmentCost()
+
+        #.. Work package:
+        dInfl  = Fctr["InflationStaff"] * dS + \
+                 Fctr["InflationEquipment"] * dE
+        dWM    = (dS + dE) * Fctr["WorkingMargin"]
+        dCntE  = dE * Fctr["ContingencyMaterial"]
+        dCntCG = dCG * Fctr["ContingencyStaffCG"]
+        dCntS  = (dS - dCG) * Fctr["ContingencyStaffPrj"] + dCntCG
+        if _dFrac is not None:
+            iWP._StaffFracByYear = WhatIf.add(iWP._StaffFracByYear, _dFrac)
+            iWP.setTotalStaffFrac()
+        iWP._StaffCostByYear     = WhatIf.add(iWP._StaffCostByYear, dS)
+        iWP.setTotalStaffCost()
+        iWP._CGStaffCostByYear   = WhatIf.add(iWP._CGStaffCostByYear, dCG)
+        iWP.setTotalCGStaffCost()
+        iWP._EquipmentCostByYear = WhatIf.add(iWP._EquipmentCostByYear, dE)
+        iWP.setTotalEquipmentCost()
+        iWP._InflationByYr       = WhatIf.add(iWP._InflationByYr, dInfl)
+        iWP.setTotalInflation()
+        iWP._WorkingMarginByYear = WhatIf.add(iWP._WorkingMarginByYear, dWM)
+        iWP.setWorkingMarginTotal()
+        iWP._ContingencyByYear   = \
+            [WhatIf.add(iWP._ContingencyByYear[0], dCntE), \
+             WhatIf.add(iWP._ContingencyByYear[1], dCntS), \
+             WhatIf.add(iWP._ContingencyByYear[2], dCntCG)]
+        iWP.setContingencyTotal()
+        iWP._TotalCostByYear     = WhatIf.add(iWP._TotalCostByYear, \
+                                   dS + dE + dInfl + dWM + dCntE + dCntS)
+        iWP.setGrandTotal()
+
+        #.. Project:
+        iPrj = self._Project
+        iPrj._StaffCostByYear     = WhatIf.add(iPrj._StaffCostByYear, dS)
+        iPrj.setTotalStaffCost()
+        iPrj._CGStaffCostByYear   = WhatIf.add(iPrj._CGStaffCostByYear, dCG)
+        iPrj.setTotalCGStaffCost()
+        iPrj._EquipmentCostByYear = WhatIf.add(iPrj._EquipmentCostByYear, dE)
+        iPrj.setTotalEquipmentCost()
+        iPrj._InflationByYear     = WhatIf.add(iPrj._InflationByYear, dInfl)
+        iPrj.setInflationTotal()
+        iPrj._WorkingMarginByYear = WhatIf.add(iPrj._WorkingMarginByYear, \
+                                               dWM)
+        iPrj.setWorkingMarginTotal()
+        iPrj._ContingencyByYear   = WhatIf.add(iPrj._ContingencyByYear, \
+                                               dCntE + dCntS)
+        iPrj.setContingencyTotal()
+        if WhatIf.__Debug:
+            print(" WhatIf; propagate: task", _Tsk._Name, "; WP", \
+                  iWP._Code, "; staff", dS, "; equipment", dE)
+
+    @classmethod
+    def add(cls, _Vec, _dVec):
+        if _dVec is None:
+            return _Vec
+        Vec  = np.asarray(_Vec, dtype=float)
+        dVec = np.asarray(_dVec, dtype=float)
+        if len(dVec) > len(Vec):
+            Vec = np.concatenate([Vec, np.zeros(len(dVec) - len(Vec))])
+        Sum = Vec.copy()
+        Sum[:len(dVec)] += dVec
+        return Sum
+
+    def recost(self):
+        LCT.LhARACostingTool.doCosting(self._Cntrl)
+        self._Project = Prj.Project.instances[0]
+        self._Fctr    = self._Cntrl.getFactorsByYr( \
+                                  len(self._Project._FinancialYears))
+
+
+#--------  Exceptions:
+class NoInputs(Exception):
+    pass
+
+class InvalidEdit(Exception):
+    pass
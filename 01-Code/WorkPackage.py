@@ -15,13 +15,21 @@ Class WorkPackage:
   -----------------
   __Debug : Boolean: set for debug print out
   instances: List of instances if the WorkPackage class.
+  _LoadHandlers: Dictionary mapping the flag of an entry of a parsed
+             record (see WorkPackageRecord) to the name of the method
+             that loads it into the registries.
+  _CostedAttributes: Names of the instance attributes filled by doCosting.
       
   Instance attributes:
   --------------------
    _filename            = Filename, includin path, to csv file containing
                           workpackage specification
    _wpParams            = Pandas dataframe instance containing workpackage 
-                          specification
+                          specification; None if instance created from a
+                          record or record taken from the parse cache.
+                          Dropped once the record has been parsed.
+   _Record              = Parsed intermediate record (see 
+                          WorkPackageRecord)
    _Code                = Work package code
    _Name                = Work package name
    _WPM                 = Work package manager(s)
@@ -64,6 +72,15 @@ Class WorkPackage:
    _TotalCostByYear     = Sum of equipment, staff, trave, consumables, other 
                           non-staff, working margin, and contingency
    -GrandTotal          = Grand total cost
+   _StaffFracByQtr, _StaffCostByQtr, _CGStaffCostByQtr,
+   _EquipmentCostByQtr, _InflationByQtr, _OtherNonStaffCostByQtr,
+   _TrvlCnsmCostByQtr, _WorkingMarginByQtr, _ContingencyByQtr,
+   _TotalCostByQtr      = As the by-year attributes, by quarter; four
+                          entries per FY.  None unless doQuarterlyCosting
+                          has been run.
+   _TotalValue          = Planned total value (£k); staff plus equipment
+                          cost.  Evaluated on first call of getTotalValue;
+                          reset when the staff or equipment total is set.
 
     
   Methods:
@@ -111,7 +128,11 @@ Class WorkPackage:
                               Input: numpy array
   
       setTotalOtherNonStaffCost : Set total OtherNonStaff cost; sum cost per 
-                              year (£k)
+                              year (£k).  Resets the total value of the
+                              tasks of the work package.
+
+      getTotalValue         : Return planned total value (£k); set on first
+                              call after costing
 
       setTravelCostByYear   : Set travel cost by financial 
                               year (£k)
@@ -134,23 +155,41 @@ Class WorkPackage:
       setTotalTrvlCnsmCost  : Set total travel and consumable cost; 
                               sum cost per year (£k)
 
+      setInflationByYr      : Set inflation by financial year (£k)
+                              Input: _Cntrl -- costing context; default
+                                               context if None
+
       setWorkingMarginByYear: Set working margin by financial year (£k)
+                              Input: _Cntrl -- as setInflationByYr
 
       setWorkingMarginTotal : Set total working margin sum cost per year (£k)
 
       setContingencyByYear  : Set contingency per year (£k)
+                              Input: _Cntrl -- as setInflationByYr
 
       setContingencyTotal   : Sums contingency by year (£k)
 
+      setQuarterlyCosting   : Set inflation, working margin, contingency
+                              and total cost by quarter from the staff,
+                              equipment and non-staff costs by quarter;
+                              the factors of each year apply to each of its
+                              quarters.
+                              Input: _Cntrl -- as setInflationByYr
+
 
   Print methods:
       printWorkPackage: Dumps pandas data frame read from CSV work package
-                        definition file
+                        definition file; the file is read again if the
+                        data frame has been dropped
 
 
   Processing methods:
       parseWorkPackage: Parses pandas data frame to fill many of the 
-                        work package attributes.  
+                        work package attributes.  The data frame is 
+                        decoded into a record by WorkPackageRecord (unless
+                        the instance was created from a record, or the
+                        record was found in the parse cache) and the
+                        record is loaded by loadRecord.
              Returns:
                self._Project
                self._Code
@@ -163,12 +202,43 @@ Class WorkPackage:
                self._TotalConsume
                self._OtherNonStaffItems
 
+      loadRecord: Create the Project, Task, Staff, TaskStaff, Equipment,
+                  TaskEquipment and OtherNonStaff instances described by a
+                  record; entries are dispatched through _LoadHandlers.
+                 Input: _Record -- record (see WorkPackageRecord)
+                Return: as parseWorkPackage
+
+      load<Entry>: Entry handlers called by loadRecord; loadProject, 
+                   loadWorkPackageName, loadManager, loadYears, loadTask,
+                   loadInstitute, loadStaff, loadEquipment, 
+                   loadOtherNonStaff, loadConsume and loadTravel.
+                 Input: _Entry -- tuple, entry of record
+                        _State -- dictionary of load state (project, 
+                                  task and institute in scope, etc.)
+
+      ingest: Create work packages from list of definition files.  The
+              files are parsed into records in worker processes (see
+              WorkPackageRecord.readAll); the records are then loaded in
+              sorted filename order so that the result is identical to
+              creating the instances one by one.  The equipment and other
+              non-staff cost vectors are then held as rows of shared
+              backing arrays (see Aggregation.share).
+                 Input: _Filenames -- list of paths
+                        _nWorkers  -- number of worker processes; None for
+                                      os.cpu_count()
+                Return: list of WorkPackage instances
+                 [Classmethod]
+
       clean: Delete incomplete instances of WorkPackage
              [classmethod]
 
       doCosting: Complete costing of WorkPackage.  Sums data from Tasks
                  related to WorkPackage instance and completes work package
-                 costing.
+                 costing.  Sums are formed by the Aggregation engine.
+                 Input: _WPs   -- list of work packages to cost; all 
+                                  instances if None (default)
+                        _Cntrl -- costing context (instance of Control);
+                                  default context if None (default)
                  Fills:
                     self._StaffFracByYear   
                     self._StaffCostByYear   
@@ -186,6 +256,15 @@ Class WorkPackage:
                     self._ContingencyTotal
                  [Classmethod]
 
+      doQuarterlyCosting: Quarterly costing of WorkPackage.  The quarterly
+                 staff and equipment costs of the tasks (see
+                 Task.doQuarterlyCosting) are summed by the Aggregation
+                 engine; other non-staff, travel and consumable costs of
+                 each year are spread evenly over its quarters.  The
+                 quarters of each year sum to the by-year costing.
+                 Input: _WPs, _Cntrl -- as doCosting
+                 [Classmethod]
+
       createPandasDataframe : Create Pandas data frame containing Work package
                               parameters.
                               [Classmethod]
@@ -203,12 +282,30 @@ Class WorkPackage:
 Created on Wed 19Jun21. Version history:
 ----------------------------------------
  1.0: 19Jun21: First implementation
+ 1.1: 18Oct26: Use work package -> task and -> other non-staff adjacency 
+               indices in getnTasks and doCosting
+ 1.2: 18Oct26: doCosting rolls up tasks and other non-staff items through
+               Aggregation
+ 1.3: 18Oct26: Single-pass, table-driven parser with column map and 
+               block slicing
+ 1.4: 18Oct26: Parse into picklable records (WorkPackageRecord); ingest
+               work packages in parallel
+ 1.5: 18Oct26: Records taken from, and written to, the parse cache
+ 1.6: 18Oct26: doCosting of a subset of work packages (incremental 
+               recosting)
+ 1.7: 18Oct26: Inflation, working margin, contingency and total cost by
+               year evaluated as vector expressions using the factor
+               vectors cached by Control
+ 1.8: 18Oct26: Costing context (instance of Control) passed to doCosting
+ 1.9: 18Oct26: Quarterly costing
+ 1.10: 18Oct26: Parse data frame dropped once parsed; ingest holds the 
+               equipment and other non-staff cost vectors in shared
+               backing arrays
+ 1.11: 18Oct26: Planned total value cached (_TotalValue)
 
 @author: kennethlong
 """
 import os as os
-import math as mt
-import copy
 import numpy as np
 import pandas as pnds
 
@@ -220,6 +317,8 @@ import Equipment     as Eqp
 import OtherNonStaff as ONS
 import TaskStaff     as TskStff
 import TaskEquipment as TskEqp
+import Aggregation   as Agg
+import WorkPackageRecord as WPRec
 
 if Cntrl.Control._Control__instance == None:
     raise Exception(" WorkPackage: no control instance; abort")
@@ -229,21 +328,36 @@ iCntrl = Cntrl.Control()
 class WorkPackage:
     __Debug   = False
     instances = []
+    _CostedAttributes = ("_StaffFracByYear", "_StaffCostByYear", \
+                         "_TotalStaffFrac", "_TotalStaffCost", \
+                         "_CGStaffCostByYear", "_TotalCGStaffCost", \
+                         "_EquipmentCostByYear", "_TotalEquipmentCost", \
+                         "_InflationByYr", "_TotalInflation", \
+                         "_OtherNonStaffCostByYear", \
+                         "_TotalOtherNonStaffCost", \
+                         "_WorkingMarginByYear", "_WorkingMarginTotal", \
+                         "_ContingencyByYear", "_ContingencyTotal", \
+                         "_TotalCostByYear", "_GrandTotal")
 
     if __Debug:
         iCntrl.print()
 
 #--------  "Built-in methods":
-    def __init__(self, filename=None): #, _PrjInst=None):
+    def __init__(self, filename=None, _Record=None): #, _PrjInst=None):
         if filename == None:
             raise NoFilenameProvided( \
                 'CSV filename required; execution termimated.')
-        elif not os.path.isfile(filename):
+        elif _Record == None and not os.path.isfile(filename):
             raise NonExistantFile('CSV file' + filename + \
                                   ' does not exist; execution termimated.')
 
         self._filename        = filename
-        self._wpParams        = self.getWorkPackage(filename)
+        self._Record          = _Record
+        self._wpParams        = None
+        if _Record == None:
+            self._Record      = WPRec.WorkPackageRecord.loadCached(filename)
+        if self._Record == None:
+            self._wpParams    = self.getWorkPackage(filename)
         self._Code = "PH"
         self._Name = "Place holder"
         if self.__Debug:
@@ -281,6 +395,17 @@ class WorkPackage:
         self._ContingencyTotal    = [None, None, None]
         self._TotalCostByYear     = None
         self._GrandTotal          = None
+        self._TotalValue          = None
+        self._StaffFracByQtr      = None
+        self._StaffCostByQtr      = None
+        self._CGStaffCostByQtr    = None
+        self._EquipmentCostByQtr  = None
+        self._InflationByQtr      = None
+        self._OtherNonStaffCostByQtr = None
+        self._TrvlCnsmCostByQtr   = None
+        self._WorkingMarginByQtr  = None
+        self._ContingencyByQtr    = [None, None, None]
+        self._TotalCostByQtr      = None
 
         self._Project,  \
             self._Code, \
@@ -366,14 +491,11 @@ class WorkPackage:
         if self.getDebug():
             print(" WP.getnTasks: WP:", self.getName())
         
-        for iTsk in Tsk.Task.getinstances():
+        for iTsk in Tsk.Task.getForWorkPackage(self):
             if self.getDebug():
                 print("     ----> Task, WP this task:", \
                       iTsk.getName(), iTsk.getWorkPackage().getName())
-                print("                              ", \
-                      id(self), id(iTsk.getWorkPackage()))
-            if id(iTsk.getWorkPackage()) == id(self):
-                nTsks += 1
+            nTsks += 1
                 
         return nTsks
 
@@ -442,6 +564,7 @@ class WorkPackage:
 
     def setTotalStaffCost(self):
         self._TotalStaffCost = np.sum(self._StaffCostByYear)
+        self._TotalValue     = None
         
     def setTotalStaffFrac(self):
         self._TotalStaffFrac = np.sum(self._StaffFracByYear)
@@ -454,12 +577,15 @@ class WorkPackage:
 
     def setTotalEquipmentCost(self):
         self._TotalEquipmentCost = np.sum(self._EquipmentCostByYear)
+        self._TotalValue         = None
 
     def setOtherNonStaffCostByYear(self, _OtherNonStaffCostByYear):
         self._OtherNonStaffCostByYear = _OtherNonStaffCostByYear
 
     def setTotalOtherNonStaffCost(self):
         self._TotalOtherNonStaffCost = np.sum(self._OtherNonStaffCostByYear)
+        for iTsk in Tsk.Task.getForWorkPackage(self):
+            iTsk._TotalValue = None
 
     def setTravelCostByYear(self, _TravelCostByYear):
         self._TravelCostByYear = _TravelCostByYear
@@ -479,33 +605,24 @@ class WorkPackage:
     def setTotalTrvlCnsmCost(self):
         self._TotalTrvlCnsmCost = np.sum(self._TrvlCnsmCostByYear)
 
-    def setInflationByYr(self):
-        self._InflationByYr = np.array([])
-        for i in range(len(self._FinancialYears)):
-            Infl = 0.
-            if i >= iCntrl._Inflation[2]:
-                Infl += ((1. + iCntrl._Inflation[0])**i - 1) * \
-                    self._StaffCostByYear[i]
-                Infl += ((1. + iCntrl._Inflation[1])**i - 1) * \
-                    self._EquipmentCostByYear[i]
-            self._InflationByYr = np.append(self._InflationByYr, Infl)
+    def setInflationByYr(self, _Cntrl=None):
+        if _Cntrl == None:
+            _Cntrl = iCntrl
+        Fctr = _Cntrl.getFactorsByYr(len(self._FinancialYears))
+        self._InflationByYr = \
+            Fctr["InflationStaff"]     * self._StaffCostByYear + \
+            Fctr["InflationEquipment"] * self._EquipmentCostByYear
 
     def setTotalInflation(self):
         self._TotalInflation = np.sum(self._InflationByYr)
             
-    def setWorkingMarginByYear(self):
-        self._WorkingMarginByYear = np.array([])
-        for i in range(len(self._FinancialYears)):
-            Cst = self._StaffCostByYear[i] + \
-                  self._EquipmentCostByYear[i]
-            fWM = iCntrl.getWorkingMargin()
-            if i >= iCntrl.getWorkingMarginStrtInYr():
-                fWM = iCntrl.getWorkingMargin()
-            else:
-                fWM = 0.
-            self._WorkingMarginByYear = np.append( \
-                                        self._WorkingMarginByYear, \
-                                        Cst * fWM )
+    def setWorkingMarginByYear(self, _Cntrl=None):
+        if _Cntrl == None:
+            _Cntrl = iCntrl
+        Fctr = _Cntrl.getFactorsByYr(len(self._FinancialYears))
+        self._WorkingMarginByYear = \
+            (self._StaffCostByYear + self._EquipmentCostByYear) * \
+            Fctr["WorkingMargin"]
 
     def setWorkingMarginTotal(self):
         self._WorkingMarginTotal = np.sum(self._WorkingMarginByYear)
@@ -513,33 +630,14 @@ class WorkPackage:
     def setWorkingMarginTotal(self):
         self._WorkingMarginTotal = np.sum(self._WorkingMarginByYear)
         
-    def setContingencyByYear(self):
-        self._ContingencyByYear = []
-        ContEquip               = np.array([])
-        ContStaff               = np.array([])
-        ContStaffCG             = np.array([])
-
-        for i in range(len(self._FinancialYears)):
-            if i >= iCntrl.getContingencyStrtInYr():
-                # Equipment:
-                CntE = \
-                    self._EquipmentCostByYear[i] * \
-                    iCntrl.getContingencyMaterial()
-                # Staff:
-                StfByYr   = self._StaffCostByYear[i]
-                CGStfByYr = self._CGStaffCostByYear[i]
-                Cnt1 =  (StfByYr - CGStfByYr) * iCntrl.getContingencyStaffPrj()
-                Cnt2 =  CGStfByYr * iCntrl.getContingencyStaffCG()
-                CntS = Cnt1 + Cnt2
-            else:
-                CntE = 0.
-                CntS = 0.
-                Cnt1 = 0.
-                Cnt2 = 0.
-            
-            ContEquip   = np.append(ContEquip,   CntE)
-            ContStaff   = np.append(ContStaff,   CntS)
-            ContStaffCG = np.append(ContStaffCG, Cnt2)
+    def setContingencyByYear(self, _Cntrl=None):
+        if _Cntrl == None:
+            _Cntrl = iCntrl
+        Fctr = _Cntrl.getFactorsByYr(len(self._FinancialYears))
+        ContEquip   = self._EquipmentCostByYear * Fctr["ContingencyMaterial"]
+        ContStaffCG = self._CGStaffCostByYear * Fctr["ContingencyStaffCG"]
+        ContStaff   = (self._StaffCostByYear - self._CGStaffCostByYear) * \
+                      Fctr["ContingencyStaffPrj"] + ContStaffCG
 
         self._ContingencyByYear = [ ContEquip, ContStaff, ContStaffCG ]
 
@@ -550,17 +648,39 @@ class WorkPackage:
         self._ContingencyTotal[2] = np.sum(self._ContingencyByYear[2])
         
     def setTotalCostByYear(self):
-        self._TotalCostByYear = np.array([])
-        for i in range(len(self._FinancialYears)):
-            Cst = self._StaffCostByYear[i]   + \
-                self._EquipmentCostByYear[i] + \
-                self._InflationByYr[i] + \
-                self._OtherNonStaffCostByYear[i] + \
-                self._TrvlCnsmCostByYear[i]  + \
-                self._WorkingMarginByYear[i] + \
-                self._ContingencyByYear[0][i] + \
-                self._ContingencyByYear[1][i]
-            self._TotalCostByYear = np.append(self._TotalCostByYear, Cst)
+        self._TotalCostByYear = self._StaffCostByYear     + \
+                                self._EquipmentCostByYear + \
+                                self._InflationByYr + \
+                                self._OtherNonStaffCostByYear + \
+                                self._TrvlCnsmCostByYear  + \
+                                self._WorkingMarginByYear + \
+                                self._ContingencyByYear[0] + \
+                                self._ContingencyByYear[1]
+
+    def setQuarterlyCosting(self, _Cntrl=None):
+        if _Cntrl == None:
+            _Cntrl = iCntrl
+        Fctr = _Cntrl.getFactorsByYr(len(self._FinancialYears))
+        Fctr = {Key: np.repeat(Fctr[Key], 4) for Key in Fctr}
+        self._InflationByQtr = \
+            Fctr["InflationStaff"]     * self._StaffCostByQtr + \
+            Fctr["InflationEquipment"] * self._EquipmentCostByQtr
+        self._WorkingMarginByQtr = \
+            (self._StaffCostByQtr + self._EquipmentCostByQtr) * \
+            Fctr["WorkingMargin"]
+        ContEquip   = self._EquipmentCostByQtr * Fctr["ContingencyMaterial"]
+        ContStaffCG = self._CGStaffCostByQtr * Fctr["ContingencyStaffCG"]
+        ContStaff   = (self._StaffCostByQtr - self._CGStaffCostByQtr) * \
+                      Fctr["ContingencyStaffPrj"] + ContStaffCG
+        self._ContingencyByQtr = [ ContEquip, ContStaff, ContStaffCG ]
+        self._TotalCostByQtr = self._StaffCostByQtr     + \
+                               self._EquipmentCostByQtr + \
+                               self._InflationByQtr + \
+                               self._OtherNonStaffCostByQtr + \
+                               self._TrvlCnsmCostByQtr  + \
+                               self._WorkingMarginByQtr + \
+                               self._ContingencyByQtr[0] + \
+                               self._ContingencyByQtr[1]
 
     def setGrandTotal(self):
         self._GrandTotal = np.sum(self._TotalCostByYear)
@@ -575,7 +695,10 @@ class WorkPackage:
         return self._TotalEquipmentCost
     
     def getTotalValue(self):
-        return self.getTotalStaff() + self.getTotalEquipmentCost()
+        if self._TotalValue is None:
+            self._TotalValue = self.getTotalStaff() + \
+                               self.getTotalEquipmentCost()
+        return self._TotalValue
         
     @classmethod
     def getHeader(cls):
@@ -646,7 +769,10 @@ class WorkPackage:
 
 #--------  Print methods
     def printWorkPackage(self):
-        print(self._wpParams)
+        wpParams = self._wpParams
+        if wpParams is None:
+            wpParams = self.getWorkPackage(self._filename)
+        print(wpParams)
 
         
 #--------  Creating the pandas dataframe:
@@ -665,236 +791,161 @@ class WorkPackage:
 
 #--------  Extracting data from the WorkPackage pandas dataframe:
     def parseWorkPackage(self):
-        iRow               = self._wpParams.index
-        PrjInst            = None
-        WorkPackageName    = "None"
-        OtherNonStaffItems = []
-        for i in iRow:
+        if self._Record == None:
+            self._Record = WPRec.WorkPackageRecord.parseSheet( \
+                               self._filename, \
+                               self._wpParams.to_numpy(dtype=object))
+            WPRec.WorkPackageRecord.storeCached(self._Record)
+            self._wpParams = None
+        return self.loadRecord(self._Record)
+
+    def loadRecord(self, _Record):
+        State = {"PrjInst"           : None, \
+                 "WorkPackageCode"   : None, \
+                 "WorkPackageName"   : "None", \
+                 "WPM"               : None, \
+                 "Yrs"               : None, \
+                 "TskInst"           : None, \
+                 "InstCode"          : None, \
+                 "TravelByYear"      : None, \
+                 "TotalTravel"       : None, \
+                 "ConsumeByYear"     : None, \
+                 "TotalConsume"      : None, \
+                 "OtherNonStaffItems": []}
+        for Entry in _Record["Entries"]:
             if self.__Debug:
-                print(" WorkPackage: parseWorkPackage: processing flag: ", \
-                      self._wpParams.iat[i,0])
-            if self._wpParams.iat[i,0] == "Project":
-                ProjectName = self._wpParams.iloc[i,1]
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: ProjectName = ", \
-                          ProjectName)
-                PrjInst = Prj.Project.getInstance(ProjectName)
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: Project instance: ",\
-                          PrjInst)
-                if isinstance(PrjInst, Prj.Project):
-                    if self.__Debug:
-                        print(" WorkPackage; parseWorkPackage: Project ", \
-                              ProjectName, " exists.")
-                else:
-                    PrjInst = Prj.Project(ProjectName)
-                    if self.__Debug:
-                        print(" WorkPackage; parseWorkPackage: Project ", \
-                              ProjectName, " created.")
-                PrjInst = Prj.Project.getInstance(ProjectName)
-            elif self._wpParams.iat[i,0] == "Work package":
-                WorkPackageCode = self._wpParams.iloc[i,1]
-                WorkPackageName = self._wpParams.iloc[i,2]
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: WorkPackage: ", \
-                          WorkPackageName, " being processed.")
-            elif self._wpParams.iat[i,0] == "Manager":
-                WPM = self._wpParams.iloc[i,2]
-            elif self._wpParams.iat[i,0] == "Years":
-                nYrs = 0
-                Yrs  = []
-                Yr   = ""
-                while Yr != "Total":
-                    Yr = self._wpParams.iloc[i,2+nYrs]
-                    if Yr != "Total":
-                        Yrs.append(Yr)
-                        nYrs += 1
-                PrjInst.setFinancialYears(Yrs)
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: financial years:", \
-                          Yrs)
-            elif self._wpParams.iat[i,0] == "Task":
-                TaskName = self._wpParams.iloc[i,1]
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: Task name = ", \
-                          TaskName)
-                TskInst = Tsk.Task.getInstance(TaskName, self)
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: Task instance = ", \
-                          TskInst)
-                if isinstance(TskInst, Tsk.Task):
-                    if self.__Debug:
-                        print(" WorkPackage; parseWorkPackage: Task ", \
-                              TaskName, " exists.")
-                else:
-                    TskInst = Tsk.Task(TaskName, self)
-                    if self.__Debug:
-                        print(" WorkPackage; parseWorkPackage: Task ", \
-                              TaskName, " created.")
-            elif self._wpParams.iat[i,0] == "Institute":
-                InstCode = self._wpParams.iloc[i,1]
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: Institute instance = ", \
-                          InstCode)
-            elif self._wpParams.iat[i,0] == "Staff":
-                StaffCode = self._wpParams.iloc[i,1]
-                StfInst = Stf.Staff.getInstance(InstCode, StaffCode)
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: Staff instance = ", \
-                          StfInst)
-                if isinstance(StfInst, Stf.Staff):
-                    if self.__Debug:
-                        print(" WorkPackage; parseWorkPackage: Staff ", \
-                              StaffCode, " exists.")
-                else:
-                    NameOrPost = "Created for WP " + WorkPackageName
-                    StfInst = Stf.Staff(StaffCode, NameOrPost, None, InstCode)
-                    if self.__Debug:
-                        print(" WorkPackage; parseWorkPackage: Staff ", \
-                              StaffCode, " created.")
-                        print(StfInst)
-                TskStfInst = TskStff.TaskStaff.getInstance(TskInst, StfInst)
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: TskStfInst:", \
-                          TskStfInst)
-                if isinstance(TskStfInst, TskStff.TaskStaff):
-                    if self.__Debug:
-                        print(" WorkPackage; parseWorkPackage: TaskStaff ", \
-                              TskInst._Name, StfInst._NameOrPost, \
-                              " exists.")
-                else:
-                    TskStfInst = TskStff.TaskStaff(TskInst, StfInst)
-                    if self.__Debug:
-                        print(" WorkPackage; parseWorkPackage: TaskStaff ", \
-                              TskStfInst, " created.")
-                if self.__Debug:
-                    print("      ----> fill staff fractions:")
-                StfFracByYrNQtr = np.empty(shape=(1,4))
-                FracByQtr       = np.array([[0., 0., 0., 0.]])
-                iOff = 1 + nYrs + 3
-                for iYr in range(nYrs):
-                    for iQtr in range(4):
-                        Frac = float(self._wpParams.iat[i, iOff+4*iYr+iQtr])
-                        if np.isnan(Frac):
-                            Frac = 0.
-                        FracByQtr[0,iQtr] = Frac
-                    if iYr == 0:
-                        StfFracByYrNQtr = copy.deepcopy(FracByQtr.reshape(1,4))
-                    else:
-                        Frac1 = copy.deepcopy(FracByQtr)
-                        StfFracByYrNQtr = np.append(StfFracByYrNQtr, \
-                                                    Frac1, \
-                                                    axis=0)
-                if self.__Debug:
-                    print("     ", StaffCode, \
-                          ": fraction by year and quarter: \n", \
-                          StfFracByYrNQtr)
-                TskStfInst.setStaffFracByYrNQtr(StfFracByYrNQtr)
-                TskStfInst.setStaffFracByYear()
-                TskStfInst.setTotalStaffFrac()
-                if self.__Debug:
-                    print("     ----> staff fractions filled:", TskStfInst)
-            elif self._wpParams.iat[i,0] == "Equipment":
-                EquipmentName = self._wpParams.iloc[i,1]
-                EqpInst = Eqp.Equipment(EquipmentName)
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: Equipment ", \
-                              EquipmentName, " created.")
-                TskEqpInst = TskEqp.TaskEquipment(TskInst, EqpInst)
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: TaskEquipment ", \
-                           TskEqpInst, " created.")
-                EqpCst = np.array([])
-                for iYr in range(len(Yrs)):
-                    Cst = float(self._wpParams.iat[i,2+iYr])
-                    if mt.isnan(Cst):
-                        Cst = 0.
-                    EqpCst = np.append(EqpCst,Cst)
-                EqpInst.setEquipmentCost(EqpCst)
-                EqpInst.setTotalEquipmentCost()
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: ", \
-                          "equipment cost by year:", \
-                          EqpInst._EquipmentCostByYear, \
-                          " Total:", EqpInst._TotalEquipmentCost)
-            elif self._wpParams.iat[i,0] == "OtherNonStaff":
-                OtherNonStaffItems.append(self._wpParams.iat[i,1])
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: other non-staff: ",\
-                          self._wpParams.iat[i,1])
-                OtherNonStaffName = self._wpParams.iloc[i,1]
-                ONSInst = ONS.OtherNonStaff(OtherNonStaffName, self)
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: OtherNonStaff ", \
-                              OtherNonStaffName, " created.")
-                ONSCst = np.array([])
-                for iYr in range(len(Yrs)):
-                    Cst = float(self._wpParams.iat[i,2+iYr])
-                    if mt.isnan(Cst):
-                        Cst = 0.
-                    ONSCst = np.append(ONSCst,Cst)
-                ONSInst.setOtherNonStaffCost(ONSCst)
-                ONSInst.setTotalOtherNonStaffCost()
-                if WorkPackage.__Debug:
-                    print(" WorkPackage; parseWorkPackage: ", \
-                          "OtherNonStaff cost by year:", \
-                          ONSInst._OtherNonStaffCostByYear, \
-                          " Total:", ONSInst._TotalOtherNonStaffCost)
-            elif str(self._wpParams.iat[i,0]) == "EndStaff":
-                pass
-            elif str(self._wpParams.iat[i,0]) == "NonStaffHd":
-                pass
-            elif str(self._wpParams.iat[i,0]) == "EquipEnd":
-                pass
-            elif str(self._wpParams.iat[i,0]) == "RiskMitigationEquip":
-                pass
-            elif str(self._wpParams.iat[i,0]) == "TotalEquip":
-                pass
-            elif str(self._wpParams.iat[i,0]) == "Consume":
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: Consumables")
-                CnsCst = np.array([])
-                for iYr in range(len(Yrs)):
-                    Cst = float(self._wpParams.iat[i,2+iYr])
-                    if mt.isnan(Cst):
-                        Cst = 0.
-                    CnsCst = np.append(CnsCst,Cst)
-                _ConsumeByYear = CnsCst
-                _TotalConsume  = np.sum(_ConsumeByYear)
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: ", \
-                          "consumables cost by year and total:", \
-                          _ConsumeByYear, _TotalConsume)
-            elif str(self._wpParams.iat[i,0]) == "Travel":
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: Travel")
-                TrvCst = np.array([])
-                for iYr in range(len(Yrs)):
-                    Cst = float(self._wpParams.iat[i,2+iYr])
-                    if mt.isnan(Cst):
-                        Cst = 0.
-                    TrvCst = np.append(TrvCst,Cst)
-                _TravelByYear = TrvCst
-                _TotalTravel  = np.sum(_TravelByYear)
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: ", \
-                          "travel cost by year and total:", \
-                          _TravelByYear, _TotalTravel)
-            elif str(self._wpParams.iat[i,0]) == "NonStaffEnd":
-                pass
-            elif str(self._wpParams.iat[i,0]) == "Flag":
-                pass
-            elif str(self._wpParams.iat[i,0]) == "nan":
-                pass
-            else:
-                if self.__Debug:
-                    print(" WorkPackage; parseWorkPackage: ", \
-                          "Unprocessed ---->", self._wpParams.iloc[i,0])
+                print(" WorkPackage: loadRecord: processing entry: ", \
+                      Entry[0])
+            getattr(self, WorkPackage._LoadHandlers[Entry[0]])(Entry, State)
+
+        return State["PrjInst"], State["WorkPackageCode"], \
+               State["WorkPackageName"], State["WPM"], State["Yrs"], \
+               State["TravelByYear"], State["TotalTravel"], \
+               State["ConsumeByYear"], State["TotalConsume"], \
+               State["OtherNonStaffItems"]
+
+    def loadProject(self, _Entry, _State):
+        ProjectName = _Entry[1]
+        if self.__Debug:
+            print(" WorkPackage; loadRecord: ProjectName = ", ProjectName)
+        PrjInst = Prj.Project.getInstance(ProjectName)
+        if not isinstance(PrjInst, Prj.Project):
+            PrjInst = Prj.Project(ProjectName)
+            if self.__Debug:
+                print(" WorkPackage; loadRecord: Project ", \
+                      ProjectName, " created.")
+        _State["PrjInst"] = Prj.Project.getInstance(ProjectName)
 
-        return PrjInst, WorkPackageCode, WorkPackageName, WPM, Yrs, \
-               _TravelByYear, _TotalTravel, \
-               _ConsumeByYear, _TotalConsume, \
-               OtherNonStaffItems
+    def loadWorkPackageName(self, _Entry, _State):
+        _State["WorkPackageCode"] = _Entry[1]
+        _State["WorkPackageName"] = _Entry[2]
+        if self.__Debug:
+            print(" WorkPackage; loadRecord: WorkPackage: ", \
+                  _Entry[2], " being processed.")
+
+    def loadManager(self, _Entry, _State):
+        _State["WPM"] = _Entry[1]
+
+    def loadYears(self, _Entry, _State):
+        _State["Yrs"] = _Entry[1]
+        _State["PrjInst"].setFinancialYears(_Entry[1])
+        if self.__Debug:
+            print(" WorkPackage; loadRecord: financial years:", _Entry[1])
+
+    def loadTask(self, _Entry, _State):
+        TaskName = _Entry[1]
+        TskInst  = Tsk.Task.getInstance(TaskName, self)
+        if not isinstance(TskInst, Tsk.Task):
+            TskInst = Tsk.Task(TaskName, self)
+            if self.__Debug:
+                print(" WorkPackage; loadRecord: Task ", \
+                      TaskName, " created.")
+        _State["TskInst"] = TskInst
+
+    def loadInstitute(self, _Entry, _State):
+        _State["InstCode"] = _Entry[1]
+        if self.__Debug:
+            print(" WorkPackage; loadRecord: Institute = ", _Entry[1])
+
+    def loadStaff(self, _Entry, _State):
+        StaffCode = _Entry[1]
+        InstCode  = _State["InstCode"]
+        TskInst   = _State["TskInst"]
+        StfInst   = Stf.Staff.getInstance(InstCode, StaffCode)
+        if not isinstance(StfInst, Stf.Staff):
+            NameOrPost = "Created for WP " + _State["WorkPackageName"]
+            StfInst = Stf.Staff(StaffCode, NameOrPost, None, InstCode)
+            if self.__Debug:
+                print(" WorkPackage; loadRecord: Staff ", \
+                      StaffCode, " created.")
+        TskStfInst = TskStff.TaskStaff.getInstance(TskInst, StfInst)
+        if not isinstance(TskStfInst, TskStff.TaskStaff):
+            TskStfInst = TskStff.TaskStaff(TskInst, StfInst)
+            if self.__Debug:
+                print(" WorkPackage; loadRecord: TaskStaff ", \
+                      TskStfInst, " created.")
+        if self.__Debug:
+            print("     ", StaffCode, \
+                  ": fraction by year and quarter: \n", _Entry[2])
+        TskStfInst.setStaffFracByYrNQtr(_Entry[2])
+        TskStfInst.setStaffFracByYear()
+        TskStfInst.setTotalStaffFrac()
+
+    def loadEquipment(self, _Entry, _State):
+        EqpInst    = Eqp.Equipment(_Entry[1])
+        TskEqpInst = TskEqp.TaskEquipment(_State["TskInst"], EqpInst)
+        EqpInst.setEquipmentCost(_Entry[2].copy())
+        EqpInst.setTotalEquipmentCost()
+        if self.__Debug:
+            print(" WorkPackage; loadRecord: ", \
+                  "equipment cost by year:", \
+                  EqpInst._EquipmentCostByYear, \
+                  " Total:", EqpInst._TotalEquipmentCost)
+
+    def loadOtherNonStaff(self, _Entry, _State):
+        _State["OtherNonStaffItems"].append(_Entry[1])
+        ONSInst = ONS.OtherNonStaff(_Entry[1], self)
+        ONSInst.setOtherNonStaffCost(_Entry[2].copy())
+        ONSInst.setTotalOtherNonStaffCost()
+        if self.__Debug:
+            print(" WorkPackage; loadRecord: ", \
+                  "OtherNonStaff cost by year:", \
+                  ONSInst._OtherNonStaffCostByYear, \
+                  " Total:", ONSInst._TotalOtherNonStaffCost)
+
+    def loadConsume(self, _Entry, _State):
+        _State["ConsumeByYear"] = _Entry[1].copy()
+        _State["TotalConsume"]  = np.sum(_State["ConsumeByYear"])
+
+    def loadTravel(self, _Entry, _State):
+        _State["TravelByYear"] = _Entry[1].copy()
+        _State["TotalTravel"]  = np.sum(_State["TravelByYear"])
+
+    #.. Record entry -> handler table:
+    _LoadHandlers = {"Project"      : "loadProject", \
+                     "Work package" : "loadWorkPackageName", \
+                     "Manager"      : "loadManager", \
+                     "Years"        : "loadYears", \
+                     "Task"         : "loadTask", \
+                     "Institute"    : "loadInstitute", \
+                     "Staff"        : "loadStaff", \
+                     "Equipment"    : "loadEquipment", \
+                     "OtherNonStaff": "loadOtherNonStaff", \
+                     "Consume"      : "loadConsume", \
+                     "Travel"       : "loadTravel"}
+
+    @classmethod
+    def ingest(cls, _Filenames, _nWorkers=None):
+        Filenames = sorted(_Filenames)
+        Records   = WPRec.WorkPackageRecord.readAll(Filenames, _nWorkers)
+        wpInst    = []
+        for Record in Records:
+            wpInst.append(WorkPackage(Record["Filename"], Record))
+        Agg.Aggregation.share(Eqp.Equipment.instances, \
+                              "_EquipmentCostByYear")
+        Agg.Aggregation.share(ONS.OtherNonStaff.instances, \
+                              "_OtherNonStaffCostByYear")
+        return wpInst
 
     @classmethod
     def clean(cls):
@@ -903,7 +954,8 @@ class WorkPackage:
         nDel    = 0
         for iWP in OldInst:
             if iWP._filename == None or \
-               not isinstance(iWP._wpParams, pnds.DataFrame) or \
+               (not isinstance(iWP._wpParams, pnds.DataFrame) and \
+                not isinstance(iWP._Record, dict)) or \
                not isinstance(iWP._Name, str) or \
                not isinstance(iWP._TrvlCnsmCostByYear, np.ndarray):
                 del iWP
@@ -925,58 +977,60 @@ class WorkPackage:
         return nDel
 
     @classmethod
-    def doCosting(cls):
-        for iWp in cls.instances:
+    def doCosting(cls, _WPs=None, _Cntrl=None):
+        if WorkPackage.__Debug:
+            print(" WorkPackage.doCosting: start")
+        WPs   = cls.instances
+        if _WPs is not None:
+            WPs = _WPs
+        nWP   = len(WPs)
+        WPPos = {iWp: iPos for iPos, iWp in enumerate(WPs)}
+
+        #.. Leaves; tasks and other non-staff items, by work package:
+        TskGrp = np.array([WPPos.get(iTsk._WorkPackage, -1) \
+                           for iTsk in Tsk.Task.instances], dtype=int)
+        ONSGrp = np.array([WPPos.get(iONS._WPInst, -1) \
+                           for iONS in ONS.OtherNonStaff.instances], \
+                          dtype=int)
+        Leaves  = {}
+        Lengths = []
+        for Attr in ("_StaffFracByYear", "_StaffCostByYear", \
+                     "_CGStaffCostByYear", "_EquipmentCostByYear"):
+            Vectors = [getattr(iTsk, Attr) if TskGrp[iLf] >= 0 \
+                       else np.array([]) \
+                       for iLf, iTsk in enumerate(Tsk.Task.instances)]
+            Leaves[Attr] = Agg.Aggregation.stack(Vectors)
+            Lengths.append(Leaves[Attr][1])
+        Vectors = [iONS._OtherNonStaffCostByYear if ONSGrp[iLf] >= 0 \
+                   else np.array([]) \
+                   for iLf, iONS in enumerate(ONS.OtherNonStaff.instances)]
+        Leaves["_OtherNonStaffCostByYear"] = Agg.Aggregation.stack(Vectors)
+        Lengths.append(Leaves["_OtherNonStaffCostByYear"][1])
+        Groups = np.concatenate([TskGrp, TskGrp, TskGrp, TskGrp, ONSGrp])
+        GrpLen = Agg.Aggregation.groupLength(np.concatenate(Lengths), \
+                                             Groups, nWP)
+
+        Sums = {}
+        for Attr in Leaves:
+            if Attr == "_OtherNonStaffCostByYear":
+                Grp = ONSGrp
+            else:
+                Grp = TskGrp
+            Sums[Attr] = Agg.Aggregation.rollUp(Leaves[Attr][0], Grp, \
+                                                nWP, GrpLen)
+
+        for iPos, iWp in enumerate(WPs):
+            _StaffFracByYear         = Sums["_StaffFracByYear"][iPos]
+            _StaffCostByYear         = Sums["_StaffCostByYear"][iPos]
+            _CGStaffCostByYear       = Sums["_CGStaffCostByYear"][iPos]
+            _EquipmentCostByYear     = Sums["_EquipmentCostByYear"][iPos]
+            _OtherNonStaffCostByYear = Sums["_OtherNonStaffCostByYear"][iPos]
             if WorkPackage.__Debug:
-                print(" WorkPackage.doCosting: start")
-            _StaffFracByYear   = np.array([])
-            _StaffCostByYear   = np.array([])
-            _CGStaffCostByYear = np.array([])
-            _EquipmentCostByYear = np.array([])
-            _OtherNonStaffCostByYear = np.array([])
-            SumInitialised = False
-            for iTsk in Tsk.Task.instances:
-                if iTsk._WorkPackage == iWp:
-                    if WorkPackage.__Debug:
-                        print("     ----> W/p, Task:", iWp._Name, "; ", \
-                              iTsk._Name)
-
-                    if not SumInitialised:
-                        for iYr in range(len(iTsk._StaffCostByYear)):
-                            _StaffFracByYear     = \
-                                np.append(_StaffFracByYear,   [0.])
-                            _StaffCostByYear     = \
-                                np.append(_StaffCostByYear,   [0.])
-                            _CGStaffCostByYear   = \
-                                np.append(_CGStaffCostByYear, [0.])
-                            _EquipmentCostByYear = \
-                                np.append(_EquipmentCostByYear,   [0.])
-                            _OtherNonStaffCostByYear = \
-                                np.append(_OtherNonStaffCostByYear,   [0.])
-                    SumInitialised = True
-
-                    if len(iTsk._StaffCostByYear) > 0:
-                        _StaffFracByYear += iTsk._StaffFracByYear
-                        _StaffCostByYear += iTsk._StaffCostByYear
-
-                    if len(iTsk._CGStaffCostByYear) > 0:
-                        _CGStaffCostByYear += iTsk._CGStaffCostByYear
-
-                    if WorkPackage.__Debug:
-                        print("         ----> W/p, Task: equipment cost", \
-                              iTsk._EquipmentCostByYear)
-                    if len(iTsk._EquipmentCostByYear) > 0:
-                        _EquipmentCostByYear += iTsk._EquipmentCostByYear
-                        
-            for iONS in ONS.OtherNonStaff.instances:
-                if iONS._WPInst == iWp:
-                    if len(iONS._OtherNonStaffCostByYear) > 0:
-                        _OtherNonStaffCostByYear += \
-                            iONS._OtherNonStaffCostByYear
-                    if WorkPackage.__Debug:
-                        print("         ----> W/p, other non-staff cost", \
-                              _OtherNonStaffCostByYear)
-                        
+                print("     ----> W/p:", iWp._Name, "; staff cost", \
+                      _StaffCostByYear, "; equipment cost", \
+                      _EquipmentCostByYear, "; other non-staff cost", \
+                      _OtherNonStaffCostByYear)
+
             iWp._StaffFracByYear = _StaffFracByYear
             iWp._StaffCostByYear = _StaffCostByYear
             iWp.setTotalStaffFrac()
@@ -986,20 +1040,70 @@ class WorkPackage:
             iWp._EquipmentCostByYear = _EquipmentCostByYear
             iWp.setTotalEquipmentCost()
 
-            iWp.setInflationByYr()
+            iWp.setInflationByYr(_Cntrl)
             iWp.setTotalInflation()
             
             iWp._OtherNonStaffCostByYear = _OtherNonStaffCostByYear
             iWp.setTotalOtherNonStaffCost()
 
-            iWp.setWorkingMarginByYear()
+            iWp.setWorkingMarginByYear(_Cntrl)
             iWp.setWorkingMarginTotal()
 
-            iWp.setContingencyByYear()
+            iWp.setContingencyByYear(_Cntrl)
             iWp.setContingencyTotal()
 
             iWp.setTotalCostByYear()
             iWp.setGrandTotal()
+
+    @classmethod
+    def doQuarterlyCosting(cls, _WPs=None, _Cntrl=None):
+        WPs   = cls.instances
+        if _WPs is not None:
+            WPs = _WPs
+        nWP   = len(WPs)
+        WPPos = {iWp: iPos for iPos, iWp in enumerate(WPs)}
+
+        #.. Leaves; tasks and other non-staff items, by work package:
+        TskGrp = np.array([WPPos.get(iTsk._WorkPackage, -1) \
+                           for iTsk in Tsk.Task.instances], dtype=int)
+        ONSGrp = np.array([WPPos.get(iONS._WPInst, -1) \
+                           for iONS in ONS.OtherNonStaff.instances], \
+                          dtype=int)
+        Leaves  = {}
+        Lengths = []
+        for Attr in ("_StaffFracByQtr", "_StaffCostByQtr", \
+                     "_CGStaffCostByQtr", "_EquipmentCostByQtr"):
+            Vectors = [getattr(iTsk, Attr) if TskGrp[iLf] >= 0 \
+                       else np.array([]) \
+                       for iLf, iTsk in enumerate(Tsk.Task.instances)]
+            Leaves[Attr] = Agg.Aggregation.stack(Vectors)
+            Lengths.append(Leaves[Attr][1])
+        Vectors = [iONS._OtherNonStaffCostByYear if ONSGrp[iLf] >= 0 \
+                   else np.array([]) \
+                   for iLf, iONS in enumerate(ONS.OtherNonStaff.instances)]
+        Values, ONSLen = Agg.Aggregation.stack(Vectors)
+        Leaves["_OtherNonStaffCostByQtr"] = \
+            (Agg.Aggregation.toQuarters(Values), 4 * ONSLen)
+        Lengths.append(4 * ONSLen)
+        Groups = np.concatenate([TskGrp, TskGrp, TskGrp, TskGrp, ONSGrp])
+        GrpLen = Agg.Aggregation.groupLength(np.concatenate(Lengths), \
+                                             Groups, nWP)
+
+        Sums = {}
+        for Attr in Leaves:
+            if Attr == "_OtherNonStaffCostByQtr":
+                Grp = ONSGrp
+            else:
+                Grp = TskGrp
+            Sums[Attr] = Agg.Aggregation.rollUp(Leaves[Attr][0], Grp, \
+                                                nWP, GrpLen)
+
+        for iPos, iWp in enumerate(WPs):
+            for Attr in Sums:
+                setattr(iWp, Attr, Sums[Attr][iPos])
+            iWp._TrvlCnsmCostByQtr = \
+                Agg.Aggregation.toQuarters(iWp._TrvlCnsmCostByYear)
+            iWp.setQuarterlyCosting(_Cntrl)
               
 #--------  Exceptions:
 class NoFilenameProvided(Exception):
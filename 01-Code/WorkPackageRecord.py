@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Class WorkPackageRecord:
+========================
+
+  Reads a work package definition CSV file into a plain, picklable
+  intermediate record.  Reading a record does not touch the WorkPackage,
+  Task, Staff, etc. registries, so records can be produced in worker
+  processes and replayed into the registries by WorkPackage (see
+  WorkPackage.loadRecord and WorkPackage.ingest).
+
+  A record is a dictionary:
+    "Filename": Path to work package definition file
+    "Version" : Parser version, _Version, used to produce the record
+    "Entries" : List of tuples, one per data-carrying row, in file order:
+                  ("Project",       ProjectName)
+                  ("Work package",  WorkPackageCode, WorkPackageName)
+                  ("Manager",       WPM)
+                  ("Years",         List of financial years)
+                  ("Task",          TaskName)
+                  ("Institute",     InstituteCode)
+                  ("Staff",         StaffCode,
+                                    numpy array (years, 4) fractions)
+                  ("Equipment",     EquipmentName, numpy array costs)
+                  ("OtherNonStaff", ItemName, numpy array costs)
+                  ("Consume",       numpy array costs)
+                  ("Travel",        numpy array costs)
+
+  WorkPackageRecord has no instances; all methods are class methods.
+
+
+  Class attributes:
+  -----------------
+  __Debug : Boolean: set for debug print out
+  _Version: Parser version; to be incremented whenever the content of a
+            record changes.
+  _CacheKind: Kind under which records are held in the parse cache.
+  _ParseHandlers: Dictionary mapping the flag in column 0 of the work
+            package definition to the name of the method that decodes the
+            row; None for flags that carry no data.
+
+
+  Methods:
+  --------
+  I/o methods:
+      read: Read work package definition file and return record.  The
+            record is taken from the parse cache if the file is unchanged
+            since it was last parsed (see ParseCache).
+                 Input: _filename -- path to work package definition
+                Return: record (dictionary)
+                 [Classmethod]
+
+      loadCached: Return record from the parse cache; None on a miss or
+                  if the cache is disabled.
+                 Input: _filename -- path to work package definition
+                 [Classmethod]
+
+      storeCached: Write record to the parse cache.
+                 Input: _Record -- record (dictionary)
+                 [Classmethod]
+
+      readAll: Read list of work package definition files, in worker
+               processes if more than one worker is requested and the
+               "fork" start method is available.
+                 Input: _Filenames -- list of paths
+                        _nWorkers  -- number of worker processes; None for
+                                      os.cpu_count()
+                Return: list of records in the order of _Filenames
+                 [Classmethod]
+
+  Processing methods:
+      parseSheet: Decode numpy object array holding the work package
+                  definition into a record.  The row flag (column 0) is
+                  dispatched through _ParseHandlers.  Year and quarter
+                  blocks are sliced using the column map built from the
+                  "Years" row.
+                 Input: _filename -- path to work package definition
+                        _Sheet    -- numpy object array
+                Return: record (dictionary)
+                 [Classmethod]
+
+      parse<Flag>: Row decoders called by parseSheet.
+                 Input: _Row   -- numpy object array, row of sheet
+                        _State -- dictionary holding the column map
+                Return: record entry (tuple)
+                 [Classmethod]
+
+      parseCosts: Return numpy array of costs by year from a row; blank
+                  cells are set to zero.
+                 [Classmethod]
+
+
+Created on Sun 18Oct26. Version history:
+----------------------------------------
+ 1.0: 18Oct26: First implementation; decoding moved from WorkPackage
+ 1.1: 18Oct26: Records held in content-hash keyed parse cache
+
+@author: kennethlong
+"""
+
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy  as np
+import pandas as pnds
+
+import ParseCache as PrsCch
+
+class WorkPackageRecord:
+    __Debug  = False
+    _Version = 1
+    _CacheKind = "WorkPackage"
+
+#--------  I/o methods:
+    @classmethod
+    def read(cls, _filename):
+        Record = cls.loadCached(_filename)
+        if Record == None:
+            wpParams = pnds.read_csv(_filename)
+            Record   = cls.parseSheet(_filename, \
+                                      wpParams.to_numpy(dtype=object))
+            cls.storeCached(Record)
+        return Record
+
+    @classmethod
+    def loadCached(cls, _filename):
+        return PrsCch.ParseCache.load(cls._CacheKind, _filename, \
+                                      cls._Version)
+
+    @classmethod
+    def storeCached(cls, _Record):
+        PrsCch.ParseCache.store(cls._CacheKind, _Record["Filename"], \
+                                cls._Version, _Record)
+
+    @classmethod
+    def readAll(cls, _Filenames, _nWorkers=None):
+        nWorkers = _nWorkers
+        if nWorkers == None:
+            nWorkers = os.cpu_count()
+        nWorkers = min(nWorkers, len(_Filenames))
+        if nWorkers <= 1 or not "fork" in mp.get_all_start_methods():
+            return [cls.read(filename) for filename in _Filenames]
+        if cls.__Debug:
+            print(" WorkPackageRecord; readAll: reading", len(_Filenames), \
+                  "files with", nWorkers, "workers")
+        with ProcessPoolExecutor(max_workers=nWorkers, \
+                                 mp_context=mp.get_context("fork")) as Pool:
+            return list(Pool.map(cls.read, _Filenames))
+
+#--------  Processing methods:
+    @classmethod
+    def parseSheet(cls, _filename, _Sheet):
+        Record = {"Filename": _filename, \
+                  "Version" : cls._Version, \
+                  "Entries" : []}
+        State  = {"YrCols": None, "QtrCols": None, "nYrs": None}
+        for i in range(_Sheet.shape[0]):
+            Flag = str(_Sheet[i,0])
+            if cls.__Debug:
+                print(" WorkPackageRecord; parseSheet: processing flag: ", \
+                      Flag)
+            if Flag in cls._ParseHandlers:
+                Handler = cls._ParseHandlers[Flag]
+                if Handler != None:
+                    Record["Entries"].append( \
+                                    getattr(cls, Handler)(_Sheet[i], State))
+            elif cls.__Debug:
+                print(" WorkPackageRecord; parseSheet: ", \
+                      "Unprocessed ---->", _Sheet[i,0])
+        return Record
+
+    @classmethod
+    def parseCosts(cls, _Row, _State):
+        Cst = _Row[_State["YrCols"]].astype(float)
+        Cst[np.isnan(Cst)] = 0.
+        return Cst
+
+    @classmethod
+    def parseProject(cls, _Row, _State):
+        return ("Project", _Row[1])
+
+    @classmethod
+    def parseWorkPackageName(cls, _Row, _State):
+        return ("Work package", _Row[1], _Row[2])
+
+    @classmethod
+    def parseManager(cls, _Row, _State):
+        return ("Manager", _Row[2])
+
+    @classmethod
+    def parseYears(cls, _Row, _State):
+        """
+           Header column map: financial years run from column 2 to the
+           "Total" column; the quarter block starts two columns after
+           "Total", four columns per year.
+        """
+        TotalCol = 2 + list(_Row[2:]).index("Total")
+        nYrs     = TotalCol - 2
+        _State["nYrs"]    = nYrs
+        _State["YrCols"]  = np.arange(2, TotalCol)
+        _State["QtrCols"] = np.arange(TotalCol + 2, TotalCol + 2 + 4*nYrs)
+        return ("Years", list(_Row[2:TotalCol]))
+
+    @classmethod
+    def parseTask(cls, _Row, _State):
+        return ("Task", _Row[1])
+
+    @classmethod
+    def parseInstitute(cls, _Row, _State):
+        return ("Institute", _Row[1])
+
+    @classmethod
+    def parseStaff(cls, _Row, _State):
+        StfFracByYrNQtr = _Row[_State["QtrCols"]].astype(float)
+        StfFracByYrNQtr[np.isnan(StfFracByYrNQtr)] = 0.
+        StfFracByYrNQtr = StfFracByYrNQtr.reshape(_State["nYrs"], 4)
+        return ("Staff", _Row[1], StfFracByYrNQtr)
+
+    @classmethod
+    def parseEquipment(cls, _Row, _State):
+        return ("Equipment", _Row[1], cls.parseCosts(_Row, _State))
+
+    @classmethod
+    def parseOtherNonStaff(cls, _Row, _State):
+        return ("OtherNonStaff", _Row[1], cls.parseCosts(_Row, _State))
+
+    @classmethod
+    def parseConsume(cls, _Row, _State):
+        return ("Consume", cls.parseCosts(_Row, _State))
+
+    @classmethod
+    def parseTravel(cls, _Row, _State):
+        return ("Travel", cls.parseCosts(_Row, _State))
+
+    #.. Flag -> handler table; None for flags that carry no data:
+    _ParseHandlers = {"Project"            : "parseProject", \
+                      "Work package"       : "parseWorkPackageName", \
+                      "Manager"            : "parseManager", \
+                      "Years"              : "parseYears", \
+                      "Task"               : "parseTask", \
+                      "Institute"          : "parseInstitute", \
+                      "Staff"              : "parseStaff", \
+                      "Equipment"          : "parseEquipment", \
+                      "OtherNonStaff"      : "parseOtherNonStaff", \
+                      "Consume"            : "parseConsume", \
+                      "Travel"             : "parseTravel", \
+                      "EndStaff"           : None, \
+                      "NonStaffHd"         : None, \
+                      "EquipEnd"           : None, \
+                      "RiskMitigationEquip": None, \
+                      "TotalEquip"         : None, \
+                      "NonStaffEnd"        : None, \
+                      "Flag"               : None, \
+                      "nan"                : None}
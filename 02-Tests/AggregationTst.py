@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for "Aggregation" class
+===================================
+
+  Aggregation.py -- set "relative" path to code
+
+"""
+
+import numpy as np
+
+import Aggregation as Agg
+import Equipment   as Eqp
+
+##! Start:
+print("========  Aggregation: tests start  ========")
+
+##! Stack leaf vectors:
+AggregationTest = 1
+print()
+print("AggregationTest:", AggregationTest, " stack leaf vectors.")
+Vectors = [np.array([1., 2., 3.]), np.array([]), np.array([4., 5., 6.]), \
+           np.array([0.1, 0.2, 0.3])]
+Values, Lengths = Agg.Aggregation.stack(Vectors)
+print("    ----> Values: \n", Values)
+print("    ----> Lengths:", Lengths)
+if Values.shape != (4, 3) or list(Lengths) != [3, 0, 3, 3]:
+    raise Exception("Stack failed")
+print("    <---- Done.")
+
+
+##! Group sums and lengths:
+AggregationTest = 2
+print()
+print("AggregationTest:", AggregationTest, " group sums and lengths.")
+Groups = np.array([1, 0, 1, -1])
+GrpLen = Agg.Aggregation.groupLength(Lengths, Groups, 3)
+print("    ----> Group lengths:", GrpLen)
+if list(GrpLen) != [0, 3, 0]:
+    raise Exception("Group lengths failed")
+Sums = Agg.Aggregation.rollUp(Values, Groups, 3, GrpLen)
+print("    ----> Group sums:", Sums)
+Check = np.zeros(3)
+Check += Vectors[0]
+Check += Vectors[2]
+if len(Sums[0]) != 0 or not np.array_equal(Sums[1], Check) or \
+   len(Sums[2]) != 0:
+    raise Exception("Roll up failed")
+print("    <---- Done.")
+
+
+##! Inconsistent lengths:
+AggregationTest = 3
+print()
+print("AggregationTest:", AggregationTest, " inconsistent lengths.")
+try:
+    GrpLen = Agg.Aggregation.groupLength(np.array([3, 2]), \
+                                         np.array([0, 0]), 1)
+    raise Exception("Failed to catch inconsistent lengths")
+except Agg.InconsistentLengths:
+    print('      ----> Correctly caught inconsistent lengths.')
+print("    <---- Done.")
+
+
+##! Quarters:
+AggregationTest = 4
+print()
+print("AggregationTest:", AggregationTest, " spread years into quarters.")
+Qtrs = Agg.Aggregation.toQuarters(Values)
+print("    ----> Quarters:", Qtrs.shape)
+if Qtrs.shape != (Values.shape[0], 4*Values.shape[1]) or \
+   not np.allclose(Agg.Aggregation.toYears(Qtrs), Values):
+    raise Exception("Quarters failed")
+print("    <---- Done.")
+
+
+##! Shared backing array:
+AggregationTest = 5
+print()
+print("AggregationTest:", AggregationTest, \
+      " vectors held as rows of a shared backing array.")
+Insts = [Eqp.Equipment("AggregationTst " + str(i)) for i in range(3)]
+for Inst, Vec in zip(Insts, Vectors):
+    Inst.setEquipmentCost(Vec.copy())
+Block = Agg.Aggregation.share(Insts, "_EquipmentCostByYear")
+print("    ----> Backing array:", Block.shape)
+for Inst, Vec in zip(Insts, Vectors):
+    if Inst._EquipmentCostByYear.base is not Block or \
+       not np.array_equal(Inst._EquipmentCostByYear, Vec):
+        raise Exception("Share failed")
+if hasattr(Insts[0], "__dict__"):
+    raise Exception("Equipment instance has a __dict__")
+print("    ----> Equipment instances have no __dict__.")
+print("    <---- Done.")
+
+
+##! Complete:
+print()
+print("========  Aggregation: tests complete  ========")
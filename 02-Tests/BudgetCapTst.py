@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for "BudgetCap" class ... budget-cap optimiser
+==========================================================
+
+  Assumes python path includes LhARA code.
+
+"""
+import os
+import numpy as np
+
+import Control as Cntrl
+iCntrl = Cntrl.Control()
+
+import BudgetCap        as BC
+import LhARACostingTool as LCT
+import Project          as Prj
+import Staff            as Stf
+import TaskStaff        as TskStf
+import WorkPackage      as wp
+
+def total():
+    return Prj.Project.instances[0].getTotalProjectCost()
+
+##! Start:
+print("========  BudgetCap: tests start  ========")
+
+LhARAPATH   = os.getenv('LhARAPATH')
+wpDirectory = os.path.join(LhARAPATH, '11-WorkPackages')
+StaffDatabaseFile = os.path.join(LhARAPATH, '12-Staff/StaffDatabase.csv')
+os.environ.pop('REPORTPATH', None)
+
+Stf.Staff.parseStaffDatabase(StaffDatabaseFile)
+Stf.Staff.cleanStaffDatabase()
+wp.WorkPackage.ingest([os.path.join(wpDirectory, wpFile) \
+                       for wpFile in os.listdir(wpDirectory) \
+                       if wpFile.find('.csv') > 0], 1)
+LCT.LhARACostingTool(False).Execute()
+Nominal = total()
+
+##! Project cap:
+BudgetCapTest = 1
+print()
+print("BudgetCapTest:", BudgetCapTest, \
+      " project cap 100k below total is met exactly.")
+try:
+    BC.BudgetCap(None, {"WP99": 100.})
+except BC.UnknownWorkPackage:
+    print("    ----> Correctly caught unknown work package exception.")
+iBC     = BC.BudgetCap(Nominal - 100.)
+print(repr(iBC))
+Changes = iBC.solve()
+print(iBC)
+for Change in Changes:
+    print("    ----> Cut", Change[0], Change[1], "by", \
+          round(100. * float(Change[5]), 2), "%; saving:", \
+          round(float(Change[6]), 3))
+iBC.apply()
+if not np.isclose(total(), Nominal - 100., rtol=1.E-12, atol=1.E-9):
+    raise Exception("Revised total differs from cap")
+print("    ----> Revised project total:", round(float(total()), 3))
+iBC.restore()
+if not np.isclose(total(), Nominal, rtol=1.E-12, atol=1.E-9):
+    raise Exception("Nominal total not restored")
+print("    <---- Done.")
+
+##! Pinned lines and minimum effort:
+BudgetCapTest = 2
+print()
+print("BudgetCapTest:", BudgetCapTest, \
+      " pinned line and minimum effort are respected.")
+TS   = TskStf.TaskStaff
+iBC2 = BC.BudgetCap(Nominal - 100.)
+try:
+    iBC2.pin(iCntrl)
+except BC.UnknownLine:
+    print("    ----> Correctly caught unknown line exception.")
+Pinned = iBC._Lines[int(np.argmax(iBC._Cuts * iBC._Saving[:, -1]))][1]
+for Weight in (0., -1.):
+    try:
+        iBC2.setWeight(Pinned, Weight)
+    except BC.InvalidWeight:
+        print("    ----> Correctly caught invalid weight exception:", Weight)
+if iBC2.getLine(Pinned) != [Line[1] for Line in iBC2._Lines].index(Pinned):
+    raise Exception("Line index differs from list of lines")
+iBC2.pin(Pinned)
+Tasks = [Line[1]._Task for Line in iBC2._Lines if Line[0] == "TaskStaff"]
+for iTsk in Tasks:
+    iBC2.setMinimumEffort(iTsk, iTsk._TotalStaffFrac)
+Changes2 = iBC2.solve()
+if iBC2._Cuts[iBC2.getLine(Pinned)] != 0.:
+    raise Exception("Pinned line cut")
+if any(Change[0] == "TaskStaff" for Change in Changes2):
+    raise Exception("Minimum effort not respected")
+print("    ----> Pinned:", Changes[0][0], Changes[0][1], \
+      "; staff effort held; lines cut:", len(Changes2), \
+      "; shortfall:", {Key: round(float(Value), 3) \
+                       for Key, Value in iBC2._Shortfall.items()})
+print("    <---- Done.")
+
+##! Work package cap, change list and revised overview:
+BudgetCapTest = 3
+print()
+print("BudgetCapTest:", BudgetCapTest, \
+      " work package cap; change list and revised overview.")
+iWP  = wp.WorkPackage.instances[1]
+Cap  = iWP._GrandTotal - 50.
+iBC3 = BC.BudgetCap(None, {iWP._Code: Cap})
+Changes3 = iBC3.solve()
+iBC3.apply()
+if not np.isclose(iWP._GrandTotal, Cap, rtol=1.E-12, atol=1.E-9):
+    raise Exception("Revised work package total differs from cap")
+print("    ----> Revised", iWP._Code, "grand total:", \
+      round(float(iWP._GrandTotal), 3))
+iBC3.restore()
+DataFrame = BC.BudgetCap.createPandasDataframe(Changes3)
+filename  = os.path.join(LhARAPATH, '99-Scratch/BudgetCapTst.csv')
+BC.BudgetCap.createCSV(DataFrame, filename)
+print("    ----> Change list written, rows:", DataFrame.shape[0])
+iBC3.writeOverview(os.path.join(LhARAPATH, '99-Scratch'), \
+                   'BudgetCapOverview.csv')
+print("    ----> Revised overview written.")
+if not np.isclose(total(), Nominal, rtol=1.E-12, atol=1.E-9):
+    raise Exception("Nominal total not restored")
+print("    <---- Done.")
+
+##! Cap that can not be met:
+BudgetCapTest = 4
+print()
+print("BudgetCapTest:", BudgetCapTest, " cap that can not be met.")
+iBC4 = BC.BudgetCap(0.)
+iBC4.solve()
+print("    ----> Shortfall (£k):", \
+      round(float(iBC4._Shortfall["Project"]), 3))
+print("    <---- Done.")
+
+##! Minimum effort below the task total:
+BudgetCapTest = 5
+print()
+print("BudgetCapTest:", BudgetCapTest, \
+      " minimum effort below the task total.")
+#.. Task with spare effort 0.5: A (fraction 1.0, saving 100) and B
+#   (fraction 0.1, saving 90); C in another task (saving 50).  A cap
+#   140 below the total is met by cutting B fully, A by 0.4 and C by 0.2:
+c = np.array([1., 1., 1.])
+A = np.array([[-100., -90., -50.], \
+              [   1.,  0.1,   0.], \
+              [   1.,   0.,   0.], \
+              [   0.,   1.,   0.], \
+              [   0.,   0.,   1.]])
+b = np.array([-140., 0.5, 1., 1., 1.])
+Cuts = BC.BudgetCap.simplex(c, A, b)
+if not np.allclose(Cuts, [0.4, 1., 0.2], rtol=0., atol=1.E-12):
+    raise Exception("Cuts differ from the solution of the programme")
+print("    ----> Cuts of A, B, C:", np.round(Cuts, 6).tolist())
+if BC.BudgetCap.simplex(c, A, np.array([-250., 0.5, 1., 1., 1.])) \
+   is not None:
+    raise Exception("Cap that can not be met found feasible")
+print("    ----> Cap that can not be met is infeasible.")
+
+#.. Half the effort cut from the task of the line cut most in test 1
+#   may be removed:
+Line  = iBC._Lines[int(np.argmax(iBC._Cuts * iBC._Saving[:, -1]))][1]
+iTsk  = Line._Task
+Rows  = [iTS._Row for iTS in TS.instances \
+         if iTS._Task is iTsk and iTS._Row != None]
+Spare = 0.5 * float(np.max(iBC._Cuts)) * TS._TotalFrac[Line._Row]
+MinFrac = float(np.sum(TS._TotalFrac[Rows])) - Spare
+iBC5  = BC.BudgetCap(Nominal - 100.)
+iBC5.setMinimumEffort(iTsk, MinFrac)
+iBC5.solve()
+iBC5.apply()
+Effort = float(np.sum(TS._TotalFrac[Rows]))
+if Effort < MinFrac - 1.E-9:
+    raise Exception("Minimum effort not respected")
+if not np.isclose(Effort, MinFrac, rtol=1.E-12, atol=1.E-9):
+    raise Exception("Spare effort of task not used")
+if not np.isclose(total(), Nominal - 100., rtol=1.E-12, atol=1.E-9):
+    raise Exception("Revised total differs from cap")
+print("    ----> Task:", iTsk._Name, "; minimum effort:", \
+      round(MinFrac, 4), "; revised effort:", round(Effort, 4), \
+      "; lines cut:", int(np.sum(iBC5._Cuts > 0.)))
+print("    ----> Revised project total:", round(float(total()), 3))
+iBC5.restore()
+print("    <---- Done.")
+
+##! Complete:
+print()
+print("========  BudgetCap: tests complete  ========")
@@ -48,6 +48,46 @@ print("    ----> print() method; tests all get methods")
 iCntrl.print()
 
 
+##! Check factor vectors:
+ControlTest = 4
+print()
+print("ControlTest:", ControlTest, " check cached factor vectors.")
+Factors = iCntrl.getFactorsByYr(5)
+for Factor in Factors:
+    print("    ----> ", Factor, ":", Factors[Factor])
+if iCntrl.getFactorsByYr(5) is not Factors:
+    raise Exception("Factor vectors not cached!")
+if Factors["WorkingMargin"].flags.writeable:
+    raise Exception("Factor vectors are writeable!")
+WorkingMargin = iCntrl._WorkingMargin
+cntrl.Control._WorkingMargin = [WorkingMargin[0] + 0.05, WorkingMargin[1]]
+print("    ----> Working margin after change:", \
+      iCntrl.getFactorsByYr(5)["WorkingMargin"])
+if iCntrl.getFactorsByYr(5) is Factors:
+    raise Exception("Factor vectors not invalidated by parameter change!")
+cntrl.Control._WorkingMargin = WorkingMargin
+
+
+##! Check costing contexts:
+ControlTest = 5
+print()
+print("ControlTest:", ControlTest, " check independent costing contexts.")
+Cntxt1 = cntrl.Control.newContext()
+Cntxt2 = cntrl.Control.newContext(filename)
+Cntxt1.setInflation([0.05, 0.05, 0])
+print("    ----> Default context:", iCntrl.isDefault(), \
+      "; new contexts:", Cntxt1.isDefault(), Cntxt2.isDefault())
+print("    ----> Inflation; default:", iCntrl._Inflation, \
+      "; context 1:", Cntxt1._Inflation, "; context 2:", Cntxt2._Inflation)
+if Cntxt1 is iCntrl or Cntxt1 is Cntxt2 or \
+   iCntrl._Inflation == Cntxt1._Inflation or \
+   iCntrl._Inflation != Cntxt2._Inflation:
+    raise Exception("Costing contexts are not independent!")
+print("    ----> Staff inflation factors; default:", \
+      iCntrl.getFactorsByYr(5)["InflationStaff"], "; context 1:", \
+      Cntxt1.getFactorsByYr(5)["InflationStaff"])
+
+
 ##! Complete:
 print()
 print("========  Control: tests complete  ========")
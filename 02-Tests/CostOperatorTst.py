@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for "CostOperator" class ... linear cost operator
+=============================================================
+
+  Assumes python path includes LhARA code.
+
+"""
+import os
+import numpy as np
+
+import Control as Cntrl
+iCntrl = Cntrl.Control()
+
+import CostOperator     as CstOp
+import Equipment        as Eqp
+import LhARACostingTool as LCT
+import Project          as Prj
+import Staff            as Stf
+import Task             as Tsk
+import TaskStaff        as TskStf
+import WorkPackage      as wp
+
+def close(_a, _b):
+    return np.allclose(_a, _b, rtol=1.E-12, atol=1.E-9)
+
+def check(_Outputs):
+    for iPos, iWP in enumerate(wp.WorkPackage.instances):
+        if not close(_Outputs["Total"][iPos], iWP._TotalCostByYear) or \
+           not close(_Outputs["Staff"][iPos], iWP._StaffCostByYear) or \
+           not close(_Outputs["ContingencyStaff"][iPos], \
+                     iWP._ContingencyByYear[1]):
+            raise Exception("Operator differs from doCosting for " + \
+                            iWP._Code)
+    iPrj = Prj.Project.instances[0]
+    if not close(_Outputs["Contingency"][-1], iPrj._ContingencyByYear) or \
+       not close(_Outputs["Total"][-1], iPrj.getTotalProjectCostByYear()):
+        raise Exception("Operator differs from doCosting for project")
+
+##! Start:
+print("========  CostOperator: tests start  ========")
+
+LhARAPATH   = os.getenv('LhARAPATH')
+wpDirectory = os.path.join(LhARAPATH, '11-WorkPackages')
+StaffDatabaseFile = os.path.join(LhARAPATH, '12-Staff/StaffDatabase.csv')
+os.environ.pop('REPORTPATH', None)
+
+Stf.Staff.parseStaffDatabase(StaffDatabaseFile)
+Stf.Staff.cleanStaffDatabase()
+wp.WorkPackage.ingest([os.path.join(wpDirectory, wpFile) \
+                       for wpFile in os.listdir(wpDirectory) \
+                       if wpFile.find('.csv') > 0], 1)
+LCT.LhARACostingTool(False).Execute()
+
+##! Compile and evaluate:
+CostOperatorTest = 1
+print()
+print("CostOperatorTest:", CostOperatorTest, \
+      " compiled operator reproduces doCosting.")
+iOp = CstOp.CostOperator()
+print(repr(iOp))
+print(iOp)
+Outputs = iOp.evaluate()
+check(Outputs)
+print("    ----> Project total by year:", Outputs["Total"][-1])
+print("    <---- Done.")
+
+##! Re-evaluation after change of equipment cost:
+CostOperatorTest = 2
+print()
+print("CostOperatorTest:", CostOperatorTest, \
+      " re-evaluation agrees with re-running doCosting.")
+iEqp = iOp._EqpKeys[0]
+Nominal = iEqp._EquipmentCostByYear
+iEqp._EquipmentCostByYear = Nominal + 10.
+x = iOp.getInput()
+Outputs = iOp.evaluate(x)
+Tsk.Task.doCosting()
+wp.WorkPackage.doCosting()
+Prj.Project.doCosting()
+check(Outputs)
+print("    ----> Equipment", iEqp._Name, "+10 per year; project total:", \
+      np.sum(Outputs["Total"][-1]))
+iEqp._EquipmentCostByYear = Nominal
+
+X = np.stack([x, iOp.getInput()], axis=1)
+Y = iOp.apply(X)
+if not close(Y[:, 0], iOp.apply(x)) or not close(Y[:, 1], iOp.apply(X[:, 1])):
+    raise Exception("Matrix of input vectors differs from single vectors")
+print("    ----> Matrix of input vectors:", X.shape, "->", Y.shape)
+print("    <---- Done.")
+
+##! Write costing back:
+CostOperatorTest = 3
+print()
+print("CostOperatorTest:", CostOperatorTest, " write costing back.")
+iOp.setCosting(iOp.evaluate())
+Tsk.Task.doCosting()
+Reference = [iWP._TotalCostByYear.copy() for iWP in wp.WorkPackage.instances]
+wp.WorkPackage.doCosting()
+for iWP, TotByYr in zip(wp.WorkPackage.instances, Reference):
+    if not close(iWP._TotalCostByYear, TotByYr):
+        raise Exception("Written costing differs for " + iWP._Code)
+print("    ----> Grand totals:", [round(float(iWP._GrandTotal), 3) \
+                                  for iWP in wp.WorkPackage.instances])
+
+x0 = iOp.getInput()
+x1 = x0.copy()
+x1[iOp._Slices["TaskStaff"]] *= 1.1
+x1[iOp._Slices["Equipment"]] += 5.
+iOp.setCosting(iOp.evaluate(x1), x1)
+Tasks  = [(iTsk._TotalStaffCost, iTsk._TotalEquipmentCost) \
+          for iTsk in Tsk.Task.instances]
+StfCst = TskStf.TaskStaff._TotalCost[iOp._Rows].copy()
+Reference = [iWP._TotalCostByYear.copy() for iWP in wp.WorkPackage.instances]
+TskStf.TaskStaff.doCosting()
+TskStf.TaskStaff._FracByYr[iOp._Rows] *= 1.1
+TskStf.TaskStaff.costRows(iOp._Rows)
+if not close(TskStf.TaskStaff._TotalCost[iOp._Rows], StfCst):
+    raise Exception("Written TaskStaff costing differs")
+Tsk.Task.doCosting()
+if not all(close(Tot, (iTsk._TotalStaffCost, iTsk._TotalEquipmentCost)) \
+           for Tot, iTsk in zip(Tasks, Tsk.Task.instances)):
+    raise Exception("Written task costing differs")
+wp.WorkPackage.doCosting()
+for iWP, TotByYr in zip(wp.WorkPackage.instances, Reference):
+    if not close(iWP._TotalCostByYear, TotByYr):
+        raise Exception("Written costing differs for " + iWP._Code)
+print("    ----> Changed inputs written back; task staff cost:", \
+      round(float(np.sum([Tot[0] for Tot in Tasks])), 3))
+iOp.setCosting(iOp.evaluate(x0), x0)
+if not close(iOp.getInput(), x0):
+    raise Exception("Nominal input not restored")
+print("    <---- Done.")
+
+##! Complete:
+print()
+print("========  CostOperator: tests complete  ========")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for "CostingState" class ... incremental recosting
+==============================================================
+
+  Assumes python path includes LhARA code.
+
+"""
+import os
+import shutil
+
+import Control as Cntrl
+iCntrl = Cntrl.Control()
+
+import CostingState     as CstStt
+import LhARACostingTool as LCT
+import Staff            as Stf
+import Project          as Prj
+import WorkPackage      as wp
+
+iLCT = LCT.LhARACostingTool(False)
+
+def load(_wpDirectory, _StaffDatabaseFile):
+    iLCT.ClearDataStructure()
+    Stf.Staff.instances = []
+    Stf.Staff.buildIndex()
+    Stf.Staff.parseStaffDatabase(_StaffDatabaseFile)
+    Stf.Staff.cleanStaffDatabase()
+    wp.WorkPackage.ingest([os.path.join(_wpDirectory, wpFile) \
+                           for wpFile in os.listdir(_wpDirectory) \
+                           if wpFile.find('.csv') > 0], 1)
+
+def totals():
+    Totals = {iWP._Code: iWP._TotalCostByYear.tobytes() \
+              for iWP in wp.WorkPackage.instances}
+    Totals["Project"] = Prj.Project.instances[0]._StaffCostByYear.tobytes()
+    return Totals
+
+def execute(_Incremental):
+    LCT.LhARACostingTool(False, _Incremental).Execute()
+
+##! Start:
+print("========  CostingState: tests start  ========")
+
+LhARAPATH   = os.getenv('LhARAPATH')
+wpDirectory = os.path.join(LhARAPATH, '11-WorkPackages')
+StaffDatabaseFile = os.path.join(LhARAPATH, '12-Staff/StaffDatabase.csv')
+ScratchDir  = os.path.join(LhARAPATH, '99-Scratch/CostingState')
+if os.path.isdir(ScratchDir):
+    shutil.rmtree(ScratchDir)
+CacheDir    = os.path.join(ScratchDir, 'Cache')
+wpCopy      = os.path.join(ScratchDir, '11-WorkPackages')
+os.makedirs(CacheDir)
+shutil.copytree(wpDirectory, wpCopy)
+os.environ['CACHEPATH'] = CacheDir
+os.environ.pop('REPORTPATH', None)
+
+##! Full costing for reference:
+CostingStateTest = 1
+print()
+print("CostingStateTest:", CostingStateTest, \
+      " full costing; no state written.")
+load(wpCopy, StaffDatabaseFile)
+execute(False)
+Reference = totals()
+if CstStt.CostingState.load() != None:
+    raise Exception("State written by full costing")
+print("    ----> Work packages:", len(wp.WorkPackage.instances))
+print("    <---- Done.")
+
+##! First incremental run; everything costed:
+CostingStateTest = 2
+print()
+print("CostingStateTest:", CostingStateTest, \
+      " first incremental run re-costs all work packages.")
+load(wpCopy, StaffDatabaseFile)
+Plan = CstStt.CostingState.plan(None)
+print("    ----> Dirty:", [iWP._Code for iWP in Plan["Dirty"]])
+execute(True)
+if totals() != Reference:
+    raise Exception("Incremental costing differs from full costing")
+print("    <---- Done.")
+
+##! Second incremental run; everything restored:
+CostingStateTest = 3
+print()
+print("CostingStateTest:", CostingStateTest, \
+      " unchanged inputs; all work packages restored.")
+load(wpCopy, StaffDatabaseFile)
+Plan = CstStt.CostingState.plan(CstStt.CostingState.load())
+print("    ----> Clean:", [iWP._Code for iWP in Plan["Clean"]], \
+      "; changed:", Plan["Changed"])
+if len(Plan["Dirty"]) != 0 or Plan["Changed"]:
+    raise Exception("Unchanged work packages marked dirty")
+load(wpCopy, StaffDatabaseFile)
+execute(True)
+if totals() != Reference:
+    raise Exception("Restored costing differs from full costing")
+print("    <---- Done.")
+
+##! Edit one work package:
+CostingStateTest = 4
+print()
+print("CostingStateTest:", CostingStateTest, \
+      " edited work package is the only one re-costed.")
+wpFile = sorted(os.listdir(wpCopy))[0]
+with open(os.path.join(wpCopy, wpFile)) as File:
+    Lines = File.readlines()
+for iLn, Line in enumerate(Lines):
+    if Line.startswith("Travel,"):
+        Cells = Line.split(",")
+        Cells[2] = str(float(Cells[2]) + 1.)
+        Lines[iLn] = ",".join(Cells)
+        break
+with open(os.path.join(wpCopy, wpFile), 'w') as File:
+    File.writelines(Lines)
+load(wpCopy, StaffDatabaseFile)
+Plan = CstStt.CostingState.plan(CstStt.CostingState.load())
+print("    ----> Dirty:", [iWP._Code for iWP in Plan["Dirty"]])
+if len(Plan["Dirty"]) != 1:
+    raise Exception("Expected exactly one dirty work package")
+load(wpCopy, StaffDatabaseFile)
+execute(True)
+Incremental = totals()
+load(wpCopy, StaffDatabaseFile)
+execute(False)
+if Incremental != totals() or Incremental == Reference:
+    raise Exception("Incremental costing of edit differs from full costing")
+print("    <---- Done.")
+
+##! Control parameters changed:
+CostingStateTest = 5
+print()
+print("CostingStateTest:", CostingStateTest, \
+      " change of control parameters marks all work packages dirty.")
+WorkingMargin = iCntrl._WorkingMargin
+Cntrl.Control._WorkingMargin = [WorkingMargin[0] + 0.05, WorkingMargin[1]]
+load(wpCopy, StaffDatabaseFile)
+Plan = CstStt.CostingState.plan(CstStt.CostingState.load())
+print("    ----> Dirty:", [iWP._Code for iWP in Plan["Dirty"]])
+if len(Plan["Clean"]) != 0:
+    raise Exception("Control change did not mark all work packages dirty")
+Cntrl.Control._WorkingMargin = WorkingMargin
+print("    <---- Done.")
+
+##! Complete:
+print()
+print("========  CostingState: tests complete  ========")
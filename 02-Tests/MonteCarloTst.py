@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for "MonteCarlo" class ... cost-uncertainty simulation
+==================================================================
+
+  Assumes python path includes LhARA code.
+
+"""
+import os
+import numpy as np
+
+import Control as Cntrl
+iCntrl = Cntrl.Control()
+
+import LhARACostingTool as LCT
+import MonteCarlo       as MC
+import Project          as Prj
+import Staff            as Stf
+import TaskStaff        as TskStf
+import WorkPackage      as wp
+
+##! Start:
+print("========  MonteCarlo: tests start  ========")
+
+LhARAPATH   = os.getenv('LhARAPATH')
+wpDirectory = os.path.join(LhARAPATH, '11-WorkPackages')
+StaffDatabaseFile = os.path.join(LhARAPATH, '12-Staff/StaffDatabase.csv')
+os.environ.pop('REPORTPATH', None)
+
+Stf.Staff.parseStaffDatabase(StaffDatabaseFile)
+Stf.Staff.cleanStaffDatabase()
+wp.WorkPackage.ingest([os.path.join(wpDirectory, wpFile) \
+                       for wpFile in os.listdir(wpDirectory) \
+                       if wpFile.find('.csv') > 0], 1)
+LCT.LhARACostingTool(False).Execute()
+
+##! No uncertainty reproduces doCosting:
+MonteCarloTest = 1
+print()
+print("MonteCarloTest:", MonteCarloTest, \
+      " no uncertainty reproduces WorkPackage.doCosting.")
+Result = MC.MonteCarlo.simulate(10, 1, (50,), 4)
+for iPos, iWP in enumerate(wp.WorkPackage.instances):
+    if not np.allclose(Result["WorkPackageTotalCostByYear"][0, iPos], \
+                       iWP._TotalCostByYear, rtol=1.E-12, atol=1.E-9):
+        raise Exception("Realisation differs from doCosting for " + \
+                        iWP._Code)
+print("    ----> Project total by year:", \
+      Result["ProjectTotalCostByYear"][0])
+print("    <---- Done.")
+
+##! Reproducible percentiles:
+MonteCarloTest = 2
+print()
+print("MonteCarloTest:", MonteCarloTest, \
+      " seeded simulation with uncertainties attached.")
+try:
+    MC.MonteCarlo.setUncertainty("Equipment", ("Gaussian", 0.1))
+except MC.UnknownDistribution:
+    print("    ----> Correctly caught unknown distribution exception.")
+MC.MonteCarlo.setUncertainty("Equipment", ("Triangular", 0.9, 1., 1.5))
+MC.MonteCarlo.setUncertainty("Staff",     ("Normal", 0.05))
+MC.MonteCarlo.setUncertainty("TaskStaff", ("LogNormal", 0.2))
+Result = MC.MonteCarlo.simulate(20000, 42, (50, 80), 2500, 1)
+print("    ----> Seed:", Result["Seed"], "; realisations:", \
+      Result["nSamples"])
+for iP, Pcnt in enumerate(Result["Percentiles"]):
+    print("    ----> P" + str(Pcnt), "project total:", \
+          Result["ProjectTotalCost"][iP], "; by year:", \
+          Result["ProjectTotalCostByYear"][iP])
+if not Result["ProjectTotalCost"][1] > Result["ProjectTotalCost"][0]:
+    raise Exception("P80 not above P50")
+Again = MC.MonteCarlo.simulate(20000, 42, (50, 80), 2500, 2)
+if Again["ProjectTotalCostSamples"].tobytes() != \
+   Result["ProjectTotalCostSamples"].tobytes():
+    raise Exception("Result depends on number of workers")
+print("    ----> Identical result with two workers.")
+print("    <---- Done.")
+
+##! Per-item distribution and CSV:
+MonteCarloTest = 3
+print()
+print("MonteCarloTest:", MonteCarloTest, \
+      " per-item distribution and CSV output.")
+MC.MonteCarlo.clearUncertainty()
+iStf = Stf.Staff.instances[0]
+MC.MonteCarlo.setUncertainty("Staff", ("Uniform", 1., 2.), \
+                             (iStf._InstituteCode, iStf._StaffCode))
+Model = MC.MonteCarlo.getModel()
+if [iKey for iKey, Dist in zip(TskStf.TaskStaff._StaffKeys, \
+                               Model["Distributions"]["Staff"]) \
+    if Dist != None] != [iStf]:
+    raise Exception("Staff distribution not applied to one staff member")
+iTskStf = TskStf.TaskStaff.instances[0]
+MC.MonteCarlo.setUncertainty("TaskStaff", ("Uniform", 1., 2.), \
+                             (iTskStf._Task._WorkPackage._Code, \
+                              iTskStf._Task._Name, \
+                              iTskStf._Staff._InstituteCode, \
+                              iTskStf._Staff._StaffCode))
+nDist = sum(Dist != None for Dist in \
+            MC.MonteCarlo.getModel()["Distributions"]["TaskStaff"])
+if nDist != 1:
+    raise Exception("TaskStaff distribution not applied to one row")
+MC.MonteCarlo.setUncertainty("TaskStaff", None, \
+                             (iTskStf._Task._WorkPackage._Code, \
+                              iTskStf._Task._Name, \
+                              iTskStf._Staff._InstituteCode, \
+                              iTskStf._Staff._StaffCode))
+print("    ----> Staff and task-staff distributions apply to one item.")
+Result = MC.MonteCarlo.simulate(1000, 7)
+print("    ----> Staff", iStf._StaffCode, "P50, P80 project total:", \
+      Result["ProjectTotalCost"])
+DataFrame = MC.MonteCarlo.createPandasDataframe(Result)
+filename  = os.path.join(LhARAPATH, '99-Scratch/MonteCarloTst.csv')
+MC.MonteCarlo.createCSV(DataFrame, filename)
+print("    ----> CSV file written, rows:", DataFrame.shape[0])
+MC.MonteCarlo.clearUncertainty()
+print("    <---- Done.")
+
+##! Complete:
+print()
+print("========  MonteCarlo: tests complete  ========")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for "ParseCache" class
+==================================
+
+  Assumes python path includes LhARA code.
+
+"""
+import os
+import shutil
+import numpy as np
+
+import Control as Cntrl
+iCntrl = Cntrl.Control()
+
+import ParseCache        as PrsCch
+import WorkPackageRecord as WPRec
+import WorkPackage       as wp
+import Staff             as Stf
+
+def sameEntries(_Ent1, _Ent2):
+    if len(_Ent1) != len(_Ent2):
+        return False
+    for Row1, Row2 in zip(_Ent1, _Ent2):
+        for Itm1, Itm2 in zip(Row1, Row2):
+            if isinstance(Itm1, np.ndarray):
+                if Itm1.tobytes() != Itm2.tobytes():
+                    return False
+            elif Itm1 != Itm2 and not (Itm1 != Itm1 and Itm2 != Itm2):
+                return False
+    return True
+
+##! Start:
+print("========  ParseCache: tests start  ========")
+
+LhARAPATH   = os.getenv('LhARAPATH')
+wpDirectory = os.path.join(LhARAPATH, '11-WorkPackages')
+Filenames   = sorted([os.path.join(wpDirectory, wpFile) \
+                      for wpFile in os.listdir(wpDirectory) \
+                      if wpFile.find('.csv') > 0])
+StaffDatabaseFile = os.path.join(LhARAPATH, '12-Staff/StaffDatabase.csv')
+CacheDir    = os.path.join(LhARAPATH, '99-Scratch/ParseCache')
+if os.path.isdir(CacheDir):
+    shutil.rmtree(CacheDir)
+
+##! Cache disabled:
+ParseCacheTest = 1
+print()
+print("ParseCacheTest:", ParseCacheTest, \
+      " cache disabled if CACHEPATH not set.")
+os.environ.pop('CACHEPATH', None)
+print("    ----> Cache path:", PrsCch.ParseCache.getCachePath())
+if PrsCch.ParseCache.load("WorkPackage", Filenames[0], 1) != None:
+    raise Exception("Cache hit with cache disabled")
+print("    <---- Done.")
+
+##! Miss, then hit:
+ParseCacheTest = 2
+print()
+print("ParseCacheTest:", ParseCacheTest, \
+      " work package record: miss, then hit with identical entries.")
+os.makedirs(CacheDir)
+os.environ['CACHEPATH'] = CacheDir
+Record1 = WPRec.WorkPackageRecord.read(Filenames[0])
+nHit    = PrsCch.ParseCache._nHit
+Record2 = WPRec.WorkPackageRecord.read(Filenames[0])
+if PrsCch.ParseCache._nHit != nHit + 1:
+    raise Exception("Second read not taken from cache")
+if not sameEntries(Record1["Entries"], Record2["Entries"]):
+    raise Exception("Cached record differs from parsed record")
+print("    ----> Hits:", PrsCch.ParseCache._nHit, \
+      "; misses:", PrsCch.ParseCache._nMiss, \
+      "; entries:", len(Record2["Entries"]))
+print("    <---- Done.")
+
+##! Work package instance from cache:
+ParseCacheTest = 3
+print()
+print("ParseCacheTest:", ParseCacheTest, \
+      " WorkPackage instance created from cached record.")
+iWP = wp.WorkPackage(Filenames[0])
+if iWP._wpParams is not None:
+    raise Exception("WorkPackage read file despite cache hit")
+print("    ----> Loaded:", iWP._Code, iWP._Name, iWP._FinancialYears)
+print("    <---- Done.")
+
+##! Staff database:
+ParseCacheTest = 4
+print()
+print("ParseCacheTest:", ParseCacheTest, \
+      " staff database: miss, then hit with identical staff.")
+Stf.Staff.instances = []
+Stf.Staff.buildIndex()
+nStf1  = Stf.Staff.parseStaffDatabase(StaffDatabaseFile)
+Staff1 = [(iStf._InstituteCode, iStf._StaffCode, iStf._AnnualCost) \
+          for iStf in Stf.Staff.instances]
+Stf.Staff.instances = []
+Stf.Staff.buildIndex()
+nHit   = PrsCch.ParseCache._nHit
+nStf2  = Stf.Staff.parseStaffDatabase(StaffDatabaseFile)
+Staff2 = [(iStf._InstituteCode, iStf._StaffCode, iStf._AnnualCost) \
+          for iStf in Stf.Staff.instances]
+if PrsCch.ParseCache._nHit != nHit + 1:
+    raise Exception("Staff database not taken from cache")
+if nStf1 != nStf2 or not sameEntries(Staff1, Staff2):
+    raise Exception("Cached staff database differs")
+print("    ----> Staff:", nStf2)
+print("    <---- Done.")
+
+##! Edited file misses:
+ParseCacheTest = 5
+print()
+print("ParseCacheTest:", ParseCacheTest, " edited file is a cache miss.")
+Copy = os.path.join(LhARAPATH, '99-Scratch/ParseCacheTst.csv')
+shutil.copyfile(Filenames[0], Copy)
+nMiss = PrsCch.ParseCache._nMiss
+WPRec.WorkPackageRecord.read(Copy)
+if PrsCch.ParseCache._nMiss != nMiss:
+    raise Exception("Copy with identical content should hit")
+with open(Copy, 'a') as File:
+    File.write("\n")
+WPRec.WorkPackageRecord.read(Copy)
+if PrsCch.ParseCache._nMiss != nMiss + 1:
+    raise Exception("Edited file should miss")
+print("    ----> Entries cleared:", PrsCch.ParseCache.clear())
+os.remove(Copy)
+print("    <---- Done.")
+
+##! Complete:
+print()
+print("========  ParseCache: tests complete  ========")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for "ProgressTable" class ... columnar progress store
+=================================================================
+
+  Assumes python path includes LhARA code.
+
+"""
+import os
+import numpy as np
+
+import Control as Cntrl
+iCntrl = Cntrl.Control()
+
+import LhARACostingTool as LCT
+import Progress         as Prg
+import ProgressTable    as PrgTbl
+import Project          as Prj
+import Staff            as Stf
+import Task             as Tsk
+import WorkPackage      as wp
+
+def Reference(_Inst):
+    Lines = []
+    for iPrg in sorted(Prg.Progress.instances, key=lambda Inst: Inst._Date):
+        if iPrg._PrjWPorTsk != _Inst:
+            continue
+        PV   = iPrg._PlannedValue
+        EV   = iPrg.getEarnedValue()
+        Spnd = iPrg._Spend
+        if Spnd == 0.:
+            Spnd = 1.E-6
+        SV, CV, BV, SPI, CPI = 0., 0., 0., 1., 1.
+        if not np.isnan(EV):
+            SV, CV, BV = EV - PV, EV - Spnd, Spnd - PV
+            SPI, CPI   = PV/EV, EV/Spnd
+        Lines.append([_Inst._Name, str(iPrg._Date)[:10], \
+                      PV, EV, Spnd, SV, CV, BV, SPI, CPI])
+    return Lines
+
+##! Start:
+print("========  ProgressTable: tests start  ========")
+
+LhARAPATH    = os.getenv('LhARAPATH')
+wpDirectory  = os.path.join(LhARAPATH, '11-WorkPackages')
+PrgDirectory = os.path.join(LhARAPATH, '13-ProgressReports')
+StaffDatabaseFile = os.path.join(LhARAPATH, '12-Staff/StaffDatabase.csv')
+filepath     = os.path.join(LhARAPATH, '99-Scratch')
+os.environ.pop('REPORTPATH', None)
+
+Stf.Staff.parseStaffDatabase(StaffDatabaseFile)
+Stf.Staff.cleanStaffDatabase()
+wp.WorkPackage.ingest([os.path.join(wpDirectory, wpFile) \
+                       for wpFile in sorted(os.listdir(wpDirectory)) \
+                       if wpFile.find('.csv') > 0], 1)
+LCT.LhARACostingTool(False).Execute()
+for PrgFile in sorted(os.listdir(PrgDirectory)):
+    if PrgFile.find('.csv') > 0:
+        Prg.Progress.loadProgress(os.path.join(PrgDirectory, PrgFile))
+for iPrg in Prg.Progress.instances:
+    Prg.EarnedValue(iPrg._PrjWPorTsk, iPrg._Date, iPrg)
+
+##! Build table:
+ProgressTableTest = 1
+print()
+print("ProgressTableTest:", ProgressTableTest, \
+      " build table from progress instances.")
+iTbl = PrgTbl.ProgressTable.getTable()
+print(repr(iTbl))
+print(iTbl)
+if len(iTbl._Entity) != len(Prg.Progress.instances):
+    raise Exception("Rows differ from progress instances")
+if np.any(np.diff(iTbl._Entity) < 0):
+    raise Exception("Rows not ordered by entity")
+for iEnt in iTbl._Entities:
+    if np.any(np.diff(iTbl._Date[iTbl.getRows(iEnt)]) < \
+              np.timedelta64(0, "us")):
+        raise Exception("Rows of an entity not ordered by date")
+if PrgTbl.ProgressTable.getTable() is not iTbl:
+    raise Exception("Table built again without new instances")
+print("    ----> Entities:", len(iTbl._Entities), "; rows:", \
+      len(iTbl._Entity))
+print("    <---- Done.")
+
+##! Indicators match row-by-row evaluation:
+ProgressTableTest += 1
+print()
+print("ProgressTableTest:", ProgressTableTest, \
+      " variances and indices match row-by-row evaluation.")
+for iTsk in Tsk.Task.instances:
+    if iTbl.getLines(iTsk) != Reference(iTsk):
+        raise Exception("Lines differ for task " + iTsk._Name)
+if iTbl.getLines(wp.WorkPackage.instances[0]) != []:
+    raise Exception("Lines for work package without progress")
+print("    ----> Lines of", len(Tsk.Task.instances), "tasks match.")
+print("    <---- Done.")
+
+##! Work package and project roll up; data frames and plots:
+ProgressTableTest += 1
+print()
+print("ProgressTableTest:", ProgressTableTest, \
+      " work package and project roll up; data frames and plots.")
+Prg.Progress.rollUpProgress()
+iTbl2 = PrgTbl.ProgressTable.getTable()
+if iTbl2 is iTbl:
+    raise Exception("Table not built again after roll up")
+for iInst in (wp.WorkPackage.instances[0], Prj.Project.instances[0]):
+    if iTbl2.getLines(iInst) != Reference(iInst):
+        raise Exception("Lines differ for " + iInst._Name)
+    DataFrame = iTbl2.createPandasDataFrame(iInst)
+    if list(DataFrame.columns) != [PrgTbl.ProgressTable.getTitle(iInst)] \
+                                  + list(PrgTbl.ProgressTable._Columns):
+        raise Exception("Data frame columns differ from report")
+    print("    ----> ", DataFrame.columns[0], "; rows:", DataFrame.shape[0])
+iTbl2.Plot(Prj.Project.instances[0], filepath, \
+           "ProgressTable-Prj-landscape.pdf", True)
+print("    ----> Project progress plotted.")
+print("    <---- Done.")
+
+##! Values edited after the table is built:
+ProgressTableTest += 1
+print()
+print("ProgressTableTest:", ProgressTableTest, \
+      " values edited after the table is built.")
+iPrg = [Inst for Inst in Prg.Progress.instances \
+        if isinstance(Inst._PrjWPorTsk, Tsk.Task)][0]
+iTsk = iPrg._PrjWPorTsk
+iTbl3 = PrgTbl.ProgressTable.getTable()
+iPrg._EarnedValueInst.setEarnedValue(999.)
+iPrg.setSpend(123.)
+iTbl4 = PrgTbl.ProgressTable.getTable()
+if iTbl4 is iTbl3 or iTbl4.getLines(iTsk) != Reference(iTsk):
+    raise Exception("Table not built again after values were set")
+Line = [Line for Line in iTbl4.getLines(iTsk) \
+        if Line[1] == str(iPrg._Date)[:10]][0]
+print("    ----> Edited line; EV, spend:", Line[3], Line[4])
+Instances = Prg.Progress.instances
+Prg.Progress.instances = [Inst for Inst in Instances if Inst is not iPrg] \
+                         + [iPrg]
+if PrgTbl.ProgressTable.getTable() is iTbl4:
+    raise Exception("Table not built again for new instance list")
+Prg.Progress.instances = Instances
+nDel = Prg.Progress.clear()
+if PrgTbl.ProgressTable.getTable().getLines(iTsk) != []:
+    raise Exception("Table not empty after clear")
+print("    ----> Cleared", nDel, "instances; table empty.")
+print("    <---- Done.")
+
+##! Complete:
+print()
+print("========  ProgressTable: tests complete  ========")
@@ -144,7 +144,24 @@ for PrgFile in PrgList:
         FileName = os.path.join(PrgDirectory, PrgFile)
         if Debug:
             print("        ----> Reading data from: ", FileName)
-        Prg.Progress.loadProgress(FileName)
+        Unmatched = Prg.Progress.loadProgress(FileName)
+        if len(Unmatched) != 0:
+            raise Exception("Unmatched rows in progress report")
+print("     ----> Progress records:", len(Prg.Progress.instances))
+nPrg = len(Prg.Progress.instances)
+BadFile = os.path.join(LhARAPATH, '99-Scratch/BadProgressReport.csv')
+with open(BadFile, "w") as Bad:
+    Bad.write("Date:,04-May-22,,Issue,1,,,\n")
+    Bad.write("Work package,WP99,No such work package,,,,,\n")
+    Bad.write("ProgressLine,Project office support,1,01 November 2022," \
+              "0.04,7.08,0.04,7.63\n")
+    Bad.write("Work package,WP1,,,,,,\n")
+    Bad.write("ProgressLine,No such task,1,01 November 2022," \
+              "0.04,7.08,0.04,7.63\n")
+Unmatched = Prg.Progress.loadProgress(BadFile)
+if len(Unmatched) != 3 or len(Prg.Progress.instances) != nPrg:
+    raise Exception("Unmatched rows not reported")
+print("     ----> Unmatched rows of bad report:", len(Unmatched))
 print("     ----> Print progress records:")
 if Debug:
     print("          ----> progress reports loaded:")
@@ -164,6 +181,19 @@ for iPrg in Prg.Progress.instances:
     EV1 = Prg.EarnedValue(iPrg._PrjWPorTsk, iPrg._Date, iPrg)
     if Debug:
         print("      ----> Earned value:", EV1._EarnedValue)
+    if iPrg._EarnedValueInst is not EV1 or \
+       iPrg.getEarnedValue() != EV1._EarnedValue:
+        raise Exception("Progress not referred back to its earned value")
+print("    ----> Progress instances refer back to their earned value.")
+iTsk  = Prg.Progress.instances[0]._PrjWPorTsk
+TotVal = iTsk.getTotalValue()
+if iTsk._TotalValue is None:
+    raise Exception("Total value not cached")
+iTsk.getWorkPackage().setTotalOtherNonStaffCost()
+if iTsk._TotalValue is not None or iTsk.getTotalValue() != TotVal:
+    raise Exception("Total value not reset when costing set")
+print("    ----> Total value cached; reset when costing set:", \
+      round(float(TotVal), 3))
 print("    <---- Earned value loaded.")
 
 
@@ -214,6 +244,28 @@ Prg.Progress.Plot(DataFrame, filepath, "Progress-Prj-landscape.pdf", True)
 print("    <---- Progress report test done.")
 print()
 
+##! One-pass roll up of all work packages and the project:
+ProgressTest += 1
+print()
+print("Progress test:", ProgressTest, \
+      " one-pass roll up for all work packages and the project.")
+
+def WPorPrjValues(_Inst):
+    return [(iPrg._Date, iPrg._PlannedFractionComplete, \
+             iPrg._PlannedValue, iPrg._FractionComplete, iPrg._Spend) \
+            for iPrg in Prg.Progress.instances if iPrg._PrjWPorTsk == _Inst]
+
+iWP      = wp.WorkPackage.instances[0]
+iPrj     = Prj.Project.instances[0]
+Previous = {iWP: WPorPrjValues(iWP), iPrj: WPorPrjValues(iPrj)}
+Loaded   = Prg.Progress.rollUpProgress()
+for iInst in (iWP, iPrj):
+    if WPorPrjValues(iInst) != 2 * Previous[iInst]:
+        raise Exception("Roll up differs from WPorPrjProgress")
+print("    ----> Instances with progress:", \
+      [iInst._Name for iInst in Loaded if Loaded[iInst]])
+print("    <---- One-pass roll up test done.")
+
 
 
 ##! Complete:
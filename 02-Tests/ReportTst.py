@@ -24,6 +24,10 @@ import Staff       as Stf
 import WorkPackage as wp
 import Project     as Prj
 import Report      as Rprt
+import Task             as Tsk
+import TaskEquipment    as TskEqp
+import LhARACostingTool as LCT
+import Aggregation      as Agg
 
 ##! Start:
 print(" ")
@@ -171,6 +175,60 @@ print("    ----> Overview report instance created.")
 print(Ovrvw1)
 print("    <---- Overview report test done.")
 
+##! Sensitivity report:
+ReportsTest = 4
+print()
+print("ReportsTest:", ReportsTest, " check sensitivity (tornado) report.")
+os.environ.pop('REPORTPATH', None)
+LCT.LhARACostingTool(False).Execute()
+iPrj   = Prj.Project.instances[0]
+SnsRpt = Rprt.Sensitivity(filepath, "Sensitivity.csv", iPrj)
+SnsRpt.asCSV()
+SnsRpt.asPlot()
+print("    ----> Inputs ranked:", len(SnsRpt._Lines), "; top five:")
+for Line in SnsRpt._Lines[:5]:
+    print("          ", Line[:4], "swing:", round(Line[9], 3))
+for Line in SnsRpt._Lines:
+    if Line[1] == "Equipment":
+        break
+for iTskEqp in TskEqp.TaskEquipment.instances:
+    if iTskEqp._Equipment._Name == Line[2]:
+        iEqp = iTskEqp._Equipment
+Nominal = iEqp._EquipmentCostByYear
+iEqp._EquipmentCostByYear = Nominal * 1.1
+Tsk.Task.doCosting()
+wp.WorkPackage.doCosting()
+Prj.Project.doCosting()
+if not np.isclose(iPrj.getTotalProjectCost(), Line[8], rtol=1.E-12):
+    raise Exception("Sensitivity differs from re-costing")
+print("    ----> Equipment", Line[2], "high total agrees with re-costing.")
+iEqp._EquipmentCostByYear = Nominal
+print("    <---- Sensitivity report test done.")
+
+##! Quarterly cash flow report:
+ReportsTest = 5
+print()
+print("ReportsTest:", ReportsTest, " check quarterly cash flow report.")
+LCT.LhARACostingTool(False, False, True).Execute()
+iPrj = Prj.Project.instances[0]
+for iWP in wp.WorkPackage.instances:
+    if not np.allclose(Agg.Aggregation.toYears(iWP._TotalCostByQtr), \
+                       iWP._TotalCostByYear, rtol=1.E-12, atol=1.E-9):
+        raise Exception("Quarters do not sum to years for " + iWP._Code)
+if not np.allclose(Agg.Aggregation.toYears(iPrj._TotalCostByQtr), \
+                   iPrj.getTotalProjectCostByYear(), rtol=1.E-12, \
+                   atol=1.E-9):
+    raise Exception("Project quarters do not sum to years")
+print("    ----> Quarters sum to years for work packages and project.")
+CshFlw = Rprt.CashFlow(filepath, "CashFlow.csv", iPrj)
+CshFlw.asCSV()
+print("    ----> Cash flow report: columns:", len(CshFlw._Header), \
+      "; lines:", len(CshFlw._Lines))
+print("          ", CshFlw._Lines[-1][:2], \
+      round(float(CshFlw._Lines[-1][-1]), 3))
+LCT.LhARACostingTool(False)
+print("    <---- Cash flow report test done.")
+
 ##! Complete:
 print()
 print("========  Reports: tests complete  ========")
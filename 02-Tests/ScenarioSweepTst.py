@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for "ScenarioSweep" class ... batched scenario costing
+=================================================================
+
+  Assumes python path includes LhARA code.
+
+"""
+import os
+import numpy as np
+
+import Control as Cntrl
+iCntrl = Cntrl.Control()
+
+import LhARACostingTool as LCT
+import ScenarioSweep    as ScnSwp
+import Staff            as Stf
+import WorkPackage      as wp
+
+##! Start:
+print("========  ScenarioSweep: tests start  ========")
+
+LhARAPATH   = os.getenv('LhARAPATH')
+wpDirectory = os.path.join(LhARAPATH, '11-WorkPackages')
+StaffDatabaseFile = os.path.join(LhARAPATH, '12-Staff/StaffDatabase.csv')
+os.environ.pop('REPORTPATH', None)
+
+Stf.Staff.parseStaffDatabase(StaffDatabaseFile)
+Stf.Staff.cleanStaffDatabase()
+wp.WorkPackage.ingest([os.path.join(wpDirectory, wpFile) \
+                       for wpFile in os.listdir(wpDirectory) \
+                       if wpFile.find('.csv') > 0], 1)
+LCT.LhARACostingTool(False).Execute()
+
+##! Default parameters reproduce doCosting:
+ScenarioSweepTest = 1
+print()
+print("ScenarioSweepTest:", ScenarioSweepTest, \
+      " default parameters reproduce WorkPackage.doCosting.")
+Params = ScnSwp.ScenarioSweep.getParameters()
+print("    ----> Parameters:", Params)
+Result = ScnSwp.ScenarioSweep.sweep({})
+Total  = Result["WorkPackageTotalCostByYear"]
+print("    ----> Shape:", Total.shape, "; work packages:", \
+      Result["WorkPackages"])
+for iPos, iWP in enumerate(wp.WorkPackage.instances):
+    if not np.allclose(Total[0, iPos], iWP._TotalCostByYear, \
+                       rtol=1.E-12, atol=0.):
+        raise Exception("Sweep differs from doCosting for " + iWP._Code)
+print("    ----> Project total by year:", Result["ProjectTotalCostByYear"][0])
+print("    <---- Done.")
+
+##! Scenarios from costing contexts:
+ScenarioSweepTest = 2
+print()
+print("ScenarioSweepTest:", ScenarioSweepTest, \
+      " scenarios from costing contexts agree with doCosting.")
+Contexts = []
+for Scale in (0.5, 1., 2.):
+    Cntxt = Cntrl.Control.newContext()
+    Cntxt.setInflation([Scale*Cntxt.getInflationCapital(), \
+                        Scale*Cntxt.getInflationStaff(), 1])
+    Cntxt.setWorkingMargin([Scale*Cntxt.getWorkingMargin(), 0])
+    Cntxt.setContingency([Scale*Cntxt.getContingencyMaterial(), \
+                          Scale*Cntxt.getContingencyStaffPrj(), \
+                          Scale*Cntxt.getContingencyStaffCG(), 2])
+    Contexts.append(Cntxt)
+Result = ScnSwp.ScenarioSweep.sweep( \
+                ScnSwp.ScenarioSweep.fromContexts(Contexts), 2)
+Total  = Result["WorkPackageTotalCostByYear"]
+for iScn, Cntxt in enumerate(Contexts):
+    wp.WorkPackage.doCosting(None, Cntxt)
+    for iPos, iWP in enumerate(wp.WorkPackage.instances):
+        if not np.allclose(Total[iScn, iPos], iWP._TotalCostByYear, \
+                           rtol=1.E-12, atol=0.):
+            raise Exception("Sweep differs from doCosting for " + iWP._Code)
+    print("    ----> Scenario", iScn, "project total:", \
+          np.sum(Result["ProjectTotalCostByYear"][iScn]))
+wp.WorkPackage.doCosting()
+print("    <---- Done.")
+
+##! Large grid and exceptions:
+ScenarioSweepTest = 3
+print()
+print("ScenarioSweepTest:", ScenarioSweepTest, \
+      " grid of scenarios and exceptions.")
+WM, Cnt = np.meshgrid(np.linspace(0., 0.2, 101), np.linspace(0., 0.3, 101))
+Result  = ScnSwp.ScenarioSweep.sweep({"WorkingMargin": WM.ravel(), \
+                                      "ContingencyMaterial": Cnt.ravel()})
+print("    ----> Scenarios:", Result["ProjectTotalCostByYear"].shape[0], \
+      "; range of project total:", \
+      np.min(np.sum(Result["ProjectTotalCostByYear"], axis=1)), \
+      np.max(np.sum(Result["ProjectTotalCostByYear"], axis=1)))
+try:
+    ScnSwp.ScenarioSweep.sweep({"VAT": [0.2]})
+except ScnSwp.InconsistentParameters:
+    print("    ----> Correctly caught unknown parameter exception.")
+try:
+    ScnSwp.ScenarioSweep.sweep({"WorkingMargin": [0.1, 0.2], \
+                                "ContingencyMaterial": [0.1, 0.2, 0.3]})
+except ScnSwp.InconsistentParameters:
+    print("    ----> Correctly caught inconsistent lengths exception.")
+print("    <---- Done.")
+
+##! Complete:
+print()
+print("========  ScenarioSweep: tests complete  ========")
@@ -11,6 +11,8 @@ Test script for "Staff" class
 """
 
 import os
+import numpy as np
+
 import Staff as Stf
 
 ##! Start:
@@ -162,6 +164,41 @@ Stf.Staff.printStaffDatabase(StfDtFrm)
 print("     <---- Done.")
 
 
+##! Check integer codes of institute and funding source:
+StaffTest = 7
+print()
+print("StaffTest:", StaffTest, " institute and funding source codes.")
+for iStf in Stf.Staff.instances:
+    if Stf.Staff.institutes[iStf._InstIdx] != iStf._InstituteCode or \
+       Stf.Staff.fundingSources[iStf._FundIdx] != iStf._ProjectOrCG:
+        raise Exception("Staff codes and lookup tables disagree")
+iStf = Stf.Staff.instances[0]
+Source = iStf._ProjectOrCG
+iStf._ProjectOrCG = "CG"
+if not Stf.Staff.isCG([iStf])[0] or iStf._FundIdx != Stf.Staff._CG:
+    raise Exception("Funding source not interned")
+iStf._ProjectOrCG = Source
+InstIdx, FundIdx = Stf.Staff.getCodes(Stf.Staff.instances)
+print("     ----> Institutes:", len(Stf.Staff.institutes), \
+      "; staff by institute:", np.bincount(InstIdx).tolist())
+print("     ----> Funding sources:", Stf.Staff.fundingSources, \
+      "; staff by funding source:", np.bincount(FundIdx).tolist())
+print("     <---- Done.")
+
+
+##! Clear staff:
+StaffTest = 8
+print()
+print("StaffTest:", StaffTest, " clear staff.")
+iStf = Stf.Staff.instances[0]
+nStf = len(Stf.Staff.instances)
+if Stf.Staff.clear() != nStf or len(Stf.Staff.instances) != 0 or \
+   Stf.Staff.getInstance(iStf._InstituteCode, iStf._StaffCode) != None:
+    raise Exception("Staff not cleared")
+print("     ----> Cleared", nStf, "staff.")
+print("     <---- Done.")
+
+
 ##! Complete:
 print()
 print("========  Staff: tests complete  ========")
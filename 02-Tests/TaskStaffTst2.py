@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Second test script for "TaskStaff" class ... effort tensor
+==========================================================
+
+  Assumes python path includes LhARA code.
+
+  Tests run on the work packages and staff database of the LhARA
+  costing; the effort tensor is filled by the costing.
+
+"""
+import os
+import numpy as np
+
+import Control as Cntrl
+iCntrl = Cntrl.Control()
+
+import LhARACostingTool as LCT
+import Staff            as Stf
+import TaskStaff        as TskStf
+import WorkPackage      as wp
+
+##! Start:
+print("========  TaskStaff: second tests start  ========")
+
+LhARAPATH   = os.getenv('LhARAPATH')
+wpDirectory = os.path.join(LhARAPATH, '11-WorkPackages')
+StaffDatabaseFile = os.path.join(LhARAPATH, '12-Staff/StaffDatabase.csv')
+os.environ.pop('REPORTPATH', None)
+
+Stf.Staff.parseStaffDatabase(StaffDatabaseFile)
+Stf.Staff.cleanStaffDatabase()
+wp.WorkPackage.ingest([os.path.join(wpDirectory, wpFile) \
+                       for wpFile in sorted(os.listdir(wpDirectory)) \
+                       if wpFile.find('.csv') > 0], 1)
+LCT.LhARACostingTool(False).Execute()
+TS = TskStf.TaskStaff
+
+##! Check effort tensor:
+TaskStaffTest = 1
+print()
+print("TaskStaffTest:", TaskStaffTest, " check effort tensor views.")
+nRows = 0
+for iTskStf in TS.instances:
+    Row = iTskStf._Row
+    if not np.array_equal(iTskStf._StaffFracByYrNQtr, \
+                          TS._FracTensor[Row, :TS._nYrs[Row], :]):
+        raise Exception("Fraction by year and quarter not a tensor view")
+    Cost = iTskStf._Staff._AnnualCost * \
+        np.average(iTskStf._StaffFracByYrNQtr, 1)
+    if not np.array_equal(iTskStf._StaffCostByYear, Cost):
+        raise Exception("Vectorised cost does not match instance cost")
+    nRows += 1
+print('    ----> Rows consistent with tensor:', nRows)
+print("    <---- Done.")
+
+
+##! Check staff over-allocation:
+TaskStaffTest = 2
+print()
+print("TaskStaffTest:", TaskStaffTest, " check staff over-allocation.")
+Alloc = TS.getAllocation()
+for iStf, Stf in enumerate(TS._StaffKeys):
+    Sum = np.zeros(Alloc.shape[1:])
+    for iTskStf in TS.getForStaff(Stf):
+        Sum += TS._FracTensor[iTskStf._Row]
+    if not np.allclose(Alloc[iStf], Sum):
+        raise Exception("Allocation differs from sum over TaskStaff")
+print("    ----> Over-allocated quarters before change:", \
+      len(TS.checkAllocation()))
+iTskStf = TS.instances[0]
+Nominal = TS._FracTensor[iTskStf._Row, 0, 1]
+Total   = Alloc[TS._StaffIdx[iTskStf._Row], 0, 1]
+TS._FracTensor[iTskStf._Row, 0, 1] += 1.2 - Total
+Offenders = TS.checkAllocation()
+if len(Offenders) != 1 or Offenders[0][0] is not iTskStf._Staff or \
+   Offenders[0][1:3] != (0, 1) or not np.isclose(Offenders[0][4], 0.2) or \
+   not iTskStf._Task in Offenders[0][5]:
+    raise Exception("Over-allocation not found")
+print("    ----> Staff", Offenders[0][0]._StaffCode, "year", \
+      Offenders[0][1], "quarter", Offenders[0][2], "excess FTE:", \
+      round(float(Offenders[0][4]), 6), "; tasks:", \
+      [iTsk._Name for iTsk in Offenders[0][5]])
+TS._FracTensor[iTskStf._Row, 0, 1] = Nominal
+print("    <---- Done.")
+
+
+##! Complete:
+print()
+print("========  TaskStaff: second tests complete  ========")
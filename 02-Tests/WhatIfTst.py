@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for "WhatIf" class ... what-if session with delta propagation
+=========================================================================
+
+  Assumes python path includes LhARA code.
+
+"""
+import os
+import time
+import numpy as np
+
+import Control as Cntrl
+iCntrl = Cntrl.Control()
+
+import Project       as Prj
+import TaskStaff     as TskStf
+import TaskEquipment as TskEqp
+import WhatIf        as WI
+import WorkPackage   as wp
+
+def close(_a, _b):
+    return np.allclose(_a, _b, rtol=1.E-12, atol=1.E-9)
+
+def check(_Session):
+    Totals = _Session.getTotals()
+    WPTotByYr = [iWP._TotalCostByYear.copy() \
+                 for iWP in wp.WorkPackage.instances]
+    PrjTotByYr = Prj.Project.instances[0].getTotalProjectCostByYear()
+    _Session.recost()
+    Again = _Session.getTotals()
+    for Key in Again["Tasks"]:
+        if not close(Totals["Tasks"][Key], Again["Tasks"][Key]):
+            raise Exception("Task total differs from recost: " + str(Key))
+    for iWP, TotByYr in zip(wp.WorkPackage.instances, WPTotByYr):
+        if not close(TotByYr, iWP._TotalCostByYear):
+            raise Exception("Work package differs from recost: " + \
+                            iWP._Code)
+    if not close(PrjTotByYr, \
+                 Prj.Project.instances[0].getTotalProjectCostByYear()) or \
+       not close(Totals["Project"], Again["Project"]):
+        raise Exception("Project differs from recost")
+
+##! Start:
+print("========  WhatIf: tests start  ========")
+
+LhARAPATH = os.getenv('LhARAPATH')
+os.environ.pop('REPORTPATH', None)
+
+##! Load session:
+WhatIfTest = 1
+print()
+print("WhatIfTest:", WhatIfTest, " load session from inputs.")
+try:
+    WI.WhatIf(os.path.join(LhARAPATH, '99-Scratch'))
+except WI.NoInputs:
+    print("    ----> Correctly caught missing inputs exception.")
+Session = WI.WhatIf(LhARAPATH)
+print(repr(Session))
+print(Session)
+Baseline = Session.getTotals()
+print("    <---- Done.")
+
+##! Edit staff fraction:
+WhatIfTest = 2
+print()
+print("WhatIfTest:", WhatIfTest, \
+      " edit staff fraction; delta agrees with full costing.")
+TS      = TskStf.TaskStaff
+iTskStf = [iTS for iTS in TS.instances \
+           if iTS._Row != None and TS._nYrs[iTS._Row] > 1][0]
+iTskStf = Session.getTaskStaff(iTskStf._Task._WorkPackage._Code, \
+                               iTskStf._Task._Name, \
+                               iTskStf._Staff._InstituteCode, \
+                               iTskStf._Staff._StaffCode)
+try:
+    Session.getTaskStaff(iTskStf._Task._WorkPackage._Code, \
+                         iTskStf._Task._Name, "No institute", \
+                         iTskStf._Staff._StaffCode)
+except WI.InvalidEdit:
+    print("    ----> Correctly caught task staff of unknown institute.")
+try:
+    Session.setTaskStaffFraction(iTskStf, 99, 0, 0.3)
+except WI.InvalidEdit:
+    print("    ----> Correctly caught year out of range exception.")
+Start   = time.perf_counter()
+Changed = Session.setTaskStaffFraction(iTskStf, 1, 2, 0.3)
+Elapsed = time.perf_counter() - Start
+print("    ----> Task", iTskStf._Task._Name, "staff", \
+      iTskStf._Staff._StaffCode, "year 2, Q3 fraction 0.3:")
+print("          work packages changed:", list(Changed["WorkPackages"]))
+print("          project total:", round(float(Baseline["Project"]), 3), \
+      "->", round(float(Changed["Project"]), 3))
+print("          edit took less than 1 s:", Elapsed < 1.)
+check(Session)
+print("    <---- Done.")
+
+##! Edit staff annual cost:
+WhatIfTest = 3
+print()
+print("WhatIfTest:", WhatIfTest, \
+      " edit staff annual cost; delta agrees with full costing.")
+iStf    = iTskStf._Staff
+iStf    = Session.getStaff(iStf._InstituteCode, iStf._StaffCode)
+try:
+    Session.getStaff("NoSuchInstitute", iStf._StaffCode)
+except WI.InvalidEdit:
+    print("    ----> Correctly caught unknown institute exception.")
+Changed = Session.setStaffAnnualCost(iStf, iStf._AnnualCost * 1.1)
+print("    ----> Staff", iStf._StaffCode, "annual cost +10%:")
+print("          tasks changed:", len(Changed["Tasks"]), \
+      "; project total:", round(float(Changed["Project"]), 3))
+check(Session)
+print("    <---- Done.")
+
+##! Edit equipment cost:
+WhatIfTest = 4
+print()
+print("WhatIfTest:", WhatIfTest, \
+      " edit equipment cost; delta agrees with full costing.")
+iEqp = Session.getEquipment( \
+              TskEqp.TaskEquipment.instances[0]._Equipment._Name)
+try:
+    Session.setEquipmentCost(iEqp, np.zeros(99))
+except WI.InvalidEdit:
+    print("    ----> Correctly caught wrong length exception.")
+Changed = Session.setEquipmentCost(iEqp, iEqp._EquipmentCostByYear + 10.)
+print("    ----> Equipment", iEqp._Name, "+10 per year:")
+print("          tasks changed:", len(Changed["Tasks"]), \
+      "; project total:", round(float(Changed["Project"]), 3))
+check(Session)
+print("    <---- Done.")
+
+##! Complete:
+print()
+print("========  WhatIf: tests complete  ========")
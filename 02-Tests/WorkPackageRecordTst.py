@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for "WorkPackageRecord" class
+=========================================
+
+  Assumes python path includes LhARA code.
+
+"""
+import os
+import numpy as np
+
+import Control as Cntrl
+iCntrl = Cntrl.Control()
+
+import WorkPackageRecord as WPRec
+import WorkPackage       as wp
+
+def sameEntries(_Rec1, _Rec2):
+    if _Rec1["Filename"] != _Rec2["Filename"] or \
+       _Rec1["Version"]  != _Rec2["Version"]  or \
+       len(_Rec1["Entries"]) != len(_Rec2["Entries"]):
+        return False
+    for Ent1, Ent2 in zip(_Rec1["Entries"], _Rec2["Entries"]):
+        if len(Ent1) != len(Ent2):
+            return False
+        for Itm1, Itm2 in zip(Ent1, Ent2):
+            if isinstance(Itm1, np.ndarray):
+                if Itm1.tobytes() != Itm2.tobytes():
+                    return False
+            elif Itm1 != Itm2:
+                return False
+    return True
+
+##! Start:
+print("========  WorkPackageRecord: tests start  ========")
+
+LhARAPATH   = os.getenv('LhARAPATH')
+wpDirectory = os.path.join(LhARAPATH, '11-WorkPackages')
+Filenames   = sorted([os.path.join(wpDirectory, wpFile) \
+                      for wpFile in os.listdir(wpDirectory) \
+                      if wpFile.find('.csv') > 0])
+
+##! Read single file:
+WorkPackageRecordTest = 1
+print()
+print("WorkPackageRecordTest:", WorkPackageRecordTest, \
+      " read single work package definition.")
+Record = WPRec.WorkPackageRecord.read(Filenames[0])
+print("    ----> File:", os.path.basename(Record["Filename"]), \
+      "; version:", Record["Version"], \
+      "; entries:", len(Record["Entries"]))
+for Entry in Record["Entries"][:6]:
+    print("          ", Entry)
+print("    <---- Done.")
+
+
+##! Serial and parallel reads identical:
+WorkPackageRecordTest = 2
+print()
+print("WorkPackageRecordTest:", WorkPackageRecordTest, \
+      " serial and parallel reads are identical.")
+Serial   = WPRec.WorkPackageRecord.readAll(Filenames, 1)
+Parallel = WPRec.WorkPackageRecord.readAll(Filenames, 2)
+for Rec1, Rec2 in zip(Serial, Parallel):
+    if not sameEntries(Rec1, Rec2):
+        raise Exception("Parallel read differs from serial read")
+    print("    ----> Identical:", os.path.basename(Rec1["Filename"]))
+print("    <---- Done.")
+
+
+##! Ingest:
+WorkPackageRecordTest = 3
+print()
+print("WorkPackageRecordTest:", WorkPackageRecordTest, \
+      " ingest work packages in sorted filename order.")
+wpInst = wp.WorkPackage.ingest(list(reversed(Filenames)), 2)
+for iWP, Record in zip(wpInst, Serial):
+    if iWP._filename != Record["Filename"] or \
+       not sameEntries(iWP._Record, Record):
+        raise Exception("Ingest did not load records in filename order")
+    print("    ----> Loaded:", iWP._Code, iWP._Name, iWP._FinancialYears)
+print("    <---- Done.")
+
+
+##! Complete:
+print()
+print("========  WorkPackageRecord: tests complete  ========")
@@ -114,6 +114,25 @@ for iWP in wp.WorkPackage.instances:
     print(iWP)
 print("    <---- Done.")
 
+
+##! Check costing in a separate costing context:
+WorkpackageTest = 7
+print()
+print("WorkpackageTest:", WorkpackageTest, \
+      " check costing in a separate costing context.")
+Default = [iWP._TotalCostByYear for iWP in wp.WorkPackage.instances]
+Cntxt   = Cntrl.Control.newContext()
+Cntxt.setWorkingMargin([2.*Cntxt.getWorkingMargin(), 0])
+wp.WorkPackage.doCosting(None, Cntxt)
+for iWP, TotByYr in zip(wp.WorkPackage.instances, Default):
+    print("    ----> ", iWP._Code, "default:", TotByYr, \
+          "; context:", iWP._TotalCostByYear)
+wp.WorkPackage.doCosting()
+for iWP, TotByYr in zip(wp.WorkPackage.instances, Default):
+    if iWP._TotalCostByYear.tobytes() != TotByYr.tobytes():
+        raise Exception("Costing in default context changed by context")
+print("    <---- Done.")
+
 ##! Complete:
 print()
 print("========  WorkPackage: tests complete  ========")
@@ -6,6 +6,18 @@ Script to execute LhARA costing tool
 
   Assumes python path includes LhARA code.
 
+  Parsed work package definitions and staff database are cached if the
+  environment variable CACHEPATH points to an existing directory (see
+  ParseCache).
+
+  With the argument "Incremental=true" only the work packages that changed
+  since the previous run (work package definition, staff database entries
+  or control parameters) are re-costed and re-reported; the costed state
+  is kept in CACHEPATH (see CostingState).
+
+  With the argument "Quarterly=true" the costing is also carried by
+  quarter and the quarterly cash flow report (CashFlow.csv) is written.
+
 """
 
 ##! --------  System imports:
@@ -14,10 +26,16 @@ import sys
 
 
 ##! --------  Initialisation
-Debug = False
+Debug       = False
+Incremental = False
+Quarterly   = False
 for arg in sys.argv:
     if arg == "Debug=true":
         Debug = True
+    if arg == "Incremental=true":
+        Incremental = True
+    if arg == "Quarterly=true":
+        Quarterly = True
 if Debug:
     print(" LhARA costing tool, execution begins.")
 
@@ -107,7 +125,7 @@ wpList    = sorted(os.listdir(wpDirectory))
 if Debug:
     print("    Read work package definitions from: \n", \
           "              ---->", wpList)
-wpInst = []
+wpFiles = []
 for wpFile in wpList:
     if wpFile.find('.csv') <= 0:
         if Debug:
@@ -116,7 +134,8 @@ for wpFile in wpList:
         FileName = os.path.join(wpDirectory, wpFile)
         if Debug:
             print("              ----> Reading data from: ", FileName)
-        wpInst.append(wp.WorkPackage(FileName))
+        wpFiles.append(FileName)
+wpInst = wp.WorkPackage.ingest(wpFiles)
 if Debug:
     print("              ---->", len(wpInst), " work packages intialised:")
     for Inst in wpInst:
@@ -124,7 +143,7 @@ if Debug:
     
 
 ##! --------  Create LhARA costing tool instance:
-iLCT = LCT.LhARACostingTool(Debug)
+iLCT = LCT.LhARACostingTool(Debug, Incremental, Quarterly)
 if Debug:
     print(iLCT)
 